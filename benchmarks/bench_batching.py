@@ -0,0 +1,143 @@
+"""
+Benchmark - Génération par lots (ModelManager + BatchEngine)
+
+Compare le débit agrégé (tokens/s toutes conversations confondues) pour 1,
+4 et 8 conversations simultanées :
+- Série : ModelManager.generate() appelé une conversation après l'autre
+- Batch : appels concurrents décodés ensemble (batch_max_sequences)
+
+Nécessite llama-cpp-python et un modèle GGUF.
+
+Usage :
+    python benchmarks/bench_batching.py [--model models/zephyr-7b-beta.Q5_K_M.gguf]
+        [--profile balanced] [--max-tokens 96] [--concurrency 1 4 8]
+"""
+
+import argparse
+import sys
+import threading
+import time
+import logging
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.config import AIConfig
+from src.ai.model_manager import ModelManager
+
+# Prompts de conversations indépendantes (format Zephyr)
+PROMPTS = [
+    "Raconte-moi une courte histoire sur un chat qui voyage.",
+    "Quels sont tes films préférés et pourquoi ?",
+    "Explique simplement comment fonctionne un arc-en-ciel.",
+    "Donne-moi trois idées de repas rapides pour ce soir.",
+    "Que ferais-tu pendant des vacances à Paris ?",
+    "Décris ta journée idéale en quelques phrases.",
+    "Comment apprendre à jouer de la guitare quand on débute ?",
+    "Pourquoi le ciel est-il bleu ?",
+]
+
+
+def _prompt(index: int) -> str:
+    """Construit le prompt de la conversation `index`"""
+    question = PROMPTS[index % len(PROMPTS)]
+    return f"<|system|>\nTu es Kira.</s>\n<|user|>\n{question}</s>\n<|assistant|>\n"
+
+
+def _run(manager: ModelManager, concurrency: int, max_tokens: int, concurrent: bool) -> tuple:
+    """
+    Génère `concurrency` réponses, en série ou en parallèle
+    
+    Returns:
+        (durée en secondes, tokens générés)
+    """
+    outputs = [""] * concurrency
+    
+    def worker(index: int):
+        # temperature=0 : longueurs comparables entre les deux modes
+        outputs[index] = manager.generate(
+            _prompt(index), temperature=0.0, max_tokens=max_tokens
+        )
+    
+    start = time.perf_counter()
+    
+    if concurrent:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        for index in range(concurrency):
+            worker(index)
+    
+    duration = time.perf_counter() - start
+    tokens = sum(manager.count_tokens(text) for text in outputs)
+    
+    return duration, tokens
+
+
+def _bench(config: AIConfig, levels: list, max_tokens: int, concurrent: bool) -> dict:
+    """Charge le modèle avec `config` et mesure chaque niveau de concurrence"""
+    manager = ModelManager(config)
+    manager.load_model()
+    
+    try:
+        # Préchauffage (allocation des buffers, graphes CUDA...)
+        _run(manager, 1, 8, concurrent)
+        
+        results = {}
+        for concurrency in levels:
+            results[concurrency] = _run(manager, concurrency, max_tokens, concurrent)
+        return results
+    
+    finally:
+        manager.unload_model()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark génération par lots")
+    parser.add_argument("--model", default=AIConfig.model_path, help="Modèle GGUF")
+    parser.add_argument("--profile", default="balanced", help="Profil GPU")
+    parser.add_argument("--max-tokens", type=int, default=96, help="Tokens par réponse")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 8],
+        help="Nombres de conversations simultanées"
+    )
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    print(
+        f"🧪 Benchmark génération par lots : {Path(args.model).name}, "
+        f"profil {args.profile}, {args.max_tokens} tokens/réponse\n"
+    )
+    
+    serial_config = AIConfig(model_path=args.model, gpu_profile=args.profile)
+    batch_config = AIConfig(
+        model_path=args.model,
+        gpu_profile=args.profile,
+        batch_max_sequences=max(args.concurrency)
+    )
+    
+    serial = _bench(serial_config, args.concurrency, args.max_tokens, concurrent=False)
+    batched = _bench(batch_config, args.concurrency, args.max_tokens, concurrent=True)
+    
+    print(f"   {'conversations':>13}  {'série tok/s':>12}  {'batch tok/s':>12}  {'gain':>6}")
+    for concurrency in args.concurrency:
+        serial_duration, serial_tokens = serial[concurrency]
+        batch_duration, batch_tokens = batched[concurrency]
+        serial_rate = serial_tokens / serial_duration
+        batch_rate = batch_tokens / batch_duration
+        
+        print(
+            f"   {concurrency:>13}  {serial_rate:>12.1f}  {batch_rate:>12.1f}  "
+            f"{batch_rate / serial_rate:>5.2f}x"
+        )
+    
+    print("\n✅ Benchmark terminé")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark - Détection des mots-clés émotionnels
+
+Compare sur un corpus synthétique de longues réponses :
+- Sous-chaînes : `keyword in text.lower()` pour chaque mot-clé de chaque
+  émotion (ancienne méthode, un parcours du texte par mot-clé)
+- KeywordMatcher : texte découpé une fois en mots, mots-clés trouvés par
+  intersection d'ensembles (trie de mots pour les expressions)
+
+Mesure aussi EmotionAnalyzer.analyze() de bout en bout.
+
+Usage :
+    python benchmarks/bench_emotion.py [--replies 2000] [--words 300]
+"""
+
+import argparse
+import random
+import sys
+import time
+import logging
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.emotion_analyzer import EmotionAnalyzer
+from src.ai.keyword_matcher import KeywordMatcher
+
+# Mots de remplissage (réponses de conversation sans charge émotionnelle)
+FILLER = (
+    "je pense que tu as raison sur ce point mais il faudrait aussi regarder "
+    "comment les choses se passent dans la vie de tous les jours avec les amis "
+    "la famille le travail les projets et les petites habitudes qui comptent "
+    "vraiment pour avancer chaque semaine un peu plus loin ensemble"
+).split()
+
+
+def _build_corpus(replies: int, words: int, seed: int = 42) -> list:
+    """Génère `replies` réponses de `words` mots (~5 % de mots-clés)"""
+    rng = random.Random(seed)
+    keywords = [
+        keyword
+        for weights in EmotionAnalyzer.EMOTION_KEYWORDS.values()
+        for keyword in weights
+    ]
+    
+    corpus = []
+    for _ in range(replies):
+        tokens = [
+            rng.choice(keywords) if rng.random() < 0.05 else rng.choice(FILLER)
+            for _ in range(words)
+        ]
+        corpus.append(" ".join(tokens).capitalize() + ".")
+    
+    return corpus
+
+
+def _substring_scan(text: str) -> dict:
+    """Ancienne méthode : une recherche de sous-chaîne par mot-clé"""
+    hits = {}
+    
+    for emotion, weights in EmotionAnalyzer.EMOTION_KEYWORDS.items():
+        text_lower = text.lower()
+        found = [keyword for keyword in weights if keyword in text_lower]
+        if found:
+            hits[emotion] = found
+    
+    return hits
+
+
+def _time(label: str, func, corpus: list, repeat: int) -> float:
+    """Mesure le meilleur temps de `repeat` passes sur le corpus"""
+    best = float("inf")
+    
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    
+    per_reply_us = best / len(corpus) * 1e6
+    print(f"   {label:<28} {best * 1000:>9.1f} ms  {per_reply_us:>8.1f} µs/réponse")
+    
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark détection mots-clés")
+    parser.add_argument("--replies", type=int, default=2000, help="Nombre de réponses")
+    parser.add_argument("--words", type=int, default=300, help="Mots par réponse")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes par mesure")
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    corpus = _build_corpus(args.replies, args.words)
+    
+    build_start = time.perf_counter()
+    matcher = KeywordMatcher(EmotionAnalyzer.EMOTION_KEYWORDS)
+    build_ms = (time.perf_counter() - build_start) * 1000
+    
+    print(
+        f"🧪 Benchmark mots-clés : {args.replies} réponses × {args.words} mots "
+        f"(compilation matcher : {build_ms:.2f} ms)\n"
+    )
+    
+    scan = _time("sous-chaînes", _substring_scan, corpus, args.repeat)
+    compiled = _time("KeywordMatcher", matcher.match, corpus, args.repeat)
+    
+    analyzer = EmotionAnalyzer()
+    _time("EmotionAnalyzer.analyze", analyzer.analyze, corpus, args.repeat)
+    
+    print(f"\n   Gain KeywordMatcher : {scan / compiled:.2f}x")
+    print("\n✅ Benchmark terminé")
+
+
+if __name__ == "__main__":
+    main()
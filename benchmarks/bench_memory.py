@@ -0,0 +1,111 @@
+"""
+Benchmark - Mémoire Conversationnelle (ConversationMemory)
+
+Mesure le surcoût mémoire d'un tour de chat (get_history + save_interaction) :
+- Avant : une connexion SQLite ouverte/fermée à chaque appel
+- Après : pool de connexions persistantes (WAL, synchronous=NORMAL)
+
+Usage :
+    python benchmarks/bench_memory.py [--turns 500] [--users 20]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.memory import ConversationMemory
+
+
+class UnpooledConversationMemory(ConversationMemory):
+    """ConversationMemory avec l'ancien comportement (connexion par appel)"""
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def _run_turns(memory: ConversationMemory, turns: int, users: int, context_limit: int) -> list:
+    """Simule des tours de chat et retourne la durée de chaque tour (secondes)"""
+    durations = []
+
+    for i in range(turns):
+        user_id = f"user_{i % users}"
+
+        start = time.perf_counter()
+        memory.get_history(user_id, limit=context_limit, source="discord")
+        memory.save_interaction(
+            user_id=user_id,
+            source="discord",
+            user_input=f"Message numéro {i} pour Kira",
+            bot_response=f"Réponse numéro {i} de Kira, avec un peu de texte 😊",
+            emotion="joy"
+        )
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def _report(label: str, durations: list) -> float:
+    """Affiche les statistiques d'une série et retourne la moyenne (ms)"""
+    ordered = sorted(durations)
+    mean_ms = sum(ordered) / len(ordered) * 1000
+    p50_ms = ordered[len(ordered) // 2] * 1000
+    p95_ms = ordered[int(len(ordered) * 0.95) - 1] * 1000
+
+    print(f"   {label:28} moyenne={mean_ms:7.3f} ms  p50={p50_ms:7.3f} ms  p95={p95_ms:7.3f} ms")
+    return mean_ms
+
+
+def _bench(memory_cls, turns: int, users: int, context_limit: int) -> list:
+    """Exécute un benchmark sur une base temporaire neuve"""
+    tmp_dir = tempfile.mkdtemp(prefix="bench_memory_")
+    db_path = os.path.join(tmp_dir, "chat_history.db")
+
+    memory = memory_cls(db_path)
+    try:
+        return _run_turns(memory, turns, users, context_limit)
+    finally:
+        memory.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ConversationMemory")
+    parser.add_argument("--turns", type=int, default=500, help="Nombre de tours de chat")
+    parser.add_argument("--users", type=int, default=20, help="Nombre d'utilisateurs simulés")
+    parser.add_argument("--context-limit", type=int, default=10, help="Taille de l'historique lu")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"🧪 Benchmark mémoire : {args.turns} tours, {args.users} utilisateurs\n")
+
+    before = _report("Avant (connexion par appel)",
+                     _bench(UnpooledConversationMemory, args.turns, args.users, args.context_limit))
+    after = _report("Après (pool persistant)",
+                    _bench(ConversationMemory, args.turns, args.users, args.context_limit))
+
+    print(f"\n✅ Gain par tour : x{before / after:.1f} ({before - after:.3f} ms économisées)")
+
+
+if __name__ == "__main__":
+    main()
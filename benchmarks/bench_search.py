@@ -0,0 +1,154 @@
+"""
+Benchmark - Recherche plein texte (ConversationMemory.search)
+
+Remplit une base temporaire avec un historique synthétique (plusieurs
+millions de lignes, vocabulaire à distribution de Zipf) puis mesure la
+latence de search() pour des requêtes rares, fréquentes, multi-termes,
+en préfixe et filtrées par utilisateur.
+
+Usage :
+    python benchmarks/bench_search.py [--rows 2000000] [--users 5000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import logging
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.memory import ConversationMemory
+
+# Vocabulaire synthétique à distribution de Zipf (comme une langue réelle) :
+# quelques mots très fréquents, une longue traîne de mots rares
+ZIPF_VOCABULARY_SIZE = 20000
+
+# Mots recherchés, placés à un rang donné de la distribution
+PLACED_WORDS = {
+    "musique": 50,
+    "vacances": 150,
+    "film": 200,
+    "paris": 300,
+    "licorne": 5000,
+    "zorglub": 15000,
+}
+
+QUERIES = [
+    ("terme rare", "zorglub", None),
+    ("terme fréquent", "musique", None),
+    ("deux termes", "film paris", None),
+    ("préfixe", "vacan*", None),
+    ("terme fréquent + user", "musique", "user_42"),
+    ("terme rare + user", "licorne", "user_42"),
+]
+
+
+def _build_vocabulary() -> tuple:
+    """Construit le vocabulaire et ses poids cumulés (loi de Zipf, s=1)"""
+    words = [f"mot{rank}" for rank in range(1, ZIPF_VOCABULARY_SIZE + 1)]
+    for word, rank in PLACED_WORDS.items():
+        words[rank - 1] = word
+    
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, ZIPF_VOCABULARY_SIZE + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+    
+    return words, cum_weights
+
+
+def _sentence(rng: random.Random, vocabulary: tuple, words: int) -> str:
+    """Génère une phrase aléatoire à partir du vocabulaire"""
+    return " ".join(rng.choices(vocabulary[0], cum_weights=vocabulary[1], k=words))
+
+
+def _populate(memory: ConversationMemory, rows: int, users: int, batch: int = 20000):
+    """Insère `rows` interactions synthétiques par lots"""
+    rng = random.Random(42)
+    vocabulary = _build_vocabulary()
+    inserted = 0
+
+    while inserted < rows:
+        count = min(batch, rows - inserted)
+        data = [
+            (
+                f"user_{rng.randrange(users)}",
+                rng.choice(("desktop", "discord")),
+                _sentence(rng, vocabulary, rng.randint(4, 15)),
+                _sentence(rng, vocabulary, rng.randint(10, 40)),
+                rng.choice(("joy", "fun", "neutral", "sorrow", None)),
+            )
+            for _ in range(count)
+        ]
+
+        with memory._get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO chat_history (user_id, source, user_input, bot_response, emotion) "
+                "VALUES (?, ?, ?, ?, ?)",
+                data
+            )
+
+        inserted += count
+        print(f"\r   Remplissage : {inserted:,}/{rows:,}", end="", flush=True)
+
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recherche FTS5")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Nombre d'interactions")
+    parser.add_argument("--users", type=int, default=5000, help="Nombre d'utilisateurs")
+    parser.add_argument("--repeat", type=int, default=20, help="Répétitions par requête")
+    parser.add_argument("--limit", type=int, default=10, help="Résultats par requête")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_search_")
+    memory = ConversationMemory(os.path.join(tmp_dir, "chat_history.db"))
+
+    try:
+        if not memory.search_available:
+            print("❌ FTS5 indisponible dans cette build SQLite")
+            return
+
+        print(f"🧪 Benchmark recherche : {args.rows:,} interactions, {args.users} utilisateurs\n")
+
+        start = time.perf_counter()
+        _populate(memory, args.rows, args.users)
+        print(f"   Insertion + indexation : {time.perf_counter() - start:.1f}s\n")
+
+        for label, query, user_id in QUERIES:
+            durations = []
+            results = []
+
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                results = memory.search(query, user_id=user_id, limit=args.limit)
+                durations.append(time.perf_counter() - t0)
+
+            durations.sort()
+            p50_ms = durations[len(durations) // 2] * 1000
+            p95_ms = durations[int(len(durations) * 0.95) - 1] * 1000
+
+            print(
+                f"   {label:24} '{query:10}' p50={p50_ms:8.2f} ms  "
+                f"p95={p95_ms:8.2f} ms  ({len(results)} résultats)"
+            )
+
+        print("\n✅ Benchmark terminé")
+
+    finally:
+        memory.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
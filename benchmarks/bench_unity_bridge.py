@@ -0,0 +1,186 @@
+"""
+Benchmark - Protocoles du pont Python ↔ Unity (JSON vs binaire)
+
+Un serveur Python local joue le rôle de Unity (négociation comprise) et
+décode les commandes avec les mêmes codecs que UnityBridge :
+- Débit : UnityBridge envoie des set_expression (noms distincts, donc pas
+  de fusion) sans limite de fréquence, mesuré jusqu'à réception complète
+- Latence : aller-retour d'une commande set_expression et d'une réponse,
+  une à la fois, sur la boucle locale
+
+Usage :
+    python benchmarks/bench_unity_bridge.py [--messages 50000] [--round-trips 2000]
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+import logging
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ipc.unity_bridge import (
+    UnityBridge, ReceiveBuffer, CODECS, PROTOCOL_JSON, PROTOCOL_BINARY
+)
+
+
+class StandInServer:
+    """Serveur remplaçant Unity : négocie le protocole, compte les commandes"""
+    
+    def __init__(self, echo: bool = False):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.echo = echo
+        self.received = 0
+        self.done = threading.Event()
+        self.expected = None
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+    
+    def _serve(self):
+        conn, _ = self.server.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buffer = ReceiveBuffer()
+        codec = CODECS[PROTOCOL_JSON]
+        
+        with conn:
+            # La négociation précède toute commande : un message à la fois d'ici là
+            limit = 1
+            
+            while buffer.recv_from(conn):
+                while True:
+                    messages = buffer.consume(codec, max_messages=limit)
+                    if not messages:
+                        break
+                    
+                    for message in messages:
+                        limit = None
+                        if message["command"] == "negotiate_protocol":
+                            conn.sendall(json.dumps({
+                                "type": "response", "command": "negotiate_protocol",
+                                "status": "success", "protocol": PROTOCOL_BINARY
+                            }).encode("utf-8") + b"\n")
+                            codec = CODECS[PROTOCOL_BINARY]
+                            continue
+                        
+                        self.received += 1
+                        if self.echo:
+                            conn.sendall(codec.encode("response", {"status": "success"}))
+                    
+                    if self.expected is not None and self.received >= self.expected:
+                        self.done.set()
+    
+    def close(self):
+        self.server.close()
+
+
+def _throughput(protocol: str, messages: int) -> tuple:
+    """
+    Envoie `messages` commandes par UnityBridge
+    
+    Returns:
+        (messages/s, octets par message)
+    """
+    server = StandInServer()
+    server.expected = messages
+    bridge = UnityBridge(
+        port=server.port, max_rate_hz=0, max_pending=messages, protocol=protocol,
+        auto_reconnect=False
+    )
+    
+    try:
+        if not bridge.connect():
+            raise RuntimeError("Connexion au serveur local impossible")
+        
+        start = time.perf_counter()
+        for index in range(messages):
+            bridge.set_expression(f"expr{index}", (index % 100) / 100)
+        
+        if not server.done.wait(60.0):
+            raise RuntimeError(f"Seulement {server.received}/{messages} commandes reçues")
+        duration = time.perf_counter() - start
+    finally:
+        bridge.disconnect()
+        server.close()
+    
+    # En JSON, chaque commande porte un identifiant (réponse attendue de Unity)
+    message_id = None if "set_expression" in bridge.codec.unacknowledged else messages
+    size = len(bridge.codec.encode("set_expression", {"name": "expr1234", "value": 0.5}, message_id))
+    return messages / duration, size
+
+
+def _latency(protocol: str, round_trips: int) -> list:
+    """
+    Mesure `round_trips` allers-retours commande → réponse
+    
+    Returns:
+        Durées en microsecondes
+    """
+    server = StandInServer(echo=True)
+    codec = CODECS[protocol]
+    client = socket.create_connection(("127.0.0.1", server.port))
+    client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    buffer = ReceiveBuffer()
+    
+    try:
+        if protocol == PROTOCOL_BINARY:
+            client.sendall(CODECS[PROTOCOL_JSON].encode("negotiate_protocol", {"protocol": "binary"}))
+            while not buffer.consume(CODECS[PROTOCOL_JSON], max_messages=1):
+                buffer.recv_from(client)
+        
+        samples = []
+        for index in range(round_trips):
+            frame = codec.encode("set_expression", {"name": "joy", "value": (index % 100) / 100})
+            
+            start = time.perf_counter()
+            client.sendall(frame)
+            while not buffer.consume(codec, max_messages=1):
+                buffer.recv_from(client)
+            samples.append((time.perf_counter() - start) * 1e6)
+        
+        return samples
+    finally:
+        client.close()
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark protocoles UnityBridge")
+    parser.add_argument("--messages", type=int, default=50000, help="Commandes pour le débit")
+    parser.add_argument("--round-trips", type=int, default=2000, help="Allers-retours pour la latence")
+    args = parser.parse_args()
+    
+    logging.disable(logging.WARNING)
+    
+    print(
+        f"🧪 Benchmark UnityBridge : {args.messages} commandes, "
+        f"{args.round_trips} allers-retours (boucle locale)\n"
+    )
+    print(
+        f"   {'protocole':>9}  {'octets/msg':>10}  {'msg/s':>10}  "
+        f"{'RTT p50 µs':>10}  {'RTT p99 µs':>10}"
+    )
+    
+    for protocol in (PROTOCOL_JSON, PROTOCOL_BINARY):
+        rate, size = _throughput(protocol, args.messages)
+        samples = sorted(_latency(protocol, args.round_trips))
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        
+        print(
+            f"   {protocol:>9}  {size:>10}  {rate:>10.0f}  "
+            f"{statistics.median(samples):>10.1f}  {p99:>10.1f}"
+        )
+    
+    print("\n✅ Benchmark terminé")
+
+
+if __name__ == "__main__":
+    main()
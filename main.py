@@ -5,25 +5,54 @@ Hybrid Unity + Python desktop avatar application.
 """
 
 import sys
+import argparse
 import logging
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.gui.app import DesktopMateApp
 from src.utils.logger import setup_logger
+from src.utils.startup_profiler import get_startup_profiler
+
+
+def parse_args(argv):
+    """Parse our command line options (the rest is left to Qt).
+    
+    Args:
+        argv: Command line arguments (without the program name)
+    
+    Returns:
+        (options, remaining arguments)
+    """
+    parser = argparse.ArgumentParser(description="Desktop-Mate control panel")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print an import-time and init-time breakdown of the startup"
+    )
+    return parser.parse_known_args(argv)
 
 
 def main():
     """Main entry point for Desktop-Mate application."""
+    options, qt_args = parse_args(sys.argv[1:])
+    
+    profiler = get_startup_profiler()
+    if options.profile_startup:
+        profiler.start()
+    
     # Setup logging
     logger = setup_logger()
     logger.info("Starting Desktop-Mate application...")
     
     try:
+        # GUI imported here so that --profile-startup times it
+        with profiler.step("import src.gui.app"):
+            from src.gui.app import DesktopMateApp
+        
         # Create and run the application
-        app = DesktopMateApp(sys.argv)
+        app = DesktopMateApp(sys.argv[:1] + qt_args)
         exit_code = app.run()
         logger.info(f"Application exited with code {exit_code}")
         return exit_code
@@ -0,0 +1,105 @@
+"""
+Re-score des émotions de l'historique (chat_history.emotion)
+
+Après une modification des mots-clés émotionnels, recalcule l'émotion de
+chaque réponse du bot avec EmotionAnalyzer.analyze_batch() (vectorisé, sans
+historique par utilisateur). La base est lue par tranches : la mémoire reste
+constante quelle que soit la taille de l'historique.
+
+Nécessite numpy.
+
+Usage :
+    python scripts/rescore_emotions.py [--db data/chat_history.db]
+        [--chunk-size 2000] [--dry-run]
+"""
+
+import argparse
+import sys
+import time
+import logging
+from collections import Counter
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.emotion_analyzer import EmotionAnalyzer
+from src.ai.memory import ConversationMemory
+
+
+def rescore(memory: ConversationMemory, chunk_size: int, dry_run: bool) -> Counter:
+    """
+    Recalcule les émotions de toute la base, tranche par tranche
+    
+    Returns:
+        Compteur des changements {(ancienne émotion, nouvelle émotion): nombre}
+    """
+    analyzer = EmotionAnalyzer()
+    total = memory.get_stats()['total_interactions']
+    changes = Counter()
+    processed = 0
+    start = time.perf_counter()
+    
+    for chunk in memory.iter_responses(chunk_size):
+        results = analyzer.analyze_batch([response for _, response, _ in chunk])
+        
+        updates = []
+        for (row_id, _, old_emotion), result in zip(chunk, results):
+            if result.emotion != old_emotion:
+                updates.append((row_id, result.emotion))
+                changes[(old_emotion, result.emotion)] += 1
+        
+        if not dry_run:
+            memory.update_emotions(updates)
+        
+        processed += len(chunk)
+        elapsed = time.perf_counter() - start
+        percent = processed / total * 100 if total else 100.0
+        print(
+            f"\r⏳ {processed}/{total} ({percent:.0f} %) - "
+            f"{sum(changes.values())} modifiée(s) - {processed / elapsed:.0f} lignes/s",
+            end="", flush=True
+        )
+    
+    print()
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score des émotions de l'historique")
+    parser.add_argument("--db", default="data/chat_history.db", help="Base SQLite")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Lignes par tranche")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Affiche les changements sans écrire"
+    )
+    args = parser.parse_args()
+    
+    if not Path(args.db).exists():
+        print(f"❌ Base introuvable : {args.db}")
+        sys.exit(1)
+    
+    logging.disable(logging.INFO)
+    
+    memory = ConversationMemory(args.db)
+    
+    try:
+        mode = " (simulation)" if args.dry_run else ""
+        print(f"🎭 Re-score des émotions : {args.db}{mode}\n")
+        
+        changes = rescore(memory, args.chunk_size, args.dry_run)
+        
+        if changes:
+            print("\n   Changements (ancienne → nouvelle) :")
+            for (old, new), count in changes.most_common(10):
+                print(f"   {old or '∅':>10} → {new:<10} {count:>8}")
+        
+        if not args.dry_run:
+            print(f"\n   Répartition : {memory.get_stats()['by_emotion']}")
+    finally:
+        memory.close()
+    
+    print("\n✅ Re-score terminé")
+
+
+if __name__ == "__main__":
+    main()
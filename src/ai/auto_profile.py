@@ -0,0 +1,442 @@
+"""
+Profil GPU automatique pour Desktop-Mate (Kira)
+
+Calcule les paramètres llama.cpp adaptés à la machine au lieu d'un profil
+figé (AIConfig.gpu_profile = "auto") :
+- Métadonnées du modèle lues dans l'en-tête GGUF (couches, contexte,
+  quantification), sans charger les poids
+- VRAM libre (pynvml) et cœurs physiques (psutil)
+- Estimation : couches déportées sur GPU, n_ctx, n_batch, n_threads
+- Calibration : débit (tokens/s) mesuré sur quelques variantes, gagnant
+  mis en cache par machine et par modèle
+"""
+
+import hashlib
+import json
+import logging
+import os
+import platform
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+# Import psutil (cœurs physiques)
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Fichier cache des profils calibrés (clé machine + modèle)
+AUTO_PROFILE_CACHE_PATH = "data/auto_profiles.json"
+
+# Contexte visé (limité par le contexte d'entraînement du modèle)
+MAX_AUTO_CTX = 4096
+MIN_AUTO_CTX = 2048
+
+# VRAM gardée libre : contexte CUDA, buffers de calcul, autres applications
+VRAM_RESERVE_BYTES = 768 * 1024 * 1024
+
+# Octets lus au début et à la fin du GGUF pour l'empreinte du modèle
+FINGERPRINT_CHUNK = 16 * 1024 * 1024
+
+# Quantification (general.file_type, enum llama_ftype de llama.cpp)
+GGUF_FILE_TYPES = {
+    0: "F32", 1: "F16", 2: "Q4_0", 3: "Q4_1", 7: "Q8_0", 8: "Q5_0", 9: "Q5_1",
+    10: "Q2_K", 11: "Q3_K_S", 12: "Q3_K_M", 13: "Q3_K_L", 14: "Q4_K_S",
+    15: "Q4_K_M", 16: "Q5_K_S", 17: "Q5_K_M", 18: "Q6_K", 32: "BF16"
+}
+
+# Types de valeurs GGUF : format struct des scalaires
+_GGUF_SCALARS = {
+    0: "<B", 1: "<b", 2: "<H", 3: "<h", 4: "<I", 5: "<i", 6: "<f", 7: "<?",
+    10: "<Q", 11: "<q", 12: "<d"
+}
+_GGUF_STRING = 8
+_GGUF_ARRAY = 9
+
+
+@dataclass
+class GGUFInfo:
+    """Métadonnées d'un modèle GGUF utiles au dimensionnement"""
+    architecture: str
+    n_layers: int                 # Blocs transformer ({arch}.block_count)
+    context_length: int           # Contexte d'entraînement
+    embedding_length: int
+    head_count: int
+    head_count_kv: int
+    quantization: str             # Ex : "Q5_K_M"
+    file_size: int                # En bytes
+    
+    @property
+    def layer_bytes(self) -> int:
+        """Taille moyenne d'une couche (embeddings et sortie comptent pour une)"""
+        return self.file_size // (self.n_layers + 1)
+    
+    @property
+    def kv_bytes_per_token(self) -> int:
+        """KV cache par token de contexte (K et V en f16, toutes couches)"""
+        n_embd_kv = self.embedding_length * self.head_count_kv // max(self.head_count, 1)
+        return 2 * self.n_layers * n_embd_kv * 2
+
+
+def _read_exact(handle: BinaryIO, size: int) -> bytes:
+    data = handle.read(size)
+    if len(data) != size:
+        raise ValueError("Fichier GGUF tronqué")
+    return data
+
+
+def _read_gguf_string(handle: BinaryIO) -> str:
+    (length,) = struct.unpack("<Q", _read_exact(handle, 8))
+    return _read_exact(handle, length).decode("utf-8", errors="replace")
+
+
+def _read_gguf_value(handle: BinaryIO, value_type: int, keep: bool):
+    """Lit une valeur GGUF (les tableaux non gardés sont seulement sautés)"""
+    if value_type in _GGUF_SCALARS:
+        fmt = _GGUF_SCALARS[value_type]
+        return struct.unpack(fmt, _read_exact(handle, struct.calcsize(fmt)))[0]
+    
+    if value_type == _GGUF_STRING:
+        return _read_gguf_string(handle)
+    
+    if value_type == _GGUF_ARRAY:
+        item_type, count = struct.unpack("<IQ", _read_exact(handle, 12))
+        if item_type in _GGUF_SCALARS and not keep:
+            handle.seek(struct.calcsize(_GGUF_SCALARS[item_type]) * count, os.SEEK_CUR)
+            return None
+        items = [_read_gguf_value(handle, item_type, keep) for _ in range(count)]
+        return items if keep else None
+    
+    raise ValueError(f"Type de valeur GGUF inconnu : {value_type}")
+
+
+def read_gguf_metadata(path: str) -> GGUFInfo:
+    """
+    Lit les métadonnées d'un modèle GGUF (en-tête seulement)
+    
+    Args:
+        path: Chemin du fichier .gguf
+    
+    Returns:
+        GGUFInfo
+    
+    Raises:
+        ValueError: Si le fichier n'est pas un GGUF valide
+    """
+    with open(path, "rb") as handle:
+        if _read_exact(handle, 4) != b"GGUF":
+            raise ValueError(f"Pas un fichier GGUF : {path}")
+        
+        (version,) = struct.unpack("<I", _read_exact(handle, 4))
+        # GGUF v1 : compteurs sur 32 bits
+        count_format = "<II" if version == 1 else "<QQ"
+        _, kv_count = struct.unpack(count_format, _read_exact(handle, struct.calcsize(count_format)))
+        
+        metadata: Dict[str, Any] = {}
+        for _ in range(kv_count):
+            key = _read_gguf_string(handle)
+            (value_type,) = struct.unpack("<I", _read_exact(handle, 4))
+            # Tableaux (vocabulaire du tokenizer...) inutiles ici
+            metadata[key] = _read_gguf_value(handle, value_type, keep=False)
+    
+    arch = metadata.get("general.architecture", "llama")
+    
+    def arch_value(name: str, default: int) -> int:
+        value = metadata.get(f"{arch}.{name}")
+        return int(value) if isinstance(value, (int, float)) else default
+    
+    n_layers = arch_value("block_count", 0)
+    if n_layers <= 0:
+        raise ValueError(f"Nombre de couches absent des métadonnées GGUF : {path}")
+    
+    head_count = arch_value("attention.head_count", 32)
+    file_type = metadata.get("general.file_type")
+    quantization = (
+        GGUF_FILE_TYPES.get(file_type, f"type {file_type}")
+        if isinstance(file_type, int) else "inconnue"
+    )
+    
+    return GGUFInfo(
+        architecture=arch,
+        n_layers=n_layers,
+        context_length=arch_value("context_length", MIN_AUTO_CTX),
+        embedding_length=arch_value("embedding_length", 4096),
+        head_count=head_count,
+        head_count_kv=arch_value("attention.head_count_kv", head_count),
+        quantization=quantization,
+        file_size=os.path.getsize(path)
+    )
+
+
+def physical_cores() -> int:
+    """
+    Nombre de cœurs physiques (llama.cpp est plus rapide sans hyperthreading)
+    
+    Returns:
+        Cœurs physiques (psutil), sinon moitié des cœurs logiques
+    """
+    if PSUTIL_AVAILABLE:
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def model_fingerprint(path: str) -> str:
+    """
+    Empreinte rapide d'un modèle (taille + début et fin du fichier)
+    
+    Hacher plusieurs Go à chaque démarrage serait trop lent : le début
+    (métadonnées) et la fin (derniers tenseurs) suffisent à distinguer
+    deux modèles ou deux quantifications.
+    
+    Args:
+        path: Chemin du fichier .gguf
+    
+    Returns:
+        Empreinte hexadécimale (SHA-256)
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    
+    with open(path, "rb") as handle:
+        digest.update(handle.read(FINGERPRINT_CHUNK))
+        if size > 2 * FINGERPRINT_CHUNK:
+            handle.seek(-FINGERPRINT_CHUNK, os.SEEK_END)
+            digest.update(handle.read(FINGERPRINT_CHUNK))
+    
+    return digest.hexdigest()
+
+
+def machine_fingerprint(gpu_name: Optional[str], vram_total: Optional[int], cores: int) -> str:
+    """
+    Empreinte de la machine (ce qui change le profil optimal)
+    
+    Args:
+        gpu_name: Nom du GPU (None si aucun)
+        vram_total: VRAM totale en bytes
+        cores: Cœurs physiques
+    
+    Returns:
+        Identifiant lisible, ex : "x86_64|8c|NVIDIA GeForce RTX 4050|6144MB"
+    """
+    vram = f"{vram_total // (1024 * 1024)}MB" if vram_total else "0MB"
+    return f"{platform.machine()}|{cores}c|{gpu_name or 'cpu'}|{vram}"
+
+
+def compute_auto_params(
+    gguf: GGUFInfo,
+    vram_free: Optional[int],
+    cores: int,
+    max_ctx: int = MAX_AUTO_CTX
+) -> Dict[str, Any]:
+    """
+    Calcule les paramètres llama.cpp adaptés au matériel
+    
+    - Toutes les couches sur GPU si poids + KV cache tiennent dans la VRAM
+      libre (moins une réserve), sinon le plus de couches possible avec un
+      contexte réduit
+    - Sans GPU (ou VRAM insuffisante pour une couche) : CPU seul
+    
+    Args:
+        gguf: Métadonnées du modèle
+        vram_free: VRAM libre en bytes (None ou 0 : pas de GPU)
+        cores: Cœurs physiques
+        max_ctx: Contexte maximum visé
+    
+    Returns:
+        Paramètres au format AIConfig.get_gpu_params()
+    """
+    n_ctx = min(max_ctx, gguf.context_length)
+    available = (vram_free or 0) - VRAM_RESERVE_BYTES
+    model_bytes = gguf.layer_bytes * (gguf.n_layers + 1)
+    n_gpu_layers = 0
+    
+    if available > 0:
+        if model_bytes + gguf.kv_bytes_per_token * n_ctx <= available:
+            n_gpu_layers = -1
+        else:
+            # Contexte réduit, couches restantes sur CPU (KV cache réparti comme les couches)
+            n_ctx = min(n_ctx, MIN_AUTO_CTX)
+            per_layer = gguf.layer_bytes + gguf.kv_bytes_per_token * n_ctx // gguf.n_layers
+            n_gpu_layers = max(0, min(gguf.n_layers, available // per_layer))
+    
+    if n_gpu_layers == 0:
+        n_ctx = min(n_ctx, MIN_AUTO_CTX)
+    
+    # Batch : gros lots si tout est sur GPU, sinon limité par le calcul CPU
+    if n_gpu_layers == -1:
+        n_batch = 512
+    elif n_gpu_layers > 0:
+        n_batch = 256
+    else:
+        n_batch = min(256, max(64, 32 * cores))
+    
+    return {
+        "n_gpu_layers": int(n_gpu_layers),
+        "n_ctx": int(n_ctx),
+        "n_batch": int(n_batch),
+        "n_threads": int(cores),
+        "use_mlock": n_gpu_layers != 0,
+        "use_mmap": True
+    }
+
+
+def candidate_params(base: Dict[str, Any], cores: int) -> List[Dict[str, Any]]:
+    """
+    Variantes à calibrer autour des paramètres calculés
+    
+    Threads et taille de batch dans tous les cas (utile aussi sans GPU),
+    quelques couches GPU de moins si le modèle est partagé GPU/CPU.
+    
+    Args:
+        base: Paramètres calculés (compute_auto_params)
+        cores: Cœurs physiques
+    
+    Returns:
+        Candidats distincts, base en premier
+    """
+    variants = [
+        {},
+        {"n_threads": max(1, cores // 2)},
+        {"n_threads": max(1, cores - 1)},
+        {"n_batch": base["n_batch"] // 2 if base["n_batch"] >= 256 else base["n_batch"] * 2},
+    ]
+    if base["n_gpu_layers"] > 0:
+        variants.append({"n_gpu_layers": max(1, base["n_gpu_layers"] - 4)})
+    
+    candidates = []
+    for variant in variants:
+        candidate = {**base, **variant}
+        if candidate not in candidates:
+            candidates.append(candidate)
+    
+    return candidates
+
+
+def calibrate(
+    candidates: List[Dict[str, Any]],
+    measure: Callable[[Dict[str, Any]], float],
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_candidate: Optional[Callable[[int, int], None]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Mesure le débit de chaque candidat et garde le plus rapide
+    
+    Args:
+        candidates: Paramètres à essayer
+        measure: Débit (tokens/s) d'une configuration ; une exception (OOM...)
+            élimine le candidat
+        should_stop: Interrompt la calibration (ex : chargement annulé)
+        on_candidate: Appelé avant chaque mesure (index, nombre de candidats)
+    
+    Returns:
+        {"params", "tokens_per_second", "results"} ou None si tous ont échoué
+    """
+    results: List[Dict[str, Any]] = []
+    
+    for index, params in enumerate(candidates):
+        if should_stop is not None and should_stop():
+            return None
+        if on_candidate is not None:
+            on_candidate(index, len(candidates))
+        
+        try:
+            speed = measure(params)
+        except Exception as e:
+            # Mesure interrompue par l'annulation : pas un échec du candidat
+            if should_stop is not None and should_stop():
+                return None
+            logger.warning(f"⚠️ Calibration : candidat écarté ({e})")
+            speed = 0.0
+        
+        results.append({"params": params, "tokens_per_second": round(speed, 2)})
+        logger.info(
+            f"🧪 Calibration : layers={params['n_gpu_layers']}, "
+            f"batch={params['n_batch']}, threads={params['n_threads']} "
+            f"→ {speed:.1f} tokens/s"
+        )
+    
+    best = max(results, key=lambda result: result["tokens_per_second"], default=None)
+    if best is None or best["tokens_per_second"] <= 0:
+        return None
+    
+    return {**best, "results": results}
+
+
+class AutoProfileCache:
+    """
+    Profils calibrés gardés sur disque (JSON), par machine et par modèle
+    
+    Exemple :
+        cache = AutoProfileCache()
+        cache.put(key, {"params": {...}, "tokens_per_second": 28.4})
+        cache.get(key)["params"]
+    """
+    
+    def __init__(self, path: str = AUTO_PROFILE_CACHE_PATH):
+        """
+        Args:
+            path: Fichier JSON du cache
+        """
+        self.path = path
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(machine: str, model: str) -> str:
+        """Clé d'un profil : empreintes machine et modèle"""
+        return f"{machine}::{model}"
+    
+    def _read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Cache des profils auto illisible ({e}), ignoré")
+            return {}
+    
+    def _write(self, data: Dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Écriture atomique : jamais de fichier à moitié écrit
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Profil calibré d'une machine/modèle
+        
+        Returns:
+            Entrée du cache ou None
+        """
+        with self._lock:
+            return self._read().get(key)
+    
+    def put(self, key: str, entry: Dict[str, Any]):
+        """Enregistre le profil calibré d'une machine/modèle"""
+        with self._lock:
+            data = self._read()
+            data[key] = entry
+            self._write(data)
+    
+    def discard(self, key: str):
+        """Oublie un profil (ex : OOM au chargement, matériel changé)"""
+        with self._lock:
+            data = self._read()
+            if data.pop(key, None) is not None:
+                self._write(data)
@@ -0,0 +1,590 @@
+"""
+Génération par lots continue (continuous batching) pour Desktop-Mate (Kira)
+
+Plusieurs conversations indépendantes sont décodées ensemble dans un même
+contexte llama.cpp : chaque requête occupe un identifiant de séquence KV
+distinct, et chaque appel à llama_decode avance toutes les séquences actives
+d'un token (plus des morceaux de prompt des requêtes qui arrivent). Une
+requête terminée libère sa séquence immédiatement pour la suivante.
+
+- BatchEngine : ordonnancement des séquences, échantillonnage, arrêts
+- LlamaBatchBackend : accès bas niveau llama.cpp (batch multi-séquences)
+"""
+
+import codecs
+import importlib.util
+import logging
+import math
+import random
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+# llama-cpp-python (API bas niveau) et numpy (dépendance de llama-cpp-python),
+# importés à la création du premier contexte de batch
+LLAMA_CPP_AVAILABLE = (
+    importlib.util.find_spec("llama_cpp") is not None
+    and importlib.util.find_spec("numpy") is not None
+)
+llama_cpp: Any = None
+np: Any = None
+
+logger = logging.getLogger(__name__)
+
+
+def _import_backend():
+    """Importe llama_cpp et numpy (premier LlamaBatchBackend)"""
+    global llama_cpp, np
+    
+    if llama_cpp is None:
+        import llama_cpp as llama_module
+        import numpy as numpy_module
+        llama_cpp, np = llama_module, numpy_module
+
+# Candidats gardés pour l'échantillonnage (top_k par défaut de llama-cpp-python)
+DEFAULT_TOP_K = 40
+
+# Entrée d'un batch : (token, position, séquence, logits demandés)
+BatchEntry = Tuple[int, int, int, bool]
+
+
+class LlamaBatchBackend:
+    """
+    Contexte llama.cpp dédié aux batchs multi-séquences
+    
+    Partage les poids du modèle déjà chargé (Llama) mais possède son propre
+    KV cache, découpé en `max_sequences` séquences de `n_ctx_per_seq` tokens.
+    """
+    
+    def __init__(
+        self,
+        llm: Any,
+        max_sequences: int,
+        n_ctx_per_seq: int,
+        n_batch: int,
+        n_threads: int
+    ):
+        """
+        Crée le contexte de batch
+        
+        Args:
+            llm: Instance Llama chargée (fournit modèle et tokenizer)
+            max_sequences: Nombre de séquences décodées simultanément
+            n_ctx_per_seq: Taille de contexte par séquence
+            n_batch: Nombre max de tokens par appel à llama_decode
+            n_threads: Threads CPU
+        
+        Raises:
+            RuntimeError: Si llama-cpp-python est absent ou si le contexte
+                ne peut pas être créé (VRAM insuffisante, etc.)
+        """
+        if not LLAMA_CPP_AVAILABLE:
+            raise RuntimeError("llama-cpp-python est requis pour la génération par lots")
+        _import_backend()
+        
+        self.llm = llm
+        self.max_sequences = max_sequences
+        self.n_ctx_per_seq = n_ctx_per_seq
+        self.n_batch = n_batch
+        self.n_vocab = llm.n_vocab()
+        
+        params = llama_cpp.llama_context_default_params()
+        params.n_ctx = n_ctx_per_seq * max_sequences
+        params.n_batch = n_batch
+        params.n_ubatch = n_batch
+        params.n_seq_max = max_sequences
+        params.n_threads = n_threads
+        params.n_threads_batch = n_threads
+        
+        self.ctx = llama_cpp.llama_new_context_with_model(llm.model, params)
+        if not self.ctx:
+            raise RuntimeError("Échec création du contexte de batch llama.cpp")
+        
+        self.batch = llama_cpp.llama_batch_init(n_batch, 0, 1)
+    
+    def decode(self, entries: Sequence[BatchEntry]):
+        """
+        Évalue un batch de tokens (toutes séquences confondues)
+        
+        Args:
+            entries: Tokens à évaluer (au plus n_batch)
+        
+        Raises:
+            RuntimeError: Si llama_decode échoue (KV cache plein, etc.)
+        """
+        batch = self.batch
+        batch.n_tokens = len(entries)
+        
+        for i, (token, pos, seq_id, logits) in enumerate(entries):
+            batch.token[i] = token
+            batch.pos[i] = pos
+            batch.n_seq_id[i] = 1
+            batch.seq_id[i][0] = seq_id
+            batch.logits[i] = logits
+        
+        result = llama_cpp.llama_decode(self.ctx, batch)
+        if result != 0:
+            raise RuntimeError(f"llama_decode a échoué (code {result})")
+    
+    def top_logits(self, index: int, k: int) -> List[Tuple[int, float]]:
+        """
+        Retourne les `k` meilleurs tokens pour une entrée du dernier batch
+        
+        Args:
+            index: Position de l'entrée dans le batch (logits demandés)
+            k: Nombre de candidats
+        
+        Returns:
+            Liste (token, logit) triée par logit décroissant
+        """
+        pointer = llama_cpp.llama_get_logits_ith(self.ctx, index)
+        logits = np.ctypeslib.as_array(pointer, shape=(self.n_vocab,))
+        
+        k = min(k, self.n_vocab)
+        best = np.argpartition(logits, -k)[-k:]
+        best = best[np.argsort(logits[best])[::-1]]
+        
+        return [(int(token), float(logits[token])) for token in best]
+    
+    def clear_sequence(self, seq_id: int):
+        """
+        Efface une séquence du KV cache (slot réutilisable)
+        
+        Args:
+            seq_id: Identifiant de séquence
+        """
+        if hasattr(llama_cpp, "llama_memory_seq_rm"):
+            memory = llama_cpp.llama_get_memory(self.ctx)
+            llama_cpp.llama_memory_seq_rm(memory, seq_id, -1, -1)
+        else:
+            llama_cpp.llama_kv_cache_seq_rm(self.ctx, seq_id, -1, -1)
+    
+    def token_eos(self) -> int:
+        """Token de fin de séquence du modèle"""
+        return self.llm.token_eos()
+    
+    def detokenize(self, tokens: Sequence[int]) -> bytes:
+        """Convertit des tokens en octets UTF-8 (éventuellement partiels)"""
+        return self.llm.detokenize(list(tokens))
+    
+    def close(self):
+        """Libère le batch et le contexte llama.cpp"""
+        if self.batch is not None:
+            llama_cpp.llama_batch_free(self.batch)
+            self.batch = None
+        
+        if self.ctx:
+            llama_cpp.llama_free(self.ctx)
+            self.ctx = None
+
+
+class BatchRequest:
+    """
+    Requête de génération suivie par BatchEngine
+    
+    `future` est résolue avec le texte généré ; cancel() interrompt la
+    génération au prochain pas de décodage.
+    """
+    
+    def __init__(
+        self,
+        tokens: Sequence[int],
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        stop: Sequence[str],
+        on_token: Optional[Callable[[str], None]] = None
+    ):
+        self.tokens = list(tokens)
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.top_p = top_p
+        self.stop = [s for s in stop if s]
+        self.on_token = on_token
+        self.future: Future = Future()
+        
+        # État de décodage
+        self.seq_id = -1  # Séquence KV attribuée à l'activation
+        self.prefill_pos = 0
+        self.pos = 0
+        self.pending_token: Optional[int] = None
+        self.generated = 0
+        self.text = ""
+        self.emitted = 0
+        self.cancelled = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    
+    @property
+    def prefilled(self) -> bool:
+        """True une fois tout le prompt évalué"""
+        return self.prefill_pos >= len(self.tokens)
+    
+    def cancel(self):
+        """Demande l'arrêt de la génération (résultat : texte partiel)"""
+        self.cancelled = True
+
+
+def _sample(
+    candidates: Sequence[Tuple[int, float]],
+    temperature: float,
+    top_p: float,
+    rng: random.Random
+) -> int:
+    """
+    Échantillonne un token parmi les candidats (temperature + nucleus)
+    
+    Args:
+        candidates: (token, logit) triés par logit décroissant
+        temperature: 0 = choix glouton
+        top_p: Masse de probabilité gardée
+        rng: Générateur aléatoire
+    
+    Returns:
+        Token choisi
+    """
+    if temperature <= 0:
+        return candidates[0][0]
+    
+    best = candidates[0][1]
+    weights = [math.exp((logit - best) / temperature) for _, logit in candidates]
+    total = sum(weights)
+    
+    kept = 0
+    cumulative = 0.0
+    for weight in weights:
+        kept += 1
+        cumulative += weight / total
+        if cumulative >= top_p:
+            break
+    
+    tokens = [token for token, _ in candidates[:kept]]
+    return rng.choices(tokens, weights=weights[:kept])[0]
+
+
+def _stop_holdback(text: str, stops: Sequence[str]) -> int:
+    """Longueur de la fin de `text` qui pourrait commencer une séquence d'arrêt"""
+    holdback = 0
+    for stop in stops:
+        for length in range(min(len(stop) - 1, len(text)), holdback, -1):
+            if text.endswith(stop[:length]):
+                holdback = length
+                break
+    return holdback
+
+
+class BatchEngine:
+    """
+    Moteur de génération par lots continue
+    
+    Un thread unique pilote le backend : à chaque pas, il évalue un token
+    pour chaque séquence en génération puis complète le batch avec des
+    morceaux de prompt des requêtes en cours d'admission (prefill découpé).
+    """
+    
+    # Attente max (secondes) de la fin du pas de décodage en cours à l'arrêt
+    CLOSE_TIMEOUT = 10.0
+    
+    def __init__(
+        self,
+        backend: Any,
+        max_sequences: int,
+        top_k: int = DEFAULT_TOP_K,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialise le moteur et démarre son thread
+        
+        Args:
+            backend: LlamaBatchBackend (ou équivalent)
+            max_sequences: Nombre max de requêtes décodées ensemble
+            top_k: Candidats gardés pour l'échantillonnage
+            seed: Graine aléatoire (None = non déterministe)
+        """
+        self.backend = backend
+        self.max_sequences = max_sequences
+        self.top_k = top_k
+        self._rng = random.Random(seed)
+        self._eos = backend.token_eos()
+        
+        self._waiting: Deque[BatchRequest] = deque()
+        self._active: List[BatchRequest] = []
+        self._free_seqs = list(range(max_sequences))
+        self._cond = threading.Condition()
+        self._running = True
+        
+        # Statistiques
+        self._steps = 0
+        self._batch_tokens = 0
+        self._tokens_generated = 0
+        self._completed = 0
+        self._failed = 0
+        
+        self._thread = threading.Thread(target=self._loop, name="batch-engine", daemon=True)
+        self._thread.start()
+        
+        logger.info(f"✅ BatchEngine démarré ({max_sequences} séquences simultanées)")
+    
+    def submit(
+        self,
+        tokens: Sequence[int],
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        stop: Optional[Sequence[str]] = None,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> BatchRequest:
+        """
+        Ajoute une requête de génération
+        
+        Args:
+            tokens: Prompt tokenisé
+            max_tokens: Nombre max de tokens générés
+            temperature: Créativité (0 = glouton)
+            top_p: Nucleus sampling
+            stop: Séquences d'arrêt
+            on_token: Appelé (thread du moteur) avec chaque fragment de texte
+        
+        Returns:
+            BatchRequest dont `future` donne le texte généré
+        
+        Raises:
+            RuntimeError: Si le moteur est arrêté
+        """
+        request = BatchRequest(tokens, max_tokens, temperature, top_p, stop or [], on_token)
+        
+        if len(request.tokens) >= self.backend.n_ctx_per_seq:
+            request.future.set_exception(RuntimeError(
+                f"Prompt trop long pour le contexte de batch "
+                f"({len(request.tokens)} >= {self.backend.n_ctx_per_seq} tokens)"
+            ))
+            return request
+        
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("BatchEngine arrêté")
+            
+            self._waiting.append(request)
+            self._cond.notify()
+        
+        return request
+    
+    def _admit_locked(self):
+        """Attribue les séquences libres aux requêtes en attente (verrou tenu)"""
+        while self._waiting and self._free_seqs:
+            request = self._waiting.popleft()
+            if request.cancelled or not request.future.set_running_or_notify_cancel():
+                continue
+            
+            request.seq_id = self._free_seqs.pop()
+            self._active.append(request)
+    
+    def _loop(self):
+        """Boucle du moteur : un pas de décodage par itération"""
+        while True:
+            with self._cond:
+                self._admit_locked()
+                while self._running and not self._active:
+                    self._cond.wait()
+                    self._admit_locked()
+                
+                if not self._running:
+                    return
+                
+                active = list(self._active)
+            
+            self._step(active)
+    
+    def _build_batch(
+        self,
+        active: List[BatchRequest]
+    ) -> Tuple[List[BatchEntry], List[Tuple[BatchRequest, int]]]:
+        """
+        Compose le batch d'un pas de décodage
+        
+        Returns:
+            (entrées du batch, [(requête, index de ses logits)])
+        """
+        entries: List[BatchEntry] = []
+        owners: List[Tuple[BatchRequest, int]] = []
+        budget = self.backend.n_batch
+        
+        # 1. Un token par séquence en génération (latence prioritaire)
+        for request in active:
+            if request.prefilled and request.pending_token is not None and budget > 0:
+                entries.append((request.pending_token, request.pos, request.seq_id, True))
+                owners.append((request, len(entries) - 1))
+                request.pos += 1
+                budget -= 1
+        
+        # 2. Compléter avec des morceaux de prompt (prefill découpé)
+        for request in active:
+            if request.prefilled or budget <= 0:
+                continue
+            
+            end = min(len(request.tokens), request.prefill_pos + budget)
+            for pos in range(request.prefill_pos, end):
+                last = pos == len(request.tokens) - 1
+                entries.append((request.tokens[pos], pos, request.seq_id, last))
+                if last:
+                    owners.append((request, len(entries) - 1))
+            
+            budget -= end - request.prefill_pos
+            request.prefill_pos = end
+            request.pos = end
+        
+        return entries, owners
+    
+    def _step(self, active: List[BatchRequest]):
+        """Exécute un pas de décodage pour les requêtes actives"""
+        for request in active:
+            if request.cancelled:
+                self._finish(request)
+        
+        active = [request for request in active if not request.cancelled]
+        if not active:
+            return
+        
+        entries, owners = self._build_batch(active)
+        
+        try:
+            self.backend.decode(entries)
+        except Exception as e:
+            logger.error(f"❌ Erreur décodage batch : {e}")
+            for request in active:
+                self._finish(request, error=RuntimeError(f"Échec génération : {e}"))
+            return
+        
+        self._steps += 1
+        self._batch_tokens += len(entries)
+        
+        for request, index in owners:
+            try:
+                candidates = self.backend.top_logits(index, self.top_k)
+                token = _sample(candidates, request.temperature, request.top_p, self._rng)
+                self._accept(request, token)
+            except Exception as e:
+                self._finish(request, error=e)
+    
+    def _accept(self, request: BatchRequest, token: int):
+        """Ajoute un token échantillonné à une requête et vérifie les arrêts"""
+        if token == self._eos:
+            self._finish(request)
+            return
+        
+        request.generated += 1
+        self._tokens_generated += 1
+        request.text += request._decoder.decode(self.backend.detokenize([token]))
+        
+        # Séquences d'arrêt (recherche limitée à la fin du texte)
+        for stop in request.stop:
+            start = max(0, len(request.text) - len(stop) - 16)
+            index = request.text.find(stop, start)
+            if index != -1:
+                request.text = request.text[:index]
+                self._finish(request)
+                return
+        
+        if (
+            request.generated >= request.max_tokens
+            or request.pos + 1 >= self.backend.n_ctx_per_seq
+        ):
+            self._finish(request)
+            return
+        
+        request.pending_token = token
+        self._emit(request, len(request.text) - _stop_holdback(request.text, request.stop))
+    
+    def _emit(self, request: BatchRequest, end: int):
+        """Transmet le texte stable au callback de streaming"""
+        if request.on_token is None or end <= request.emitted:
+            return
+        
+        piece = request.text[request.emitted:end]
+        request.emitted = end
+        
+        try:
+            request.on_token(piece)
+        except Exception as e:
+            logger.debug(f"⚠️ Callback de streaming en erreur, requête annulée : {e}")
+            request.cancelled = True
+    
+    def _finish(self, request: BatchRequest, error: Optional[BaseException] = None):
+        """Termine une requête et libère sa séquence KV"""
+        with self._cond:
+            if request not in self._active:
+                return
+            self._active.remove(request)
+        
+        try:
+            self.backend.clear_sequence(request.seq_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Nettoyage séquence {request.seq_id} impossible : {e}")
+        
+        with self._cond:
+            self._free_seqs.append(request.seq_id)
+            if error is None:
+                self._completed += 1
+            else:
+                self._failed += 1
+        
+        if error is None:
+            if not request.cancelled:
+                self._emit(request, len(request.text))
+            request.future.set_result(request.text)
+        else:
+            request.future.set_exception(error)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Récupère les statistiques du moteur
+        
+        Returns:
+            Dictionnaire (séquences actives, pas de décodage, taille moyenne des batchs)
+        """
+        with self._cond:
+            return {
+                'max_sequences': self.max_sequences,
+                'active': len(self._active),
+                'waiting': len(self._waiting),
+                'steps': self._steps,
+                'tokens_generated': self._tokens_generated,
+                'avg_batch_tokens': (
+                    self._batch_tokens / self._steps if self._steps else 0.0
+                ),
+                'completed': self._completed,
+                'failed': self._failed
+            }
+    
+    def close(self):
+        """
+        Arrête le moteur, annule les requêtes restantes et libère le backend
+        
+        Si le thread est encore dans un pas de décodage après CLOSE_TIMEOUT,
+        le backend n'est pas libéré (il l'utilise encore) : il reste alloué
+        jusqu'à la fin du processus.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        
+        self._thread.join(timeout=self.CLOSE_TIMEOUT)
+        
+        with self._cond:
+            pending = list(self._waiting) + list(self._active)
+            self._waiting.clear()
+            self._active.clear()
+        
+        for request in pending:
+            if not request.future.cancel() and not request.future.done():
+                request.future.set_exception(RuntimeError("BatchEngine arrêté"))
+        
+        if self._thread.is_alive():
+            logger.error(
+                f"❌ BatchEngine : décodage toujours en cours après "
+                f"{self.CLOSE_TIMEOUT:.0f} s, contexte de batch non libéré"
+            )
+            return
+        
+        self.backend.close()
+        logger.info("🛑 BatchEngine arrêté")
@@ -3,19 +3,24 @@ Chat Engine pour Desktop-Mate (Kira)
 
 Moteur conversationnel unifié qui orchestre :
 - Mémoire conversationnelle (ConversationMemory)
-- Génération LLM (ModelManager)
+- Génération LLM (ModelManager), complète ou en streaming
 - Détection émotionnelle basique
-- Construction prompts avec contexte
+- Construction prompts avec contexte (budget de tokens)
 - Sauvegarde automatique des conversations
 """
 
 import logging
-from typing import Optional, Dict, List, Any
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Hashable, Tuple
 from dataclasses import dataclass
 
 from .memory import ConversationMemory, get_memory
 from .model_manager import ModelManager, get_model_manager
 from .config import AIConfig, get_config
+from .emotion_analyzer import EmotionAnalyzer, EmotionResult, get_emotion_analyzer
+from .keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +30,30 @@ class ChatResponse:
     """Réponse du chat engine"""
     response: str                      # Texte généré par le modèle
     emotion: str                       # Émotion détectée ('joy', 'angry', etc.)
-    tokens_used: int                   # Nombre approximatif de tokens
+    tokens_used: int                   # Tokens prompt + réponse
     context_messages: int              # Nombre de messages dans le contexte
     processing_time: float             # Temps de traitement en secondes
+    prompt_tokens: int = 0             # Tokens du prompt (system + historique + question)
+    completion_tokens: int = 0         # Tokens de la réponse générée
+    time_to_first_token: Optional[float] = None  # Secondes (streaming uniquement)
+    emotion_result: Optional[EmotionResult] = None  # Analyse complète (intensité, confiance...)
+    vrm_blendshape: Optional[Dict[str, Any]] = None  # Expression VRM correspondante
+
+
+class ChatStream:
+    """
+    Flux de réponse renvoyé par ChatEngine.chat_stream()
+    
+    Itérer produit les fragments de texte au fil de la génération ; une fois
+    le flux terminé, `response` contient la ChatResponse complète.
+    """
+    
+    def __init__(self, generator):
+        self._generator = generator
+        self.response: Optional[ChatResponse] = None
+    
+    def __iter__(self):
+        self.response = yield from self._generator
 
 
 class EmotionDetector:
@@ -35,7 +61,8 @@ class EmotionDetector:
     Détecteur d'émotions basique par mots-clés
     
     Analyse le texte généré et retourne l'émotion dominante.
-    Version simple mais efficace pour Desktop-Mate.
+    Version simple et sans état ; ChatEngine utilise EmotionAnalyzer
+    (intensité, confiance, historique, mapping VRM).
     """
     
     # Mots-clés par émotion (français)
@@ -75,6 +102,10 @@ class EmotionDetector:
         ]
     }
     
+    def __init__(self):
+        """Compile les mots-clés (un seul parcours du texte par analyse)"""
+        self._matcher = KeywordMatcher(self.EMOTION_KEYWORDS)
+    
     def analyze(self, text: str) -> str:
         """
         Analyse le texte et retourne l'émotion dominante
@@ -88,19 +119,12 @@ class EmotionDetector:
         if not text or not text.strip():
             return 'neutral'
         
-        text_lower = text.lower()
-        
-        # Compter occurrences par émotion
-        emotion_scores = {}
-        
-        for emotion, keywords in self.EMOTION_KEYWORDS.items():
-            if emotion == 'neutral':
-                continue  # Ne pas compter neutral dans le scoring
-            
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            
-            if score > 0:
-                emotion_scores[emotion] = score
+        # Compter mots-clés présents par émotion (poids 1 chacun)
+        emotion_scores = {
+            emotion: hits.weight
+            for emotion, hits in self._matcher.match(text).items()
+            if emotion != 'neutral'  # Ne pas compter neutral dans le scoring
+        }
         
         # Retourner émotion dominante ou neutral
         if not emotion_scores:
@@ -120,19 +144,29 @@ class ChatEngine:
     """
     Moteur conversationnel unifié pour Desktop-Mate
     
-    Orchestre la mémoire, le modèle LLM et la détection émotionnelle
+    Orchestre la mémoire, le modèle LLM et l'analyse émotionnelle
     pour générer des réponses cohérentes et émotionnelles.
     
+    Chaque réponse est analysée une seule fois : l'émotion sauvegardée en
+    base est celle que l'avatar affiche (ChatResponse.emotion_result).
+    
     Utilisable par :
     - Interface GUI Desktop-Mate (source="desktop")
     - Bot Discord (source="discord")
     """
     
+    # Nombre de segments de prompt dont le compte de tokens est mis en cache
+    TOKEN_CACHE_SIZE = 4096
+    
+    # Nombre de conversations dont le début de fenêtre d'historique est gardé
+    HISTORY_WINDOW_KEYS = 1000
+    
     def __init__(
         self,
         config: Optional[AIConfig] = None,
         memory: Optional[ConversationMemory] = None,
-        model_manager: Optional[ModelManager] = None
+        model_manager: Optional[ModelManager] = None,
+        emotion_analyzer: Optional[EmotionAnalyzer] = None
     ):
         """
         Initialise le Chat Engine
@@ -141,14 +175,179 @@ class ChatEngine:
             config: Configuration IA (si None, charge depuis config.json)
             memory: Gestionnaire mémoire (si None, utilise singleton)
             model_manager: Gestionnaire modèle (si None, utilise singleton)
+            emotion_analyzer: Analyseur émotionnel (si None, utilise singleton).
+                Doit fournir analyze(text, user_id) → EmotionResult,
+                get_vrm_blendshape(emotion, intensity), rehydrate_history,
+                clear_user_history et get_stats
         """
         self.config = config or get_config()
-        self.memory = memory or get_memory()
+        self.memory = memory or get_memory(
+            write_behind=self.config.memory_write_behind,
+            history_cache_size=self.config.context_limit
+        )
         self.model_manager = model_manager or get_model_manager(self.config)
-        self.emotion_detector = EmotionDetector()
+        self.emotion_analyzer = emotion_analyzer or get_emotion_analyzer()
+        
+        # Cache LRU des comptes de tokens (un segment = un échange formaté)
+        self._token_cache: OrderedDict = OrderedDict()
+        self._token_cache_lock = threading.Lock()
+        
+        # Premier échange du prompt par conversation : fixe tant que la
+        # fenêtre tient, pour que le préfixe en cache KV reste réutilisable
+        self._window_starts: OrderedDict = OrderedDict()
+        self._window_lock = threading.Lock()
         
         logger.info("✅ ChatEngine initialisé")
     
+    def _count_tokens(self, text: str) -> int:
+        """
+        Compte les tokens d'un segment de prompt (avec cache LRU)
+        
+        Les échanges d'historique reviennent à chaque tour : leur compte est
+        calculé une seule fois par modèle.
+        
+        Args:
+            text: Segment de prompt
+        
+        Returns:
+            Nombre de tokens
+        """
+        key = (self.config.model_path, text)
+        
+        with self._token_cache_lock:
+            count = self._token_cache.get(key)
+            if count is not None:
+                self._token_cache.move_to_end(key)
+                return count
+        
+        count = self.model_manager.count_tokens(text)
+        
+        with self._token_cache_lock:
+            self._token_cache[key] = count
+            if len(self._token_cache) > self.TOKEN_CACHE_SIZE:
+                self._token_cache.popitem(last=False)
+        
+        return count
+    
+    def _format_system(self) -> str:
+        """Formate le system prompt"""
+        return f"<|system|>\n{self.config.system_prompt}</|system|>"
+    
+    @staticmethod
+    def _format_interaction(user_msg: str, bot_msg: str) -> str:
+        """Formate un échange d'historique (question + réponse)"""
+        return (
+            f"<|user|>\n{user_msg}</|user|>\n"
+            f"<|assistant|>\n{bot_msg}</|assistant|>"
+        )
+    
+    @staticmethod
+    def _format_question(user_input: str) -> str:
+        """Formate la question actuelle et l'amorce de réponse"""
+        return f"<|user|>\n{user_input}</|user|>\n<|assistant|>"
+    
+    @staticmethod
+    def _interaction_id(interaction: Dict[str, Any]) -> Tuple:
+        """Identifie un échange d'historique (début de fenêtre)"""
+        return (
+            interaction.get('timestamp'),
+            interaction['user_input'],
+            interaction['bot_response']
+        )
+    
+    def _fit_history(
+        self,
+        user_input: str,
+        history: List[Dict[str, Any]],
+        key: Optional[Hashable] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Sélectionne l'historique qui tient dans la fenêtre de contexte
+        
+        Budget = n_ctx - max_tokens - system prompt - question actuelle.
+        
+        La fenêtre d'une conversation (key) commence au même échange d'un
+        tour à l'autre : le prompt précédent reste un préfixe du suivant et
+        son état KV est réutilisé. Quand elle dépasse context_limit échanges
+        ou le budget, elle est coupée d'un bloc : il reste la moitié des
+        échanges (les plus récents) et au plus la moitié du budget.
+        
+        Args:
+            user_input: Message actuel de l'utilisateur
+            history: Historique candidat (du plus ancien au plus récent,
+                context_limit échanges au plus)
+            key: Conversation (user_id, source), None = pas de fenêtre fixe
+        
+        Returns:
+            Tuple (historique retenu du plus ancien au plus récent,
+            nombre de tokens du prompt complet)
+        """
+        # Contexte effectif du modèle chargé (calculé si profil "auto")
+        gpu_params = getattr(self.model_manager, "gpu_params", None)
+        n_ctx = (gpu_params or self.config.get_gpu_params())["n_ctx"]
+        
+        # +1 token par séparateur "\n" entre segments
+        prompt_tokens = (
+            self._count_tokens(self._format_system()) + 1
+            + self._count_tokens(self._format_question(user_input))
+        )
+        budget = n_ctx - self.config.max_tokens - prompt_tokens
+        
+        if budget < 0:
+            logger.warning(
+                f"⚠️ Prompt trop long pour le contexte ({prompt_tokens} tokens, "
+                f"n_ctx={n_ctx}, max_tokens={self.config.max_tokens})"
+            )
+        
+        with self._window_lock:
+            window_start = self._window_starts.get(key) if key is not None else None
+        
+        start = 0
+        if window_start is not None:
+            ids = [self._interaction_id(interaction) for interaction in history]
+            if window_start in ids:
+                start = ids.index(window_start)
+            else:
+                # Début de fenêtre sorti des context_limit derniers échanges
+                start = max(0, len(history) - self.config.context_limit // 2)
+        
+        counts = [
+            self._count_tokens(self._format_interaction(
+                interaction['user_input'],
+                interaction['bot_response']
+            )) + 1
+            for interaction in history[start:]
+        ]
+            
+        total = sum(counts)
+        if total > budget:
+            # Coupe d'un bloc : les prochains tours gardent le même début
+            limit = budget // 2
+            while counts and total > limit:
+                total -= counts.pop(0)
+                start += 1
+            
+        selected = history[start:]
+        prompt_tokens += total
+        
+        if key is not None:
+            with self._window_lock:
+                if selected:
+                    self._window_starts[key] = self._interaction_id(selected[0])
+                    self._window_starts.move_to_end(key)
+                    if len(self._window_starts) > self.HISTORY_WINDOW_KEYS:
+                        self._window_starts.popitem(last=False)
+                else:
+                    self._window_starts.pop(key, None)
+        
+        if len(selected) < len(history):
+            logger.debug(
+                f"✂️ Historique tronqué : {len(selected)}/{len(history)} "
+                f"messages (budget n_ctx={n_ctx})"
+            )
+        
+        return selected, prompt_tokens
+    
     def _build_prompt(
         self,
         user_input: str,
@@ -168,19 +367,17 @@ class ChatEngine:
         prompt_parts = []
         
         # System prompt
-        prompt_parts.append(f"<|system|>\n{self.config.system_prompt}</|system|>")
+        prompt_parts.append(self._format_system())
         
         # Historique des conversations
         for interaction in history:
-            user_msg = interaction['user_input']
-            bot_msg = interaction['bot_response']
-            
-            prompt_parts.append(f"<|user|>\n{user_msg}</|user|>")
-            prompt_parts.append(f"<|assistant|>\n{bot_msg}</|assistant|>")
+            prompt_parts.append(self._format_interaction(
+                interaction['user_input'],
+                interaction['bot_response']
+            ))
         
         # Question actuelle
-        prompt_parts.append(f"<|user|>\n{user_input}</|user|>")
-        prompt_parts.append("<|assistant|>")
+        prompt_parts.append(self._format_question(user_input))
         
         prompt = "\n".join(prompt_parts)
         
@@ -191,29 +388,21 @@ class ChatEngine:
         
         return prompt
     
-    def chat(
+    def _prepare_turn(
         self,
         user_input: str,
-        user_id: str = "desktop_user",
-        source: str = "desktop"
-    ) -> ChatResponse:
+        user_id: str,
+        source: str
+    ) -> Tuple[str, List[Dict[str, Any]], int]:
         """
-        Génère une réponse conversationnelle
-        
-        Args:
-            user_input: Message de l'utilisateur
-            user_id: ID utilisateur (Discord ID ou "desktop_user")
-            source: Source du message ("desktop" ou "discord")
+        Vérifie le modèle, récupère l'historique et construit le prompt
         
         Returns:
-            ChatResponse avec réponse, émotion, stats
+            Tuple (prompt, historique retenu, tokens du prompt)
         
         Raises:
             RuntimeError: Si le modèle n'est pas chargé
         """
-        import time
-        start_time = time.time()
-        
         logger.info(
             f"💬 Chat request : user={user_id[:8]}..., "
             f"source={source}, input_len={len(user_input)}"
@@ -235,24 +424,51 @@ class ChatEngine:
             source=source
         )
         
-        # 2. Construire le prompt
+        # 2. Construire le prompt (historique limité au budget de tokens)
+        history, prompt_tokens = self._fit_history(user_input, history, (user_id, source))
         prompt = self._build_prompt(user_input, history)
         
-        # 3. Générer la réponse
-        try:
-            response_text = self.model_manager.generate(
-                prompt=prompt,
-                temperature=self.config.temperature,
-                top_p=self.config.top_p,
-                max_tokens=self.config.max_tokens,
-                stop=["<|user|>", "<|system|>"]  # Arrêter aux balises
-            )
-        except Exception as e:
-            logger.error(f"❌ Erreur génération : {e}")
-            raise RuntimeError(f"Échec génération réponse : {e}")
+        return prompt, history, prompt_tokens
+    
+    def _generation_params(self, user_id: str, source: str) -> Dict[str, Any]:
+        """Paramètres de génération communs à chat() et chat_stream()"""
+        return {
+            'temperature': self.config.temperature,
+            'top_p': self.config.top_p,
+            'max_tokens': self.config.max_tokens,
+            'stop': ["<|user|>", "<|system|>"],  # Arrêter aux balises
+            'prefix': self._format_system(),
+            'cache_key': (user_id, source)
+        }
+    
+    def _finish_turn(
+        self,
+        user_input: str,
+        user_id: str,
+        source: str,
+        response_text: str,
+        history: List[Dict[str, Any]],
+        prompt_tokens: int,
+        start_time: float,
+        time_to_first_token: Optional[float] = None
+    ) -> ChatResponse:
+        """
+        Analyse l'émotion, sauvegarde l'interaction et calcule les stats
         
-        # 4. Analyser l'émotion
-        emotion = self.emotion_detector.analyze(response_text)
+        Returns:
+            ChatResponse complète
+        """
+        # 4. Analyser l'émotion (une seule fois : sauvegarde + avatar)
+        # Utilisateur inconnu de l'analyseur (redémarrage, éviction) : contexte
+        # émotionnel repris depuis l'historique déjà chargé pour le prompt
+        self.emotion_analyzer.rehydrate_history(
+            user_id, [row.get('emotion') for row in history]
+        )
+        emotion_result = self.emotion_analyzer.analyze(text=response_text, user_id=user_id)
+        emotion = emotion_result.emotion
+        vrm_blendshape = self.emotion_analyzer.get_vrm_blendshape(
+            emotion, emotion_result.intensity
+        )
         
         # 5. Sauvegarder l'interaction
         self.memory.save_interaction(
@@ -265,11 +481,17 @@ class ChatEngine:
         
         # 6. Calculer stats
         processing_time = time.time() - start_time
-        tokens_used = len(response_text.split())  # Approximation
+        completion_tokens = self.model_manager.count_tokens(response_text)
+        tokens_used = prompt_tokens + completion_tokens
         
+        ttft_info = (
+            f", 1er token={time_to_first_token:.2f}s"
+            if time_to_first_token is not None else ""
+        )
         logger.info(
             f"✅ Réponse générée : {len(response_text)} chars, "
-            f"émotion={emotion}, temps={processing_time:.2f}s"
+            f"émotion={emotion}, tokens={prompt_tokens}+{completion_tokens}, "
+            f"temps={processing_time:.2f}s{ttft_info}"
         )
         
         return ChatResponse(
@@ -277,9 +499,107 @@ class ChatEngine:
             emotion=emotion,
             tokens_used=tokens_used,
             context_messages=len(history),
-            processing_time=processing_time
+            processing_time=processing_time,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            time_to_first_token=time_to_first_token,
+            emotion_result=emotion_result,
+            vrm_blendshape=vrm_blendshape
         )
     
+    def chat(
+        self,
+        user_input: str,
+        user_id: str = "desktop_user",
+        source: str = "desktop"
+    ) -> ChatResponse:
+        """
+        Génère une réponse conversationnelle
+        
+        Args:
+            user_input: Message de l'utilisateur
+            user_id: ID utilisateur (Discord ID ou "desktop_user")
+            source: Source du message ("desktop" ou "discord")
+        
+        Returns:
+            ChatResponse avec réponse, émotion, stats
+        
+        Raises:
+            RuntimeError: Si le modèle n'est pas chargé
+        """
+        start_time = time.time()
+        
+        prompt, history, prompt_tokens = self._prepare_turn(user_input, user_id, source)
+        
+        # 3. Générer la réponse
+        try:
+            response_text = self.model_manager.generate(
+                prompt=prompt,
+                **self._generation_params(user_id, source)
+            )
+        except Exception as e:
+            logger.error(f"❌ Erreur génération : {e}")
+            raise RuntimeError(f"Échec génération réponse : {e}")
+        
+        return self._finish_turn(
+            user_input, user_id, source, response_text,
+            history, prompt_tokens, start_time
+        )
+    
+    def chat_stream(
+        self,
+        user_input: str,
+        user_id: str = "desktop_user",
+        source: str = "desktop"
+    ) -> "ChatStream":
+        """
+        Génère une réponse conversationnelle en streaming
+        
+        L'historique et le prompt sont préparés immédiatement ; la génération
+        démarre à l'itération. L'émotion et la sauvegarde sont faites une
+        seule fois, à la fin du flux (rien n'est sauvegardé si le flux est
+        abandonné).
+        
+        Args:
+            user_input: Message de l'utilisateur
+            user_id: ID utilisateur (Discord ID ou "desktop_user")
+            source: Source du message ("desktop" ou "discord")
+        
+        Returns:
+            ChatStream : itérable de fragments de texte, puis `.response`
+        
+        Raises:
+            RuntimeError: Si le modèle n'est pas chargé
+        """
+        start_time = time.time()
+        
+        prompt, history, prompt_tokens = self._prepare_turn(user_input, user_id, source)
+        
+        def stream():
+            chunks = []
+            time_to_first_token = None
+            
+            # 3. Générer la réponse au fil de l'eau
+            try:
+                for text in self.model_manager.generate_stream(
+                    prompt=prompt,
+                    **self._generation_params(user_id, source)
+                ):
+                    if time_to_first_token is None:
+                        time_to_first_token = time.time() - start_time
+                    chunks.append(text)
+                    yield text
+            except Exception as e:
+                logger.error(f"❌ Erreur génération : {e}")
+                raise RuntimeError(f"Échec génération réponse : {e}")
+            
+            return self._finish_turn(
+                user_input, user_id, source, "".join(chunks).strip(),
+                history, prompt_tokens, start_time, time_to_first_token
+            )
+        
+        return ChatStream(stream())
+    
     def clear_user_history(
         self,
         user_id: str,
@@ -297,6 +617,15 @@ class ChatEngine:
         """
         deleted = self.memory.clear_user_history(user_id, source)
         
+        # Contexte émotionnel (lissage) repart de zéro
+        self.emotion_analyzer.clear_user_history(user_id)
+        
+        # L'état KV de ces conversations ne correspond plus à l'historique
+        for slot_source in ([source] if source else ["desktop", "discord"]):
+            self.model_manager.release_slot((user_id, slot_source))
+            with self._window_lock:
+                self._window_starts.pop((user_id, slot_source), None)
+        
         logger.info(
             f"🗑️ Historique effacé : {deleted} interactions "
             f"pour {user_id[:8]}... (source={source or 'all'})"
@@ -317,6 +646,7 @@ class ChatEngine:
         return {
             'memory': memory_stats,
             'model': model_info,
+            'emotion': self.emotion_analyzer.get_stats(),
             'config': {
                 'context_limit': self.config.context_limit,
                 'gpu_profile': self.config.gpu_profile,
@@ -342,7 +672,8 @@ _chat_engine_instance: Optional[ChatEngine] = None
 def get_chat_engine(
     config: Optional[AIConfig] = None,
     memory: Optional[ConversationMemory] = None,
-    model_manager: Optional[ModelManager] = None
+    model_manager: Optional[ModelManager] = None,
+    emotion_analyzer: Optional[EmotionAnalyzer] = None
 ) -> ChatEngine:
     """
     Récupère l'instance globale de ChatEngine (singleton)
@@ -351,6 +682,7 @@ def get_chat_engine(
         config: Configuration IA (optionnel)
         memory: Gestionnaire mémoire (optionnel)
         model_manager: Gestionnaire modèle (optionnel)
+        emotion_analyzer: Analyseur émotionnel (optionnel)
     
     Returns:
         Instance ChatEngine
@@ -358,7 +690,7 @@ def get_chat_engine(
     global _chat_engine_instance
     
     if _chat_engine_instance is None:
-        _chat_engine_instance = ChatEngine(config, memory, model_manager)
+        _chat_engine_instance = ChatEngine(config, memory, model_manager, emotion_analyzer)
     
     return _chat_engine_instance
 
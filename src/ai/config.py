@@ -30,6 +30,7 @@ GPU_PROFILES = {
         "n_batch": 512,          # Batch size élevé
         "n_threads": 6,          # Threads CPU
         "use_mlock": True,       # Lock memory pour éviter swap
+        "use_mmap": True,        # Poids mappés depuis le GGUF (rechargement à chaud)
         "vram_estimate": "5-5.5 GB",
         "speed_estimate": "25-35 tokens/sec",
         "recommended_for": "Réponses ultra-rapides, autres apps fermées"
@@ -42,6 +43,7 @@ GPU_PROFILES = {
         "n_batch": 256,          # Batch size modéré
         "n_threads": 6,          # Threads CPU
         "use_mlock": True,       # Lock memory
+        "use_mmap": True,        # Poids mappés depuis le GGUF
         "vram_estimate": "3-4 GB",
         "speed_estimate": "15-25 tokens/sec",
         "recommended_for": "Usage quotidien, conversations longues"
@@ -54,9 +56,24 @@ GPU_PROFILES = {
         "n_batch": 128,          # Batch size réduit
         "n_threads": 8,          # Plus de threads CPU
         "use_mlock": False,      # Pas de memory lock
+        "use_mmap": True,        # Poids mappés (cache de pages de l'OS)
         "vram_estimate": "0 GB (RAM: 4-6 GB)",
         "speed_estimate": "2-5 tokens/sec",
         "recommended_for": "Fallback si erreur VRAM ou sans GPU NVIDIA"
+    },
+    "auto": {
+        "name": "Auto",
+        "description": "Calculé selon la machine (VRAM libre, cœurs, modèle) puis calibré",
+        # Valeurs de repli (= balanced) : ModelManager les remplace au chargement
+        "n_gpu_layers": 35,      # Selon la VRAM libre et la taille des couches
+        "n_ctx": 2048,           # 4096 si poids + KV cache tiennent en VRAM
+        "n_batch": 256,          # Calibré (débit mesuré)
+        "n_threads": 6,          # Cœurs physiques, calibré
+        "use_mlock": True,       # Seulement si des couches sont sur GPU
+        "use_mmap": True,        # Poids mappés depuis le GGUF
+        "vram_estimate": "Selon la VRAM libre",
+        "speed_estimate": "Mesurée au premier chargement",
+        "recommended_for": "Toute machine, profil mis en cache par machine et modèle"
     }
 }
 
@@ -69,11 +86,27 @@ class AIConfig:
     Attributes:
         model_path: Chemin vers le modèle LLM (gguf)
         context_limit: Nombre de messages d'historique à inclure
-        gpu_profile: Profil GPU ("performance", "balanced", "cpu_fallback")
+        gpu_profile: Profil GPU ("performance", "balanced", "cpu_fallback", "auto")
         temperature: Créativité des réponses (0.0-2.0)
         top_p: Nucleus sampling (0.0-1.0)
         max_tokens: Nombre maximum de tokens générés
         system_prompt: Prompt système définissant la personnalité de Kira
+        memory_write_behind: Écriture différée par lots de l'historique SQLite
+        prefix_cache_mb: Mémoire max des états KV llama.cpp gardés par
+            conversation (0 = seul le préfixe system prompt est conservé)
+        prefix_cache_disk_mb: Espace disque max pour les états KV évincés
+            de la RAM (0 = pas de débordement sur disque)
+        scheduler_max_queue: Nombre max de requêtes en attente d'inférence
+        scheduler_timeout: Attente max (secondes) d'une requête avant rejet
+        batch_max_sequences: Conversations décodées ensemble par le moteur de
+            batch (1 = génération série, sans contexte de batch ; au-delà,
+            le cache de préfixes KV n'est pas utilisé)
+        model_prefetch: Demande à l'OS de lire le fichier GGUF à l'avance
+            (readahead) pendant la préparation du chargement
+        suspend_on_unload: unload_model() libère KV cache et buffers de calcul
+            mais garde les poids chargés (rechargement en quelques secondes)
+        auto_profile_calibrate: Profil "auto" : mesure le débit de quelques
+            variantes au premier chargement (sinon paramètres calculés seuls)
     """
     
     model_path: str = "models/zephyr-7b-beta.Q5_K_M.gguf"
@@ -83,6 +116,15 @@ class AIConfig:
     top_p: float = 0.9
     max_tokens: int = 512
     system_prompt: str = field(default="Tu es Kira, un assistant virtuel amical.")
+    memory_write_behind: bool = False
+    prefix_cache_mb: int = 512
+    prefix_cache_disk_mb: int = 0
+    scheduler_max_queue: int = 32
+    scheduler_timeout: float = 120.0
+    batch_max_sequences: int = 1
+    model_prefetch: bool = True
+    suspend_on_unload: bool = False
+    auto_profile_calibrate: bool = True
     
     def __post_init__(self):
         """Validation après initialisation"""
@@ -132,7 +174,30 @@ class AIConfig:
                 temperature=ai_config.get("temperature", cls.temperature),
                 top_p=ai_config.get("top_p", cls.top_p),
                 max_tokens=ai_config.get("max_tokens", cls.max_tokens),
-                system_prompt=ai_config.get("system_prompt", cls.system_prompt)
+                system_prompt=ai_config.get("system_prompt", cls.system_prompt),
+                memory_write_behind=ai_config.get(
+                    "memory_write_behind", cls.memory_write_behind
+                ),
+                prefix_cache_mb=ai_config.get("prefix_cache_mb", cls.prefix_cache_mb),
+                prefix_cache_disk_mb=ai_config.get(
+                    "prefix_cache_disk_mb", cls.prefix_cache_disk_mb
+                ),
+                scheduler_max_queue=ai_config.get(
+                    "scheduler_max_queue", cls.scheduler_max_queue
+                ),
+                scheduler_timeout=ai_config.get(
+                    "scheduler_timeout", cls.scheduler_timeout
+                ),
+                batch_max_sequences=ai_config.get(
+                    "batch_max_sequences", cls.batch_max_sequences
+                ),
+                model_prefetch=ai_config.get("model_prefetch", cls.model_prefetch),
+                suspend_on_unload=ai_config.get(
+                    "suspend_on_unload", cls.suspend_on_unload
+                ),
+                auto_profile_calibrate=ai_config.get(
+                    "auto_profile_calibrate", cls.auto_profile_calibrate
+                )
             )
             
             logger.info(
@@ -155,6 +220,9 @@ class AIConfig:
         """
         Retourne les paramètres GPU du profil actuel
         
+        Pour le profil "auto", ce sont les valeurs de repli : les paramètres
+        réels sont calculés par ModelManager (src/ai/auto_profile.py).
+        
         Returns:
             Dictionnaire avec paramètres llama-cpp-python
         
@@ -176,7 +244,8 @@ class AIConfig:
             "n_ctx": profile["n_ctx"],
             "n_batch": profile["n_batch"],
             "n_threads": profile["n_threads"],
-            "use_mlock": profile["use_mlock"]
+            "use_mlock": profile["use_mlock"],
+            "use_mmap": profile["use_mmap"]
         }
         
         logger.debug(
@@ -271,6 +340,53 @@ class AIConfig:
         if not isinstance(self.system_prompt, str) or not self.system_prompt.strip():
             raise ValueError("system_prompt ne peut pas être vide")
         
+        # Validation memory_write_behind
+        if not isinstance(self.memory_write_behind, bool):
+            raise ValueError(
+                f"memory_write_behind doit être un booléen "
+                f"(reçu: {type(self.memory_write_behind)})"
+            )
+        
+        # Validation prefix_cache_mb
+        if not isinstance(self.prefix_cache_mb, int) or self.prefix_cache_mb < 0:
+            raise ValueError(
+                f"prefix_cache_mb doit être un entier >= 0 (reçu: {self.prefix_cache_mb})"
+            )
+        
+        # Validation prefix_cache_disk_mb
+        if not isinstance(self.prefix_cache_disk_mb, int) or self.prefix_cache_disk_mb < 0:
+            raise ValueError(
+                f"prefix_cache_disk_mb doit être un entier >= 0 "
+                f"(reçu: {self.prefix_cache_disk_mb})"
+            )
+        
+        # Validation scheduler_max_queue
+        if not isinstance(self.scheduler_max_queue, int) or self.scheduler_max_queue < 1:
+            raise ValueError(
+                f"scheduler_max_queue doit être un entier >= 1 "
+                f"(reçu: {self.scheduler_max_queue})"
+            )
+        
+        # Validation scheduler_timeout
+        if not isinstance(self.scheduler_timeout, (int, float)) or self.scheduler_timeout <= 0:
+            raise ValueError(
+                f"scheduler_timeout doit être un nombre > 0 "
+                f"(reçu: {self.scheduler_timeout})"
+            )
+        
+        # Validation batch_max_sequences
+        if not isinstance(self.batch_max_sequences, int) or not 1 <= self.batch_max_sequences <= 64:
+            raise ValueError(
+                f"batch_max_sequences doit être un entier entre 1 et 64 "
+                f"(reçu: {self.batch_max_sequences})"
+            )
+        
+        # Validation model_prefetch / suspend_on_unload / auto_profile_calibrate
+        for name in ("model_prefetch", "suspend_on_unload", "auto_profile_calibrate"):
+            value = getattr(self, name)
+            if not isinstance(value, bool):
+                raise ValueError(f"{name} doit être un booléen (reçu: {type(value)})")
+        
         logger.debug("✅ Configuration validée")
         return True
     
@@ -288,7 +404,16 @@ class AIConfig:
             "temperature": self.temperature,
             "top_p": self.top_p,
             "max_tokens": self.max_tokens,
-            "system_prompt": self.system_prompt
+            "system_prompt": self.system_prompt,
+            "memory_write_behind": self.memory_write_behind,
+            "prefix_cache_mb": self.prefix_cache_mb,
+            "prefix_cache_disk_mb": self.prefix_cache_disk_mb,
+            "scheduler_max_queue": self.scheduler_max_queue,
+            "scheduler_timeout": self.scheduler_timeout,
+            "batch_max_sequences": self.batch_max_sequences,
+            "model_prefetch": self.model_prefetch,
+            "suspend_on_unload": self.suspend_on_unload,
+            "auto_profile_calibrate": self.auto_profile_calibrate
         }
     
     def save_to_json(self, config_path: str = "data/config.json"):
@@ -324,7 +449,7 @@ class AIConfig:
         Change le profil GPU actuel
         
         Args:
-            new_profile: Nouveau profil ("performance", "balanced", "cpu_fallback")
+            new_profile: Nouveau profil ("performance", "balanced", "cpu_fallback", "auto")
         
         Raises:
             ValueError: Si le profil n'existe pas
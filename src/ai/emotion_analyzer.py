@@ -7,20 +7,39 @@ et les mapper vers des expressions VRM.
 Fonctionnalités :
 - Analyse contextuelle avec historique
 - Intensité émotionnelle (0-100)
-- Historique émotionnel par utilisateur
+- Historique émotionnel par utilisateur (compact, borné, éviction LRU/inactivité)
 - Transitions émotionnelles douces
 - Mapping complet vers Blendshapes VRM
+- Analyse par lots vectorisée (NumPy) pour re-scorer un historique
 """
 
+import importlib.util
 import logging
-from typing import List, Dict, Optional, Tuple, Any
+import threading
+import time
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
-from collections import deque
+from collections import OrderedDict, deque
+
+from .keyword_matcher import KeywordHits, KeywordMatcher
+
+# numpy (analyse par lots), importé au premier analyze_batch
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+np: Any = None
 
 logger = logging.getLogger(__name__)
 
 
+def _import_numpy():
+    """Importe numpy (premier analyze_batch)"""
+    global np
+    
+    if np is None:
+        import numpy as numpy_module
+        np = numpy_module
+
+
 @dataclass
 class EmotionResult:
     """Résultat de l'analyse émotionnelle"""
@@ -32,6 +51,213 @@ class EmotionResult:
     timestamp: datetime         # Horodatage de l'analyse
 
 
+class EmotionRecord:
+    """
+    Entrée compacte de l'historique émotionnel
+    
+    Seuls les champs utiles au contexte et au lissage sont gardés (pas de
+    mots-clés ni de datetime). Les entrées rechargées depuis chat_history
+    n'ont que l'émotion (intensity/confidence à None).
+    """
+    
+    __slots__ = ('emotion', 'intensity', 'confidence', 'context_score', 'timestamp')
+    
+    def __init__(
+        self,
+        emotion: str,
+        intensity: Optional[float] = None,
+        confidence: Optional[float] = None,
+        context_score: Optional[float] = None,
+        timestamp: Optional[float] = None
+    ):
+        self.emotion = emotion
+        self.intensity = intensity
+        self.confidence = confidence
+        self.context_score = context_score
+        self.timestamp = timestamp if timestamp is not None else time.time()
+    
+    @classmethod
+    def from_result(cls, result: EmotionResult) -> "EmotionRecord":
+        """Compacte un EmotionResult"""
+        return cls(
+            result.emotion,
+            result.intensity,
+            result.confidence,
+            result.context_score,
+            result.timestamp.timestamp() if result.timestamp else None
+        )
+    
+    def to_result(self) -> EmotionResult:
+        """Reconstruit un EmotionResult (mots-clés non conservés)"""
+        return EmotionResult(
+            emotion=self.emotion,
+            intensity=self.intensity or 0.0,
+            confidence=self.confidence or 0.0,
+            keywords_found=[],
+            context_score=self.context_score or 0.0,
+            timestamp=datetime.fromtimestamp(self.timestamp)
+        )
+
+
+class EmotionHistory:
+    """
+    Historique émotionnel borné par utilisateur
+    
+    Les derniers `depth` résultats de chaque utilisateur sont gardés sous
+    forme d'EmotionRecord. Le nombre d'utilisateurs est borné (les moins
+    récemment vus sont évincés en premier) et les utilisateurs inactifs
+    depuis `idle_ttl` secondes sont oubliés. Les compteurs des statistiques
+    sont tenus à jour à chaque écriture : get_stats() est O(1).
+    """
+    
+    def __init__(
+        self,
+        depth: int = 5,
+        max_users: int = 10000,
+        idle_ttl: Optional[float] = None
+    ):
+        """
+        Initialise l'historique
+        
+        Args:
+            depth: Nombre de résultats conservés par utilisateur
+            max_users: Nombre maximum d'utilisateurs conservés
+            idle_ttl: Durée d'inactivité (secondes) avant oubli (None = jamais)
+        """
+        self.depth = depth
+        self.max_users = max_users
+        self.idle_ttl = idle_ttl
+        
+        self._lock = threading.Lock()
+        # Format : {user_id: [deque(EmotionRecord), dernière activité (monotonic)]}
+        self._users: OrderedDict = OrderedDict()
+        
+        # Compteurs (entrées conservées)
+        self._total_entries = 0
+        self._emotion_counts: Dict[str, int] = {}
+        self.evictions = 0
+        self.rehydrations = 0
+    
+    def __len__(self) -> int:
+        return len(self._users)
+    
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._users
+    
+    def get(self, user_id: str) -> List[EmotionRecord]:
+        """Résultats d'un utilisateur, du plus ancien au plus récent"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            return list(entry[0]) if entry else []
+    
+    def append(self, user_id: str, record: EmotionRecord):
+        """Ajoute un résultat (l'utilisateur devient le plus récemment vu)"""
+        with self._lock:
+            self._store(user_id, [record])
+    
+    def rehydrate(self, user_id: str, emotions: Iterable[Optional[str]]) -> bool:
+        """
+        Recharge l'historique d'un utilisateur inconnu (ex : depuis chat_history)
+        
+        Args:
+            user_id: ID utilisateur
+            emotions: Émotions passées, de la plus ancienne à la plus récente
+        
+        Returns:
+            True si l'historique a été rechargé (utilisateur absent et émotions connues)
+        """
+        with self._lock:
+            if user_id in self._users:
+                return False
+            
+            records = [EmotionRecord(emotion) for emotion in emotions if emotion]
+            if not records:
+                return False
+            
+            self._store(user_id, records[-self.depth:])
+            self.rehydrations += 1
+            return True
+    
+    def remove(self, user_id: str) -> bool:
+        """Oublie un utilisateur (True s'il était présent)"""
+        with self._lock:
+            return self._drop(user_id)
+    
+    def _store(self, user_id: str, records: List[EmotionRecord]):
+        """Ajoute des résultats et applique les limites (appelé sous verrou)"""
+        now = time.monotonic()
+        entry = self._users.get(user_id)
+        
+        if entry is None:
+            entry = [deque(maxlen=self.depth), now]
+            self._users[user_id] = entry
+        else:
+            entry[1] = now
+            self._users.move_to_end(user_id)
+        
+        history = entry[0]
+        for record in records:
+            if len(history) == history.maxlen:
+                self._count(history[0].emotion, -1)
+            history.append(record)
+            self._count(record.emotion, 1)
+        
+        self._enforce_limits(now)
+    
+    def _count(self, emotion: str, delta: int):
+        """Met à jour les compteurs (appelé sous verrou)"""
+        self._total_entries += delta
+        count = self._emotion_counts.get(emotion, 0) + delta
+        
+        if count > 0:
+            self._emotion_counts[emotion] = count
+        else:
+            self._emotion_counts.pop(emotion, None)
+    
+    def _drop(self, user_id: str) -> bool:
+        """Supprime un utilisateur et ses compteurs (appelé sous verrou)"""
+        entry = self._users.pop(user_id, None)
+        if entry is None:
+            return False
+        
+        for record in entry[0]:
+            self._count(record.emotion, -1)
+        return True
+    
+    def _enforce_limits(self, now: float):
+        """Évince les utilisateurs inactifs puis les moins récents (appelé sous verrou)"""
+        # Ordre LRU = ordre d'inactivité : seuls les premiers peuvent avoir expiré
+        while self.idle_ttl is not None and self._users:
+            user_id, entry = next(iter(self._users.items()))
+            if now - entry[1] <= self.idle_ttl:
+                break
+            self._drop(user_id)
+            self.evictions += 1
+        
+        while len(self._users) > self.max_users:
+            self._drop(next(iter(self._users)))
+            self.evictions += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Récupère les statistiques de l'historique (O(1))
+        
+        Returns:
+            Dictionnaire avec utilisateurs, entrées, répartition et évictions
+        """
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'entries': self._total_entries,
+                'emotion_distribution': dict(self._emotion_counts),
+                'evictions': self.evictions,
+                'rehydrations': self.rehydrations,
+                'depth': self.depth,
+                'max_users': self.max_users,
+                'idle_ttl': self.idle_ttl
+            }
+
+
 class EmotionAnalyzer:
     """
     Analyseur émotionnel avancé avec analyse contextuelle
@@ -162,7 +388,13 @@ class EmotionAnalyzer:
         }
     }
     
-    def __init__(self, smoothing_factor: float = 0.3, history_size: int = 5):
+    def __init__(
+        self,
+        smoothing_factor: float = 0.3,
+        history_size: int = 5,
+        max_users: int = 10000,
+        idle_ttl: Optional[float] = None
+    ):
         """
         Initialise l'analyseur émotionnel
         
@@ -170,47 +402,40 @@ class EmotionAnalyzer:
             smoothing_factor: Facteur de lissage pour transitions (0-1)
                             0 = changement brutal, 1 = très lisse
             history_size: Taille de l'historique émotionnel par utilisateur
+            max_users: Nombre maximum d'utilisateurs gardés en historique (LRU)
+            idle_ttl: Oubli des utilisateurs inactifs depuis N secondes (None = jamais)
         """
         self.smoothing_factor = max(0.0, min(1.0, smoothing_factor))
         self.history_size = history_size
         
-        # Historique émotionnel par utilisateur
-        # Format : {user_id: deque([EmotionResult, ...])}
-        self.emotion_history: Dict[str, deque] = {}
+        # Historique émotionnel par utilisateur (borné, compteurs maintenus)
+        self.emotion_history = EmotionHistory(history_size, max_users, idle_ttl)
+        
+        # Mots-clés compilés une fois : un seul parcours du texte par analyse
+        self._matcher = KeywordMatcher(self.EMOTION_KEYWORDS)
+        # Matrice mot-clé × émotion (analyse par lots), construite au premier lot
+        self._weights: Any = None
         
         logger.info(
             f"✅ EmotionAnalyzer initialisé "
             f"(smoothing={self.smoothing_factor}, history={self.history_size})"
         )
     
-    def _calculate_intensity(
-        self,
-        text: str,
-        keywords_with_weights: Dict[str, int]
-    ) -> Tuple[float, List[str]]:
+    def _calculate_intensity(self, hits: KeywordHits) -> Tuple[float, List[str]]:
         """
         Calcule l'intensité émotionnelle basée sur les mots-clés trouvés
         
         Args:
-            text: Texte à analyser
-            keywords_with_weights: Dictionnaire {mot-clé: poids}
+            hits: Mots-clés trouvés pour l'émotion (voir KeywordMatcher.match)
         
         Returns:
             (intensité 0-100, liste des mots-clés trouvés)
         """
-        text_lower = text.lower()
-        
-        total_weight = 0
-        keywords_found = []
-        
-        for keyword, weight in keywords_with_weights.items():
-            if keyword in text_lower:
-                total_weight += weight
-                keywords_found.append(keyword)
+        keywords_found = hits.keywords
         
         # Calcul intensité (normalisation empirique)
         # Poids total typique : 1-10 → Intensité : 0-100
-        raw_intensity = min(100, total_weight * 15)  # 15 = facteur de normalisation
+        raw_intensity = min(100, hits.weight * 15)  # 15 = facteur de normalisation
         
         # Bonus si plusieurs mots-clés (contexte renforcé)
         keyword_count = len(keywords_found)
@@ -270,16 +495,13 @@ class EmotionAnalyzer:
         Returns:
             Score contextuel 0-100
         """
-        if user_id not in self.emotion_history:
-            return 50.0  # Score neutre si pas d'historique
+        history = self.emotion_history.get(user_id)
         
-        history = self.emotion_history[user_id]
-        
-        if len(history) == 0:
-            return 50.0
+        if not history:
+            return 50.0  # Score neutre si pas d'historique
         
         # Vérifier cohérence avec émotions précédentes
-        recent_emotions = [result.emotion for result in history]
+        recent_emotions = [record.emotion for record in history]
         
         # Si émotion identique récente → Score élevé (cohérence)
         if current_emotion in recent_emotions[-2:]:  # 2 dernières
@@ -316,13 +538,18 @@ class EmotionAnalyzer:
         Returns:
             Résultat émotionnel lissé
         """
-        if user_id not in self.emotion_history or len(self.emotion_history[user_id]) == 0:
+        history = self.emotion_history.get(user_id)
+        
+        if not history:
             return current_result  # Pas de lissage si pas d'historique
         
-        previous_result = self.emotion_history[user_id][-1]
+        previous_result = history[-1]
         
-        # Si émotion identique, lisser l'intensité
+        # Si émotion identique, lisser l'intensité (inconnue si rechargée)
         if current_result.emotion == previous_result.emotion:
+            if previous_result.intensity is None:
+                return current_result
+            
             smoothed_intensity = (
                 self.smoothing_factor * previous_result.intensity +
                 (1 - self.smoothing_factor) * current_result.intensity
@@ -379,8 +606,8 @@ class EmotionAnalyzer:
         emotion_scores = {}
         emotion_details = {}
         
-        for emotion, keywords_with_weights in self.EMOTION_KEYWORDS.items():
-            intensity, keywords_found = self._calculate_intensity(text, keywords_with_weights)
+        for emotion, hits in self._matcher.match(text).items():
+            intensity, keywords_found = self._calculate_intensity(hits)
             
             if intensity > 0:
                 context_score = self._calculate_context_score(emotion, user_id)
@@ -437,6 +664,97 @@ class EmotionAnalyzer:
         
         return result
     
+    def analyze_batch(self, texts: Sequence[str]) -> List[EmotionResult]:
+        """
+        Analyse plusieurs textes d'un coup, sans historique (ex : re-scorer la base)
+        
+        Les mots-clés trouvés forment une matrice document × mot-clé ; un
+        produit avec la matrice des poids donne les scores de chaque émotion.
+        Aucun lissage ni historique : chaque texte est analysé comme le premier
+        message d'un utilisateur (score contextuel neutre).
+        
+        Args:
+            texts: Textes à analyser
+        
+        Returns:
+            Un EmotionResult par texte, dans le même ordre
+        
+        Raises:
+            ImportError: Si numpy n'est pas installé
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy est requis pour EmotionAnalyzer.analyze_batch")
+        _import_numpy()
+        
+        if self._weights is None:
+            self._weights = np.array(self._matcher.weight_matrix(), dtype=np.float64)
+        
+        emotions = self._matcher.emotions
+        columns = {keyword: index for index, keyword in enumerate(self._matcher.keywords)}
+        
+        # 1. Matrice document × mot-clé (présence 0/1)
+        found = [self._matcher.find(text) if text else set() for text in texts]
+        rows = [row for row, keywords in enumerate(found) for _ in keywords]
+        cols = [columns[keyword] for keywords in found for keyword in keywords]
+        
+        counts = np.zeros((len(texts), len(columns)), dtype=np.float64)
+        counts[rows, cols] = 1.0
+        
+        # 2. Poids totaux et nombre de mots-clés par émotion (document × émotion)
+        total_weight = counts @ self._weights
+        keyword_count = counts @ (self._weights > 0)
+        
+        # 3. Intensité (mêmes règles que _calculate_intensity)
+        intensity = np.minimum(100, total_weight * 15)
+        intensity = np.where(
+            keyword_count >= 3, np.minimum(100, intensity * 1.2),
+            np.where(keyword_count >= 2, np.minimum(100, intensity * 1.1), intensity)
+        )
+        
+        # 4. Émotion dominante : score final (intensité + contexte neutre)
+        # croissant avec l'intensité → argmax, première émotion en cas d'égalité
+        dominant = np.argmax(intensity, axis=1)
+        doc_index = np.arange(len(texts))
+        dominant_intensity = intensity[doc_index, dominant]
+        dominant_count = keyword_count[doc_index, dominant]
+        
+        context_score = 50.0  # Score neutre si pas d'historique
+        confidence = np.minimum(100, (
+            dominant_intensity / 100.0 * 0.4 +
+            np.minimum(1.0, dominant_count / 3.0) * 0.3 +
+            context_score / 100.0 * 0.3
+        ) * 100)
+        
+        # 5. Résultats
+        timestamp = datetime.now()
+        results = []
+        
+        for row, keywords in enumerate(found):
+            if dominant_intensity[row] <= 0:
+                results.append(EmotionResult(
+                    emotion='neutral',
+                    intensity=0.0,
+                    confidence=100.0,
+                    keywords_found=[],
+                    context_score=100.0,
+                    timestamp=timestamp
+                ))
+                continue
+            
+            emotion = emotions[dominant[row]]
+            results.append(EmotionResult(
+                emotion=emotion,
+                intensity=float(dominant_intensity[row]),
+                confidence=float(confidence[row]),
+                keywords_found=self._matcher.keywords_for(keywords, emotion),
+                context_score=context_score,
+                timestamp=timestamp
+            ))
+        
+        logger.debug(f"🎭 Analyse par lots : {len(texts)} textes")
+        
+        return results
+    
     def _save_to_history(self, user_id: str, result: EmotionResult):
         """
         Sauvegarde le résultat dans l'historique émotionnel
@@ -445,15 +763,30 @@ class EmotionAnalyzer:
             user_id: ID utilisateur
             result: Résultat émotionnel
         """
-        if user_id not in self.emotion_history:
-            self.emotion_history[user_id] = deque(maxlen=self.history_size)
+        self.emotion_history.append(user_id, EmotionRecord.from_result(result))
         
-        self.emotion_history[user_id].append(result)
+        logger.debug(f"📚 Historique émotionnel mis à jour pour {user_id[:8]}...")
+    
+    def rehydrate_history(self, user_id: str, emotions: Iterable[Optional[str]]) -> bool:
+        """
+        Recharge l'historique d'un utilisateur inconnu depuis des émotions sauvegardées
         
-        logger.debug(
-            f"📚 Historique émotionnel : {len(self.emotion_history[user_id])} "
-            f"entrées pour {user_id[:8]}..."
-        )
+        Utile après un redémarrage ou une éviction : le contexte émotionnel
+        reprend depuis chat_history au lieu de repartir de zéro.
+        
+        Args:
+            user_id: ID utilisateur
+            emotions: Émotions passées, de la plus ancienne à la plus récente
+        
+        Returns:
+            True si l'historique a été rechargé
+        """
+        rehydrated = self.emotion_history.rehydrate(user_id, emotions)
+        
+        if rehydrated:
+            logger.debug(f"📚 Historique émotionnel rechargé pour {user_id[:8]}...")
+        
+        return rehydrated
     
     def get_emotion_history(self, user_id: str) -> List[EmotionResult]:
         """
@@ -463,12 +796,9 @@ class EmotionAnalyzer:
             user_id: ID utilisateur
         
         Returns:
-            Liste des résultats émotionnels (chronologique)
+            Liste des résultats émotionnels (chronologique, sans mots-clés)
         """
-        if user_id not in self.emotion_history:
-            return []
-        
-        return list(self.emotion_history[user_id])
+        return [record.to_result() for record in self.emotion_history.get(user_id)]
     
     def get_vrm_blendshape(
         self,
@@ -521,8 +851,7 @@ class EmotionAnalyzer:
         Args:
             user_id: ID utilisateur
         """
-        if user_id in self.emotion_history:
-            del self.emotion_history[user_id]
+        if self.emotion_history.remove(user_id):
             logger.info(f"🗑️ Historique émotionnel effacé pour {user_id[:8]}...")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -530,23 +859,20 @@ class EmotionAnalyzer:
         Récupère des statistiques sur l'analyseur
         
         Returns:
-            Dictionnaire avec statistiques globales
+            Dictionnaire avec statistiques globales (O(1) : compteurs maintenus)
         """
-        total_users = len(self.emotion_history)
-        total_emotions = sum(len(history) for history in self.emotion_history.values())
-        
-        # Répartition des émotions
-        emotion_counts = {}
-        for history in self.emotion_history.values():
-            for result in history:
-                emotion_counts[result.emotion] = emotion_counts.get(result.emotion, 0) + 1
+        history_stats = self.emotion_history.get_stats()
         
         return {
-            'total_users': total_users,
-            'total_emotions_analyzed': total_emotions,
-            'emotion_distribution': emotion_counts,
+            'total_users': history_stats['users'],
+            'total_emotions_analyzed': history_stats['entries'],
+            'emotion_distribution': history_stats['emotion_distribution'],
             'smoothing_factor': self.smoothing_factor,
-            'history_size': self.history_size
+            'history_size': self.history_size,
+            'max_users': history_stats['max_users'],
+            'idle_ttl': history_stats['idle_ttl'],
+            'evicted_users': history_stats['evictions'],
+            'rehydrated_users': history_stats['rehydrations']
         }
 
 
@@ -556,7 +882,9 @@ _emotion_analyzer_instance: Optional[EmotionAnalyzer] = None
 
 def get_emotion_analyzer(
     smoothing_factor: float = 0.3,
-    history_size: int = 5
+    history_size: int = 5,
+    max_users: int = 10000,
+    idle_ttl: Optional[float] = None
 ) -> EmotionAnalyzer:
     """
     Récupère l'instance globale de EmotionAnalyzer (singleton)
@@ -564,6 +892,8 @@ def get_emotion_analyzer(
     Args:
         smoothing_factor: Facteur de lissage (0-1)
         history_size: Taille historique par utilisateur
+        max_users: Nombre maximum d'utilisateurs en historique
+        idle_ttl: Oubli des utilisateurs inactifs (secondes, None = jamais)
     
     Returns:
         Instance EmotionAnalyzer
@@ -571,7 +901,9 @@ def get_emotion_analyzer(
     global _emotion_analyzer_instance
     
     if _emotion_analyzer_instance is None:
-        _emotion_analyzer_instance = EmotionAnalyzer(smoothing_factor, history_size)
+        _emotion_analyzer_instance = EmotionAnalyzer(
+            smoothing_factor, history_size, max_users, idle_ttl
+        )
     
     return _emotion_analyzer_instance
 
@@ -0,0 +1,212 @@
+"""
+Détection de mots-clés multi-motifs pour Desktop-Mate (Kira)
+
+Compile une fois tous les mots-clés émotionnels : le texte est découpé en
+mots (un seul parcours), les mots-clés d'un mot sont trouvés par intersection
+d'ensembles et ceux de plusieurs mots ('mort de rire', "d'accord") par un
+trie de mots, à la manière d'un automate Aho-Corasick.
+
+Les mots-clés sont des mots entiers : 'ah' ne correspond plus dans
+'ahurissant', ni 'oh' dans 'colère'. Les emojis restent détectés partout.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Mots-clés d'une émotion : {mot-clé: poids} ou liste (poids 1)
+Keywords = Union[Mapping[str, int], Iterable[str]]
+
+
+@dataclass
+class KeywordHits:
+    """Mots-clés trouvés pour une émotion"""
+    weight: int = 0                                      # Somme des poids (un mot-clé compte une fois)
+    keywords: List[str] = field(default_factory=list)   # Mots-clés, dans l'ordre de déclaration
+
+
+# Mots (lettres, chiffres, _) ou caractère isolé (ponctuation, emoji)
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def _tokenize(text: str) -> List[str]:
+    """Découpe un texte en minuscules en mots et symboles"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class KeywordMatcher:
+    """
+    Détecteur compilé de mots-clés émotionnels
+    
+    Exemple :
+        matcher = KeywordMatcher({'joy': {'super': 3}, 'fun': ['mdr']})
+        matcher.match("Super, mdr !")['joy'].weight  # 3
+    """
+    
+    def __init__(self, keywords_by_emotion: Mapping[str, Keywords]):
+        """
+        Compile les mots-clés
+        
+        Args:
+            keywords_by_emotion: {émotion: {mot-clé: poids}} ou {émotion: [mots-clés]}
+        """
+        # mot-clé (minuscules) → [(émotion, poids, rang de déclaration)]
+        self._entries: Dict[str, List[Tuple[str, int, int]]] = {}
+        
+        for emotion, keywords in keywords_by_emotion.items():
+            weights = keywords if isinstance(keywords, Mapping) else dict.fromkeys(keywords, 1)
+            
+            for rank, (keyword, weight) in enumerate(weights.items()):
+                keyword = keyword.lower()
+                if keyword:
+                    self._entries.setdefault(keyword, []).append((emotion, weight, rank))
+        
+        # Mots-clés d'un seul mot : intersection d'ensembles
+        self._single = set()
+        # Mots-clés de plusieurs mots : trie {mot: {mot suivant: ...}}, fin = clé None
+        self._multi: dict = {}
+        # Mots nécessaires à chaque mot-clé de plusieurs mots (pré-filtre)
+        self._multi_words: List[frozenset] = []
+        
+        for keyword in self._entries:
+            tokens = _tokenize(keyword)
+            
+            if tokens == [keyword]:
+                self._single.add(keyword)
+                continue
+            
+            node = self._multi
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[None] = keyword
+            self._multi_words.append(frozenset(tokens))
+        
+        self.emotions = list(keywords_by_emotion)
+        # Ordre des colonnes des matrices document × mot-clé
+        self.keywords = list(self._entries)
+        
+        logger.debug(
+            f"🔎 KeywordMatcher compilé : {len(self._entries)} mots-clés, "
+            f"{len(self.emotions)} émotions"
+        )
+    
+    @staticmethod
+    def _words(text: str) -> set:
+        """
+        Ensemble des mots et symboles du texte
+        
+        Équivalent à set(_tokenize(text)), mais seuls les fragments contenant
+        ponctuation ou emoji passent par l'expression régulière.
+        """
+        words = set(text.lower().split())
+        
+        for piece in [piece for piece in words if not piece.isalnum()]:
+            words.discard(piece)
+            words.update(_TOKEN_PATTERN.findall(piece))
+        
+        return words
+    
+    def _find_multi(self, tokens: List[str]) -> List[str]:
+        """Parcourt le trie de mots pour trouver les mots-clés de plusieurs mots"""
+        found = []
+        
+        for index, token in enumerate(tokens):
+            node = self._multi.get(token)
+            position = index + 1
+            
+            while node is not None:
+                if None in node:
+                    found.append(node[None])
+                if position == len(tokens):
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        
+        return found
+    
+    def find(self, text: str) -> set:
+        """
+        Trouve les mots-clés présents dans le texte (toutes émotions)
+        
+        Args:
+            text: Texte à analyser
+        
+        Returns:
+            Ensemble des mots-clés trouvés (minuscules)
+        """
+        words = self._words(text)
+        found = words & self._single
+        
+        # Découpage complet seulement si un mot-clé de plusieurs mots est possible
+        if any(required <= words for required in self._multi_words):
+            found.update(self._find_multi(_tokenize(text)))
+        
+        return found
+    
+    def keywords_for(self, found: Iterable[str], emotion: str) -> List[str]:
+        """
+        Mots-clés trouvés appartenant à une émotion
+        
+        Args:
+            found: Mots-clés trouvés (voir find)
+            emotion: Émotion
+        
+        Returns:
+            Mots-clés de l'émotion, dans l'ordre de déclaration
+        """
+        ranked = [
+            (rank, keyword)
+            for keyword in found
+            for entry_emotion, _, rank in self._entries[keyword]
+            if entry_emotion == emotion
+        ]
+        return [keyword for _, keyword in sorted(ranked)]
+    
+    def match(self, text: str) -> Dict[str, KeywordHits]:
+        """
+        Trouve les mots-clés de toutes les émotions en un seul parcours
+        
+        Args:
+            text: Texte à analyser
+        
+        Returns:
+            {émotion: KeywordHits} pour les émotions ayant au moins un mot-clé,
+            dans l'ordre de déclaration des émotions
+        """
+        ranked: Dict[str, List[Tuple[int, str, int]]] = {}
+        for keyword in self.find(text):
+            for emotion, weight, rank in self._entries[keyword]:
+                ranked.setdefault(emotion, []).append((rank, keyword, weight))
+        
+        hits = {}
+        for emotion in self.emotions:
+            entries = ranked.get(emotion)
+            if not entries:
+                continue
+            
+            entries.sort()
+            hits[emotion] = KeywordHits(
+                weight=sum(weight for _, _, weight in entries),
+                keywords=[keyword for _, keyword, _ in entries]
+            )
+        
+        return hits
+    
+    def weight_matrix(self) -> List[List[int]]:
+        """
+        Poids des mots-clés par émotion (lignes : self.keywords, colonnes : self.emotions)
+        
+        Returns:
+            Matrice mot-clé × émotion (0 si le mot-clé n'appartient pas à l'émotion)
+        """
+        columns = {emotion: index for index, emotion in enumerate(self.emotions)}
+        matrix = [[0] * len(self.emotions) for _ in self.keywords]
+        
+        for row, keyword in enumerate(self.keywords):
+            for emotion, weight, _ in self._entries[keyword]:
+                matrix[row][columns[emotion]] = weight
+        
+        return matrix
@@ -6,12 +6,21 @@ Gère la mémoire conversationnelle avec SQLite :
 - Support multi-source (GUI Desktop-Mate + Discord)
 - Sauvegarde des émotions détectées
 - Fonctions CRUD optimisées avec indexes
+- Pool de connexions persistantes (une par thread, mode WAL)
+- Mode write-behind optionnel (écritures groupées en arrière-plan)
+- Cache LRU en mémoire des derniers échanges par (utilisateur, source)
+- Statistiques matérialisées (compteurs tenus à jour par triggers)
+- Recherche plein texte (FTS5) dans l'historique
 """
 
 import sqlite3
 import os
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Iterator, List, Dict, Optional, Sequence, Tuple
 from contextlib import contextmanager
 import logging
 
@@ -20,31 +29,496 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _stats_trigger_body(row: str, sign: int) -> str:
+    """
+    Génère les instructions SQL de mise à jour des compteurs pour une ligne
+    
+    Args:
+        row: Alias de la ligne dans le trigger ("NEW" ou "OLD")
+        sign: +1 pour une insertion, -1 pour une suppression
+    
+    Returns:
+        Corps de trigger (instructions séparées par des ;)
+    """
+    upsert = "ON CONFLICT({cols}) DO UPDATE SET count = count + ({sign})"
+    global_upsert = upsert.format(cols="scope, key", sign=sign)
+    user_upsert = upsert.format(cols="user_id, scope, key", sign=sign)
+    user_total = (
+        f"(SELECT count FROM chat_stats_user "
+        f"WHERE user_id = {row}.user_id AND scope = 'total' AND key = '')"
+    )
+    
+    statements = [
+        # Compteurs globaux
+        f"INSERT INTO chat_stats_global (scope, key, count) "
+        f"VALUES ('total', '', {sign}) {global_upsert}",
+        f"INSERT INTO chat_stats_global (scope, key, count) "
+        f"VALUES ('source', {row}.source, {sign}) {global_upsert}",
+        f"INSERT INTO chat_stats_global (scope, key, count) "
+        f"SELECT 'emotion', {row}.emotion, {sign} WHERE {row}.emotion IS NOT NULL {global_upsert}",
+        # Compteurs par utilisateur
+        f"INSERT INTO chat_stats_user (user_id, scope, key, count) "
+        f"VALUES ({row}.user_id, 'total', '', {sign}) {user_upsert}",
+        f"INSERT INTO chat_stats_user (user_id, scope, key, count) "
+        f"VALUES ({row}.user_id, 'source', {row}.source, {sign}) {user_upsert}",
+        f"INSERT INTO chat_stats_user (user_id, scope, key, count) "
+        f"SELECT {row}.user_id, 'emotion', {row}.emotion, {sign} "
+        f"WHERE {row}.emotion IS NOT NULL {user_upsert}",
+    ]
+    
+    if sign > 0:
+        # Nouvel utilisateur : son total vient de passer à 1
+        statements.append(
+            f"INSERT INTO chat_stats_global (scope, key, count) "
+            f"SELECT 'users', '', 1 WHERE {user_total} = 1 {global_upsert}"
+        )
+    else:
+        # Dernière interaction de l'utilisateur supprimée
+        statements += [
+            f"UPDATE chat_stats_global SET count = count - 1 "
+            f"WHERE scope = 'users' AND key = '' AND {user_total} <= 0",
+            f"DELETE FROM chat_stats_user WHERE user_id = {row}.user_id AND count <= 0",
+            "DELETE FROM chat_stats_global "
+            "WHERE scope IN ('source', 'emotion') AND count <= 0",
+        ]
+    
+    return ";\n".join(statements) + ";"
+
+
+class SQLiteConnectionPool:
+    """
+    Pool de connexions SQLite persistantes (une connexion par thread)
+    
+    Chaque thread (thread GUI, executor Discord...) réutilise sa propre
+    connexion au lieu d'en ouvrir une nouvelle à chaque requête.
+    Les connexions des threads terminés sont fermées automatiquement.
+    
+    Réglages appliqués à chaque connexion :
+    - journal_mode=WAL : lectures concurrentes pendant les écritures
+    - synchronous=NORMAL : un fsync par checkpoint au lieu d'un par commit
+    - cache_size / mmap_size : cache de pages chaud entre les requêtes
+    """
+    
+    def __init__(
+        self,
+        db_path: str,
+        cache_size_kb: int = 8192,
+        mmap_size: int = 64 * 1024 * 1024,
+        busy_timeout_ms: int = 5000
+    ):
+        """
+        Initialise le pool de connexions
+        
+        Args:
+            db_path: Chemin vers la base SQLite
+            cache_size_kb: Taille du cache de pages par connexion (KiB)
+            mmap_size: Taille maximale du mapping mémoire (bytes, 0 = désactivé)
+            busy_timeout_ms: Attente maximale si la base est verrouillée (ms)
+        """
+        self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Format : {thread_ident: (thread, connexion)}
+        self._connections: Dict[int, Tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._closed = False
+        
+        # Statistiques
+        self.connections_opened = 0
+        self.connections_reused = 0
+    
+    def _create_connection(self) -> sqlite3.Connection:
+        """Ouvre une nouvelle connexion et applique les PRAGMA de performance"""
+        # check_same_thread=False : la connexion n'est utilisée que par son
+        # thread, mais close_all() doit pouvoir la fermer depuis un autre
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row  # Permet d'accéder aux colonnes par nom
+        
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        
+        self.connections_opened += 1
+        return conn
+    
+    def _reap_dead_threads(self):
+        """Ferme les connexions des threads terminés (appelé sous verrou)"""
+        dead = [
+            ident for ident, (thread, _) in self._connections.items()
+            if not thread.is_alive()
+        ]
+        
+        for ident in dead:
+            _, conn = self._connections.pop(ident)
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        
+        if dead:
+            logger.debug(f"🧹 {len(dead)} connexion(s) SQLite de threads terminés fermée(s)")
+    
+    def get(self) -> sqlite3.Connection:
+        """
+        Récupère la connexion du thread courant (créée au premier appel)
+        
+        Returns:
+            Connexion SQLite dédiée au thread courant
+        
+        Raises:
+            RuntimeError: Si le pool a été fermé
+        """
+        conn = getattr(self._local, 'conn', None)
+        
+        if conn is not None:
+            self.connections_reused += 1
+            return conn
+        
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Pool de connexions SQLite fermé")
+            
+            self._reap_dead_threads()
+            
+            conn = self._create_connection()
+            thread = threading.current_thread()
+            self._connections[threading.get_ident()] = (thread, conn)
+        
+        self._local.conn = conn
+        return conn
+    
+    def close_all(self):
+        """Ferme toutes les connexions du pool"""
+        with self._lock:
+            self._closed = True
+            
+            for _, conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            
+            count = len(self._connections)
+            self._connections.clear()
+        
+        # La connexion locale du thread appelant est invalide désormais
+        self._local = threading.local()
+        
+        logger.debug(f"🔒 Pool SQLite fermé ({count} connexion(s))")
+    
+    @property
+    def size(self) -> int:
+        """Nombre de connexions actuellement ouvertes"""
+        with self._lock:
+            return len(self._connections)
+    
+    def get_stats(self) -> Dict:
+        """
+        Récupère les statistiques du pool
+        
+        Returns:
+            Dictionnaire avec connexions ouvertes / réutilisées
+        """
+        return {
+            'open_connections': self.size,
+            'connections_opened': self.connections_opened,
+            'connections_reused': self.connections_reused
+        }
+
+
+class HistoryCache:
+    """
+    Cache LRU des dernières interactions par clé (user_id, source)
+    
+    Chaque clé conserve une deque des `depth` interactions les plus récentes,
+    tenue à jour par save_interaction. Une clé est dite « complète » quand la
+    base ne contient pas d'interaction plus ancienne que celles en cache.
+    
+    Le cache est borné en nombre de clés et en taille estimée (bytes) :
+    les clés les moins récemment utilisées sont évincées en premier.
+    """
+    
+    # Surcoût estimé par interaction (dict + deque + chaînes Python)
+    ROW_OVERHEAD_BYTES = 400
+    
+    def __init__(
+        self,
+        depth: int = 10,
+        max_users: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024
+    ):
+        """
+        Initialise le cache d'historique
+        
+        Args:
+            depth: Nombre d'interactions conservées par clé
+            max_users: Nombre maximum de clés (user_id, source) en cache
+            max_bytes: Taille mémoire estimée maximale du cache
+        """
+        self.depth = depth
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        
+        self._lock = threading.Lock()
+        # Format : {(user_id, source): [deque(interactions), complete, size_bytes]}
+        self._entries: OrderedDict = OrderedDict()
+        self._total_bytes = 0
+        # Incrémenté à chaque écriture/invalidation (évite de peupler le
+        # cache avec une lecture base devenue obsolète entre-temps)
+        self._generation = 0
+        
+        # Statistiques
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @classmethod
+    def _row_size(cls, row: Dict) -> int:
+        """Taille mémoire estimée d'une interaction"""
+        return (
+            cls.ROW_OVERHEAD_BYTES
+            + len(row['user_input']) * 2
+            + len(row['bot_response']) * 2
+        )
+    
+    @property
+    def generation(self) -> int:
+        """Compteur de modifications (à capturer avant une lecture base)"""
+        return self._generation
+    
+    def get(self, user_id: str, source: Optional[str], limit: int) -> Optional[List[Dict]]:
+        """
+        Récupère les `limit` dernières interactions si le cache peut répondre
+        
+        Returns:
+            Liste chronologique, ou None si absent/insuffisant (miss)
+        """
+        key = (user_id, source)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            
+            if entry is None or limit > self.depth or (limit > len(entry[0]) and not entry[1]):
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            rows = list(entry[0])
+        
+        return rows[-limit:] if limit > 0 else []
+    
+    def populate(
+        self,
+        user_id: str,
+        source: Optional[str],
+        rows: List[Dict],
+        requested: int,
+        generation: int
+    ):
+        """
+        Peuple le cache après une lecture en base (miss)
+        
+        Args:
+            rows: Interactions lues (chronologique)
+            requested: Limite demandée à la base (moins de lignes = complet)
+            generation: Valeur de `generation` capturée avant la lecture
+        """
+        if self.depth <= 0:
+            return
+        
+        key = (user_id, source)
+        
+        with self._lock:
+            if generation != self._generation:
+                return  # Écriture concurrente : lecture potentiellement obsolète
+            
+            self._remove(key)
+            
+            cached = deque(rows[-self.depth:], maxlen=self.depth)
+            complete = len(rows) < requested and len(rows) <= self.depth
+            size = sum(self._row_size(row) for row in cached)
+            
+            self._entries[key] = [cached, complete, size]
+            self._total_bytes += size
+            self._enforce_limits()
+    
+    def append(self, user_id: str, source: str, row: Dict):
+        """Ajoute une nouvelle interaction aux clés en cache concernées"""
+        with self._lock:
+            self._generation += 1
+            
+            for key in ((user_id, source), (user_id, None)):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                
+                cached = entry[0]
+                if len(cached) == cached.maxlen:
+                    entry[2] -= self._row_size(cached[0])
+                    self._total_bytes -= self._row_size(cached[0])
+                
+                cached.append(row)
+                size = self._row_size(row)
+                entry[2] += size
+                self._total_bytes += size
+            
+            self._enforce_limits()
+    
+    def invalidate_user(self, user_id: str, source: Optional[str] = None):
+        """Invalide les clés d'un utilisateur (toutes sources si source=None)"""
+        with self._lock:
+            self._generation += 1
+            
+            if source is None:
+                keys = [key for key in self._entries if key[0] == user_id]
+            else:
+                keys = [(user_id, source), (user_id, None)]
+            
+            for key in keys:
+                self._remove(key)
+    
+    def clear(self):
+        """Vide entièrement le cache"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._total_bytes = 0
+    
+    def _remove(self, key: Tuple):
+        """Supprime une clé (appelé sous verrou)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+    
+    def _enforce_limits(self):
+        """Évince les clés les moins récemment utilisées (appelé sous verrou)"""
+        while self._entries and (
+            len(self._entries) > self.max_users or self._total_bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry[2]
+            self.evictions += 1
+    
+    def get_stats(self) -> Dict:
+        """
+        Récupère les statistiques du cache
+        
+        Returns:
+            Dictionnaire avec hits/misses, taille et évictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'estimated_bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'depth': self.depth,
+                'max_users': self.max_users,
+                'max_bytes': self.max_bytes
+            }
+
+
 class ConversationMemory:
     """Gestionnaire de mémoire conversationnelle SQLite"""
     
-    def __init__(self, db_path: str = "data/chat_history.db"):
+    # Nombre de correspondances récentes classées par search()
+    SEARCH_WINDOW = 2000
+    
+    # Délai maximum entre deux tentatives d'écriture différée en échec (s)
+    WRITER_MAX_BACKOFF = 5.0
+    
+    def __init__(
+        self,
+        db_path: str = "data/chat_history.db",
+        write_behind: bool = False,
+        flush_interval_ms: int = 200,
+        flush_batch_size: int = 50,
+        max_pending: int = 10000,
+        history_cache_size: int = 10,
+        history_cache_max_users: int = 1000,
+        history_cache_max_bytes: int = 16 * 1024 * 1024
+    ):
         """
         Initialise le gestionnaire de mémoire
         
         Args:
             db_path: Chemin vers la base SQLite (créée automatiquement si inexistante)
+            write_behind: Si True, save_interaction met les interactions en file
+                          et un thread d'arrière-plan les écrit par lots
+            flush_interval_ms: Délai maximum avant écriture d'un lot (write-behind)
+            flush_batch_size: Nombre d'interactions déclenchant une écriture immédiate
+            max_pending: Taille maximale de la file ; au-delà, save_interaction
+                         écrit la file elle-même (synchrone)
+            history_cache_size: Interactions gardées en cache par (user_id, source)
+                                (0 = cache désactivé)
+            history_cache_max_users: Nombre maximum de clés en cache (LRU)
+            history_cache_max_bytes: Taille mémoire estimée maximale du cache
         """
         self.db_path = db_path
         
         # Créer le dossier data si nécessaire
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
+        # Connexions persistantes partagées par tous les threads appelants
+        self.pool = SQLiteConnectionPool(db_path)
+        
         # Initialiser la base de données
         self._init_database()
         
-        logger.info(f"✅ ConversationMemory initialisée : {db_path}")
+        # Cache des derniers échanges devant get_history
+        self.history_cache = HistoryCache(
+            depth=history_cache_size,
+            max_users=history_cache_max_users,
+            max_bytes=history_cache_max_bytes
+        )
+        
+        # File d'écriture différée (write-behind)
+        self.write_behind = write_behind
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_batch_size = max(1, flush_batch_size)
+        self.max_pending = max(1, max_pending)
+        self._pending: List[Tuple] = []
+        self._pending_lock = threading.Lock()
+        self._pending_cond = threading.Condition(self._pending_lock)
+        # Sérialise écriture d'un lot et lectures fusionnées (pas de doublon/trou)
+        self._flush_lock = threading.RLock()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_running = False
+        self.flush_count = 0
+        self.flushed_rows = 0
+        self.flush_errors = 0
+        self.sync_flushes = 0
+        
+        if write_behind:
+            self._start_writer()
+        
+        logger.info(
+            f"✅ ConversationMemory initialisée : {db_path}"
+            f"{' (write-behind)' if write_behind else ''}"
+        )
     
     @contextmanager
     def _get_connection(self):
-        """Context manager pour gérer les connexions SQLite de manière thread-safe"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Permet d'accéder aux colonnes par nom
+        """
+        Context manager transactionnel sur la connexion du thread courant
+        
+        La connexion provient du pool et reste ouverte après la transaction.
+        """
+        conn = self.pool.get()
         try:
             yield conn
             conn.commit()
@@ -52,8 +526,130 @@ class ConversationMemory:
             conn.rollback()
             logger.error(f"❌ Erreur transaction SQLite : {e}")
             raise
-        finally:
-            conn.close()
+    
+    def close(self):
+        """Écrit les interactions en attente puis ferme les connexions SQLite"""
+        self._stop_writer()
+        self.pool.close_all()
+        logger.info(f"🔒 ConversationMemory fermée : {self.db_path}")
+    
+    # ==========================================================
+    # Write-behind : file d'écriture différée
+    # ==========================================================
+    
+    def _start_writer(self):
+        """Démarre le thread d'écriture en arrière-plan"""
+        self._writer_running = True
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop,
+            name="ConversationMemoryWriter",
+            daemon=True
+        )
+        self._writer_thread.start()
+    
+    def _stop_writer(self):
+        """Arrête le thread d'écriture et vide la file"""
+        if self._writer_thread is not None:
+            with self._pending_cond:
+                self._writer_running = False
+                self._pending_cond.notify()
+            
+            self._writer_thread.join(timeout=5.0)
+            self._writer_thread = None
+        
+        self.flush()
+    
+    def _writer_loop(self):
+        """Boucle du thread d'écriture : un lot toutes les N ms ou N lignes"""
+        interval = self.flush_interval_ms / 1000.0
+        backoff = 0.0
+        
+        while True:
+            with self._pending_cond:
+                if backoff:
+                    # Après un échec, attendre tout le délai même si la file
+                    # se remplit (pas de boucle active sur une base en erreur)
+                    deadline = time.monotonic() + backoff
+                    remaining = backoff
+                    while self._writer_running and remaining > 0:
+                        self._pending_cond.wait(timeout=remaining)
+                        remaining = deadline - time.monotonic()
+                elif self._writer_running and len(self._pending) < self.flush_batch_size:
+                    self._pending_cond.wait(timeout=interval)
+                
+                running = self._writer_running
+            
+            try:
+                self.flush()
+                backoff = 0.0
+            except Exception as e:
+                # Les lignes restent en file, nouvelle tentative après un
+                # délai doublé à chaque échec
+                self.flush_errors += 1
+                backoff = min(max(backoff * 2, interval, 0.1), self.WRITER_MAX_BACKOFF)
+                logger.error(
+                    f"❌ Erreur écriture différée (nouvel essai dans {backoff:.1f} s) : {e}"
+                )
+            
+            if not running:
+                break
+    
+    def flush(self) -> int:
+        """
+        Écrit toutes les interactions en attente en une seule transaction
+        
+        Returns:
+            Nombre d'interactions écrites
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                # Copie : save_interaction peut ajouter des lignes pendant l'écriture
+                batch = list(self._pending)
+                if not batch:
+                    return 0
+            
+            # En cas d'erreur, le lot reste en file pour le prochain flush
+            with self._get_connection() as conn:
+                conn.executemany("""
+                    INSERT INTO chat_history
+                        (user_id, source, user_input, bot_response, emotion, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, batch)
+            
+            with self._pending_lock:
+                # Retirer uniquement le lot écrit (d'autres lignes ont pu arriver)
+                del self._pending[:len(batch)]
+            
+            self.flush_count += 1
+            self.flushed_rows += len(batch)
+        
+        logger.debug(f"💾 Lot écrit : {len(batch)} interaction(s)")
+        
+        return len(batch)
+    
+    def _get_pending(self, user_id: str, source: Optional[str]) -> List[Dict]:
+        """Interactions en attente d'écriture pour un utilisateur (chronologique)"""
+        with self._pending_lock:
+            rows = [
+                row for row in self._pending
+                if row[0] == user_id and (source is None or row[1] == source)
+            ]
+        
+        return [
+            {
+                'user_input': row[2],
+                'bot_response': row[3],
+                'emotion': row[4],
+                'timestamp': row[5]
+            }
+            for row in rows
+        ]
+    
+    @property
+    def pending_count(self) -> int:
+        """Nombre d'interactions en attente d'écriture"""
+        with self._pending_lock:
+            return len(self._pending)
     
     def _init_database(self):
         """Crée le schema de la base de données si nécessaire"""
@@ -95,8 +691,331 @@ class ConversationMemory:
                 ON chat_history(user_id, timestamp DESC)
             """)
             
+            self._init_stats_schema(cursor)
+            self.search_available = self._init_search_schema(cursor)
+            
             logger.info("✅ Schema SQLite créé/vérifié")
     
+    def _init_stats_schema(self, cursor: sqlite3.Cursor):
+        """
+        Crée les tables de compteurs et les triggers qui les maintiennent
+        
+        Les compteurs sont mis à jour dans la même transaction que
+        l'INSERT/DELETE/UPDATE sur chat_history : get_stats() devient O(1).
+        Une base existante sans compteurs est remplie une fois (backfill).
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chat_stats_global'"
+        )
+        needs_backfill = cursor.fetchone() is None
+        
+        # scope : 'total' | 'users' | 'source' | 'emotion'
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chat_stats_global (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (scope, key)
+            ) WITHOUT ROWID
+        """)
+        
+        # scope : 'total' | 'source' | 'emotion'
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chat_stats_user (
+                user_id TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, scope, key)
+            ) WITHOUT ROWID
+        """)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_chat_stats_insert
+            AFTER INSERT ON chat_history
+            BEGIN
+                {_stats_trigger_body("NEW", 1)}
+            END
+        """)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_chat_stats_delete
+            AFTER DELETE ON chat_history
+            BEGIN
+                {_stats_trigger_body("OLD", -1)}
+            END
+        """)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_chat_stats_update
+            AFTER UPDATE OF user_id, source, emotion ON chat_history
+            BEGIN
+                {_stats_trigger_body("OLD", -1)}
+                {_stats_trigger_body("NEW", 1)}
+            END
+        """)
+        
+        if needs_backfill:
+            self._rebuild_stats(cursor)
+    
+    def _rebuild_stats(self, cursor: sqlite3.Cursor):
+        """Recalcule tous les compteurs depuis chat_history (dans la transaction)"""
+        cursor.execute("DELETE FROM chat_stats_global")
+        cursor.execute("DELETE FROM chat_stats_user")
+        
+        cursor.execute("""
+            INSERT INTO chat_stats_global (scope, key, count)
+            SELECT 'total', '', COUNT(*) FROM chat_history
+            UNION ALL
+            SELECT 'users', '', COUNT(DISTINCT user_id) FROM chat_history
+            UNION ALL
+            SELECT 'source', source, COUNT(*) FROM chat_history GROUP BY source
+            UNION ALL
+            SELECT 'emotion', emotion, COUNT(*) FROM chat_history
+            WHERE emotion IS NOT NULL GROUP BY emotion
+        """)
+        
+        cursor.execute("""
+            INSERT INTO chat_stats_user (user_id, scope, key, count)
+            SELECT user_id, 'total', '', COUNT(*) FROM chat_history GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 'source', source, COUNT(*) FROM chat_history
+            GROUP BY user_id, source
+            UNION ALL
+            SELECT user_id, 'emotion', emotion, COUNT(*) FROM chat_history
+            WHERE emotion IS NOT NULL GROUP BY user_id, emotion
+        """)
+    
+    def rebuild_stats(self) -> Dict:
+        """
+        Recalcule les compteurs de statistiques depuis chat_history
+        
+        À utiliser pour réparer une dérive (base modifiée hors triggers,
+        import manuel, restauration partielle...).
+        
+        Returns:
+            Statistiques globales après reconstruction
+        """
+        self.flush()
+        
+        with self._get_connection() as conn:
+            self._rebuild_stats(conn.cursor())
+        
+        logger.info("🔧 Compteurs de statistiques reconstruits")
+        
+        return self.get_stats()
+    
+    def _init_search_schema(self, cursor: sqlite3.Cursor) -> bool:
+        """
+        Crée l'index plein texte FTS5 et ses triggers de synchronisation
+        
+        L'index est à contenu externe (pas de duplication du texte) et
+        reste synchronisé avec chat_history par triggers. Une base existante
+        est indexée une fois (backfill). user_id est aussi indexé pour que
+        le filtre par utilisateur soit résolu dans l'index FTS.
+        
+        Returns:
+            True si FTS5 est disponible, False sinon (recherche désactivée)
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chat_history_fts'"
+        )
+        needs_backfill = cursor.fetchone() is None
+        
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS chat_history_fts USING fts5(
+                    user_input,
+                    bot_response,
+                    user_id,
+                    content = 'chat_history',
+                    content_rowid = 'id',
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ FTS5 indisponible, recherche désactivée : {e}")
+            return False
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_chat_fts_insert
+            AFTER INSERT ON chat_history
+            BEGIN
+                INSERT INTO chat_history_fts (rowid, user_input, bot_response, user_id)
+                VALUES (NEW.id, NEW.user_input, NEW.bot_response, NEW.user_id);
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_chat_fts_delete
+            AFTER DELETE ON chat_history
+            BEGIN
+                INSERT INTO chat_history_fts (chat_history_fts, rowid, user_input, bot_response, user_id)
+                VALUES ('delete', OLD.id, OLD.user_input, OLD.bot_response, OLD.user_id);
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_chat_fts_update
+            AFTER UPDATE OF user_input, bot_response, user_id ON chat_history
+            BEGIN
+                INSERT INTO chat_history_fts (chat_history_fts, rowid, user_input, bot_response, user_id)
+                VALUES ('delete', OLD.id, OLD.user_input, OLD.bot_response, OLD.user_id);
+                INSERT INTO chat_history_fts (rowid, user_input, bot_response, user_id)
+                VALUES (NEW.id, NEW.user_input, NEW.bot_response, NEW.user_id);
+            END
+        """)
+        
+        if needs_backfill:
+            cursor.execute("INSERT INTO chat_history_fts (chat_history_fts) VALUES ('rebuild')")
+            logger.info("🔎 Index de recherche plein texte construit")
+        
+        return True
+    
+    def rebuild_search_index(self):
+        """
+        Reconstruit l'index plein texte depuis chat_history puis l'optimise
+        
+        Raises:
+            RuntimeError: Si FTS5 n'est pas disponible
+        """
+        if not self.search_available:
+            raise RuntimeError("Recherche plein texte indisponible (FTS5 absent)")
+        
+        self.flush()
+        
+        with self._get_connection() as conn:
+            conn.execute("INSERT INTO chat_history_fts (chat_history_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO chat_history_fts (chat_history_fts) VALUES ('optimize')")
+        
+        logger.info("🔧 Index de recherche plein texte reconstruit")
+    
+    @staticmethod
+    def _build_match_query(query: str) -> str:
+        """
+        Convertit un texte libre en requête FTS5 sûre
+        
+        Chaque mot devient un terme entre guillemets (ET implicite), ce qui
+        neutralise la syntaxe FTS5 (opérateurs, parenthèses, guillemets).
+        Un mot terminé par * est recherché en préfixe.
+        """
+        terms = []
+        
+        for token in re.findall(r"[\w']+\*?", query):
+            prefix = token.endswith("*")
+            word = token.rstrip("*").replace('"', '""')
+            if word:
+                terms.append(f'"{word}"' + ("*" if prefix else ""))
+        
+        return " ".join(terms)
+    
+    def search(
+        self,
+        query: str,
+        user_id: Optional[str] = None,
+        source: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0,
+        raw: bool = False
+    ) -> List[Dict]:
+        """
+        Recherche des interactions par contenu (classées par pertinence)
+        
+        Args:
+            query: Texte recherché (mots, ET implicite ; "mot*" = préfixe)
+            user_id: Filtrer par utilisateur (optionnel)
+            source: Filtrer par source (optionnel)
+            limit: Nombre maximum de résultats
+            offset: Décalage pour la pagination
+            raw: Si True, `query` est passée telle quelle (syntaxe FTS5)
+        
+        Le classement BM25 porte sur les SEARCH_WINDOW correspondances les
+        plus récentes, ce qui borne la latence sur un gros historique.
+        
+        Returns:
+            Liste d'interactions avec 'id', 'score' (BM25, plus bas = plus
+            pertinent) et 'snippet' (extrait avec termes entre [ ])
+        
+        Raises:
+            RuntimeError: Si FTS5 n'est pas disponible
+        """
+        if not self.search_available:
+            raise RuntimeError("Recherche plein texte indisponible (FTS5 absent)")
+        
+        match_query = query if raw else self._build_match_query(query)
+        
+        if not match_query.strip():
+            return []
+        
+        self.flush()
+        
+        # Les termes ne portent que sur le contenu, pas sur la colonne user_id
+        match_query = f"{{user_input bot_response}} : ({match_query})"
+        window_query = match_query
+        
+        # Pré-filtre utilisateur résolu dans l'index (intersection des listes
+        # de documents) ; le filtre exact h.user_id = ? reste appliqué
+        if user_id is not None and re.search(r"[^\W_]", user_id):
+            user_phrase = user_id.replace('"', '""')
+            window_query += f' AND user_id : "{user_phrase}"'
+        
+        # 1) Classement BM25 limité aux SEARCH_WINDOW correspondances les plus
+        #    récentes : coût borné même pour un terme présent partout
+        window_sql = """
+            SELECT chat_history_fts.rowid AS id,
+                   bm25(chat_history_fts, 1.0, 1.0, 0.0) AS score
+            FROM chat_history_fts
+        """
+        params: List = [window_query]
+        filters = ["chat_history_fts MATCH ?"]
+        
+        if user_id is not None or source is not None:
+            window_sql += " JOIN chat_history h ON h.id = chat_history_fts.rowid"
+        
+        if user_id is not None:
+            filters.append("h.user_id = ?")
+            params.append(user_id)
+        
+        if source is not None:
+            filters.append("h.source = ?")
+            params.append(source)
+        
+        window_sql += " WHERE " + " AND ".join(filters)
+        window_sql += " ORDER BY chat_history_fts.rowid DESC LIMIT ?"
+        params.append(self.SEARCH_WINDOW)
+        
+        ranked_sql = f"SELECT id, score FROM ({window_sql}) ORDER BY score, id DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        
+        with self._get_connection() as conn:
+            ranked = conn.execute(ranked_sql, params).fetchall()
+            
+            if not ranked:
+                return []
+            
+            # 2) Lignes complètes et extraits uniquement pour la page retournée.
+            #    Un seul parcours borné par BETWEEN : "+rowid IN" n'est pas
+            #    transmis à FTS5 (qui relancerait la requête pour chaque id)
+            scores = {row['id']: row['score'] for row in ranked}
+            placeholders = ", ".join("?" * len(scores))
+            rows = conn.execute(f"""
+                SELECT h.id, h.user_id, h.source, h.user_input, h.bot_response,
+                       h.emotion, h.timestamp,
+                       snippet(chat_history_fts, -1, '[', ']', '…', 12) AS snippet
+                FROM chat_history_fts
+                JOIN chat_history h ON h.id = chat_history_fts.rowid
+                WHERE chat_history_fts MATCH ?
+                  AND chat_history_fts.rowid BETWEEN ? AND ?
+                  AND +chat_history_fts.rowid IN ({placeholders})
+            """, [match_query, min(scores), max(scores), *scores]).fetchall()
+        
+        by_id = {row['id']: {**dict(row), 'score': scores[row['id']]} for row in rows}
+        results = [by_id[row['id']] for row in ranked if row['id'] in by_id]
+        
+        logger.debug(f"🔎 Recherche '{query[:30]}' : {len(results)} résultat(s)")
+        
+        return results
+    
     def save_interaction(
         self,
         user_id: str,
@@ -116,15 +1035,48 @@ class ConversationMemory:
             emotion: Émotion détectée (optionnel)
         
         Returns:
-            ID de l'interaction sauvegardée
+            ID de l'interaction sauvegardée (0 en mode write-behind :
+            l'ID n'est attribué qu'à l'écriture du lot)
         """
+        # Même format que CURRENT_TIMESTAMP (UTC) pour un tri cohérent
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        
+        self.history_cache.append(user_id, source, {
+            'user_input': user_input,
+            'bot_response': bot_response,
+            'emotion': emotion,
+            'timestamp': timestamp
+        })
+        
+        if self.write_behind:
+            if self.pending_count >= self.max_pending:
+                # File pleine (base lente ou en erreur) : l'appelant écrit la
+                # file lui-même, dans l'ordre, et reçoit l'erreur éventuelle
+                self.sync_flushes += 1
+                self.flush()
+            
+            with self._pending_cond:
+                self._pending.append(
+                    (user_id, source, user_input, bot_response, emotion, timestamp)
+                )
+                if len(self._pending) >= self.flush_batch_size:
+                    self._pending_cond.notify()
+            
+            logger.debug(
+                f"📥 Interaction mise en file : "
+                f"user={user_id[:8]}..., source={source}, emotion={emotion}"
+            )
+            
+            return 0
+        
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
-                INSERT INTO chat_history (user_id, source, user_input, bot_response, emotion)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, source, user_input, bot_response, emotion))
+                INSERT INTO chat_history
+                    (user_id, source, user_input, bot_response, emotion, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (user_id, source, user_input, bot_response, emotion, timestamp))
             
             interaction_id = cursor.lastrowid
             
@@ -144,6 +1096,9 @@ class ConversationMemory:
         """
         Récupère l'historique des conversations d'un utilisateur
         
+        Servi depuis le cache LRU quand il contient assez d'interactions.
+        En mode write-behind, les interactions encore en file sont incluses.
+        
         Args:
             user_id: ID utilisateur
             limit: Nombre maximum d'interactions à récupérer
@@ -152,6 +1107,38 @@ class ConversationMemory:
         Returns:
             Liste d'interactions (du plus ancien au plus récent)
         """
+        history = self.history_cache.get(user_id, source, limit)
+        
+        if history is not None:
+            logger.debug(f"📖 Historique (cache) : {len(history)} interactions pour {user_id[:8]}...")
+            return history
+        
+        generation = self.history_cache.generation
+        
+        if self.write_behind:
+            # Verrou de flush : une ligne est soit en base, soit en file
+            with self._flush_lock:
+                history = self._query_history(user_id, limit, source)
+                pending = self._get_pending(user_id, source)
+            
+            if pending:
+                history = (history + pending)[-limit:]
+        else:
+            history = self._query_history(user_id, limit, source)
+        
+        self.history_cache.populate(user_id, source, history, limit, generation)
+        
+        logger.debug(f"📖 Historique récupéré : {len(history)} interactions pour {user_id[:8]}...")
+        
+        return history
+    
+    def _query_history(
+        self,
+        user_id: str,
+        limit: int,
+        source: Optional[str]
+    ) -> List[Dict]:
+        """Lit l'historique d'un utilisateur en base (du plus ancien au plus récent)"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -160,7 +1147,7 @@ class ConversationMemory:
                     SELECT user_input, bot_response, emotion, timestamp
                     FROM chat_history
                     WHERE user_id = ? AND source = ?
-                    ORDER BY timestamp DESC
+                    ORDER BY timestamp DESC, id DESC
                     LIMIT ?
                 """, (user_id, source, limit))
             else:
@@ -168,14 +1155,14 @@ class ConversationMemory:
                     SELECT user_input, bot_response, emotion, timestamp
                     FROM chat_history
                     WHERE user_id = ?
-                    ORDER BY timestamp DESC
+                    ORDER BY timestamp DESC, id DESC
                     LIMIT ?
                 """, (user_id, limit))
             
             rows = cursor.fetchall()
             
             # Convertir en liste de dictionnaires (du plus ancien au plus récent)
-            history = [
+            return [
                 {
                     'user_input': row['user_input'],
                     'bot_response': row['bot_response'],
@@ -184,10 +1171,69 @@ class ConversationMemory:
                 }
                 for row in reversed(rows)  # Inverser pour avoir chronologique
             ]
+    
+    def iter_responses(self, chunk_size: int = 1000) -> Iterator[List[Tuple[int, str, Optional[str]]]]:
+        """
+        Parcourt toutes les réponses du bot par tranches (ex : re-scorer les émotions)
+        
+        Pagination par id (index de la clé primaire) : une seule tranche en
+        mémoire à la fois, pas de transaction longue entre deux tranches.
+        
+        Args:
+            chunk_size: Nombre de lignes par tranche
+        
+        Yields:
+            Listes de tuples (id, bot_response, emotion), par id croissant
+        """
+        self.flush()
+        last_id = 0
+        
+        while True:
+            with self._get_connection() as conn:
+                rows = conn.execute("""
+                    SELECT id, bot_response, emotion
+                    FROM chat_history
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, chunk_size)).fetchall()
             
-            logger.debug(f"📖 Historique récupéré : {len(history)} interactions pour {user_id[:8]}...")
+            if not rows:
+                return
             
-            return history
+            last_id = rows[-1]['id']
+            yield [(row['id'], row['bot_response'], row['emotion']) for row in rows]
+    
+    def update_emotions(self, updates: Sequence[Tuple[int, Optional[str]]]) -> int:
+        """
+        Met à jour la colonne emotion de plusieurs interactions en une transaction
+        
+        Les compteurs de statistiques suivent via le trigger de mise à jour.
+        
+        Args:
+            updates: Tuples (id, nouvelle émotion)
+        
+        Returns:
+            Nombre d'interactions modifiées
+        """
+        if not updates:
+            return 0
+        
+        with self._get_connection() as conn:
+            cursor = conn.executemany("""
+                UPDATE chat_history
+                SET emotion = ?
+                WHERE id = ? AND emotion IS NOT ?
+            """, [(emotion, row_id, emotion) for row_id, emotion in updates])
+            updated_count = cursor.rowcount
+        
+        # Les échanges en cache portent l'ancienne émotion
+        if updated_count:
+            self.history_cache.clear()
+        
+        logger.debug(f"🎭 Émotions mises à jour : {updated_count} interaction(s)")
+        
+        return updated_count
     
     def clear_user_history(self, user_id: str, source: Optional[str] = None) -> int:
         """
@@ -200,7 +1246,8 @@ class ConversationMemory:
         Returns:
             Nombre d'interactions supprimées
         """
-        with self._get_connection() as conn:
+        with self._flush_lock, self._get_connection() as conn:
+            self.flush()
             cursor = conn.cursor()
             
             if source:
@@ -216,6 +1263,8 @@ class ConversationMemory:
             
             deleted_count = cursor.rowcount
             
+            self.history_cache.invalidate_user(user_id, source)
+            
             logger.info(
                 f"🗑️ Historique effacé : {deleted_count} interactions "
                 f"pour {user_id[:8]}... (source={source or 'all'})"
@@ -232,12 +1281,15 @@ class ConversationMemory:
         Returns:
             Nombre total d'interactions supprimées
         """
-        with self._get_connection() as conn:
+        with self._flush_lock, self._get_connection() as conn:
+            self.flush()
             cursor = conn.cursor()
             
             cursor.execute("DELETE FROM chat_history")
             deleted_count = cursor.rowcount
             
+            self.history_cache.clear()
+            
             logger.warning(
                 f"⚠️ TOUT l'historique effacé : {deleted_count} interactions supprimées"
             )
@@ -248,39 +1300,41 @@ class ConversationMemory:
         """
         Récupère des statistiques sur la base de données
         
+        Lit les compteurs matérialisés (O(1), indépendant du nombre
+        d'interactions) au lieu d'agréger chat_history.
+        
         Returns:
             Dictionnaire avec statistiques globales
         """
+        self.flush()
+        
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
-            # Nombre total d'interactions
-            cursor.execute("SELECT COUNT(*) FROM chat_history")
-            total_interactions = cursor.fetchone()[0]
+            cursor.execute("SELECT scope, key, count FROM chat_stats_global")
+            counters = cursor.fetchall()
             
-            # Nombre d'utilisateurs uniques
-            cursor.execute("SELECT COUNT(DISTINCT user_id) FROM chat_history")
-            unique_users = cursor.fetchone()[0]
+            totals = {
+                row['scope']: row['count']
+                for row in counters if row['scope'] in ('total', 'users')
+            }
+            total_interactions = totals.get('total', 0)
+            unique_users = totals.get('users', 0)
             
             # Répartition par source
-            cursor.execute("""
-                SELECT source, COUNT(*) as count
-                FROM chat_history
-                GROUP BY source
-            """)
-            by_source = {row['source']: row['count'] for row in cursor.fetchall()}
+            by_source = {
+                row['key']: row['count']
+                for row in counters if row['scope'] == 'source'
+            }
             
-            # Répartition par émotion
-            cursor.execute("""
-                SELECT emotion, COUNT(*) as count
-                FROM chat_history
-                WHERE emotion IS NOT NULL
-                GROUP BY emotion
-                ORDER BY count DESC
-            """)
-            by_emotion = {row['emotion']: row['count'] for row in cursor.fetchall()}
+            # Répartition par émotion (décroissante)
+            by_emotion = dict(sorted(
+                ((row['key'], row['count']) for row in counters if row['scope'] == 'emotion'),
+                key=lambda item: item[1],
+                reverse=True
+            ))
             
-            # Interaction la plus récente
+            # Interaction la plus récente (index idx_timestamp)
             cursor.execute("""
                 SELECT timestamp
                 FROM chat_history
@@ -296,10 +1350,20 @@ class ConversationMemory:
                 'by_source': by_source,
                 'by_emotion': by_emotion,
                 'last_interaction': last_timestamp,
-                'database_path': self.db_path
+                'database_path': self.db_path,
+                'connection_pool': self.pool.get_stats(),
+                'history_cache': self.history_cache.get_stats(),
+                'write_behind': {
+                    'enabled': self.write_behind,
+                    'pending': self.pending_count,
+                    'flush_count': self.flush_count,
+                    'flushed_rows': self.flushed_rows,
+                    'flush_errors': self.flush_errors,
+                    'sync_flushes': self.sync_flushes
+                }
             }
             
-            logger.info(
+            logger.debug(
                 f"📊 Stats : {total_interactions} interactions, "
                 f"{unique_users} utilisateurs"
             )
@@ -316,34 +1380,35 @@ class ConversationMemory:
         Returns:
             Dictionnaire avec statistiques utilisateur
         """
+        self.flush()
+        
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
-            # Nombre total d'interactions
             cursor.execute("""
-                SELECT COUNT(*) FROM chat_history WHERE user_id = ?
+                SELECT scope, key, count
+                FROM chat_stats_user
+                WHERE user_id = ?
             """, (user_id,))
-            total = cursor.fetchone()[0]
+            counters = cursor.fetchall()
+            
+            # Nombre total d'interactions
+            total = next(
+                (row['count'] for row in counters if row['scope'] == 'total'), 0
+            )
             
             # Par source
-            cursor.execute("""
-                SELECT source, COUNT(*) as count
-                FROM chat_history
-                WHERE user_id = ?
-                GROUP BY source
-            """, (user_id,))
-            by_source = {row['source']: row['count'] for row in cursor.fetchall()}
+            by_source = {
+                row['key']: row['count']
+                for row in counters if row['scope'] == 'source'
+            }
             
             # Émotions les plus fréquentes
-            cursor.execute("""
-                SELECT emotion, COUNT(*) as count
-                FROM chat_history
-                WHERE user_id = ? AND emotion IS NOT NULL
-                GROUP BY emotion
-                ORDER BY count DESC
-                LIMIT 5
-            """, (user_id,))
-            top_emotions = [(row['emotion'], row['count']) for row in cursor.fetchall()]
+            top_emotions = sorted(
+                ((row['key'], row['count']) for row in counters if row['scope'] == 'emotion'),
+                key=lambda item: item[1],
+                reverse=True
+            )[:5]
             
             return {
                 'user_id': user_id,
@@ -356,12 +1421,18 @@ class ConversationMemory:
 # Instance globale (sera créée dans config.py)
 _memory_instance = None
 
-def get_memory(db_path: str = "data/chat_history.db") -> ConversationMemory:
+def get_memory(
+    db_path: str = "data/chat_history.db",
+    write_behind: bool = False,
+    history_cache_size: int = 10
+) -> ConversationMemory:
     """
     Récupère l'instance globale de ConversationMemory (singleton)
     
     Args:
         db_path: Chemin vers la base SQLite
+        write_behind: Active l'écriture différée (uniquement à la création)
+        history_cache_size: Profondeur du cache d'historique (uniquement à la création)
     
     Returns:
         Instance ConversationMemory
@@ -369,11 +1440,28 @@ def get_memory(db_path: str = "data/chat_history.db") -> ConversationMemory:
     global _memory_instance
     
     if _memory_instance is None:
-        _memory_instance = ConversationMemory(db_path)
+        _memory_instance = ConversationMemory(
+            db_path,
+            write_behind=write_behind,
+            history_cache_size=history_cache_size
+        )
     
     return _memory_instance
 
 
+def close_memory():
+    """
+    Ferme l'instance globale de ConversationMemory (à appeler à l'arrêt)
+    
+    Écrit les interactions encore en file (write-behind) avant fermeture.
+    """
+    global _memory_instance
+    
+    if _memory_instance is not None:
+        _memory_instance.close()
+        _memory_instance = None
+
+
 # Pour tests et usage direct
 if __name__ == "__main__":
     # Test rapide du système de mémoire
@@ -5,36 +5,200 @@ Gestion du modèle LLM (Zephyr-7B) avec :
 - Chargement modèle avec llama-cpp-python
 - Détection GPU NVIDIA avec pynvml
 - Application profils GPU adaptatifs
-- Génération texte avec contexte
+- Génération texte avec contexte (complète ou en streaming)
+- Comptage de tokens avec le tokenizer du modèle
+- Réutilisation du KV cache (préfixe system prompt / conversation)
 - Gestion erreurs (OOM, modèle introuvable)
 """
 
 import os
-from typing import Optional, Dict, List, Any
+import gc
+import sys
+import glob
+import hashlib
+import importlib.util
+import mmap
+import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from typing import (
+    TYPE_CHECKING, Optional, Dict, List, Any, Callable, Hashable, Iterator, Sequence, Tuple
+)
 import logging
 from dataclasses import dataclass
 
-# Import llama-cpp-python
-try:
-    from llama_cpp import Llama
-    LLAMA_CPP_AVAILABLE = True
-except ImportError:
-    LLAMA_CPP_AVAILABLE = False
-    Llama = None
-
-# Import pynvml (GPU monitoring)
-try:
-    import pynvml
-    PYNVML_AVAILABLE = True
-except ImportError:
-    PYNVML_AVAILABLE = False
-    pynvml = None
+# llama-cpp-python et pynvml importés au premier usage : llama_cpp charge
+# les bibliothèques CUDA (plusieurs centaines de ms), inutiles au démarrage
+LLAMA_CPP_AVAILABLE = importlib.util.find_spec("llama_cpp") is not None
+Llama: Any = None
 
+# pynvml (GPU monitoring)
+PYNVML_AVAILABLE = importlib.util.find_spec("pynvml") is not None
+pynvml: Any = None
+
+if TYPE_CHECKING:
+    # Type du modèle chargé (la classe elle-même est importée au premier usage)
+    from llama_cpp import Llama as LlamaModel
+
+from . import auto_profile
+from .batching import BatchEngine, LlamaBatchBackend
 from .config import AIConfig, get_config
 
 logger = logging.getLogger(__name__)
 
 
+def _import_llama():
+    """Importe llama-cpp-python (premier chargement de modèle)"""
+    global Llama
+    
+    if Llama is None:
+        from llama_cpp import Llama as llama_class
+        Llama = llama_class
+    
+    return Llama
+
+
+def _import_pynvml():
+    """Importe pynvml (première interrogation du GPU)"""
+    global pynvml
+    
+    if pynvml is None:
+        import pynvml as nvml
+        pynvml = nvml
+    
+    return pynvml
+
+
+def _import_llama_internals():
+    """
+    Objets bas niveau de llama-cpp-python (contexte, batch) pour la veille
+    
+    Returns:
+        Module llama_cpp._internals, ou None si la version installée ne
+        l'expose pas (veille indisponible)
+    """
+    try:
+        return importlib.import_module("llama_cpp._internals")
+    except ImportError:
+        return None
+
+
+def _prefetch_file(path: str) -> bool:
+    """
+    Demande à l'OS de lire un fichier à l'avance (cache de pages)
+    
+    Le GGUF est ensuite mappé par llama.cpp (use_mmap) : les pages déjà en
+    cache ne coûtent plus de lecture disque, et restent en cache après un
+    déchargement (rechargement à chaud). Non bloquant : la lecture se fait
+    en arrière-plan côté noyau.
+    
+    Args:
+        path: Fichier à pré-charger
+    
+    Returns:
+        True si l'indication a été transmise (posix_fadvise ou madvise)
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as e:
+        logger.debug(f"Pré-chargement impossible ({path}) : {e}")
+        return False
+    
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            return True
+        
+        size = os.fstat(fd).st_size
+        if hasattr(mmap, "MADV_WILLNEED") and size > 0:
+            with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mapping:
+                mapping.madvise(mmap.MADV_WILLNEED)
+            return True
+        
+        # Windows : llama.cpp appelle lui-même PrefetchVirtualMemory (use_mmap)
+        return False
+        
+    except (OSError, ValueError) as e:
+        logger.debug(f"Pré-chargement impossible ({path}) : {e}")
+        return False
+    finally:
+        os.close(fd)
+
+
+def _elapsed_ms(start: float, end: float) -> float:
+    """Durée en millisecondes (arrondie au dixième)"""
+    return round((end - start) * 1000, 1)
+
+
+# Un seul chargement à la fois peut brancher le callback de progression
+_PROGRESS_HOOK_LOCK = threading.Lock()
+
+
+class ModelLoadCancelled(RuntimeError):
+    """Chargement du modèle annulé (cancel_event positionné)"""
+
+
+@contextmanager
+def _llama_load_progress(on_progress: Callable[[float], bool]):
+    """
+    Branche un callback de progression sur le chargement llama.cpp
+    
+    Llama() n'expose pas le progress_callback de llama.cpp : les paramètres
+    par défaut du modèle sont enveloppés le temps du chargement. Le callback
+    reçoit la progression (0.0 → 1.0) et renvoie False pour interrompre le
+    chargement (llama.cpp libère alors ce qu'il a déjà alloué).
+    
+    Yields:
+        True si la progression native est branchée (sinon aucun appel)
+    """
+    lib: Any = sys.modules.get("llama_cpp.llama_cpp")
+    original = getattr(lib, "llama_model_default_params", None)
+    
+    if original is None or not hasattr(lib, "llama_progress_callback"):
+        yield False
+        return
+    
+    def progress(value, _user_data):
+        try:
+            return bool(on_progress(float(value)))
+        except Exception as e:
+            # Une exception ne doit jamais remonter dans le code C
+            logger.debug(f"Callback de progression en erreur : {e}")
+            return True
+    
+    # Référence conservée pendant tout le chargement (appelé depuis le C)
+    c_progress = lib.llama_progress_callback(progress)
+    
+    def default_params():
+        params = original()
+        params.progress_callback = c_progress
+        return params
+    
+    with _PROGRESS_HOOK_LOCK:
+        lib.llama_model_default_params = default_params
+        try:
+            yield True
+        finally:
+            lib.llama_model_default_params = original
+
+
+# Dossier des slots KV déplacés sur disque (AIConfig.prefix_cache_disk_mb > 0)
+KV_SLOTS_DIR = "data/kv_slots"
+
+# Calibration du profil "auto" : prompt et tokens générés par candidat
+AUTO_CALIBRATION_PROMPT = (
+    "Tu es Kira, un assistant virtuel amical.\n"
+    "Utilisateur : Raconte-moi ta journée en quelques phrases.\n"
+    "Kira :"
+)
+AUTO_CALIBRATION_TOKENS = 48
+# Part de la progression du chargement occupée par la calibration (un modèle chargé par candidat)
+AUTO_CALIBRATION_PROGRESS = 0.8
+
+
 @dataclass
 class GPUInfo:
     """Informations sur le GPU NVIDIA"""
@@ -47,15 +211,263 @@ class GPUInfo:
     cuda_version: Optional[str] = None
 
 
+def _common_prefix_length(a: Sequence[int], b: Sequence[int]) -> int:
+    """Longueur du plus long préfixe commun de deux séquences de tokens"""
+    length = 0
+    for token_a, token_b in zip(a, b):
+        if token_a != token_b:
+            break
+        length += 1
+    return length
+
+
+class PrefixCache:
+    """
+    Cache d'états llama.cpp (KV cache) indexés par préfixe de tokens
+    
+    - Un état permanent pour le préfixe commun (system prompt)
+    - Un slot par conversation (clé, ex: (user_id, source)), LRU borné en
+      taille (bytes)
+    - Optionnel : les slots évincés de la RAM sont déplacés sur disque
+      (eux aussi en LRU borné) et rechargés au tour suivant
+    
+    Restaurer l'état qui partage le plus long préfixe avec un nouveau prompt
+    évite de réévaluer ce préfixe : seul le suffixe est calculé.
+    """
+    
+    SLOT_SUFFIX = ".slot"
+    
+    def __init__(
+        self,
+        max_bytes: int = 512 * 1024 * 1024,
+        spill_dir: Optional[str] = None,
+        spill_max_bytes: int = 0
+    ):
+        """
+        Initialise le cache
+        
+        Args:
+            max_bytes: Taille max des slots en RAM (0 = désactivé)
+            spill_dir: Dossier des slots déplacés sur disque (None = désactivé)
+            spill_max_bytes: Taille max des slots sur disque
+        """
+        self.max_bytes = max_bytes
+        self._system: Optional[Tuple[Tuple[int, ...], Any]] = None
+        self._states: OrderedDict = OrderedDict()
+        self._total_bytes = 0
+        self.evictions = 0
+        
+        self.spill_dir = spill_dir if spill_max_bytes > 0 else None
+        self.spill_max_bytes = spill_max_bytes
+        self._spilled: OrderedDict = OrderedDict()  # clé -> (chemin, taille)
+        self._spilled_bytes = 0
+        self.spill_loads = 0
+        
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            # Slots d'une session précédente : index perdu, modèle peut-être différent
+            for path in glob.glob(os.path.join(self.spill_dir, f"*{self.SLOT_SUFFIX}")):
+                self._remove_file(path)
+    
+    @staticmethod
+    def _state_size(state: Any) -> int:
+        """Taille d'un état llama.cpp en bytes (KV cache, logits et tokens)"""
+        size = getattr(state, "llama_state_size", 0) or 0
+        
+        # LlamaState garde aussi les logits (scores : n_batch x n_vocab float32,
+        # souvent plus gros que le KV cache) et les tokens évalués (input_ids)
+        for name in ("scores", "input_ids"):
+            nbytes = getattr(getattr(state, name, None), "nbytes", 0)
+            if isinstance(nbytes, int):
+                size += nbytes
+        
+        return size
+    
+    @property
+    def system_tokens(self) -> Optional[Tuple[int, ...]]:
+        """Tokens du préfixe system prompt en cache (None si absent)"""
+        return self._system[0] if self._system else None
+    
+    def set_system(self, tokens: Sequence[int], state: Any):
+        """Mémorise l'état du préfixe system prompt"""
+        self._system = (tuple(tokens), state)
+    
+    def put(self, key: Hashable, tokens: Sequence[int], state: Any):
+        """
+        Mémorise l'état de fin de génération d'une conversation
+        
+        Args:
+            key: Clé de conversation (ex: ("1234", "discord"))
+            tokens: Tokens évalués dans l'état
+            state: État llama.cpp (Llama.save_state())
+        """
+        size = self._state_size(state)
+        
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            return
+        
+        self.discard(key)
+        
+        self._states[key] = (tuple(tokens), state, size)
+        self._total_bytes += size
+        
+        while self._total_bytes > self.max_bytes:
+            evicted_key, (evicted_tokens, evicted_state, evicted_size) = (
+                self._states.popitem(last=False)
+            )
+            self._total_bytes -= evicted_size
+            self.evictions += 1
+            
+            if self.spill_dir:
+                self._spill(evicted_key, evicted_tokens, evicted_state, evicted_size)
+    
+    def discard(self, key: Hashable):
+        """Supprime le slot d'une conversation (RAM et disque)"""
+        if key in self._states:
+            self._total_bytes -= self._states.pop(key)[2]
+        
+        if key in self._spilled:
+            path, size = self._spilled.pop(key)
+            self._spilled_bytes -= size
+            self._remove_file(path)
+    
+    def _slot_path(self, key: Hashable) -> str:
+        """Chemin du fichier d'un slot sur disque"""
+        if self.spill_dir is None:
+            raise ValueError("Débordement des slots sur disque désactivé")
+        
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}{self.SLOT_SUFFIX}")
+    
+    @staticmethod
+    def _remove_file(path: str):
+        """Supprime un fichier de slot (ignore les erreurs)"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def _spill(self, key: Hashable, tokens: Tuple[int, ...], state: Any, size: int):
+        """Déplace un slot évincé de la RAM vers le disque"""
+        if size > self.spill_max_bytes:
+            return
+        
+        path = self._slot_path(key)
+        
+        try:
+            with open(path, "wb") as f:
+                pickle.dump((tokens, state), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"⚠️ Échec écriture slot KV sur disque : {e}")
+            self._remove_file(path)
+            return
+        
+        self._spilled[key] = (path, size)
+        self._spilled_bytes += size
+        
+        while self._spilled_bytes > self.spill_max_bytes:
+            _, (old_path, old_size) = self._spilled.popitem(last=False)
+            self._spilled_bytes -= old_size
+            self._remove_file(old_path)
+    
+    def _load_spilled(self, key: Hashable) -> bool:
+        """
+        Recharge en RAM un slot déplacé sur disque
+        
+        Returns:
+            True si le slot a été rechargé
+        """
+        path, size = self._spilled.pop(key)
+        self._spilled_bytes -= size
+        
+        try:
+            with open(path, "rb") as f:
+                tokens, state = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Échec lecture slot KV depuis le disque : {e}")
+            return False
+        finally:
+            self._remove_file(path)
+        
+        self.spill_loads += 1
+        self.put(key, tokens, state)
+        return key in self._states
+    
+    def best_match(
+        self,
+        tokens: Sequence[int],
+        key: Optional[Hashable] = None
+    ) -> Tuple[int, Any]:
+        """
+        Trouve l'état partageant le plus long préfixe avec `tokens`
+        
+        Args:
+            tokens: Tokens du nouveau prompt
+            key: Clé de conversation (optionnel)
+        
+        Returns:
+            Tuple (longueur du préfixe commun, état) ou (0, None)
+        """
+        candidates = []
+        
+        if key is not None and key not in self._states and key in self._spilled:
+            self._load_spilled(key)
+        
+        if key is not None and key in self._states:
+            self._states.move_to_end(key)
+            candidates.append(self._states[key][:2])
+        
+        if self._system is not None:
+            candidates.append(self._system)
+        
+        best_length, best_state = 0, None
+        
+        for cached_tokens, state in candidates:
+            length = _common_prefix_length(cached_tokens, tokens)
+            if length > best_length:
+                best_length, best_state = length, state
+        
+        return best_length, best_state
+    
+    def clear(self):
+        """Vide le cache (ex: déchargement du modèle)"""
+        self._system = None
+        self._states.clear()
+        self._total_bytes = 0
+        
+        for path, _ in self._spilled.values():
+            self._remove_file(path)
+        self._spilled.clear()
+        self._spilled_bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statistiques du cache
+        
+        Returns:
+            Dictionnaire avec nombre d'états, taille et évictions
+        """
+        return {
+            'system_prefix_tokens': len(self._system[0]) if self._system else 0,
+            'conversations': len(self._states),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+            'spilled': len(self._spilled),
+            'spilled_bytes': self._spilled_bytes,
+            'spill_loads': self.spill_loads
+        }
+
+
 class ModelManager:
     """
     Gestionnaire du modèle LLM avec support GPU
     
     Gère le cycle de vie du modèle :
     - Détection GPU
-    - Chargement modèle avec profil GPU
+    - Chargement modèle avec profil GPU (poids mappés depuis le GGUF)
     - Génération texte
-    - Déchargement modèle
+    - Mise en veille (contexte libéré, poids conservés) et déchargement
     """
     
     def __init__(self, config: Optional[AIConfig] = None):
@@ -66,9 +478,38 @@ class ModelManager:
             config: Configuration IA (si None, charge depuis config.json)
         """
         self.config = config or get_config()
-        self.model: Optional[Llama] = None
+        self.model: Optional["LlamaModel"] = None
         self.is_loaded = False
         self.gpu_info: Optional[GPUInfo] = None
+        # Paramètres llama.cpp du modèle chargé (profil "auto" : calculés)
+        self.gpu_params: Optional[Dict[str, Any]] = None
+        # Profil "auto" : cache des profils calibrés et clé du profil utilisé
+        self.auto_profile_cache = auto_profile.AutoProfileCache()
+        self._auto_profile_key: Optional[str] = None
+        
+        # Veille : poids gardés dans self.model, contexte (KV cache) libéré
+        self.is_suspended = False
+        # Durées du dernier chargement (voir _record_load_stats)
+        self.load_stats: Optional[Dict[str, Any]] = None
+        
+        # Réutilisation du KV cache entre requêtes (llama.cpp n'est pas
+        # thread-safe : génération et restauration d'état sous verrou)
+        self.prefix_cache = PrefixCache(
+            max_bytes=self.config.prefix_cache_mb * 1024 * 1024,
+            spill_dir=KV_SLOTS_DIR,
+            spill_max_bytes=self.config.prefix_cache_disk_mb * 1024 * 1024
+        )
+        self._generate_lock = threading.Lock()
+        self.prefix_stats = {
+            'requests': 0,
+            'prompt_tokens': 0,
+            'prefix_hit_tokens': 0,
+            'evaluated_tokens': 0
+        }
+        self.last_prefix_stats: Optional[Dict[str, int]] = None
+        
+        # Génération par lots (AIConfig.batch_max_sequences > 1)
+        self.batch_engine: Optional[BatchEngine] = None
         
         # Vérifier disponibilité llama-cpp-python
         if not LLAMA_CPP_AVAILABLE:
@@ -95,6 +536,7 @@ class ModelManager:
             return GPUInfo(available=False)
         
         try:
+            _import_pynvml()
             pynvml.nvmlInit()
             
             # Compter les GPUs
@@ -144,24 +586,45 @@ class ModelManager:
             logger.error(f"❌ Erreur détection GPU : {e}")
             return GPUInfo(available=False)
     
-    def load_model(self, force_profile: Optional[str] = None) -> bool:
+    def load_model(
+        self,
+        force_profile: Optional[str] = None,
+        progress_callback: Optional[Callable[[float], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> bool:
         """
         Charge le modèle LLM avec le profil GPU configuré
         
+        Appelable depuis un thread de travail (GUI) : la progression est
+        remontée par llama.cpp pendant la lecture des poids, et le chargement
+        s'interrompt dès que cancel_event est positionné.
+        
+        Modèle en veille (suspend_model) : seul le contexte est recréé.
+        
         Args:
             force_profile: Force un profil spécifique (ignore config)
+            progress_callback: Appelé avec la progression (0.0 → 1.0)
+            cancel_event: Événement d'annulation du chargement
         
         Returns:
             True si chargement réussi
         
         Raises:
             FileNotFoundError: Si le modèle n'existe pas
+            ModelLoadCancelled: Si le chargement a été annulé
             RuntimeError: Si erreur de chargement (OOM, etc.)
         """
         if self.is_loaded:
             logger.warning("⚠️ Modèle déjà chargé. Utilisez unload_model() d'abord.")
             return True
         
+        if self.is_suspended:
+            same_profile = force_profile is None or force_profile == self.config.gpu_profile
+            if same_profile and self._resume_model(progress_callback, cancel_event):
+                return True
+            # Autre profil (ou reprise impossible) : rechargement complet
+            self._release_partial_model()
+        
         # Vérifier existence du modèle
         model_path = self.config.model_path
         if not os.path.exists(model_path):
@@ -177,26 +640,92 @@ class ModelManager:
             self.config.switch_profile(force_profile)
         
         profile_name = self.config.gpu_profile
-        gpu_params = self.config.get_gpu_params()
         
         logger.info(
             f"🔄 Chargement modèle : {os.path.basename(model_path)} "
             f"(profil: {profile_name})"
         )
         
+        def cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
+        
+        # Début de la plage du chargement final (après une calibration)
+        progress_start = 0.0
+        
+        def report(value: float) -> bool:
+            if progress_callback is not None:
+                progress_callback(min(max(value, 0.0), 1.0))
+            # False : llama.cpp interrompt le chargement
+            return not cancelled()
+        
+        def on_calibration_progress(value: float) -> bool:
+            nonlocal progress_start
+            progress_start = AUTO_CALIBRATION_PROGRESS
+            return report(value * AUTO_CALIBRATION_PROGRESS)
+        
+        def on_progress(value: float) -> bool:
+            return report(progress_start + value * (1.0 - progress_start))
+        
+        if profile_name == "auto":
+            gpu_params = self._resolve_auto_params(
+                model_path, gpu_info, cancelled, on_calibration_progress
+            )
+        else:
+            self._auto_profile_key = None
+            gpu_params = self.config.get_gpu_params()
+        
+        # Instants des appels de progression de llama.cpp : le premier suit
+        # le mapping du fichier, le dernier la fin de l'envoi des tenseurs
+        native_progress: List[float] = []
+        
+        def on_native_progress(value: float) -> bool:
+            native_progress.append(time.perf_counter())
+            return on_progress(value)
+        
+        if cancelled():
+            raise ModelLoadCancelled("Chargement du modèle annulé")
+        _import_llama()
+        on_progress(0.0)
+        
+        started = time.perf_counter()
+        if self.config.model_prefetch and gpu_params["use_mmap"]:
+            _prefetch_file(model_path)
+        prefetched = time.perf_counter()
+        
         try:
             # Charger modèle avec llama-cpp-python
-            self.model = Llama(
-                model_path=model_path,
-                n_gpu_layers=gpu_params["n_gpu_layers"],
-                n_ctx=gpu_params["n_ctx"],
-                n_batch=gpu_params["n_batch"],
-                n_threads=gpu_params["n_threads"],
-                use_mlock=gpu_params["use_mlock"],
-                verbose=False  # Désactiver logs verbeux
-            )
+            with _llama_load_progress(on_native_progress):
+                self.model = Llama(
+                    model_path=model_path,
+                    n_gpu_layers=gpu_params["n_gpu_layers"],
+                    n_ctx=gpu_params["n_ctx"],
+                    n_batch=gpu_params["n_batch"],
+                    n_threads=gpu_params["n_threads"],
+                    use_mlock=gpu_params["use_mlock"],
+                    use_mmap=gpu_params["use_mmap"],
+                    verbose=False  # Désactiver logs verbeux
+                )
+            constructed = time.perf_counter()
+            
+            # Annulé après la lecture des poids (création du contexte)
+            if cancelled():
+                raise ModelLoadCancelled("Chargement du modèle annulé")
             
             self.is_loaded = True
+            self.gpu_params = gpu_params
+            self._start_batch_engine(gpu_params)
+            on_progress(1.0)
+            
+            stages = {"prefetch_ms": _elapsed_ms(started, prefetched)}
+            if native_progress:
+                stages["mapping_ms"] = _elapsed_ms(prefetched, native_progress[0])
+                stages["tensors_ms"] = _elapsed_ms(native_progress[0], native_progress[-1])
+                stages["context_ms"] = _elapsed_ms(native_progress[-1], constructed)
+            else:
+                # Sans progression native : durée du constructeur Llama seule
+                stages["model_ms"] = _elapsed_ms(prefetched, constructed)
+            stages["batch_engine_ms"] = _elapsed_ms(constructed, time.perf_counter())
+            self._record_load_stats("cold", started, stages)
             
             logger.info(
                 f"✅ Modèle chargé avec succès ! "
@@ -208,6 +737,12 @@ class ModelManager:
             return True
             
         except Exception as e:
+            if cancelled():
+                self._release_partial_model()
+                logger.info("⏹️ Chargement du modèle annulé")
+                raise ModelLoadCancelled("Chargement du modèle annulé") from None
+            
+            self._release_partial_model()
             error_msg = str(e)
             
             # Détecter erreur OOM (Out Of Memory)
@@ -218,32 +753,478 @@ class ModelManager:
                     f"Essayez un profil moins gourmand (balanced ou cpu_fallback)."
                 )
                 
+                # Profil calibré devenu trop gros (VRAM occupée) : recalcul au prochain chargement
+                if self._auto_profile_key is not None:
+                    self.auto_profile_cache.discard(self._auto_profile_key)
+                
                 # Auto-fallback vers CPU si erreur OOM
                 if profile_name != "cpu_fallback":
                     logger.warning("⚠️ Tentative de fallback vers cpu_fallback...")
-                    return self.load_model(force_profile="cpu_fallback")
+                    return self.load_model(
+                        force_profile="cpu_fallback",
+                        progress_callback=progress_callback,
+                        cancel_event=cancel_event
+                    )
             
             logger.error(f"❌ Erreur chargement modèle : {error_msg}")
             raise RuntimeError(f"Échec chargement modèle : {error_msg}")
     
-    def unload_model(self):
-        """Décharge le modèle de la mémoire"""
-        if not self.is_loaded:
+    def _resolve_auto_params(
+        self,
+        model_path: str,
+        gpu_info: GPUInfo,
+        cancelled: Callable[[], bool],
+        on_progress: Optional[Callable[[float], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Paramètres du profil "auto" pour cette machine et ce modèle
+        
+        Profil calibré en cache, sinon calcul depuis la VRAM libre, les cœurs
+        physiques et les métadonnées GGUF, puis calibration (débit mesuré)
+        si AIConfig.auto_profile_calibrate.
+        
+        Args:
+            model_path: Chemin du modèle GGUF
+            gpu_info: GPU détecté (detect_gpu)
+            cancelled: Indique si le chargement a été annulé
+            on_progress: Progression de la calibration (0.0 → 1.0, une part
+                égale par candidat) ; renvoie False pour l'interrompre
+        
+        Returns:
+            Paramètres au format AIConfig.get_gpu_params()
+        
+        Raises:
+            ModelLoadCancelled: Si annulé pendant la calibration
+        """
+        try:
+            gguf = auto_profile.read_gguf_metadata(model_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Métadonnées GGUF illisibles ({e}), profil 'auto' = valeurs de repli")
+            self._auto_profile_key = None
+            return self.config.get_gpu_params()
+        
+        cores = auto_profile.physical_cores()
+        vram_free = gpu_info.vram_free if gpu_info.available else None
+        key = auto_profile.AutoProfileCache.key(
+            auto_profile.machine_fingerprint(
+                gpu_info.name if gpu_info.available else None,
+                gpu_info.vram_total if gpu_info.available else None,
+                cores
+            ),
+            auto_profile.model_fingerprint(model_path)
+        )
+        self._auto_profile_key = key
+        
+        cached = self.auto_profile_cache.get(key)
+        if cached is not None:
+            logger.info(
+                f"🎯 Profil auto en cache : {cached['tokens_per_second']} tokens/s "
+                f"({self._describe_params(cached['params'])})"
+            )
+            return dict(cached["params"])
+        
+        params = auto_profile.compute_auto_params(gguf, vram_free, cores)
+        logger.info(
+            f"🧮 Profil auto calculé ({gguf.n_layers} couches, {gguf.quantization}, "
+            f"{cores} cœurs) : {self._describe_params(params)}"
+        )
+        
+        if not self.config.auto_profile_calibrate:
+            return params
+        
+        # Part de la progression du candidat en cours : [index/total, (index+1)/total]
+        current = [0, 1]
+        
+        def on_candidate(index: int, total: int):
+            current[:] = [index, total]
+            logger.info(f"🧪 Calibration : candidat {index + 1}/{total}")
+        
+        def on_load_progress(value: float) -> bool:
+            index, total = current
+            if on_progress is not None and not on_progress((index + value) / total):
+                return False
+            return not cancelled()
+        
+        _import_llama()
+        best = auto_profile.calibrate(
+            auto_profile.candidate_params(params, cores),
+            lambda candidate: self._measure_throughput(model_path, candidate, on_load_progress),
+            should_stop=cancelled,
+            on_candidate=on_candidate
+        )
+        if cancelled():
+            raise ModelLoadCancelled("Chargement du modèle annulé")
+        if best is None:
+            logger.warning("⚠️ Calibration sans résultat, paramètres calculés conservés")
+            return params
+        
+        self.auto_profile_cache.put(key, {
+            "params": best["params"],
+            "tokens_per_second": best["tokens_per_second"],
+            "results": best["results"],
+            "model": os.path.basename(model_path),
+            "calibrated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        })
+        logger.info(
+            f"🏁 Profil auto calibré : {best['tokens_per_second']} tokens/s "
+            f"({self._describe_params(best['params'])})"
+        )
+        return dict(best["params"])
+    
+    @staticmethod
+    def _describe_params(params: Dict[str, Any]) -> str:
+        return (
+            f"layers={params['n_gpu_layers']}, ctx={params['n_ctx']}, "
+            f"batch={params['n_batch']}, threads={params['n_threads']}"
+        )
+    
+    def _measure_throughput(
+        self,
+        model_path: str,
+        params: Dict[str, Any],
+        on_progress: Optional[Callable[[float], bool]] = None
+    ) -> float:
+        """
+        Débit d'une configuration : modèle chargé, courte génération, libéré
+        
+        Le temps compté inclut l'évaluation du prompt (n_batch, threads) et
+        la génération : c'est ce que l'utilisateur attend à chaque réponse.
+        
+        Args:
+            model_path: Chemin du modèle GGUF
+            params: Paramètres llama.cpp du candidat
+            on_progress: Progression du chargement du candidat (0.0 → 1.0) ;
+                renvoie False pour interrompre llama.cpp
+        
+        Returns:
+            Tokens générés par seconde
+        
+        Raises:
+            ModelLoadCancelled: Si on_progress a interrompu le chargement
+        """
+        interrupted = [False]
+        
+        def on_load_progress(value: float) -> bool:
+            if on_progress is None or on_progress(value):
+                return True
+            interrupted[0] = True
+            return False
+        
+        try:
+            with _llama_load_progress(on_load_progress):
+                model = Llama(model_path=model_path, verbose=False, **params)
+        except Exception:
+            if interrupted[0]:
+                raise ModelLoadCancelled("Chargement du modèle annulé") from None
+            raise
+        if interrupted[0]:
+            # Interrompu après la lecture des poids (création du contexte)
+            close = getattr(model, "close", None)
+            if close is not None:
+                close()
+            raise ModelLoadCancelled("Chargement du modèle annulé")
+        
+        try:
+            started = time.perf_counter()
+            result = model.create_completion(
+                AUTO_CALIBRATION_PROMPT,
+                max_tokens=AUTO_CALIBRATION_TOKENS,
+                temperature=0.0
+            )
+            elapsed = time.perf_counter() - started
+            tokens = result["usage"]["completion_tokens"]
+        finally:
+            close = getattr(model, "close", None)
+            if close is not None:
+                close()
+            del model
+            gc.collect()
+        
+        return tokens / elapsed if elapsed > 0 else 0.0
+    
+    def _record_load_stats(self, mode: str, started: float, stages: Dict[str, float]):
+        """
+        Conserve et journalise les durées d'un chargement
+        
+        Args:
+            mode: "cold" (chargement complet) ou "resume" (sortie de veille)
+            started: Début du chargement (time.perf_counter())
+            stages: Durées par étape (ms) : prefetch, mapping (ouverture et
+                mapping du GGUF), tensors (lecture/envoi des poids), context
+                (KV cache et buffers de calcul), batch_engine
+        """
+        self.load_stats = {
+            "mode": mode,
+            "total_ms": _elapsed_ms(started, time.perf_counter()),
+            **stages
+        }
+        
+        details = ", ".join(
+            f"{name[:-3]} {value:.0f} ms" for name, value in stages.items()
+        )
+        logger.info(
+            f"⏱️ Chargement ({mode}) en {self.load_stats['total_ms']:.0f} ms : {details}"
+        )
+    
+    def _release_partial_model(self):
+        """Libère un chargement interrompu (modèle, moteur de batch, mémoire)"""
+        if self.batch_engine is not None:
+            self.batch_engine.close()
+            self.batch_engine = None
+        
+        self.model = None
+        self.gpu_params = None
+        self.is_loaded = False
+        self.is_suspended = False
+        
+        # Llama à moitié construit (poids chargés, contexte en échec) :
+        # ses buffers natifs sont libérés à la collecte
+        gc.collect()
+    
+    def unload_model(self, keep_weights: Optional[bool] = None):
+        """
+        Décharge le modèle de la mémoire
+        
+        Args:
+            keep_weights: Mise en veille seulement (voir suspend_model) ;
+                None = AIConfig.suspend_on_unload
+        """
+        if keep_weights is None:
+            keep_weights = self.config.suspend_on_unload
+        
+        if keep_weights and self.is_loaded and self.suspend_model():
+            return
+        
+        if not self.is_loaded and not self.is_suspended:
             logger.warning("⚠️ Aucun modèle chargé")
             return
         
+        if self.batch_engine is not None:
+            self.batch_engine.close()
+            self.batch_engine = None
+        
         self.model = None
+        self.gpu_params = None
         self.is_loaded = False
+        self.is_suspended = False
+        self.prefix_cache.clear()
         
         logger.info("✅ Modèle déchargé")
     
+    @property
+    def _llama(self) -> "LlamaModel":
+        """Modèle llama.cpp chargé (ou en veille)
+        
+        Raises:
+            RuntimeError: Si aucun modèle n'est chargé
+        """
+        if self.model is None:
+            raise RuntimeError("Aucun modèle chargé")
+        return self.model
+    
+    def _context_parts(self):
+        """
+        Contexte et batch llama.cpp du modèle chargé, si la veille est possible
+        
+        Returns:
+            (contexte, batch) ou None si la version de llama-cpp-python
+            n'expose pas ces objets
+        """
+        ctx = getattr(self.model, "_ctx", None)
+        batch = getattr(self.model, "_batch", None)
+        
+        if (
+            ctx is None or batch is None
+            or not hasattr(ctx, "close") or not hasattr(batch, "close")
+            or not hasattr(self.model, "context_params")
+            or _import_llama_internals() is None
+        ):
+            return None
+        
+        return ctx, batch
+    
+    def suspend_model(self) -> bool:
+        """
+        Met le modèle en veille : libère KV cache et buffers de calcul
+        
+        Les poids restent chargés (mappés depuis le GGUF, couches GPU en
+        VRAM) : load_model() recrée seulement le contexte, en quelques
+        secondes au lieu d'un chargement complet.
+        
+        Returns:
+            True si mis en veille, False sinon (modèle toujours chargé)
+        """
+        if not self.is_loaded:
+            logger.warning("⚠️ Aucun modèle chargé")
+            return False
+        
+        parts = self._context_parts()
+        if parts is None:
+            logger.warning(
+                "⚠️ Veille non supportée par cette version de llama-cpp-python"
+            )
+            return False
+        
+        if self.batch_engine is not None:
+            self.batch_engine.close()
+            self.batch_engine = None
+        
+        # Aucune génération en cours pendant la libération du contexte
+        with self._generate_lock:
+            ctx, batch = parts
+            batch.close()
+            ctx.close()
+            self._llama._ctx = None
+            self._llama._batch = None
+            self._llama.n_tokens = 0
+            
+            self.is_loaded = False
+            self.is_suspended = True
+            # États KV sauvegardés : mémoire libérée avec le contexte
+            self.prefix_cache.clear()
+        
+        gc.collect()
+        logger.info("💤 Modèle en veille (poids conservés, contexte libéré)")
+        return True
+    
+    def _resume_model(
+        self,
+        progress_callback: Optional[Callable[[float], None]],
+        cancel_event: Optional[threading.Event]
+    ) -> bool:
+        """
+        Sort de veille : recrée contexte et batch sur les poids conservés
+        
+        Args:
+            progress_callback: Appelé avec la progression (0.0 → 1.0)
+            cancel_event: Événement d'annulation du chargement
+        
+        Returns:
+            True si repris, False si un rechargement complet est nécessaire
+        
+        Raises:
+            ModelLoadCancelled: Si annulé avant la reprise (reste en veille)
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            raise ModelLoadCancelled("Chargement du modèle annulé")
+        if progress_callback is not None:
+            progress_callback(0.0)
+        
+        internals = _import_llama_internals()
+        started = time.perf_counter()
+        
+        try:
+            with self._generate_lock:
+                model = self._llama
+                ctx = internals.LlamaContext(
+                    model=model._model, params=model.context_params, verbose=model.verbose
+                )
+                batch = internals.LlamaBatch(
+                    n_tokens=model.n_batch, embd=0,
+                    n_seq_max=model.context_params.n_ctx, verbose=model.verbose
+                )
+                
+                # Libérés avec le modèle (Llama.close), comme à la construction
+                stack = getattr(model, "_stack", None)
+                if stack is not None:
+                    stack.enter_context(closing(ctx))
+                    stack.enter_context(closing(batch))
+                
+                model._ctx = ctx
+                model._batch = batch
+                model.n_tokens = 0
+        except Exception as e:
+            logger.warning(f"⚠️ Sortie de veille impossible ({e}), rechargement complet")
+            return False
+        
+        context_ready = time.perf_counter()
+        self.is_suspended = False
+        self.is_loaded = True
+        self._start_batch_engine(self.get_gpu_params())
+        
+        if progress_callback is not None:
+            progress_callback(1.0)
+        
+        self._record_load_stats("resume", started, {
+            "context_ms": _elapsed_ms(started, context_ready),
+            "batch_engine_ms": _elapsed_ms(context_ready, time.perf_counter())
+        })
+        logger.info("✅ Modèle sorti de veille")
+        return True
+    
+    def _start_batch_engine(self, gpu_params: Dict[str, Any]):
+        """
+        Démarre le moteur de génération par lots si configuré
+        
+        En cas d'échec (VRAM insuffisante pour le second contexte, version
+        de llama.cpp sans batch multi-séquences...), la génération reste
+        série. Les générations par lots ne réutilisent pas les états KV par
+        préfixe (prefix/cache_key ignorés) : le cache de préfixes est vidé.
+        
+        Args:
+            gpu_params: Paramètres du profil GPU chargé
+        """
+        max_sequences = self.config.batch_max_sequences
+        if max_sequences <= 1:
+            return
+        
+        try:
+            backend = LlamaBatchBackend(
+                self.model,
+                max_sequences=max_sequences,
+                n_ctx_per_seq=gpu_params["n_ctx"],
+                n_batch=gpu_params["n_batch"],
+                n_threads=gpu_params["n_threads"]
+            )
+            self.batch_engine = BatchEngine(backend, max_sequences=max_sequences)
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Génération par lots indisponible ({e}), génération série"
+            )
+            self.batch_engine = None
+            return
+        
+        self.prefix_cache.clear()
+        if self.config.prefix_cache_mb > 0:
+            logger.warning(
+                f"⚠️ Génération par lots active : cache de préfixes KV inutilisé "
+                f"(prefix_cache_mb={self.config.prefix_cache_mb} ignoré)"
+            )
+    
+    def _submit_batched(
+        self,
+        prompt: str,
+        temperature: float,
+        top_p: float,
+        max_tokens: int,
+        stop: Optional[List[str]],
+        on_token=None
+    ):
+        """Tokenise le prompt et l'envoie au moteur de génération par lots"""
+        engine = self.batch_engine
+        if engine is None:
+            raise RuntimeError("Moteur de génération par lots arrêté")
+        
+        tokens = self._llama.tokenize(prompt.encode("utf-8"))
+        
+        return engine.submit(
+            tokens,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop,
+            on_token=on_token
+        )
+    
     def generate(
         self,
         prompt: str,
         temperature: Optional[float] = None,
         top_p: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        stop: Optional[List[str]] = None
+        stop: Optional[List[str]] = None,
+        prefix: Optional[str] = None,
+        cache_key: Optional[Hashable] = None
     ) -> str:
         """
         Génère une réponse texte à partir d'un prompt
@@ -254,6 +1235,15 @@ class ModelManager:
             top_p: Nucleus sampling (0.0-1.0). Si None, utilise config.
             max_tokens: Nombre max de tokens générés. Si None, utilise config.
             stop: Liste de séquences d'arrêt (ex: ["\n\n", "User:"])
+            prefix: Début constant du prompt (system prompt) dont l'état
+                KV est gardé en cache
+            cache_key: Clé de conversation, ex: (user_id, source) : l'état de
+                fin de génération est gardé pour réutiliser le préfixe commun
+                au prochain prompt
+        
+        Avec le moteur de génération par lots actif, les appels concurrents
+        sont décodés ensemble (prefix et cache_key sont alors ignorés : le
+        contexte de batch a son propre KV cache).
         
         Returns:
             Texte généré par le modèle
@@ -276,16 +1266,38 @@ class ModelManager:
             f"temp={temperature}, top_p={top_p}, max_tokens={max_tokens}"
         )
         
+        if self.batch_engine is not None:
+            try:
+                request = self._submit_batched(prompt, temperature, top_p, max_tokens, stop)
+                generated_text = request.future.result().strip()
+            except Exception as e:
+                logger.error(f"❌ Erreur génération (batch) : {e}")
+                raise RuntimeError(f"Échec génération : {e}")
+            
+            logger.debug(f"✅ Génération terminée : {len(generated_text)} caractères")
+            return generated_text
+        
+        use_prefix_cache = prefix is not None or cache_key is not None
+        
         try:
-            # Générer avec llama-cpp-python
-            response = self.model(
-                prompt,
-                temperature=temperature,
-                top_p=top_p,
-                max_tokens=max_tokens,
-                stop=stop or [],
-                echo=False  # Ne pas répéter le prompt dans la sortie
-            )
+            with self._generate_lock:
+                if use_prefix_cache:
+                    tokens = self.model.tokenize(prompt.encode("utf-8"))
+                    hit_tokens = self._restore_prefix(tokens, prefix, cache_key)
+                
+                # Générer avec llama-cpp-python (ne réévalue que le suffixe
+                # qui diffère des tokens déjà présents dans le KV cache)
+                response = self.model(
+                    prompt,
+                    temperature=temperature,
+                    top_p=top_p,
+                    max_tokens=max_tokens,
+                    stop=stop or [],
+                    echo=False  # Ne pas répéter le prompt dans la sortie
+                )
+                
+                if use_prefix_cache:
+                    self._save_slot(tokens, hit_tokens, cache_key)
             
             # Extraire le texte généré
             generated_text = response["choices"][0]["text"].strip()
@@ -298,6 +1310,263 @@ class ModelManager:
             logger.error(f"❌ Erreur génération : {e}")
             raise RuntimeError(f"Échec génération : {e}")
     
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        prefix: Optional[str] = None,
+        cache_key: Optional[Hashable] = None
+    ) -> Iterator[str]:
+        """
+        Génère une réponse en streaming (fragments de texte au fil de l'eau)
+        
+        Mêmes paramètres que generate(). Les espaces de début de réponse
+        sont ignorés (comme le strip() de generate()).
+        
+        Yields:
+            Fragments de texte dans l'ordre de génération
+        
+        Raises:
+            RuntimeError: Si le modèle n'est pas chargé ou si la génération échoue
+        """
+        if not self.is_loaded or self.model is None:
+            raise RuntimeError(
+                "Modèle non chargé ! Appelez load_model() d'abord."
+            )
+        
+        temperature = temperature if temperature is not None else self.config.temperature
+        top_p = top_p if top_p is not None else self.config.top_p
+        max_tokens = max_tokens if max_tokens is not None else self.config.max_tokens
+        
+        if self.batch_engine is not None:
+            yield from self._stream_batched(prompt, temperature, top_p, max_tokens, stop)
+            return
+        
+        use_prefix_cache = prefix is not None or cache_key is not None
+        
+        # Le verrou est tenu pendant tout le stream (contexte llama unique)
+        with self._generate_lock:
+            try:
+                if use_prefix_cache:
+                    tokens = self.model.tokenize(prompt.encode("utf-8"))
+                    hit_tokens = self._restore_prefix(tokens, prefix, cache_key)
+                
+                chunks = self.model(
+                    prompt,
+                    temperature=temperature,
+                    top_p=top_p,
+                    max_tokens=max_tokens,
+                    stop=stop or [],
+                    echo=False,
+                    stream=True
+                )
+                
+                started = False
+                
+                for chunk in chunks:
+                    text = chunk["choices"][0]["text"]
+                    
+                    if not started:
+                        text = text.lstrip()
+                        started = bool(text)
+                    
+                    if text:
+                        yield text
+                
+                if use_prefix_cache:
+                    self._save_slot(tokens, hit_tokens, cache_key)
+                
+            except GeneratorExit:
+                # Stream abandonné par l'appelant : rien à enregistrer
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur génération (stream) : {e}")
+                raise RuntimeError(f"Échec génération : {e}")
+    
+    def _stream_batched(
+        self,
+        prompt: str,
+        temperature: float,
+        top_p: float,
+        max_tokens: int,
+        stop: Optional[List[str]]
+    ) -> Iterator[str]:
+        """Streaming via le moteur de génération par lots (voir generate_stream)"""
+        chunks: "queue.Queue[Optional[str]]" = queue.Queue()
+        request = None
+        
+        try:
+            request = self._submit_batched(
+                prompt, temperature, top_p, max_tokens, stop, on_token=chunks.put
+            )
+            request.future.add_done_callback(lambda _: chunks.put(None))
+            
+            started = False
+            
+            while True:
+                text = chunks.get()
+                if text is None:
+                    break
+                
+                if not started:
+                    text = text.lstrip()
+                    started = bool(text)
+                
+                if text:
+                    yield text
+            
+            # Remonter une éventuelle erreur de génération
+            request.future.result()
+            
+        except GeneratorExit:
+            # Stream abandonné : libérer la séquence au prochain pas
+            if request is not None:
+                request.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"❌ Erreur génération (stream batch) : {e}")
+            raise RuntimeError(f"Échec génération : {e}")
+    
+    def _save_slot(
+        self,
+        tokens: Sequence[int],
+        hit_tokens: int,
+        cache_key: Optional[Hashable]
+    ):
+        """Sauvegarde l'état de la conversation et enregistre les métriques"""
+        if cache_key is not None and self.prefix_cache.max_bytes > 0:
+            self.prefix_cache.put(
+                cache_key,
+                self._llama.eval_tokens,
+                self._llama.save_state()
+            )
+        
+        self._record_prefix_stats(len(tokens), hit_tokens)
+    
+    def _restore_prefix(
+        self,
+        tokens: Sequence[int],
+        prefix: Optional[str],
+        cache_key: Optional[Hashable]
+    ) -> int:
+        """
+        Restaure l'état KV partageant le plus long préfixe avec le prompt
+        
+        Args:
+            tokens: Tokens du prompt
+            prefix: Préfixe constant (system prompt) ou None
+            cache_key: Clé de conversation ou None
+        
+        Returns:
+            Nombre de tokens du prompt qui ne seront pas réévalués
+        """
+        if prefix is not None:
+            self._ensure_prefix_state(prefix, tokens)
+        
+        # L'état courant du modèle (dernière génération) est aussi candidat
+        current_length = _common_prefix_length(self._llama.eval_tokens, tokens)
+        cached_length, state = self.prefix_cache.best_match(tokens, cache_key)
+        
+        if state is not None and cached_length > current_length:
+            self._llama.load_state(state)
+            current_length = cached_length
+        
+        # llama.cpp réévalue toujours au moins le dernier token du prompt
+        return min(current_length, max(len(tokens) - 1, 0))
+    
+    def _ensure_prefix_state(self, prefix: str, tokens: Sequence[int]):
+        """
+        Évalue et met en cache l'état du préfixe constant (une seule fois)
+        
+        Args:
+            prefix: Texte du préfixe (system prompt formaté)
+            tokens: Tokens du prompt complet commençant par ce préfixe
+        """
+        prefix_tokens = self._llama.tokenize(prefix.encode("utf-8"))
+        
+        # Frontière de tokenisation : ne garder que la partie réellement commune
+        length = _common_prefix_length(prefix_tokens, tokens)
+        prefix_tokens = tuple(tokens[:length])
+        
+        if not prefix_tokens or self.prefix_cache.system_tokens == prefix_tokens:
+            return
+        
+        self._llama.reset()
+        self._llama.eval(list(prefix_tokens))
+        self.prefix_cache.set_system(prefix_tokens, self._llama.save_state())
+        
+        logger.info(f"♻️ État KV du system prompt mis en cache ({length} tokens)")
+    
+    def _record_prefix_stats(self, prompt_tokens: int, hit_tokens: int):
+        """Enregistre les tokens réutilisés / évalués d'une requête"""
+        evaluated = prompt_tokens - hit_tokens
+        
+        self.last_prefix_stats = {
+            'prompt_tokens': prompt_tokens,
+            'prefix_hit_tokens': hit_tokens,
+            'evaluated_tokens': evaluated
+        }
+        
+        self.prefix_stats['requests'] += 1
+        self.prefix_stats['prompt_tokens'] += prompt_tokens
+        self.prefix_stats['prefix_hit_tokens'] += hit_tokens
+        self.prefix_stats['evaluated_tokens'] += evaluated
+        
+        logger.debug(
+            f"♻️ Préfixe réutilisé : {hit_tokens}/{prompt_tokens} tokens "
+            f"({evaluated} évalués)"
+        )
+    
+    def release_slot(self, cache_key: Hashable):
+        """
+        Libère le slot KV d'une conversation (ex: historique effacé)
+        
+        Args:
+            cache_key: Clé de conversation passée à generate()
+        """
+        with self._generate_lock:
+            self.prefix_cache.discard(cache_key)
+    
+    def get_prefix_cache_stats(self) -> Dict[str, Any]:
+        """
+        Récupère les métriques de réutilisation du KV cache
+        
+        Returns:
+            Dictionnaire avec totaux, taux de réutilisation, dernière requête
+            et état du cache
+        """
+        total = self.prefix_stats['prompt_tokens']
+        
+        return {
+            **self.prefix_stats,
+            'hit_ratio': self.prefix_stats['prefix_hit_tokens'] / total if total else 0.0,
+            'last_request': self.last_prefix_stats,
+            'cache': self.prefix_cache.get_stats()
+        }
+    
+    def count_tokens(self, text: str) -> int:
+        """
+        Compte les tokens d'un texte avec le tokenizer du modèle chargé
+        
+        Args:
+            text: Texte à tokeniser
+        
+        Returns:
+            Nombre de tokens (sans token BOS)
+        
+        Raises:
+            RuntimeError: Si le modèle n'est pas chargé
+        """
+        if not self.is_loaded or self.model is None:
+            raise RuntimeError(
+                "Modèle non chargé ! Appelez load_model() d'abord."
+            )
+        
+        return len(self.model.tokenize(text.encode("utf-8"), add_bos=False))
+    
     def get_gpu_status(self) -> Dict[str, Any]:
         """
         Récupère le statut actuel du GPU
@@ -309,6 +1578,7 @@ class ModelManager:
             return {"available": False, "error": "pynvml non installé"}
         
         try:
+            _import_pynvml()
             pynvml.nvmlInit()
             handle = pynvml.nvmlDeviceGetHandleByIndex(0)
             
@@ -334,6 +1604,15 @@ class ModelManager:
             logger.error(f"❌ Erreur récupération statut GPU : {e}")
             return {"available": False, "error": str(e)}
     
+    def get_gpu_params(self) -> Dict[str, Any]:
+        """
+        Paramètres llama.cpp effectifs (ceux du modèle chargé ou en veille)
+        
+        Returns:
+            Paramètres calculés du profil "auto", sinon ceux du profil configuré
+        """
+        return self.gpu_params or self.config.get_gpu_params()
+    
     def get_model_info(self) -> Dict[str, Any]:
         """
         Récupère les informations sur le modèle chargé
@@ -343,10 +1622,12 @@ class ModelManager:
         """
         return {
             "is_loaded": self.is_loaded,
+            "is_suspended": self.is_suspended,
+            "load_stats": self.load_stats,
             "model_path": self.config.model_path,
             "model_name": os.path.basename(self.config.model_path),
             "gpu_profile": self.config.gpu_profile,
-            "gpu_params": self.config.get_gpu_params() if self.is_loaded else None,
+            "gpu_params": self.get_gpu_params() if self.is_loaded else None,
             "gpu_info": {
                 "available": self.gpu_info.available if self.gpu_info else False,
                 "name": self.gpu_info.name if self.gpu_info else None,
@@ -355,12 +1636,14 @@ class ModelManager:
                     if self.gpu_info and self.gpu_info.vram_total
                     else None
                 )
-            }
+            },
+            "prefix_cache": self.get_prefix_cache_stats(),
+            "batching": self.batch_engine.get_stats() if self.batch_engine else None
         }
     
     def __repr__(self) -> str:
         """Représentation string du ModelManager"""
-        status = "chargé" if self.is_loaded else "déchargé"
+        status = "chargé" if self.is_loaded else "en veille" if self.is_suspended else "déchargé"
         model_name = os.path.basename(self.config.model_path)
         return f"ModelManager({model_name}, {status}, profil={self.config.gpu_profile})"
 
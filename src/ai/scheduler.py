@@ -0,0 +1,407 @@
+"""
+Ordonnanceur d'inférence pour Desktop-Mate (Kira)
+
+Le modèle llama.cpp chargé n'est pas thread-safe : toutes les générations
+(GUI desktop, Discord) passent par un worker unique qui les exécute une par
+une depuis une file bornée. Avec la génération par lots
+(AIConfig.batch_max_sequences > 1), il y a un worker par séquence du moteur
+de batch : les générations concurrentes sont décodées ensemble.
+
+- Priorités : le desktop (utilisateur local) passe avant Discord
+- Équité : à priorité égale, les files (une par serveur Discord, une pour
+  le desktop) sont servies à tour de rôle
+- Rejet : file pleine → SchedulerFullError immédiate ; attente plus longue
+  que `timeout` → SchedulerTimeoutError
+- Utilisable depuis un thread (run) ou une boucle asyncio (run_async)
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .config import AIConfig, get_config
+
+logger = logging.getLogger(__name__)
+
+# Priorités (plus petit = servi en premier)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+# Nombre de temps d'attente récents gardés pour les percentiles
+WAIT_SAMPLES = 256
+
+
+class SchedulerFullError(RuntimeError):
+    """File d'inférence pleine : requête refusée"""
+
+
+class SchedulerTimeoutError(TimeoutError):
+    """Requête restée trop longtemps en file d'attente"""
+
+
+@dataclass
+class _Job:
+    """Requête d'inférence en attente"""
+    
+    fn: Callable[[], Any]
+    lane: str
+    priority: int
+    enqueued_at: float
+    future: Future = field(default_factory=Future)
+
+
+class InferenceScheduler:
+    """
+    File d'inférence bornée servie par un pool de workers
+    
+    Par défaut un seul worker pour le modèle chargé : deux générations ne
+    s'exécutent jamais en même temps, quelle que soit leur origine.
+    """
+    
+    def __init__(
+        self,
+        max_queue: int = 32,
+        timeout: float = 120.0,
+        name: str = "inference",
+        workers: int = 1
+    ):
+        """
+        Initialise l'ordonnanceur (les workers démarrent à la première requête)
+        
+        Args:
+            max_queue: Nombre max de requêtes en attente (toutes files confondues)
+            timeout: Attente max en file (secondes) avant rejet
+            name: Nom des threads workers
+            workers: Requêtes exécutées simultanément (1 sauf génération par lots)
+        """
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.name = name
+        self.workers = workers
+        
+        # Une file FIFO par lane, dans l'ordre de service (round-robin)
+        self._lanes: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._active = 0
+        self._threads: List[threading.Thread] = []
+        
+        # Statistiques
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected_full = 0
+        self._rejected_timeout = 0
+        self._wait_total = 0.0
+        self._wait_count = 0
+        self._wait_max = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        
+        logger.info(
+            f"✅ InferenceScheduler initialisé "
+            f"(file max={max_queue}, timeout={timeout}s, workers={workers})"
+        )
+    
+    def _start_locked(self):
+        """Démarre les workers et le thread d'expiration (verrou tenu)"""
+        if self._running:
+            return
+        
+        self._running = True
+        self._threads = [
+            threading.Thread(
+                target=self._worker_loop, name=f"{self.name}-{index}", daemon=True
+            )
+            for index in range(self.workers)
+        ]
+        self._threads.append(threading.Thread(
+            target=self._reaper_loop, name=f"{self.name}-reaper", daemon=True
+        ))
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        lane: str = "default",
+        priority: int = PRIORITY_NORMAL
+    ) -> Future:
+        """
+        Met une requête en file d'attente
+        
+        Args:
+            fn: Travail à exécuter sur le worker (sans argument)
+            lane: File d'équité (ex: "desktop", "discord:<guild_id>")
+            priority: PRIORITY_HIGH ou PRIORITY_NORMAL
+        
+        Returns:
+            Future résolue avec le résultat de `fn` (ou son exception,
+            ou SchedulerTimeoutError si l'attente dépasse `timeout`)
+        
+        Raises:
+            SchedulerFullError: Si la file est pleine
+        """
+        job = _Job(fn=fn, lane=lane, priority=priority, enqueued_at=time.monotonic())
+        
+        with self._cond:
+            if self._size >= self.max_queue:
+                self._rejected_full += 1
+                raise SchedulerFullError(
+                    f"File d'inférence pleine ({self.max_queue} requêtes en attente)"
+                )
+            
+            self._start_locked()
+            self._lanes.setdefault(lane, deque()).append(job)
+            self._size += 1
+            self._submitted += 1
+            self._cond.notify_all()
+        
+        return job.future
+    
+    def run(
+        self,
+        fn: Callable[[], Any],
+        lane: str = "default",
+        priority: int = PRIORITY_NORMAL
+    ) -> Any:
+        """
+        Exécute `fn` sur le worker et attend son résultat (appel bloquant)
+        
+        Args:
+            fn: Travail à exécuter
+            lane: File d'équité
+            priority: Priorité de la requête
+        
+        Returns:
+            Résultat de `fn`
+        """
+        return self.submit(fn, lane=lane, priority=priority).result()
+    
+    async def run_async(
+        self,
+        fn: Callable[[], Any],
+        lane: str = "default",
+        priority: int = PRIORITY_NORMAL
+    ) -> Any:
+        """
+        Exécute `fn` sur le worker sans bloquer la boucle asyncio
+        
+        Args:
+            fn: Travail à exécuter
+            lane: File d'équité
+            priority: Priorité de la requête
+        
+        Returns:
+            Résultat de `fn`
+        """
+        return await asyncio.wrap_future(self.submit(fn, lane=lane, priority=priority))
+    
+    def _next_job_locked(self) -> Optional[_Job]:
+        """
+        Retire la prochaine requête à servir (verrou tenu)
+        
+        Meilleure priorité d'abord ; à égalité, la lane servie le moins
+        récemment (les lanes servies passent en fin d'ordre).
+        """
+        best_lane = None
+        best_priority = None
+        
+        for lane, jobs in self._lanes.items():
+            priority = jobs[0].priority
+            if best_priority is None or priority < best_priority:
+                best_lane, best_priority = lane, priority
+        
+        if best_lane is None:
+            return None
+        
+        jobs = self._lanes.pop(best_lane)
+        job = jobs.popleft()
+        if jobs:
+            self._lanes[best_lane] = jobs
+        self._size -= 1
+        
+        return job
+    
+    def _expire_locked(self, now: float) -> Optional[float]:
+        """
+        Rejette les requêtes en attente depuis plus de `timeout` (verrou tenu)
+        
+        Returns:
+            Délai avant la prochaine expiration (None si file vide)
+        """
+        next_deadline = None
+        
+        for lane in list(self._lanes):
+            jobs = self._lanes[lane]
+            
+            # FIFO par lane : les plus anciennes sont en tête
+            while jobs and now - jobs[0].enqueued_at >= self.timeout:
+                job = jobs.popleft()
+                self._size -= 1
+                self._rejected_timeout += 1
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(SchedulerTimeoutError(
+                        f"Requête restée {now - job.enqueued_at:.1f}s en file "
+                        f"(lane={job.lane})"
+                    ))
+                logger.warning(f"⏱️ Requête d'inférence expirée (lane={job.lane})")
+            
+            if not jobs:
+                del self._lanes[lane]
+                continue
+            
+            deadline = jobs[0].enqueued_at + self.timeout - now
+            if next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+        
+        return next_deadline
+    
+    def _record_wait(self, wait: float):
+        """Enregistre le temps d'attente d'une requête servie (verrou tenu)"""
+        self._wait_total += wait
+        self._wait_count += 1
+        self._wait_max = max(self._wait_max, wait)
+        self._recent_waits.append(wait)
+    
+    def _worker_loop(self):
+        """Boucle d'un worker : exécute les requêtes une par une"""
+        while True:
+            with self._cond:
+                job = None
+                while self._running and job is None:
+                    self._expire_locked(time.monotonic())
+                    job = self._next_job_locked()
+                    if job is None:
+                        self._cond.wait()
+                
+                if job is None:
+                    return
+                
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                
+                self._record_wait(time.monotonic() - job.enqueued_at)
+                self._active += 1
+            
+            error = None
+            try:
+                result = job.fn()
+            except BaseException as e:
+                error = e
+            
+            # Statistiques à jour avant de réveiller l'appelant
+            with self._cond:
+                self._active -= 1
+                if error is None:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+            
+            if error is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(error)
+    
+    def _reaper_loop(self):
+        """Rejette les requêtes expirées même pendant une génération longue"""
+        with self._cond:
+            while self._running:
+                next_deadline = self._expire_locked(time.monotonic())
+                self._cond.wait(timeout=next_deadline)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Récupère les statistiques de l'ordonnanceur
+        
+        Returns:
+            Dictionnaire avec profondeur de file et temps d'attente
+        """
+        with self._cond:
+            waits = sorted(self._recent_waits)
+            p95 = waits[math.ceil(len(waits) * 0.95) - 1] if waits else 0.0
+            
+            return {
+                'queue_depth': self._size,
+                'max_queue': self.max_queue,
+                'lanes': {lane: len(jobs) for lane, jobs in self._lanes.items()},
+                'busy': self._active > 0,
+                'active': self._active,
+                'workers': self.workers,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected_full': self._rejected_full,
+                'rejected_timeout': self._rejected_timeout,
+                'wait_avg_ms': (
+                    self._wait_total / self._wait_count * 1000
+                    if self._wait_count else 0.0
+                ),
+                'wait_p95_ms': p95 * 1000,
+                'wait_max_ms': self._wait_max * 1000
+            }
+    
+    def shutdown(self):
+        """Arrête le worker et annule les requêtes encore en file"""
+        with self._cond:
+            self._running = False
+            
+            for jobs in self._lanes.values():
+                for job in jobs:
+                    job.future.cancel()
+            
+            self._lanes.clear()
+            self._size = 0
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=5.0)
+        
+        logger.info("🛑 InferenceScheduler arrêté")
+    
+    def __repr__(self) -> str:
+        """Représentation string de l'ordonnanceur"""
+        return (
+            f"InferenceScheduler(file={self._size}/{self.max_queue}, "
+            f"timeout={self.timeout}s)"
+        )
+
+
+# Instance globale (optionnel, pour usage singleton)
+_scheduler_instance: Optional[InferenceScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_inference_scheduler(config: Optional[AIConfig] = None) -> InferenceScheduler:
+    """
+    Récupère l'instance globale de InferenceScheduler (singleton)
+    
+    Partagée par la GUI et le bot Discord : c'est elle qui sérialise les
+    accès au modèle chargé (ou les répartit sur le moteur de batch).
+    
+    Args:
+        config: Configuration IA (optionnel)
+    
+    Returns:
+        Instance InferenceScheduler
+    """
+    global _scheduler_instance
+    
+    with _scheduler_lock:
+        if _scheduler_instance is None:
+            config = config or get_config()
+            _scheduler_instance = InferenceScheduler(
+                max_queue=config.scheduler_max_queue,
+                timeout=config.scheduler_timeout,
+                workers=config.batch_max_sequences
+            )
+    
+    return _scheduler_instance
@@ -4,13 +4,15 @@ Bot Discord pour Desktop-Mate (Kira)
 Bot Discord qui permet à Kira de discuter sur Discord en utilisant :
 - ChatEngine (Phase 5) pour générer les réponses
 - EmotionAnalyzer (Phase 6) pour détecter les émotions
-- UnityBridge pour faire réagir l'avatar VRM
+- AsyncUnityBridge pour faire réagir l'avatar VRM (asyncio, ne bloque
+  jamais la boucle d'événements de discord.py)
 
 Fonctionnalités :
 - Réponse aux mentions (@Kira)
 - Auto-reply dans canaux configurés
 - Intégration complète avec système IA Desktop-Mate
 - Rate limiting pour éviter spam
+- Réponses en streaming (message édité au fil de la génération)
 - Réaction émotionnelle VRM en temps réel
 """
 
@@ -18,7 +20,7 @@ import os
 import logging
 import asyncio
 import time
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 import discord
@@ -26,22 +28,65 @@ from discord.ext import commands
 from dotenv import load_dotenv
 
 # Import modules Desktop-Mate
-from src.ai.chat_engine import get_chat_engine
+from src.ai.chat_engine import ChatResponse, get_chat_engine
 from src.ai.emotion_analyzer import get_emotion_analyzer
-from src.ipc.unity_bridge import UnityBridge
+from src.ai.scheduler import (
+    get_inference_scheduler, SchedulerFullError, SchedulerTimeoutError
+)
+from src.ipc.async_unity_bridge import AsyncUnityBridge
 from src.utils.config import Config
 
 # Configuration du logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Taille maximale d'un message Discord (caractères)
+DISCORD_MESSAGE_LIMIT = 2000
+
+# Contenu du message posté avant le premier token en mode streaming
+STREAM_PLACEHOLDER = "💭 …"
+
+# Messages d'erreur envoyés sur Discord
+ERROR_MESSAGE = "Désolée, j'ai rencontré une erreur... 😔"
+BUSY_MESSAGE = "Je suis débordée, réessaie dans un petit moment ! ⏳"
+
+
+def split_message(text: str, limit: int = DISCORD_MESSAGE_LIMIT) -> List[str]:
+    """
+    Découpe un texte en morceaux acceptés par Discord
+    
+    Coupe de préférence sur un saut de ligne, sinon sur un espace, sinon
+    brutalement à `limit` caractères.
+    
+    Args:
+        text: Texte à découper
+        limit: Taille maximale d'un morceau
+    
+    Returns:
+        Liste de morceaux (au moins un, éventuellement vide)
+    """
+    parts = []
+    
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    
+    parts.append(text)
+    return parts
+
 
 class KiraDiscordBot(commands.Bot):
     """
     Bot Discord pour Kira (Desktop-Mate)
     
     Permet à Kira de discuter sur Discord en utilisant le système IA
-    complet de Desktop-Mate (ChatEngine + EmotionAnalyzer + UnityBridge).
+    complet de Desktop-Mate (ChatEngine + EmotionAnalyzer + AsyncUnityBridge).
     """
     
     def __init__(
@@ -49,16 +94,20 @@ class KiraDiscordBot(commands.Bot):
         chat_engine=None,
         emotion_analyzer=None,
         unity_bridge=None,
-        config=None
+        config=None,
+        scheduler=None
     ):
         """
         Initialise le bot Discord Kira
         
         Args:
             chat_engine: ChatEngine pour générer réponses (si None, utilise singleton)
-            emotion_analyzer: EmotionAnalyzer pour émotions (si None, utilise singleton)
-            unity_bridge: UnityBridge pour VRM (si None, crée nouvelle instance)
+            emotion_analyzer: EmotionAnalyzer branché sur le ChatEngine créé par
+                le bot (si None, utilise singleton)
+            unity_bridge: AsyncUnityBridge pour VRM (si None, crée une instance
+                configurée par la section "unity" de config.json)
             config: Config pour paramètres (si None, charge depuis config.json)
+            scheduler: InferenceScheduler partagé (si None, utilise singleton)
         """
         # Configuration Discord Intents
         intents = discord.Intents.default()
@@ -73,10 +122,15 @@ class KiraDiscordBot(commands.Bot):
         )
         
         # Composants Desktop-Mate
-        self.chat_engine = chat_engine or get_chat_engine()
         self.emotion_analyzer = emotion_analyzer or get_emotion_analyzer()
-        self.unity_bridge = unity_bridge or UnityBridge()
+        self.chat_engine = chat_engine or get_chat_engine(emotion_analyzer=self.emotion_analyzer)
         self.config = config or Config()
+        self.unity_bridge = unity_bridge or AsyncUnityBridge(
+            host=self.config.get("unity.host", "127.0.0.1"),
+            port=self.config.get("unity.port", 5555),
+            protocol=self.config.get("unity.protocol", "json")
+        )
+        self.scheduler = scheduler or get_inference_scheduler()
         
         # Configuration Discord depuis config.json
         discord_config = self.config.get("discord", {})
@@ -84,6 +138,15 @@ class KiraDiscordBot(commands.Bot):
         self.auto_reply_channels = discord_config.get("auto_reply_channels", [])
         self.rate_limit_seconds = discord_config.get("rate_limit_seconds", 3)
         
+        # Streaming : message placeholder édité au fil de la génération
+        self.stream_replies = discord_config.get("stream_replies", True)
+        self.stream_edit_interval = discord_config.get("stream_edit_interval", 1.0)
+        self.stream_edit_chars = discord_config.get("stream_edit_chars", 80)
+        
+        # Avatar Unity : le serveur Unity n'accepte qu'un client, occupé par
+        # l'interface Desktop-Mate quand elle tourne (opt-in pour le bot seul)
+        self.unity_enabled = discord_config.get("unity_enabled", False)
+        
         # Rate limiting par utilisateur
         self.last_response_time: Dict[int, float] = {}
         
@@ -95,9 +158,21 @@ class KiraDiscordBot(commands.Bot):
         logger.info(
             f"✅ KiraDiscordBot initialisé "
             f"(auto_reply={self.auto_reply_enabled}, "
-            f"channels={len(self.auto_reply_channels)})"
+            f"channels={len(self.auto_reply_channels)}, "
+            f"streaming={self.stream_replies}, unity={self.unity_enabled})"
         )
     
+    async def setup_hook(self):
+        """Connexion à Unity (non bloquante, si discord.unity_enabled), avant la connexion à Discord"""
+        if not self.unity_enabled:
+            logger.info("🎭 Avatar Unity non utilisé par le bot (discord.unity_enabled)")
+            return
+        
+        if await self.unity_bridge.connect():
+            logger.info("🎭 Connecté à Unity (avatar VRM)")
+        else:
+            logger.warning("⚠️ Unity non disponible, nouvelles tentatives en arrière-plan")
+    
     async def on_ready(self):
         """Event déclenché quand le bot est connecté à Discord"""
         logger.info(f"✅ Bot Discord connecté : {self.user.name} (ID: {self.user.id})")
@@ -154,6 +229,29 @@ class KiraDiscordBot(commands.Bot):
             logger.debug("📝 Prompt vide après nettoyage, ignoré")
             return
         
+        if self.stream_replies:
+            try:
+                response = await self._stream_response(
+                    message=message,
+                    prompt=prompt,
+                    user_id=str(message.author.id),
+                    username=message.author.name
+                )
+                
+                self.responses_sent += 1
+                logger.info(
+                    f"✅ Réponse streamée à {message.author.name} "
+                    f"({len(response)} chars)"
+                )
+                
+            except (SchedulerFullError, SchedulerTimeoutError) as e:
+                logger.warning(f"⏳ Requête refusée par l'ordonnanceur : {e}")
+                await message.channel.send(BUSY_MESSAGE)
+            except Exception as e:
+                logger.error(f"❌ Erreur génération/envoi réponse : {e}")
+                await message.channel.send(ERROR_MESSAGE)
+            return
+        
         # Afficher typing indicator pendant traitement
         async with message.channel.typing():
             try:
@@ -161,7 +259,8 @@ class KiraDiscordBot(commands.Bot):
                 response = await self._generate_response(
                     prompt=prompt,
                     user_id=str(message.author.id),
-                    username=message.author.name
+                    username=message.author.name,
+                    lane=self._scheduler_lane(message)
                 )
                 
                 # Envoyer réponse
@@ -173,11 +272,12 @@ class KiraDiscordBot(commands.Bot):
                     f"({len(response)} chars)"
                 )
                 
+            except (SchedulerFullError, SchedulerTimeoutError) as e:
+                logger.warning(f"⏳ Requête refusée par l'ordonnanceur : {e}")
+                await message.channel.send(BUSY_MESSAGE)
             except Exception as e:
                 logger.error(f"❌ Erreur génération/envoi réponse : {e}")
-                await message.channel.send(
-                    "Désolée, j'ai rencontré une erreur... 😔"
-                )
+                await message.channel.send(ERROR_MESSAGE)
     
     def _should_reply_to_message(self, message: discord.Message) -> bool:
         """
@@ -241,11 +341,25 @@ class KiraDiscordBot(commands.Bot):
         
         return cleaned
     
+    def _scheduler_lane(self, message: discord.Message) -> str:
+        """
+        Détermine la file d'équité de l'ordonnanceur pour un message
+        
+        Args:
+            message: Message Discord
+        
+        Returns:
+            "discord:<guild_id>" (ou "discord:dm" en message privé)
+        """
+        guild = getattr(message, "guild", None)
+        return f"discord:{guild.id}" if guild is not None else "discord:dm"
+    
     async def _generate_response(
         self,
         prompt: str,
         user_id: str,
-        username: str
+        username: str,
+        lane: str = "discord:dm"
     ) -> str:
         """
         Génère une réponse via ChatEngine et met à jour émotions VRM
@@ -254,21 +368,25 @@ class KiraDiscordBot(commands.Bot):
             prompt: Message de l'utilisateur
             user_id: ID utilisateur Discord
             username: Nom utilisateur Discord
+            lane: File d'équité de l'ordonnanceur (serveur Discord)
         
         Returns:
             Réponse générée
+        
+        Raises:
+            SchedulerFullError: Si la file d'inférence est pleine
+            SchedulerTimeoutError: Si la requête a trop attendu en file
         """
         logger.info(f"🤖 Génération réponse pour {username} : '{prompt[:50]}...'")
         
-        # Générer réponse avec ChatEngine (bloquant, à exécuter dans executor)
-        loop = asyncio.get_event_loop()
-        chat_result = await loop.run_in_executor(
-            None,
+        # Générer réponse avec ChatEngine (bloquant, exécuté par l'ordonnanceur)
+        chat_result = await self.scheduler.run_async(
             lambda: self.chat_engine.chat(
                 user_input=prompt,
                 user_id=user_id,
                 source="discord"
-            )
+            ),
+            lane=lane
         )
         
         response_text = chat_result.response
@@ -278,40 +396,182 @@ class KiraDiscordBot(commands.Bot):
             f"émotion={chat_result.emotion}"
         )
         
-        # Analyser émotion avec EmotionAnalyzer avancé
-        emotion_result = self.emotion_analyzer.analyze(
-            text=response_text,
-            user_id=user_id
+        await self._react_to_response(chat_result)
+        
+        return response_text
+    
+    async def _stream_response(
+        self,
+        message: discord.Message,
+        prompt: str,
+        user_id: str,
+        username: str
+    ) -> str:
+        """
+        Génère une réponse en streaming et l'affiche progressivement
+        
+        Poste un placeholder puis l'édite avec le texte accumulé dès que
+        `stream_edit_interval` secondes ou `stream_edit_chars` caractères se
+        sont écoulés depuis la dernière édition. Les éditions sont attendues
+        une par une (discord.py temporise selon ses buckets de rate limit) :
+        les tokens arrivés pendant une édition sont regroupés dans la
+        suivante. Au-delà de DISCORD_MESSAGE_LIMIT, la réponse continue dans
+        de nouveaux messages.
+        
+        Args:
+            message: Message Discord auquel répondre
+            prompt: Message de l'utilisateur
+            user_id: ID utilisateur Discord
+            username: Nom utilisateur Discord
+        
+        Returns:
+            Réponse générée
+        
+        Raises:
+            SchedulerFullError: Si la file d'inférence est pleine
+            SchedulerTimeoutError: Si la requête a trop attendu en file
+        """
+        logger.info(f"🤖 Génération streamée pour {username} : '{prompt[:50]}...'")
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def produce():
+            # Génération bloquante (worker de l'ordonnanceur) → queue asyncio
+            stream = self.chat_engine.chat_stream(
+                user_input=prompt,
+                user_id=user_id,
+                source="discord"
+            )
+            for token in stream:
+                loop.call_soon_threadsafe(queue.put_nowait, token)
+            return stream.response
+        
+        sent = [await message.channel.send(STREAM_PLACEHOLDER)]
+        shown = [STREAM_PLACEHOLDER]
+        
+        try:
+            future = self.scheduler.submit(produce, lane=self._scheduler_lane(message))
+            
+            # Fin de flux signalée aussi si la requête expire avant de démarrer
+            future.add_done_callback(
+                lambda _: loop.call_soon_threadsafe(queue.put_nowait, None)
+            )
+            producer = asyncio.wrap_future(future)
+            
+            text = ""
+            pending = 0
+            last_edit = time.monotonic()
+            
+            while True:
+                token = await queue.get()
+                if token is None:
+                    break
+                
+                text += token
+                pending += len(token)
+                
+                if (
+                    pending >= self.stream_edit_chars
+                    or time.monotonic() - last_edit >= self.stream_edit_interval
+                ):
+                    await self._sync_stream_messages(message.channel, sent, shown, text)
+                    pending = 0
+                    last_edit = time.monotonic()
+            
+            chat_result = await producer
+        
+        except Exception:
+            # Ne pas laisser un placeholder orphelin
+            if shown == [STREAM_PLACEHOLDER]:
+                try:
+                    await sent[0].delete()
+                except Exception as e:
+                    logger.debug(f"⚠️ Suppression placeholder impossible : {e}")
+            raise
+        
+        response_text = chat_result.response
+        await self._sync_stream_messages(
+            message.channel, sent, shown, response_text or "…"
         )
         
         logger.info(
-            f"🎭 Émotion analysée : {emotion_result.emotion} "
-            f"(intensité={emotion_result.intensity:.1f}, "
-            f"confiance={emotion_result.confidence:.1f})"
+            f"✅ Réponse générée : {len(response_text)} chars, "
+            f"{len(sent)} message(s), émotion={chat_result.emotion}, "
+            f"1er token={chat_result.time_to_first_token}"
         )
         
-        # Envoyer émotion à Unity (si connecté)
-        self._send_emotion_to_unity(emotion_result.emotion, emotion_result.intensity)
+        await self._react_to_response(chat_result)
         
         return response_text
     
-    def _send_emotion_to_unity(self, emotion: str, intensity: float):
+    async def _sync_stream_messages(
+        self,
+        channel,
+        sent: List,
+        shown: List[str],
+        text: str
+    ):
+        """
+        Aligne les messages Discord postés sur le texte accumulé
+        
+        N'édite que les messages dont le contenu a changé et poste un nouveau
+        message pour chaque morceau au-delà de DISCORD_MESSAGE_LIMIT.
+        
+        Args:
+            channel: Canal Discord de la réponse
+            sent: Messages déjà postés (complété sur place)
+            shown: Contenu actuellement affiché par message (mis à jour)
+            text: Texte complet à afficher
+        """
+        for index, part in enumerate(split_message(text)):
+            if not part:
+                continue
+            
+            if index < len(sent):
+                if shown[index] != part:
+                    await sent[index].edit(content=part)
+                    shown[index] = part
+            else:
+                sent.append(await channel.send(part))
+                shown.append(part)
+    
+    async def _react_to_response(self, chat_result: ChatResponse):
+        """
+        Fait réagir l'avatar VRM à l'émotion analysée par le ChatEngine
+        
+        Args:
+            chat_result: Réponse du ChatEngine (émotion déjà analysée)
+        """
+        emotion_result = chat_result.emotion_result
+        
+        if emotion_result is not None:
+            logger.info(
+                f"🎭 Émotion analysée : {emotion_result.emotion} "
+                f"(intensité={emotion_result.intensity:.1f}, "
+                f"confiance={emotion_result.confidence:.1f})"
+            )
+        
+        # Envoyer émotion à Unity (si connecté)
+        if chat_result.vrm_blendshape:
+            await self._send_emotion_to_unity(chat_result.vrm_blendshape)
+    
+    async def _send_emotion_to_unity(self, vrm_data: Dict[str, Any]):
         """
         Envoie l'émotion à Unity pour mise à jour VRM
         
+        Mise en file sans bloquer la boucle d'événements : si Unity ne lit
+        plus, l'attente est bornée par le send_timeout du pont.
+        
         Args:
-            emotion: Émotion détectée ('joy', 'angry', etc.)
-            intensity: Intensité 0-100
+            vrm_data: Mapping VRM (voir EmotionAnalyzer.get_vrm_blendshape)
         """
         if not self.unity_bridge.is_connected():
             logger.debug("⚠️ Unity non connecté, émotion non envoyée")
             return
         
-        # Obtenir mapping VRM
-        vrm_data = self.emotion_analyzer.get_vrm_blendshape(emotion, intensity)
-        
         # Envoyer à Unity
-        success = self.unity_bridge.set_expression(
+        success = await self.unity_bridge.set_expression(
             expression_name=vrm_data['blendshape'],
             value=vrm_data['value']
         )
@@ -324,6 +584,21 @@ class KiraDiscordBot(commands.Bot):
         else:
             logger.warning("⚠️ Échec envoi émotion à Unity")
     
+    async def close(self):
+        """Ferme le bot après écriture de l'historique en attente (write-behind) et déconnexion d'Unity"""
+        try:
+            flushed = self.chat_engine.memory.flush()
+            logger.info(f"💾 Historique écrit avant fermeture : {flushed} interaction(s)")
+        except Exception as e:
+            logger.error(f"❌ Erreur écriture historique à la fermeture : {e}")
+        
+        try:
+            await self.unity_bridge.disconnect()
+        except Exception as e:
+            logger.error(f"❌ Erreur déconnexion Unity à la fermeture : {e}")
+        
+        await super().close()
+    
     def get_stats(self) -> Dict:
         """
         Récupère les statistiques du bot
@@ -342,7 +617,11 @@ class KiraDiscordBot(commands.Bot):
             'responses_sent': self.responses_sent,
             'auto_reply_enabled': self.auto_reply_enabled,
             'auto_reply_channels': self.auto_reply_channels,
-            'rate_limit_seconds': self.rate_limit_seconds
+            'rate_limit_seconds': self.rate_limit_seconds,
+            'stream_replies': self.stream_replies,
+            'unity_enabled': self.unity_enabled,
+            'inference': self.scheduler.get_stats(),
+            'unity': self.unity_bridge.get_stats()
         }
 
 
@@ -362,7 +641,7 @@ def get_discord_bot(
     Args:
         chat_engine: ChatEngine (optionnel)
         emotion_analyzer: EmotionAnalyzer (optionnel)
-        unity_bridge: UnityBridge (optionnel)
+        unity_bridge: AsyncUnityBridge (optionnel)
         config: Config (optionnel)
     
     Returns:
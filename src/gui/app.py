@@ -5,19 +5,21 @@ Manages the GUI and coordinates with Unity via IPC.
 
 import sys
 import logging
+import threading
 from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QMenuBar, QMenu,
-    QTabWidget, QSlider, QGroupBox, QCheckBox, QMessageBox
+    QTabWidget, QSlider, QGroupBox, QCheckBox, QMessageBox, QProgressBar
 )
 from PySide6.QtCore import Qt, QTimer, Signal
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QIcon, QTextCharFormat, QColor
 
 from ..ipc.unity_bridge import UnityBridge
 from ..utils.config import Config
-from ..ai.chat_engine import get_chat_engine
-from ..ai.emotion_analyzer import get_emotion_analyzer
+from ..utils.startup_profiler import get_startup_profiler
+
+# AI modules (src.ai.*) are imported on first use to keep them off the startup path
 
 logger = logging.getLogger(__name__)
 
@@ -35,26 +37,45 @@ class MainWindow(QMainWindow):
     
     # Custom signals for thread-safe UI updates
     message_received = Signal(str, str, str)  # sender, message, color
+    stream_started = Signal(str, str)  # sender, color
+    token_received = Signal(str)  # text fragment of the streamed reply
     emotion_updated = Signal(str)  # emotion_text
     stats_updated = Signal()
+    ai_load_progress = Signal(int)  # model loading progress (percent)
+    ai_load_finished = Signal(str, str)  # outcome, details
+    
+    # Give up waiting for an aborted model load when the window closes
+    AI_LOAD_JOIN_TIMEOUT = 10.0
     
     def __init__(self):
         super().__init__()
-        self.config = Config()
-        self.unity_bridge = UnityBridge()
+        profiler = get_startup_profiler()
+        
+        with profiler.step("Config"):
+            self.config = Config()
+        with profiler.step("UnityBridge"):
+            self.unity_bridge = UnityBridge(protocol=self.config.get("unity.protocol", "json"))
         self.vrm_loaded = False  # Track if VRM model is loaded
         
         # Initialize AI components as None (will be loaded on demand)
         self.chat_engine = None
         self.emotion_analyzer = None
         self.ai_available = False
+        self.last_time_to_first_token = None
+        self.ai_load_thread = None
+        self.ai_load_cancel = None
         logger.info("💡 AI components not initialized. Use 'Charger IA' button to load them.")
         
         # Connect signals (emotion_updated will be connected after create_chat_tab)
         self.message_received.connect(self.append_chat_message)
+        self.stream_started.connect(self.begin_stream_message)
+        self.token_received.connect(self.append_stream_token)
         self.stats_updated.connect(self.update_chat_stats)
+        self.ai_load_progress.connect(self.on_ai_load_progress)
+        self.ai_load_finished.connect(self.on_ai_load_finished)
         
-        self.init_ui()
+        with profiler.step("init_ui"):
+            self.init_ui()
         
     def init_ui(self):
         """Initialize the user interface."""
@@ -94,18 +115,51 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
         
-        # Create tabs
-        self.create_connexion_tab()
-        self.create_chat_tab()
-        self.create_expressions_tab()
-        self.create_animations_tab()
-        self.create_options_tab()
+        # Create tabs: only the first one before the window is shown, the
+        # others right after (one per event loop iteration, see showEvent)
+        with get_startup_profiler().step("Connexion tab"):
+            self.create_connexion_tab()
+        self.deferred_tabs = [
+            ("Chat tab", self.create_chat_tab),
+            ("Expressions tab", self.create_expressions_tab),
+            ("Animations tab", self.create_animations_tab),
+            ("Options tab", self.create_options_tab),
+        ]
+        self.deferred_tabs_scheduled = False
         
         # Status timer
         self.status_timer = QTimer()
         self.status_timer.timeout.connect(self.update_status)
         self.status_timer.start(1000)  # Check every second
 
+    def showEvent(self, event):
+        """Build the deferred tabs once the window is on screen."""
+        super().showEvent(event)
+        
+        if not self.deferred_tabs_scheduled:
+            self.deferred_tabs_scheduled = True
+            get_startup_profiler().mark("window shown")
+            QTimer.singleShot(0, self.build_next_deferred_tab)
+    
+    def build_next_deferred_tab(self):
+        """Build one deferred tab and schedule the next one."""
+        if self.deferred_tabs:
+            name, create_tab = self.deferred_tabs.pop(0)
+            with get_startup_profiler().step(name):
+                create_tab()
+        
+        if self.deferred_tabs:
+            QTimer.singleShot(0, self.build_next_deferred_tab)
+        else:
+            profiler = get_startup_profiler()
+            profiler.mark("all tabs built")
+            profiler.finish()
+    
+    def ensure_tabs(self):
+        """Build every deferred tab now (before touching their widgets)."""
+        while self.deferred_tabs:
+            self.build_next_deferred_tab()
+
     def create_connexion_tab(self):
         """Create the Unity connexion tab."""
         tab = QWidget()
@@ -141,6 +195,12 @@ class MainWindow(QMainWindow):
         self.ai_status_label.setStyleSheet("font-size: 13px; padding: 5px;")
         ai_layout.addWidget(self.ai_status_label)
         
+        # AI loading progress (shown while the model loads)
+        self.ai_progress_bar = QProgressBar()
+        self.ai_progress_bar.setRange(0, 100)
+        self.ai_progress_bar.setVisible(False)
+        ai_layout.addWidget(self.ai_progress_bar)
+        
         # Load AI button
         ai_button_layout = QHBoxLayout()
         self.load_ai_btn = QPushButton("📥 Charger IA (Zephyr-7B)")
@@ -170,6 +230,11 @@ class MainWindow(QMainWindow):
         self.unload_ai_btn.clicked.connect(self.unload_ai_model)
         ai_button_layout.addWidget(self.unload_ai_btn)
         
+        self.cancel_ai_btn = QPushButton("⏹️ Annuler")
+        self.cancel_ai_btn.setVisible(False)
+        self.cancel_ai_btn.clicked.connect(self.cancel_ai_load)
+        ai_button_layout.addWidget(self.cancel_ai_btn)
+        
         ai_layout.addLayout(ai_button_layout)
         
         # Info label
@@ -336,23 +401,40 @@ class MainWindow(QMainWindow):
         self.append_chat_message("Vous", message, "#64B5F6")  # Bleu clair pour fond sombre
         
         # Process in background thread to avoid freezing UI
-        import threading
+        from ..ai.scheduler import get_inference_scheduler, PRIORITY_HIGH
+        
         def process_message():
-            try:
-                # Generate response using ChatEngine
-                response = self.chat_engine.chat(
+            def generate():
+                # Stream response tokens from ChatEngine as they are generated
+                stream = self.chat_engine.chat_stream(
                     user_input=message,
                     user_id="desktop_user"
                 )
                 
-                # Analyze emotion
-                emotion_result = self.emotion_analyzer.analyze(
-                    text=response.response,
-                    user_id="kira"
+                started = False
+                for token in stream:
+                    if not started:
+                        self.stream_started.emit("Kira", "#CE93D8")  # Violet clair pour fond sombre
+                        started = True
+                    self.token_received.emit(token)
+                
+                return stream.response, started
+            
+            try:
+                # Run on the shared inference worker (desktop served before Discord)
+                response, started = get_inference_scheduler().run(
+                    generate,
+                    lane="desktop",
+                    priority=PRIORITY_HIGH
                 )
+                self.last_time_to_first_token = response.time_to_first_token
+                
+                if not started:
+                    # Empty reply: still show Kira's turn
+                    self.message_received.emit("Kira", response.response, "#CE93D8")
                 
-                # Emit signal to display Kira's response (thread-safe)
-                self.message_received.emit("Kira", response.response, "#CE93D8")  # Violet clair pour fond sombre
+                # Emotion already analyzed once by ChatEngine (same as persisted)
+                emotion_result = response.emotion_result
                 
                 # Update emotion display
                 emotion_emoji = {
@@ -379,11 +461,8 @@ class MainWindow(QMainWindow):
                 self.emotion_updated.emit(f"{emoji} {name} ({intensity}%)")
                 
                 # Send emotion to Unity VRM if connected and loaded
-                if self.unity_bridge.is_connected() and self.vrm_loaded:
-                    vrm_data = self.emotion_analyzer.get_vrm_blendshape(
-                        emotion_result.emotion,
-                        emotion_result.intensity
-                    )
+                if self.unity_bridge.can_send() and self.vrm_loaded:
+                    vrm_data = response.vrm_blendshape
                     
                     if vrm_data and vrm_data.get('recommended', False):
                         blendshape = vrm_data['blendshape']
@@ -446,20 +525,57 @@ class MainWindow(QMainWindow):
         cursor.movePosition(cursor.MoveOperation.End)
         self.chat_display.setTextCursor(cursor)
     
+    def begin_stream_message(self, sender: str, color: str):
+        """Start a message whose text is rendered progressively.
+        
+        Args:
+            sender: Name of the sender
+            color: Color for the sender name (hex code)
+        """
+        from datetime import datetime
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        
+        self.chat_display.append(
+            f"<span style='color: {color}; font-weight: bold;'>{sender}</span>"
+            f"<span style='color: #888; font-size: 11px;'> ({timestamp})</span>"
+        )
+        
+        # Empty block receiving the streamed text
+        self.chat_display.append("")
+    
+    def append_stream_token(self, token: str):
+        """Append a streamed text fragment to the current message.
+        
+        Args:
+            token: Text fragment (inserted as plain text)
+        """
+        text_format = QTextCharFormat()
+        text_format.setFont(self.chat_display.font())
+        text_format.setForeground(QColor("#e0e0e0"))
+        
+        cursor = self.chat_display.textCursor()
+        cursor.movePosition(cursor.MoveOperation.End)
+        cursor.insertText(token, text_format)
+        self.chat_display.setTextCursor(cursor)
+    
     def update_chat_stats(self):
         """Update chat statistics display."""
         if not self.ai_available:
             self.chat_stats_label.setText("Messages : 0 | Émotions détectées : 0")
             return
         
+        # Memory stats come from materialized counters (O(1) per call)
         stats = self.chat_engine.get_stats()
         emotion_stats = self.emotion_analyzer.get_stats()
         
-        messages = stats.get('total_interactions', 0)
-        emotions = emotion_stats.get('total_analyzed', 0)
+        messages = stats.get('memory', {}).get('total_interactions', 0)
+        emotions = emotion_stats.get('total_emotions_analyzed', 0)
+        
+        ttft = self.last_time_to_first_token
+        ttft_text = f" | 1er token : {ttft:.2f}s" if ttft is not None else ""
         
         self.chat_stats_label.setText(
-            f"Messages : {messages} | Émotions détectées : {emotions}"
+            f"Messages : {messages} | Émotions détectées : {emotions}{ttft_text}"
         )
     
     def clear_chat_history(self):
@@ -477,8 +593,8 @@ class MainWindow(QMainWindow):
             
             # Clear engine memory (if available)
             if self.ai_available:
+                # Also resets the emotion context of this user
                 self.chat_engine.clear_user_history("desktop_user")
-                self.emotion_analyzer.clear_user_history("kira")
             
             # Update stats
             self.update_chat_stats()
@@ -809,7 +925,7 @@ class MainWindow(QMainWindow):
         label.setText(f"{original_text}: {value}%")
         
         # Send to Unity if connected
-        if self.unity_bridge.is_connected():
+        if self.unity_bridge.can_send():
             # Convert 0-100 to 0.0-1.0
             normalized_value = value / 100.0
             self.unity_bridge.set_expression(expression_id, normalized_value)
@@ -849,7 +965,7 @@ class MainWindow(QMainWindow):
         self.speed_label.setText(f"Vitesse de transition : {speed:.1f} ({speed_text})")
         
         # Send to Unity only if connected AND VRM is loaded
-        if self.unity_bridge.is_connected() and self.vrm_loaded:
+        if self.unity_bridge.can_send() and self.vrm_loaded:
             self.unity_bridge.set_transition_speed(speed)
             logger.debug(f"Set transition speed to {speed:.1f}")
 
@@ -860,7 +976,7 @@ class MainWindow(QMainWindow):
             slider.setValue(0)
         
         # Send reset command to Unity
-        if self.unity_bridge.is_connected():
+        if self.unity_bridge.can_send():
             self.unity_bridge.reset_expressions()
             logger.info("Reset all expressions")
     
@@ -881,7 +997,7 @@ class MainWindow(QMainWindow):
         self.config.save()
         
         # Send to Unity if connected
-        if self.unity_bridge.is_connected() and self.vrm_loaded:
+        if self.unity_bridge.can_send() and self.vrm_loaded:
             self.unity_bridge.set_auto_blink(False)
             self.unity_bridge.set_auto_head_movement(True, 3.0, 7.0, 5.0)
         
@@ -912,7 +1028,7 @@ class MainWindow(QMainWindow):
         logger.info(f"Auto-blink {'enabled' if enabled else 'disabled'}")
         
         # Send command to Unity only if connected AND VRM is loaded
-        if self.unity_bridge.is_connected() and self.vrm_loaded:
+        if self.unity_bridge.can_send() and self.vrm_loaded:
             self.unity_bridge.set_auto_blink(enabled)
             logger.debug(f"Sent auto_blink command: {enabled}")
         elif not self.vrm_loaded:
@@ -935,7 +1051,7 @@ class MainWindow(QMainWindow):
         logger.info(f"Auto head movement {'enabled' if enabled else 'disabled'}")
         
         # Send command to Unity only if connected AND VRM is loaded
-        if self.unity_bridge.is_connected() and self.vrm_loaded:
+        if self.unity_bridge.can_send() and self.vrm_loaded:
             # Get current parameter values from sliders
             min_interval = 3.0  # Fixed minimum
             max_interval = self.head_freq_slider.value() / 10.0
@@ -967,7 +1083,7 @@ class MainWindow(QMainWindow):
         logger.debug(f"Updated head movement {param_type} to {value:.1f}")
         
         # Send updated parameters to Unity if enabled and connected
-        if (self.unity_bridge.is_connected() and 
+        if (self.unity_bridge.can_send() and 
             self.vrm_loaded and 
             self.auto_head_movement_checkbox.isChecked()):
             
@@ -1017,35 +1133,125 @@ class MainWindow(QMainWindow):
             logger.error("Failed to connect to Unity")
     
     def load_ai_model(self):
-        """Load AI/LLM model (ChatEngine + EmotionAnalyzer)."""
+        """Load AI/LLM model (ChatEngine + EmotionAnalyzer) in the background.
+        
+        The model is loaded on a worker thread so the window stays responsive;
+        progress and the outcome come back through the ai_load_* signals.
+        """
+        if self.ai_load_thread is not None and self.ai_load_thread.is_alive():
+            return
+        
+        # Show loading state (busy indicator until llama.cpp reports progress)
+        self.ai_status_label.setText("⏳ Chargement du modèle IA...")
+        self.ai_status_label.setStyleSheet("font-size: 13px; padding: 5px;")
+        self.load_ai_btn.setEnabled(False)
+        self.ai_progress_bar.setRange(0, 0)
+        self.ai_progress_bar.setVisible(True)
+        self.cancel_ai_btn.setEnabled(True)
+        self.cancel_ai_btn.setVisible(True)
+        
+        self.ai_load_cancel = threading.Event()
+        self.ai_load_thread = threading.Thread(
+            target=self._load_ai_worker,
+            args=(self.ai_load_cancel,),
+            name="ai-model-loader",
+            daemon=True
+        )
+        self.ai_load_thread.start()
+    
+    def _load_ai_worker(self, cancel_event: threading.Event):
+        """Load the AI components (runs on the loader thread).
+        
+        Args:
+            cancel_event: Set to abort the model load
+        """
+        from ..ai.chat_engine import get_chat_engine
+        from ..ai.emotion_analyzer import get_emotion_analyzer
+        from ..ai.model_manager import ModelLoadCancelled
+        
+        last_percent = -1
+        
+        def report_progress(value: float):
+            nonlocal last_percent
+            # llama.cpp reports once per tensor: only forward visible changes
+            percent = int(value * 100)
+            if percent != last_percent:
+                last_percent = percent
+                self.ai_load_progress.emit(percent)
+        
         try:
-            # Show loading message
-            self.ai_status_label.setText("⏳ Chargement du modèle IA...")
-            self.load_ai_btn.setEnabled(False)
-            QApplication.processEvents()  # Update UI
-            
             logger.info("Loading AI components...")
             
-            # Try to import and initialize AI components
-            from src.ai.chat_engine import get_chat_engine
-            from src.ai.emotion_analyzer import get_emotion_analyzer
-            
-            # Get instances
-            self.chat_engine = get_chat_engine()
-            self.emotion_analyzer = get_emotion_analyzer()
+            emotion_analyzer = get_emotion_analyzer()
+            chat_engine = get_chat_engine(emotion_analyzer=emotion_analyzer)
             
             # IMPORTANT: Load the LLM model into VRAM/RAM
             logger.info("Loading LLM model into GPU/CPU...")
-            self.ai_status_label.setText("⏳ Chargement du modèle sur GPU...")
-            QApplication.processEvents()  # Update UI
-            
-            if not self.chat_engine.model_manager.load_model():
+            if not chat_engine.model_manager.load_model(
+                progress_callback=report_progress,
+                cancel_event=cancel_event
+            ):
                 raise RuntimeError("Échec du chargement du modèle LLM")
             
+            self.emotion_analyzer = emotion_analyzer
+            self.chat_engine = chat_engine
+            self.ai_load_finished.emit("loaded", "")
+            
+        except ModelLoadCancelled:
+            logger.info("AI model loading cancelled")
+            self.ai_load_finished.emit("cancelled", "")
+            
+        except ImportError as e:
+            logger.error(f"ImportError loading AI: {e}")
+            self.ai_load_finished.emit("missing_dependency", str(e))
+            
+        except Exception as e:
+            logger.error(f"Error loading AI: {e}")
+            self.ai_load_finished.emit("error", str(e))
+    
+    def on_ai_load_progress(self, percent: int):
+        """Show the model loading progress.
+        
+        Args:
+            percent: Loading progress (0-100)
+        """
+        if self.ai_load_cancel is not None and self.ai_load_cancel.is_set():
+            return
+        
+        self.ai_progress_bar.setRange(0, 100)
+        self.ai_progress_bar.setValue(percent)
+        self.ai_status_label.setText(f"⏳ Chargement du modèle... {percent}%")
+    
+    def cancel_ai_load(self):
+        """Abort the model load in progress."""
+        if self.ai_load_cancel is None:
+            return
+        
+        logger.info("Cancelling AI model loading...")
+        self.ai_load_cancel.set()
+        self.cancel_ai_btn.setEnabled(False)
+        self.ai_status_label.setText("⏹️ Annulation du chargement...")
+    
+    def on_ai_load_finished(self, outcome: str, details: str):
+        """Update the UI once the loader thread is done.
+        
+        Args:
+            outcome: "loaded", "cancelled", "missing_dependency" or "error"
+            details: Error message (empty unless the load failed)
+        """
+        self.ensure_tabs()
+        self.ai_load_thread = None
+        self.ai_load_cancel = None
+        self.ai_progress_bar.setVisible(False)
+        self.cancel_ai_btn.setVisible(False)
+        
+        if outcome == "loaded":
             self.ai_available = True
             
-            # Update UI
-            self.ai_status_label.setText("✅ IA chargée : Zephyr-7B prêt")
+            # Update UI (with the load time measured by ModelManager)
+            load_stats = self.chat_engine.model_manager.load_stats
+            load_time = f" ({load_stats['total_ms'] / 1000:.1f} s)" if load_stats else ""
+            self.ai_status_label.setText(f"✅ IA chargée : Zephyr-7B prêt{load_time}")
             self.ai_status_label.setStyleSheet("font-size: 13px; padding: 5px; color: #4CAF50;")
             self.load_ai_btn.setEnabled(False)
             self.unload_ai_btn.setEnabled(True)
@@ -1064,43 +1270,44 @@ class MainWindow(QMainWindow):
                 "✅ Modèle IA chargé avec succès ! Vous pouvez maintenant discuter avec Kira.", 
                 "#4CAF50"
             )
+            return
             
-        except ImportError as e:
+        self.load_ai_btn.setEnabled(True)
+        
+        if outcome == "cancelled":
+            self.ai_status_label.setText("Statut IA : Chargement annulé")
+            self.ai_status_label.setStyleSheet("font-size: 13px; padding: 5px;")
+            return
+        
+        if outcome == "missing_dependency":
             error_msg = (
                 "❌ Impossible de charger l'IA : llama-cpp-python n'est pas installé.\n\n"
                 "Pour installer :\n"
                 "pip install llama-cpp-python\n\n"
-                f"Détails : {str(e)}"
+                f"Détails : {details}"
             )
             self.ai_status_label.setText("❌ IA non disponible")
-            self.ai_status_label.setStyleSheet("font-size: 13px; padding: 5px; color: #f44336;")
-            self.load_ai_btn.setEnabled(True)
-            logger.error(f"ImportError loading AI: {e}")
-            
-            # Show error dialog
-            from PySide6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, "Erreur de chargement IA", error_msg)
-            
-        except Exception as e:
-            error_msg = f"❌ Erreur lors du chargement de l'IA : {str(e)}"
+        else:
+            error_msg = f"❌ Erreur lors du chargement de l'IA : {details}"
             self.ai_status_label.setText("❌ Erreur de chargement")
-            self.ai_status_label.setStyleSheet("font-size: 13px; padding: 5px; color: #f44336;")
-            self.load_ai_btn.setEnabled(True)
-            logger.error(f"Error loading AI: {e}")
             
-            # Show error dialog
-            from PySide6.QtWidgets import QMessageBox
-            QMessageBox.critical(self, "Erreur de chargement IA", error_msg)
+        self.ai_status_label.setStyleSheet("font-size: 13px; padding: 5px; color: #f44336;")
+            
+        # Show error dialog
+        QMessageBox.critical(self, "Erreur de chargement IA", error_msg)
     
     def unload_ai_model(self):
         """Unload AI/LLM model to free memory."""
+        self.ensure_tabs()
         try:
             logger.info("Unloading AI components...")
             
-            # Unload LLM model from VRAM/RAM first
+            # Unload LLM model from VRAM/RAM first (or suspend it, see ai.suspend_on_unload)
+            suspended = False
             if self.chat_engine and self.chat_engine.model_manager:
                 logger.info("Unloading LLM model from GPU/CPU...")
                 self.chat_engine.model_manager.unload_model()
+                suspended = self.chat_engine.model_manager.is_suspended
             
             # Clear references
             self.chat_engine = None
@@ -1108,7 +1315,9 @@ class MainWindow(QMainWindow):
             self.ai_available = False
             
             # Update UI
-            self.ai_status_label.setText("Statut IA : Non chargé")
+            self.ai_status_label.setText(
+                "Statut IA : En veille 💤" if suspended else "Statut IA : Non chargé"
+            )
             self.ai_status_label.setStyleSheet("font-size: 13px; padding: 5px;")
             self.load_ai_btn.setEnabled(True)
             self.unload_ai_btn.setEnabled(False)
@@ -1122,17 +1331,21 @@ class MainWindow(QMainWindow):
             logger.info("✅ AI components unloaded successfully!")
             
             # Show info message
-            self.append_chat_message(
-                "Système", 
-                "ℹ️ Modèle IA déchargé. Cliquez sur 'Charger IA' pour le recharger.", 
-                "#FF9800"
-            )
+            if suspended:
+                message = (
+                    "ℹ️ Modèle IA en veille (poids conservés). "
+                    "Cliquez sur 'Charger IA' pour le relancer en quelques secondes."
+                )
+            else:
+                message = "ℹ️ Modèle IA déchargé. Cliquez sur 'Charger IA' pour le recharger."
+            self.append_chat_message("Système", message, "#FF9800")
             
         except Exception as e:
             logger.error(f"Error unloading AI: {e}")
             
     def toggle_vrm_model(self):
         """Toggle between loading and unloading VRM model."""
+        self.ensure_tabs()
         if not self.vrm_loaded:
             # Load default VRM model
             default_model = self.config.get("avatar.default_model")
@@ -1288,7 +1501,12 @@ class MainWindow(QMainWindow):
     def update_status(self):
         """Update connection status."""
         if self.unity_bridge.is_connected():
-            self.status_label.setText("Statut Unity : Connecté ✓")
+            rtt = self.unity_bridge.get_stats()['rtt_ms']
+            latency = f" ({rtt:.0f} ms)" if rtt is not None else ""
+            self.status_label.setText(f"Statut Unity : Connecté ✓{latency}")
+        elif self.unity_bridge.is_reconnecting():
+            # Commands are buffered and the avatar state replayed once Unity is back
+            self.status_label.setText("Statut Unity : Reconnexion... ⟳")
         else:
             if self.connect_btn.isEnabled() == False:
                 self.status_label.setText("Statut Unity : Déconnecté ✗")
@@ -1316,8 +1534,19 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Handle window close event."""
         logger.info("Application closing...")
+        
+        # Abort a model load in progress so llama.cpp frees what it allocated
+        if self.ai_load_thread is not None and self.ai_load_thread.is_alive():
+            self.ai_load_cancel.set()
+            self.ai_load_thread.join(timeout=self.AI_LOAD_JOIN_TIMEOUT)
+        
         self.unity_bridge.disconnect()
         self.config.save()
+        
+        # Flush pending chat history (write-behind) and close SQLite connections
+        from ..ai.memory import close_memory
+        close_memory()
+        
         event.accept()
 
 
@@ -1330,11 +1559,15 @@ class DesktopMateApp:
         Args:
             argv: Command line arguments
         """
-        self.app = QApplication(argv)
-        self.app.setApplicationName("Desktop-Mate")
-        self.app.setOrganizationName("Xyon15")
+        profiler = get_startup_profiler()
+        
+        with profiler.step("QApplication"):
+            self.app = QApplication(argv)
+            self.app.setApplicationName("Desktop-Mate")
+            self.app.setOrganizationName("Xyon15")
         
-        self.main_window = MainWindow()
+        with profiler.step("MainWindow"):
+            self.main_window = MainWindow()
         
     def run(self):
         """Run the application.
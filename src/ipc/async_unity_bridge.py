@@ -0,0 +1,749 @@
+"""
+Async Unity Bridge - asyncio client for the Unity IPC server.
+
+Same commands, wire protocols and coalescing as UnityBridge, for code that
+runs on an asyncio event loop (e.g. the Discord bot) and must never block it:
+- the connection is opened with asyncio.open_connection (bounded by
+  `connect_timeout`, other coroutines keep running meanwhile)
+- a writer task flushes queued commands in batches and awaits drain(): when
+  Unity stops reading, commands keep coalescing and callers wait at most
+  `send_timeout` for room in the queue (backpressure) instead of stalling
+- a reader task replaces the receive thread and routes Unity's replies to
+  the futures of `request()`
+
+Lost connections are re-established in the background with exponential
+backoff; commands queued meanwhile are sent once reconnected. Heartbeats and
+avatar state replay are left to the desktop UnityBridge.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from src.ipc.unity_bridge import (
+    CODECS, PROTOCOL_BINARY, PROTOCOL_JSON, BINARY_PROTOCOL_VERSION, MAX_AWAITING_REPLIES,
+    CommandDroppedError, LatencyHistogram, ReceiveBuffer, UnityBridge, UnityReply, _coalesce_key
+)
+
+logger = logging.getLogger(__name__)
+
+# Bytes requested per StreamReader.read()
+READ_SIZE = 65536
+
+
+def _resolve(futures: List[asyncio.Future], result: Any = None, error: Optional[BaseException] = None):
+    """Resolve futures, skipping those already cancelled (e.g. by wait_for).
+    
+    Args:
+        futures: Futures to resolve
+        result: Result to set (if no error)
+        error: Exception to set instead of a result
+    """
+    for future in futures:
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+class AsyncUnityBridge:
+    """Asyncio counterpart of UnityBridge (single event loop, no threads)."""
+    
+    DEFAULT_CONNECT_TIMEOUT = 5.0
+    DEFAULT_SEND_TIMEOUT = 1.0
+    
+    def __init__(
+        self,
+        host: str = UnityBridge.DEFAULT_HOST,
+        port: int = UnityBridge.DEFAULT_PORT,
+        max_rate_hz: float = UnityBridge.DEFAULT_MAX_RATE_HZ,
+        max_pending: int = UnityBridge.DEFAULT_MAX_PENDING,
+        protocol: str = PROTOCOL_JSON,
+        handshake_timeout: float = UnityBridge.DEFAULT_HANDSHAKE_TIMEOUT,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        send_timeout: float = DEFAULT_SEND_TIMEOUT,
+        auto_reconnect: bool = True,
+        reconnect_min_delay: float = UnityBridge.DEFAULT_RECONNECT_MIN_DELAY,
+        reconnect_max_delay: float = UnityBridge.DEFAULT_RECONNECT_MAX_DELAY
+    ):
+        """Initialize the async Unity bridge.
+        
+        Args:
+            host: Host address of the Unity server
+            port: Port of the Unity server
+            max_rate_hz: Maximum number of batched writes per second (frame budget)
+            max_pending: Maximum number of queued commands (callers wait for room)
+            protocol: Requested wire protocol ("json" or "binary")
+            handshake_timeout: Seconds to wait for Unity to accept the binary protocol
+            connect_timeout: Seconds to wait for the TCP connection
+            send_timeout: Seconds a command waits for room in a full queue
+                before being rejected
+            auto_reconnect: Retry a failed or lost connection in the background
+                until disconnect()
+            reconnect_min_delay: First reconnection delay in seconds (doubled
+                after each failure)
+            reconnect_max_delay: Maximum reconnection delay in seconds
+        
+        Raises:
+            ValueError: If the protocol is unknown
+        """
+        if protocol not in CODECS:
+            raise ValueError(f"Unknown protocol '{protocol}' (expected one of {sorted(CODECS)})")
+        
+        self.host = host
+        self.port = port
+        self.connected = False
+        self.protocol = protocol
+        self.handshake_timeout = handshake_timeout
+        self.connect_timeout = connect_timeout
+        self.codec = CODECS[PROTOCOL_JSON]
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        
+        # Outbound queue: {coalescing key: (command, data)}, in send order
+        self.min_send_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self._pending: OrderedDict = OrderedDict()
+        self._cond = asyncio.Condition()
+        self._sequence = 0  # Unique keys for commands that are never coalesced
+        self._writing = False
+        
+        # Replies: futures of queued commands {coalescing key: [Future]}, sent
+        # commands {message id: (command, write time, [Future])}, latencies per command
+        self._message_id = 0
+        self._waiters: Dict[Hashable, List[asyncio.Future]] = {}
+        self._awaiting: OrderedDict = OrderedDict()
+        self._latency: Dict[str, LatencyHistogram] = {}
+        
+        # Reconnection with backoff
+        self.auto_reconnect = auto_reconnect
+        self.reconnect_min_delay = reconnect_min_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self._supervising = False
+        self._supervisor_task: Optional[asyncio.Task] = None
+        self._lost = asyncio.Event()
+        
+        # Statistics
+        self.commands_queued = 0
+        self.commands_sent = 0
+        self.commands_coalesced = 0
+        self.commands_rejected = 0
+        self.batches_sent = 0
+        self.replies_received = 0
+        self.reconnects = 0
+    
+    async def connect(self) -> bool:
+        """Connect to Unity without blocking the event loop.
+        
+        With protocol="binary", the binary frames are negotiated first and
+        the bridge falls back to JSON if Unity does not accept them. With
+        auto_reconnect, a failed or lost connection is retried in the
+        background until disconnect().
+        
+        Returns:
+            True if connected now, False otherwise
+        """
+        if self._supervising:
+            # The supervisor already owns the connection (connected or reconnecting)
+            return self.connected
+        if self.connected:
+            return True
+        
+        connected = await self._open()
+        
+        if self.auto_reconnect and not self._supervising:
+            self._supervising = True
+            if not connected:
+                self._lost.set()
+            self._supervisor_task = asyncio.create_task(self._supervise())
+        
+        return connected
+    
+    async def _open(self) -> bool:
+        """Open the connection, negotiate the protocol and start the reader/writer tasks.
+        
+        Returns:
+            True if connection successful, False otherwise
+        """
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.error(f"Failed to connect to Unity: {e or 'timeout'}")
+            return False
+        
+        buffer = ReceiveBuffer()
+        codec = CODECS[PROTOCOL_JSON]
+        
+        try:
+            if self.protocol == PROTOCOL_BINARY:
+                codec = CODECS[await self._negotiate_protocol(reader, writer, buffer)]
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to connect to Unity: {e}")
+            writer.close()
+            return False
+        
+        self._reader, self._writer, self.codec = reader, writer, codec
+        self.connected = True
+        self._lost.clear()
+        self._reader_task = asyncio.create_task(self._read_loop(reader, writer, buffer))
+        self._writer_task = asyncio.create_task(self._write_loop(writer))
+        
+        logger.info(f"Connected to Unity at {self.host}:{self.port} ({codec.name} protocol, asyncio)")
+        return True
+    
+    async def _negotiate_protocol(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, buffer: ReceiveBuffer
+    ) -> str:
+        """Ask Unity to switch to binary frames (see UnityBridge._negotiate_protocol).
+        
+        Args:
+            reader: Stream of the fresh connection
+            writer: Stream of the fresh connection
+            buffer: Receive buffer of this connection (keeps bytes received
+                after the answer)
+        
+        Returns:
+            Negotiated protocol name
+        
+        Raises:
+            ConnectionError: If Unity closes the connection during the handshake
+        """
+        loop = asyncio.get_running_loop()
+        codec = CODECS[PROTOCOL_JSON]
+        writer.write(codec.encode("negotiate_protocol", {
+            "protocol": PROTOCOL_BINARY,
+            "version": BINARY_PROTOCOL_VERSION
+        }))
+        await writer.drain()
+        deadline = loop.time() + self.handshake_timeout
+        
+        while True:
+            # One message at a time: bytes after the answer are binary frames
+            for message in buffer.consume(codec, max_messages=1):
+                if message.get("command") != "negotiate_protocol":
+                    self._handle_message(message)
+                elif message.get("status") == "success" and message.get("protocol") == PROTOCOL_BINARY:
+                    return PROTOCOL_BINARY
+                else:
+                    logger.warning(f"Unity refused the binary protocol, using JSON: {message.get('message')}")
+                    return PROTOCOL_JSON
+                break
+            else:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    logger.warning("Unity did not answer the protocol negotiation, using JSON")
+                    return PROTOCOL_JSON
+                
+                try:
+                    data = await asyncio.wait_for(reader.read(READ_SIZE), remaining)
+                except asyncio.TimeoutError:
+                    continue
+                if not data:
+                    raise ConnectionError("Unity closed the connection during the handshake")
+                buffer.feed(data)
+    
+    async def disconnect(self, flush_timeout: float = 0.5):
+        """Close the connection to Unity (and stop reconnecting).
+        
+        Args:
+            flush_timeout: Seconds to wait for queued commands to be written
+        """
+        flushed = self.connected and await self.flush(flush_timeout)
+        
+        self._supervising = False
+        self.connected = False
+        writer, self._writer, self._reader = self._writer, None, None
+        
+        for task in (self._supervisor_task, self._reader_task, self._writer_task):
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+        
+        unanswered = [future for futures in self._waiters.values() for future in futures]
+        unanswered.extend(future for _, _, futures in self._awaiting.values() for future in futures)
+        self._pending.clear()
+        self._waiters.clear()
+        self._awaiting.clear()
+        _resolve(unanswered, error=ConnectionError("Disconnected from Unity"))
+        
+        if writer is not None:
+            if not flushed:
+                # Unity is not reading: closing gracefully would wait for the unsent bytes
+                writer.transport.abort()
+            writer.close()
+            try:
+                await asyncio.wait_for(writer.wait_closed(), flush_timeout)
+            except (OSError, asyncio.TimeoutError):
+                pass
+        
+        logger.info("Disconnected from Unity")
+    
+    def is_connected(self) -> bool:
+        """Check if connected to Unity.
+        
+        Returns:
+            True if connected, False otherwise
+        """
+        return self.connected
+    
+    def is_reconnecting(self) -> bool:
+        """Check if the connection is being (re-)established in the background.
+        
+        Returns:
+            True while reconnecting, False otherwise
+        """
+        return self._supervising and not self.connected
+    
+    def can_send(self) -> bool:
+        """Check if commands are accepted (sent now, or once reconnected).
+        
+        Returns:
+            True if connected or reconnecting, False otherwise
+        """
+        return self.connected or self.is_reconnecting()
+    
+    async def send_command(self, command: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue a command for Unity.
+        
+        A pending command for the same target (same expression name,
+        transition speed...) is replaced by this one; `reset_expressions`
+        also drops pending expression changes. If the queue is full (Unity
+        not reading), waits at most `send_timeout` for room.
+        
+        Args:
+            command: Command name
+            data: Optional command data
+        
+        Returns:
+            True if queued, False if not connected (nor reconnecting) or
+            the queue stayed full
+        """
+        return await self._queue(command, data, None)
+    
+    async def request(
+        self, command: str, data: Optional[Dict[str, Any]] = None,
+        timeout: float = UnityBridge.DEFAULT_REQUEST_TIMEOUT
+    ) -> UnityReply:
+        """Send a command and await Unity's reply.
+        
+        Args:
+            command: Command name
+            data: Optional command data
+            timeout: Maximum seconds to wait for the reply
+        
+        Returns:
+            Unity's reply (check `ok` for the status)
+        
+        Raises:
+            TimeoutError: If Unity did not answer within `timeout`
+            ConnectionError: If not connected, or the connection was lost
+            CommandDroppedError: If the queue stayed full for `send_timeout`
+        """
+        future = asyncio.get_running_loop().create_future()
+        
+        if not await self._queue(command, data, future):
+            if not self.can_send():
+                raise ConnectionError("Not connected to Unity")
+            raise CommandDroppedError("Command dropped: Unity command queue full")
+        
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No reply from Unity to '{command}' within {timeout}s") from None
+    
+    async def _queue(
+        self, command: str, data: Optional[Dict[str, Any]], future: Optional[asyncio.Future]
+    ) -> bool:
+        """Enqueue a command, waiting for room if the queue is full (backpressure).
+        
+        Args:
+            command: Command name
+            data: Optional command data
+            future: Resolved with Unity's reply (None if nobody waits for it)
+        
+        Returns:
+            True if queued, False if not connected (nor reconnecting) or
+            the queue stayed full for `send_timeout`
+        """
+        if not self.can_send():
+            logger.warning("Cannot send command: not connected to Unity")
+            return False
+        
+        data = data or {}
+        key = _coalesce_key(command, data)
+        
+        async with self._cond:
+            # Replacing a pending command needs no room
+            if key is None or key not in self._pending:
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(
+                            lambda: len(self._pending) < self.max_pending or key in self._pending
+                        ),
+                        self.send_timeout
+                    )
+                except asyncio.TimeoutError:
+                    self.commands_rejected += 1
+                    logger.warning(f"Unity command queue full, '{command}' dropped")
+                    return False
+            
+            self._enqueue(command, data, key, future)
+            self.commands_queued += 1
+            self._cond.notify_all()
+        
+        logger.debug(f"Queued command for Unity: {command}")
+        return True
+    
+    def _enqueue(
+        self, command: str, data: Dict[str, Any], key: Optional[Hashable],
+        future: Optional[asyncio.Future]
+    ):
+        """Add a command to the outbound queue (caller holds `_cond`).
+        
+        Futures of superseded commands move to the command replacing them.
+        
+        Args:
+            command: Command name
+            data: Command data
+            key: Coalescing key (None for commands that are never coalesced)
+            future: Resolved with Unity's reply (None if nobody waits for it)
+        """
+        waiters = [future] if future is not None else []
+        
+        if command == "reset_expressions":
+            superseded = [k for k in self._pending if k and k[0] == "set_expression"]
+            for pending_key in superseded:
+                del self._pending[pending_key]
+                waiters.extend(self._waiters.pop(pending_key, ()))
+            self.commands_coalesced += len(superseded)
+        
+        if key is None:
+            self._sequence += 1
+            key = ("#", self._sequence)
+        elif key in self._pending:
+            # Superseded: drop the old value, send the new one in order
+            del self._pending[key]
+            self.commands_coalesced += 1
+        
+        self._pending[key] = (command, data)
+        if waiters:
+            self._waiters.setdefault(key, []).extend(waiters)
+    
+    async def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until every queued command has been written and drained.
+        
+        Args:
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            True if the queue was drained, False on timeout
+        """
+        async with self._cond:
+            try:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: not self._pending and not self._writing), timeout
+                )
+            except asyncio.TimeoutError:
+                return False
+        
+        return True
+    
+    async def _write_loop(self, writer: asyncio.StreamWriter):
+        """Writer task of one connection: one write (and drain) per batch.
+        
+        Args:
+            writer: Stream of this connection
+        """
+        loop = asyncio.get_running_loop()
+        last_send = 0.0
+        
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: self._pending)
+            
+            # Frame budget: further commands keep coalescing meanwhile
+            delay = last_send + self.min_send_interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            async with self._cond:
+                batch = [
+                    (command, data, self._waiters.pop(key, None))
+                    for key, (command, data) in self._pending.items()
+                ]
+                self._pending.clear()
+                self._writing = True
+                # Room in the queue for callers waiting on backpressure
+                self._cond.notify_all()
+            
+            try:
+                writer.write(self._encode_batch(batch))
+                # Backpressure: suspended (not blocking) while Unity is not reading
+                await writer.drain()
+                self.commands_sent += len(batch)
+                self.batches_sent += 1
+                logger.debug(f"Sent {len(batch)} command(s) to Unity")
+            
+            except OSError as e:
+                logger.error(f"Error sending commands to Unity: {e}")
+                _resolve(
+                    [future for _, _, futures in batch for future in futures or ()],
+                    error=ConnectionError("Unity connection lost")
+                )
+                self._connection_lost(writer)
+                return
+            
+            finally:
+                async with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+            
+            last_send = loop.time()
+    
+    def _encode_batch(self, batch) -> bytes:
+        """Serialize a batch, registering the commands that await a reply.
+        
+        Commands get a message id unless they are unacknowledged struct
+        frames nobody waits for (see UnityBridge._write_batch).
+        
+        Args:
+            batch: List of (command, data, futures or None) tuples
+        
+        Returns:
+            Bytes to write
+        """
+        codec = self.codec
+        now = time.monotonic()
+        frames = []
+        
+        for command, data, futures in batch:
+            message_id = None
+            if futures or command not in codec.unacknowledged:
+                self._message_id += 1
+                message_id = self._message_id
+                self._awaiting[message_id] = (command, now, futures or [])
+            frames.append(codec.encode(command, data, message_id))
+        
+        expired = []
+        while len(self._awaiting) > MAX_AWAITING_REPLIES:
+            expired.extend(self._awaiting.popitem(last=False)[1][2])
+        _resolve(expired, error=TimeoutError("No reply from Unity"))
+        
+        return b"".join(frames)
+    
+    async def _read_loop(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, buffer: ReceiveBuffer
+    ):
+        """Reader task of one connection.
+        
+        Args:
+            reader: Stream of this connection
+            writer: Stream of this connection (identifies it once lost)
+            buffer: Receive buffer of this connection
+        """
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    logger.warning("Unity connection closed")
+                    break
+                
+                buffer.feed(data)
+                for message in buffer.consume(self.codec):
+                    self._handle_message(message)
+        
+        except (OSError, ValueError) as e:
+            logger.error(f"Error receiving from Unity: {e}")
+        
+        self._connection_lost(writer)
+    
+    def _handle_message(self, message: Dict[str, Any]):
+        """Route a reply to the futures of its command and record its latency.
+        
+        Args:
+            message: Decoded message
+        """
+        logger.debug(f"Received from Unity: {message}")
+        
+        # Replies echo the id of their command (0 or missing: unsolicited message)
+        entry = self._awaiting.pop(message.get("id") or None, None)
+        if entry is None:
+            return
+        
+        command, sent_at, futures = entry
+        latency_ms = (time.monotonic() - sent_at) * 1000
+        self._latency.setdefault(command, LatencyHistogram()).record(latency_ms)
+        self.replies_received += 1
+        
+        _resolve(futures, UnityReply(
+            command=command,
+            status=message.get("status") or "success",
+            message=message.get("message") or "",
+            latency_ms=latency_ms
+        ))
+    
+    def _connection_lost(self, writer: asyncio.StreamWriter):
+        """Mark a connection as dead, stop its tasks and wake the supervisor.
+        
+        Args:
+            writer: Stream of the lost connection (ignored if already replaced)
+        """
+        if self._writer is not writer:
+            return
+        
+        self.connected = False
+        self._writer = self._reader = None
+        writer.close()
+        
+        for task in (self._reader_task, self._writer_task):
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+        
+        # Replies to the commands written on this connection will never come
+        unanswered = [future for _, _, futures in self._awaiting.values() for future in futures]
+        self._awaiting.clear()
+        _resolve(unanswered, error=ConnectionError("Unity connection lost"))
+        
+        if self._supervising:
+            logger.warning("Unity connection lost, reconnecting...")
+        self._lost.set()
+    
+    async def _supervise(self):
+        """Background task: reconnect with exponential backoff whenever the connection is lost."""
+        delay = self.reconnect_min_delay
+        
+        while self._supervising:
+            await self._lost.wait()
+            
+            logger.info(f"Reconnecting to Unity in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            
+            if await self._open():
+                self.reconnects += 1
+                delay = self.reconnect_min_delay
+            else:
+                delay = min(delay * 2, self.reconnect_max_delay)
+    
+    def get_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the reply latency histogram of each command.
+        
+        Returns:
+            {command: LatencyHistogram.to_dict()}, slowest average first
+        """
+        stats = {command: histogram.to_dict() for command, histogram in self._latency.items()}
+        return dict(sorted(stats.items(), key=lambda item: -item[1]['avg_ms']))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get outbound queue statistics.
+        
+        Returns:
+            Dictionary with queued/sent/coalesced/rejected counters,
+            reconnection count and the number of replies received / awaited
+        """
+        return {
+            'connected': self.connected,
+            'reconnecting': self.is_reconnecting(),
+            'reconnects': self.reconnects,
+            'protocol': self.codec.name,
+            'pending': len(self._pending),
+            'queued': self.commands_queued,
+            'sent': self.commands_sent,
+            'coalesced': self.commands_coalesced,
+            'rejected': self.commands_rejected,
+            'batches': self.batches_sent,
+            'replies': self.replies_received,
+            'awaiting': len(self._awaiting),
+            'max_rate_hz': 1.0 / self.min_send_interval if self.min_send_interval else None
+        }
+    
+    # === VRM Control Methods ===
+    
+    async def load_vrm_model(self, model_path: str) -> bool:
+        """Load a VRM model in Unity.
+        
+        Args:
+            model_path: Path to the VRM model file
+        
+        Returns:
+            True if command queued successfully, False otherwise
+        """
+        return await self.send_command("load_model", {"path": model_path})
+    
+    async def set_expression(self, expression_name: str, value: float) -> bool:
+        """Set a facial expression on the VRM avatar.
+        
+        Args:
+            expression_name: Name of the expression (e.g., "joy", "angry", "sorrow")
+            value: Expression intensity from 0.0 (0%) to 1.0 (100%)
+        
+        Returns:
+            True if command queued successfully, False otherwise
+        """
+        return await self.send_command("set_expression", {
+            "name": expression_name,
+            "value": max(0.0, min(1.0, value))
+        })
+    
+    async def reset_expressions(self) -> bool:
+        """Reset all facial expressions to neutral.
+        
+        Returns:
+            True if command queued successfully, False otherwise
+        """
+        return await self.send_command("reset_expressions", {})
+    
+    async def set_transition_speed(self, speed: float) -> bool:
+        """Set the transition speed for smooth expressions.
+        
+        Args:
+            speed: Transition speed from 0.1 (slow) to 10.0 (fast)
+        
+        Returns:
+            True if command queued successfully, False otherwise
+        """
+        return await self.send_command("set_transition_speed", {
+            "speed": max(0.1, min(10.0, speed))
+        })
+    
+    async def set_auto_blink(self, enabled: bool) -> bool:
+        """Enable or disable automatic eye blinking.
+        
+        Args:
+            enabled: True to enable automatic blinking, False to disable
+        
+        Returns:
+            True if command queued successfully, False otherwise
+        """
+        return await self.send_command("set_auto_blink", {
+            "enabled": enabled
+        })
+    
+    async def set_auto_head_movement(
+        self, enabled: bool, min_interval: float = 3.0,
+        max_interval: float = 7.0, max_angle: float = 5.0
+    ) -> bool:
+        """Enable or disable automatic head movements (see UnityBridge.set_auto_head_movement).
+        
+        Args:
+            enabled: True to enable automatic head movements, False to disable
+            min_interval: Minimum time (seconds) between movements
+            max_interval: Maximum time (seconds) between movements
+            max_angle: Maximum yaw rotation in degrees (pitch is half of it)
+        
+        Returns:
+            True if command queued successfully, False otherwise
+        """
+        return await self.send_command("set_auto_head_movement", {
+            "enabled": enabled,
+            "min_interval": min_interval,
+            "max_interval": max_interval,
+            "max_angle": max_angle
+        })
@@ -1,30 +1,584 @@
 """
 Unity Bridge - IPC communication with Unity application.
 Uses socket-based communication (can be upgraded to OSC later).
+
+Outbound commands go through a queue drained by a sender thread: callers
+(e.g. the Qt thread) never block on the socket. Commands that supersede a
+pending one for the same target (same expression, transition speed...) are
+coalesced, batches are flushed as one write at most `max_rate_hz` times
+per second.
+
+Two wire protocols are supported:
+- "json" (default): newline-delimited JSON, understood by every Unity build
+- "binary": length-prefixed frames negotiated at connect time; hot commands
+  (set_expression, set_auto_head_movement) use a fixed struct layout, the
+  others are JSON inside a frame. Falls back to JSON if Unity does not
+  acknowledge the negotiation.
+
+Inbound data is read with recv_into() into a reusable buffer and frames are
+parsed in place.
+
+Once connected, a supervisor thread pings Unity (RTT, liveness) and, if the
+connection drops (e.g. Unity restarts), reconnects with exponential backoff.
+Commands issued meanwhile stay queued, and the last known avatar state
+(model, expressions, auto-blink, head movement, transition speed) is replayed
+after reconnecting.
+
+Commands carry a message id that Unity echoes in its reply: `submit()`,
+`request()` and the `*_async()` methods return Unity's answer, and the
+round-trip time of every acknowledged command feeds a per-command latency
+histogram (see get_latency_stats()). Binary hot frames are not acknowledged
+unless the caller waits for the reply.
 """
 
+import asyncio
+import bisect
 import socket
 import json
 import logging
+import struct
 import threading
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, FrozenSet, Hashable, Iterable, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# State-setting commands: only the latest pending value matters
+COALESCED_COMMANDS = {
+    "set_transition_speed",
+    "set_auto_blink",
+    "set_auto_head_movement",
+}
+
+# Avatar state rebuilt after a reconnection (model first, then settings, then expressions)
+SETTING_COMMANDS = ("set_transition_speed", "set_auto_blink", "set_auto_head_movement")
+STATE_COMMANDS = {"load_model", "unload_model", "reset_expressions", "set_expression", *SETTING_COMMANDS}
+
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+BINARY_PROTOCOL_VERSION = 1
+
+# Binary frame: <u32 length (type + payload), little-endian><u8 frame type><payload>
+FRAME_HEADER = struct.Struct("<IB")
+FRAME_JSON = 0x01            # UTF-8 JSON object (any command, Unity responses)
+FRAME_SET_EXPRESSION = 0x02  # <f32 value><u8 name length><name UTF-8>
+FRAME_HEAD_MOVEMENT = 0x03   # <u8 enabled><f32 min_interval><f32 max_interval><f32 max_angle>
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+_EXPRESSION = struct.Struct("<fB")
+_HEAD_MOVEMENT = struct.Struct("<?fff")
+
+# Sent commands kept waiting for a reply (older ones expire first)
+MAX_AWAITING_REPLIES = 1024
+
+# Latency histogram bucket upper bounds, in milliseconds (last bucket: above)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class CommandDroppedError(RuntimeError):
+    """A queued command was discarded before being sent (queue overflow)."""
+
+
+@dataclass
+class UnityReply:
+    """Unity's reply to a command."""
+    command: str
+    status: str              # "success" or "error"
+    message: str = ""
+    latency_ms: float = 0.0  # From the write of the command to the reply
+    
+    @property
+    def ok(self) -> bool:
+        """True if Unity applied the command."""
+        return self.status == "success"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (constant memory, O(log buckets) record)."""
+    
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        """Initialize an empty histogram.
+        
+        Args:
+            bounds: Increasing bucket upper bounds in milliseconds
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def record(self, latency_ms: float):
+        """Add one sample.
+        
+        Args:
+            latency_ms: Latency in milliseconds
+        """
+        self.counts[bisect.bisect_left(self.bounds, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+    
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Estimate a percentile (upper bound of the bucket holding it).
+        
+        Args:
+            fraction: Percentile between 0 and 1 (e.g. 0.95)
+        
+        Returns:
+            Latency in milliseconds (at most the maximum seen), None if empty
+        """
+        if not self.count:
+            return None
+        
+        rank = max(1, int(fraction * self.count + 0.5))
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the histogram.
+        
+        Returns:
+            Dictionary with count, avg/p50/p95/p99/max in milliseconds and
+            the bucket counts ({"<=1": n, ..., ">5000": n})
+        """
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            'count': self.count,
+            'avg_ms': self.total_ms / self.count if self.count else None,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max_ms if self.count else None,
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+def _settle(futures: Iterable[Future], result: Any = None, error: Optional[BaseException] = None):
+    """Resolve futures, skipping those already cancelled by their caller.
+    
+    Args:
+        futures: Futures to resolve
+        result: Result to set (if no error)
+        error: Exception to set instead of a result
+    """
+    for future in futures:
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+
+def _coalesce_key(command: str, data: Dict[str, Any]) -> Optional[Hashable]:
+    """Return the target a command overwrites, or None if it must always be sent.
+    
+    Args:
+        command: Command name
+        data: Command data
+        
+    Returns:
+        Coalescing key, or None for commands that are never coalesced
+    """
+    if command == "set_expression":
+        return (command, data.get("name"))
+    if command in COALESCED_COMMANDS:
+        return (command,)
+    return None
+
+
+def _parse_json(raw: Union[bytes, bytearray]) -> Optional[Dict[str, Any]]:
+    """Parse one JSON message, logging (not raising) on malformed input.
+    
+    Args:
+        raw: UTF-8 encoded JSON
+    
+    Returns:
+        Decoded message, or None if it could not be parsed
+    """
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.error(f"Failed to parse Unity message: {e}")
+        return None
+
+
+def _command_message(command: str, data: Dict[str, Any], message_id: Optional[int]) -> Dict[str, Any]:
+    """Build the JSON object of a command.
+    
+    The id comes first: Unity's lightweight parser takes the first "id" key.
+    
+    Args:
+        command: Command name
+        data: Command data
+        message_id: Id echoed by Unity in its reply (None for none)
+    
+    Returns:
+        Command message
+    """
+    if message_id is None:
+        return {"command": command, "data": data}
+    return {"id": message_id, "command": command, "data": data}
+
+
+class JsonCodec:
+    """Newline-delimited JSON messages."""
+    
+    name = PROTOCOL_JSON
+    # Commands Unity does not acknowledge when sent without an id
+    unacknowledged: FrozenSet[str] = frozenset()
+    
+    def encode(self, command: str, data: Dict[str, Any], message_id: Optional[int] = None) -> bytes:
+        """Serialize a command.
+        
+        Args:
+            command: Command name
+            data: Command data
+            message_id: Id echoed by Unity in its reply (None for none)
+        
+        Returns:
+            Encoded message, newline included
+        """
+        return self.encode_message(_command_message(command, data, message_id))
+    
+    def encode_message(self, message: Dict[str, Any]) -> bytes:
+        """Serialize any JSON message (commands, responses).
+        
+        Args:
+            message: JSON-serializable object
+            
+        Returns:
+            Encoded message, newline included
+        """
+        return json.dumps(message).encode('utf-8') + b'\n'
+    
+    def decode(
+        self, buffer: bytearray, start: int, end: int, max_messages: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Decode the complete messages in buffer[start:end].
+        
+        Args:
+            buffer: Receive buffer
+            start: Offset of the first unread byte
+            end: Offset after the last received byte
+            max_messages: Stop after this many messages (None for all)
+        
+        Returns:
+            (decoded messages, offset of the first unconsumed byte)
+        """
+        messages: List[Dict[str, Any]] = []
+        
+        while max_messages is None or len(messages) < max_messages:
+            newline = buffer.find(b'\n', start, end)
+            if newline < 0:
+                break
+            
+            if newline > start:
+                message = _parse_json(buffer[start:newline])
+                if message is not None:
+                    messages.append(message)
+            start = newline + 1
+        
+        return messages, start
+
+
+class BinaryCodec:
+    """Length-prefixed binary frames with struct layouts for hot commands."""
+    
+    name = PROTOCOL_BINARY
+    # Commands Unity does not acknowledge when sent without an id (struct frames)
+    unacknowledged: FrozenSet[str] = frozenset({"set_expression", "set_auto_head_movement"})
+    
+    def encode(self, command: str, data: Dict[str, Any], message_id: Optional[int] = None) -> bytes:
+        """Serialize a command as one frame.
+        
+        Struct frames have no room for an id: a command that needs a reply
+        is sent as a JSON frame instead.
+        
+        Args:
+            command: Command name
+            data: Command data
+            message_id: Id echoed by Unity in its reply (None for none)
+        
+        Returns:
+            Encoded frame, header included
+        """
+        if message_id is not None:
+            return self.encode_message(_command_message(command, data, message_id))
+        
+        if command == "set_expression":
+            name = str(data.get("name", "")).encode('utf-8')
+            if len(name) <= 255:
+                payload = _EXPRESSION.pack(float(data.get("value", 0.0)), len(name)) + name
+                return FRAME_HEADER.pack(len(payload) + 1, FRAME_SET_EXPRESSION) + payload
+        
+        elif command == "set_auto_head_movement":
+            payload = _HEAD_MOVEMENT.pack(
+                bool(data.get("enabled", False)),
+                float(data.get("min_interval", 3.0)),
+                float(data.get("max_interval", 7.0)),
+                float(data.get("max_angle", 5.0))
+            )
+            return FRAME_HEADER.pack(len(payload) + 1, FRAME_HEAD_MOVEMENT) + payload
+        
+        return self.encode_message({"command": command, "data": data})
+    
+    def encode_message(self, message: Dict[str, Any]) -> bytes:
+        """Serialize any JSON message (commands, responses) as a FRAME_JSON frame.
+        
+        Args:
+            message: JSON-serializable object
+            
+        Returns:
+            Encoded frame, header included
+        """
+        payload = json.dumps(message).encode('utf-8')
+        return FRAME_HEADER.pack(len(payload) + 1, FRAME_JSON) + payload
+    
+    def decode(
+        self, buffer: bytearray, start: int, end: int, max_messages: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Decode the complete frames in buffer[start:end].
+        
+        Headers and struct payloads are unpacked in place; only JSON
+        payloads are copied out of the buffer.
+        
+        Args:
+            buffer: Receive buffer
+            start: Offset of the first unread byte
+            end: Offset after the last received byte
+            max_messages: Stop after this many messages (None for all)
+        
+        Returns:
+            (decoded messages, offset of the first unconsumed byte)
+        
+        Raises:
+            ValueError: If a frame header is invalid (stream out of sync)
+        """
+        messages: List[Dict[str, Any]] = []
+        
+        while max_messages is None or len(messages) < max_messages:
+            if end - start < FRAME_HEADER.size:
+                break
+            
+            length, frame_type = FRAME_HEADER.unpack_from(buffer, start)
+            if length < 1 or length > MAX_FRAME_SIZE:
+                raise ValueError(f"Invalid frame length: {length}")
+            
+            frame_end = start + 4 + length
+            if frame_end > end:
+                break
+            
+            message = self._decode_frame(frame_type, buffer, start + FRAME_HEADER.size, frame_end)
+            if message is not None:
+                messages.append(message)
+            start = frame_end
+        
+        return messages, start
+    
+    def _decode_frame(
+        self, frame_type: int, buffer: bytearray, offset: int, end: int
+    ) -> Optional[Dict[str, Any]]:
+        """Decode one frame payload located at buffer[offset:end].
+        
+        Args:
+            frame_type: Frame type byte
+            buffer: Receive buffer
+            offset: Offset of the payload
+            end: Offset after the payload
+        
+        Returns:
+            Decoded message, or None if it could not be parsed
+        
+        Raises:
+            ValueError: If the frame type is unknown or the payload truncated
+        """
+        try:
+            if frame_type == FRAME_JSON:
+                return _parse_json(buffer[offset:end])
+            
+            if frame_type == FRAME_SET_EXPRESSION:
+                value, name_length = _EXPRESSION.unpack_from(buffer, offset)
+                name_start = offset + _EXPRESSION.size
+                if name_start + name_length > end:
+                    raise ValueError("Truncated set_expression frame")
+                name = buffer[name_start:name_start + name_length].decode('utf-8')
+                return {"command": "set_expression", "data": {"name": name, "value": value}}
+            
+            if frame_type == FRAME_HEAD_MOVEMENT:
+                enabled, min_interval, max_interval, max_angle = _HEAD_MOVEMENT.unpack_from(
+                    buffer, offset
+                )
+                return {"command": "set_auto_head_movement", "data": {
+                    "enabled": enabled,
+                    "min_interval": min_interval,
+                    "max_interval": max_interval,
+                    "max_angle": max_angle
+                }}
+        
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid frame payload: {e}") from e
+        
+        raise ValueError(f"Unknown frame type: {frame_type}")
+
+
+CODECS: Dict[str, Union[JsonCodec, BinaryCodec]] = {
+    PROTOCOL_JSON: JsonCodec(),
+    PROTOCOL_BINARY: BinaryCodec(),
+}
+
+
+class ReceiveBuffer:
+    """Reusable receive buffer filled in place with recv_into().
+    
+    Complete messages are decoded straight from the buffer; the unread tail
+    is moved to the front only when the buffer is full, and the buffer
+    grows only for a single message larger than its capacity.
+    """
+    
+    def __init__(self, size: int = 65536):
+        """Initialize the buffer.
+        
+        Args:
+            size: Initial capacity in bytes
+        """
+        self.data = bytearray(size)
+        self.view = memoryview(self.data)
+        self.start = 0
+        self.end = 0
+    
+    def recv_from(self, sock: socket.socket) -> int:
+        """Read available bytes from a socket into the free space.
+        
+        Args:
+            sock: Connected socket
+        
+        Returns:
+            Number of bytes received (0 when the peer closed the connection)
+        
+        Raises:
+            ValueError: If a single message exceeds MAX_FRAME_SIZE
+        """
+        if self.end == len(self.data):
+            self._make_room()
+        
+        received = sock.recv_into(self.view[self.end:])
+        self.end += received
+        return received
+    
+    def feed(self, data: bytes):
+        """Append bytes read by other means (e.g. an asyncio StreamReader).
+        
+        Args:
+            data: Received bytes
+        
+        Raises:
+            ValueError: If a single message exceeds MAX_FRAME_SIZE
+        """
+        while len(self.data) - self.end < len(data):
+            self._make_room()
+        
+        self.data[self.end:self.end + len(data)] = data
+        self.end += len(data)
+    
+    def consume(self, codec, max_messages: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Decode and drop the complete messages currently buffered.
+        
+        Args:
+            codec: JsonCodec or BinaryCodec
+            max_messages: Stop after this many messages (None for all)
+        
+        Returns:
+            Decoded messages
+        """
+        messages, self.start = codec.decode(self.data, self.start, self.end, max_messages)
+        if self.start == self.end:
+            self.start = self.end = 0
+        return messages
+    
+    def _make_room(self):
+        """Move the unread tail to the front, or grow if it fills the buffer."""
+        pending = self.end - self.start
+        
+        if self.start == 0:
+            if len(self.data) >= MAX_FRAME_SIZE:
+                raise ValueError(f"Message larger than {MAX_FRAME_SIZE} bytes")
+            data = bytearray(len(self.data) * 2)
+            data[:pending] = self.data[:pending]
+            self.view.release()
+            self.data, self.view = data, memoryview(data)
+        else:
+            self.data[:pending] = self.data[self.start:self.end]
+        
+        self.start, self.end = 0, pending
+
 
 class UnityBridge:
     """Manages communication between Python and Unity via sockets."""
     
     DEFAULT_HOST = "127.0.0.1"
     DEFAULT_PORT = 5555
+    DEFAULT_MAX_RATE_HZ = 60.0
+    DEFAULT_MAX_PENDING = 1024
+    DEFAULT_HANDSHAKE_TIMEOUT = 1.0
+    DEFAULT_HEARTBEAT_INTERVAL = 2.0
+    DEFAULT_HEARTBEAT_TIMEOUT = 10.0
+    DEFAULT_RECONNECT_MIN_DELAY = 0.5
+    DEFAULT_RECONNECT_MAX_DELAY = 30.0
+    DEFAULT_REPLAY_DELAY = 2.5
+    DEFAULT_REQUEST_TIMEOUT = 5.0
     
-    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_rate_hz: float = DEFAULT_MAX_RATE_HZ,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        protocol: str = PROTOCOL_JSON,
+        handshake_timeout: float = DEFAULT_HANDSHAKE_TIMEOUT,
+        auto_reconnect: bool = True,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        heartbeat_timeout: float = DEFAULT_HEARTBEAT_TIMEOUT,
+        reconnect_min_delay: float = DEFAULT_RECONNECT_MIN_DELAY,
+        reconnect_max_delay: float = DEFAULT_RECONNECT_MAX_DELAY,
+        replay_delay: float = DEFAULT_REPLAY_DELAY
+    ):
         """Initialize Unity bridge.
         
         Args:
             host: Host address for socket connection
             port: Port number for socket connection
+            max_rate_hz: Maximum number of batched writes per second (frame budget)
+            max_pending: Maximum number of queued commands (oldest dropped first),
+                also bounds the commands buffered while reconnecting
+            protocol: Requested wire protocol ("json" or "binary")
+            handshake_timeout: Seconds to wait for Unity to accept the binary protocol
+            auto_reconnect: Supervise the connection after connect() (heartbeats,
+                reconnection, state replay)
+            heartbeat_interval: Seconds between pings
+            heartbeat_timeout: Seconds without pong before the connection is
+                considered dead (only once Unity has answered a ping)
+            reconnect_min_delay: First reconnection delay in seconds (doubled
+                after each failure)
+            reconnect_max_delay: Maximum reconnection delay in seconds
+            replay_delay: Seconds between replaying the model and the rest of
+                the avatar state (the model loads asynchronously in Unity)
+        
+        Raises:
+            ValueError: If the protocol is unknown
         """
+        if protocol not in CODECS:
+            raise ValueError(f"Unknown protocol '{protocol}' (expected one of {sorted(CODECS)})")
+        
         self.host = host
         self.port = port
         self.socket: Optional[socket.socket] = None
@@ -32,42 +586,222 @@ class UnityBridge:
         self.receive_thread: Optional[threading.Thread] = None
         self.running = False
         
+        # Wire protocol: requested one, and the one negotiated at connect time
+        self.protocol = protocol
+        self.handshake_timeout = handshake_timeout
+        self.codec = CODECS[PROTOCOL_JSON]
+        
+        # Outbound queue: {coalescing key: (command, data)}, in send order
+        self.min_send_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.max_pending = max_pending
+        self._pending: OrderedDict = OrderedDict()
+        self._pending_cond = threading.Condition()
+        self._sequence = 0  # Unique keys for commands that are never coalesced
+        self._in_flight = 0
+        self.sender_thread: Optional[threading.Thread] = None
+        
+        # Connection supervision (heartbeats, reconnection with backoff)
+        self.auto_reconnect = auto_reconnect
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.reconnect_min_delay = reconnect_min_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.replay_delay = replay_delay
+        self.supervisor_thread: Optional[threading.Thread] = None
+        self._supervising = False
+        self._supervisor_generation = 0  # Run owning the connection (bumped by connect())
+        self._wakeup = threading.Event()
+        self._ping_sent_at: Optional[float] = None  # Outstanding ping (None once answered)
+        self._pong_supported = False  # Unity answered at least one ping on this connection
+        self._rtt_samples: deque = deque(maxlen=32)
+        
+        # Replies: futures of queued commands {coalescing key: [Future]}, sent
+        # commands {message id: (command, write time, [Future])}, latencies per command
+        self._message_id = 0
+        self._waiters: Dict[Hashable, List[Future]] = {}
+        self._awaiting: OrderedDict = OrderedDict()
+        self._latency: Dict[str, LatencyHistogram] = {}
+        
+        # Last known avatar state: {coalescing key: (command, data)}
+        self._avatar_state: OrderedDict = OrderedDict()
+        self._replay_deferred = False
+        
+        # Statistics
+        self.commands_queued = 0
+        self.commands_sent = 0
+        self.commands_coalesced = 0
+        self.commands_dropped = 0
+        self.batches_sent = 0
+        self.reconnects = 0
+        self.pings_sent = 0
+        self.replies_received = 0
+        
     def connect(self) -> bool:
         """Establish connection to Unity.
         
+        With protocol="binary", the binary frames are negotiated first and
+        the bridge falls back to JSON if Unity does not accept them. With
+        auto_reconnect, the connection is then supervised until disconnect().
+        
         Returns:
             True if connection successful, False otherwise
         """
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(5.0)
-            self.socket.connect((self.host, self.port))
-            self.connected = True
+        if self._supervising:
+            # The supervisor already owns the connection (connected or reconnecting)
+            return self.connected
             
-            # Start receive thread
-            self.running = True
-            self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
-            self.receive_thread.start()
+        if not self._open():
+            return False
             
-            logger.info(f"Connected to Unity at {self.host}:{self.port}")
-            return True
+        if self.sender_thread is None or not self.sender_thread.is_alive():
+            self.sender_thread = threading.Thread(target=self._send_loop, daemon=True)
+            self.sender_thread.start()
+            
+        if self.auto_reconnect:
+            # A previous supervisor may still be blocked in a reconnection
+            # attempt: the new generation makes it stand down
+            with self._pending_cond:
+                self._supervisor_generation += 1
+                self._supervising = True
+                generation = self._supervisor_generation
+            self._wakeup.clear()
+            self.supervisor_thread = threading.Thread(
+                target=self._supervise_loop, args=(generation,), daemon=True
+            )
+            self.supervisor_thread.start()
+        
+        return True
+    
+    def _open(self, generation: Optional[int] = None) -> bool:
+        """Open the socket, negotiate the protocol and start the receive thread.
+        
+        Args:
+            generation: Supervisor run of a reconnection attempt (abandoned if
+                disconnect() or a new connect() happened meanwhile); None for
+                a direct connection
+            
+        Returns:
+            True if connection successful, False otherwise
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        
+        try:
+            sock.settimeout(5.0)
+            sock.connect((self.host, self.port))
             
-        except (socket.error, socket.timeout) as e:
+            buffer = ReceiveBuffer()
+            codec = CODECS[PROTOCOL_JSON]
+            if self.protocol == PROTOCOL_BINARY:
+                codec = CODECS[self._negotiate_protocol(sock, buffer)]
+                sock.settimeout(5.0)
+            
+        except (socket.error, socket.timeout, ValueError) as e:
             logger.error(f"Failed to connect to Unity: {e}")
             self.connected = False
+            sock.close()
             return False
+    
+        # Publish the connection, wake the sender thread
+        with self._pending_cond:
+            if generation is not None and not self._owns_connection(generation):
+                sock.close()
+                return False
             
-    def disconnect(self):
-        """Close connection to Unity."""
-        self.running = False
-        self.connected = False
+            self.socket = sock
+            self.codec = codec
+            self._ping_sent_at = None
+            self._pong_supported = False
+            if generation is not None:
+                # Before the sender thread wakes up: buffered state is superseded
+                self._replay_deferred = self._queue_replay()
+            self.connected = True
+            self.running = True
+            self._pending_cond.notify_all()
+        
+        self.receive_thread = threading.Thread(
+            target=self._receive_loop, args=(sock, buffer), daemon=True
+        )
+        self.receive_thread.start()
+        
+        logger.info(f"Connected to Unity at {self.host}:{self.port} ({self.codec.name} protocol)")
+        return True
+    
+    def _negotiate_protocol(self, sock: socket.socket, buffer: ReceiveBuffer) -> str:
+        """Ask Unity to switch to binary frames (before any other command).
+        
+        Unity answers with a JSON `negotiate_protocol` response, then both
+        sides use binary frames. Unity builds without binary support ignore
+        the request: after `handshake_timeout` the bridge stays on JSON.
+        
+        Args:
+            sock: Freshly connected socket
+            buffer: Receive buffer of this connection (keeps bytes received
+                after the answer)
         
-        if self.socket:
+        Returns:
+            Negotiated protocol name
+        
+        Raises:
+            socket.error: If the connection fails during the handshake
+        """
+        codec = CODECS[PROTOCOL_JSON]
+        sock.sendall(codec.encode("negotiate_protocol", {
+            "protocol": PROTOCOL_BINARY,
+            "version": BINARY_PROTOCOL_VERSION
+        }))
+        deadline = time.monotonic() + self.handshake_timeout
+        
+        while True:
+            # One message at a time: bytes after the answer are binary frames
+            for message in buffer.consume(codec, max_messages=1):
+                if message.get("command") != "negotiate_protocol":
+                    self._handle_message(message)
+                elif message.get("status") == "success" and message.get("protocol") == PROTOCOL_BINARY:
+                    return PROTOCOL_BINARY
+                else:
+                    logger.warning(f"Unity refused the binary protocol, using JSON: {message.get('message')}")
+                    return PROTOCOL_JSON
+                break
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("Unity did not answer the protocol negotiation, using JSON")
+                    return PROTOCOL_JSON
+                
+                sock.settimeout(remaining)
+                try:
+                    if buffer.recv_from(sock) == 0:
+                        raise ConnectionError("Unity closed the connection during the handshake")
+                except socket.timeout:
+                    continue
+            
+    def disconnect(self, flush_timeout: float = 0.5):
+        """Close connection to Unity (and stop reconnecting).
+        
+        Args:
+            flush_timeout: Seconds to wait for queued commands to be written
+        """
+        if self.connected:
+            self.flush(flush_timeout)
+        
+        with self._pending_cond:
+            self._supervising = False
+            self.running = False
+            self.connected = False
+            self._pending.clear()
+            self._avatar_state.clear()
+            self._pending_cond.notify_all()
+            sock, self.socket = self.socket, None
+            unanswered = self._take_waiters()
+        
+        _settle(unanswered, error=ConnectionError("Disconnected from Unity"))
+        self._wakeup.set()
+        
+        if sock:
             try:
-                self.socket.close()
+                sock.close()
             except:
                 pass
-            self.socket = None
             
         logger.info("Disconnected from Unity")
         
@@ -79,77 +813,585 @@ class UnityBridge:
         """
         return self.connected
         
-    def send_command(self, command: str, data: Dict[str, Any] = None) -> bool:
-        """Send a command to Unity.
+    def is_reconnecting(self) -> bool:
+        """Check if the connection was lost and is being re-established.
+        
+        Returns:
+            True while the supervisor is reconnecting, False otherwise
+        """
+        return self._supervising and not self.connected
+    
+    def can_send(self) -> bool:
+        """Check if commands are accepted (sent now, or replayed after reconnecting).
+        
+        Returns:
+            True if connected or reconnecting, False otherwise
+        """
+        return self.connected or self.is_reconnecting()
+        
+    def send_command(
+        self,
+        command: str,
+        data: Optional[Dict[str, Any]] = None,
+        callback: Optional[Callable[[Optional[UnityReply]], None]] = None
+    ) -> bool:
+        """Queue a command for Unity (never blocks on the socket).
+        
+        A pending command for the same target (same expression name,
+        transition speed...) is replaced by this one; `reset_expressions`
+        also drops pending expression changes. While reconnecting, commands
+        stay queued (at most `max_pending`) and the avatar state they set is
+        replayed once reconnected.
         
         Args:
             command: Command name
             data: Optional command data
+            callback: Called with Unity's reply, or None if the command got
+                no reply (dropped, connection lost, expired). Runs on a
+                bridge thread: keep it short.
             
         Returns:
-            True if sent successfully, False otherwise
+            True if queued, False if not connected (nor reconnecting)
+        """
+        future: Optional[Future] = None
+        if callback is not None:
+            future = Future()
+            future.add_done_callback(
+                lambda done: callback(None if done.cancelled() or done.exception() else done.result())
+            )
+        
+        return self._queue(command, data, future)
+    
+    def submit(self, command: str, data: Optional[Dict[str, Any]] = None) -> Future:
+        """Queue a command and return a future resolved with Unity's reply.
+        
+        A command superseded while queued (see send_command) resolves with
+        the reply to the command that replaced it.
+        
+        Args:
+            command: Command name
+            data: Optional command data
+        
+        Returns:
+            Future of a UnityReply; it fails with ConnectionError if not
+            connected or if the connection is lost before the reply,
+            CommandDroppedError if the queue overflowed, TimeoutError if
+            the reply expired (see MAX_AWAITING_REPLIES)
         """
-        if not self.connected or not self.socket:
+        future: Future = Future()
+        if not self._queue(command, data, future):
+            future.set_exception(ConnectionError("Not connected to Unity"))
+        return future
+    
+    def request(
+        self, command: str, data: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_REQUEST_TIMEOUT
+    ) -> UnityReply:
+        """Send a command and wait for Unity's reply.
+        
+        Args:
+            command: Command name
+            data: Optional command data
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            Unity's reply (check `ok` for the status)
+        
+        Raises:
+            TimeoutError: If Unity did not answer within `timeout`
+            ConnectionError: If not connected, or the connection was lost
+            CommandDroppedError: If the command was dropped from the queue
+        """
+        future = self.submit(command, data)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"No reply from Unity to '{command}' within {timeout}s") from None
+    
+    async def request_async(
+        self, command: str, data: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_REQUEST_TIMEOUT
+    ) -> UnityReply:
+        """Send a command and await Unity's reply (asyncio).
+        
+        Args:
+            command: Command name
+            data: Optional command data
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            Unity's reply (check `ok` for the status)
+        
+        Raises:
+            TimeoutError: If Unity did not answer within `timeout`
+            ConnectionError: If not connected, or the connection was lost
+            CommandDroppedError: If the command was dropped from the queue
+        """
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self.submit(command, data)), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No reply from Unity to '{command}' within {timeout}s") from None
+    
+    def _queue(self, command: str, data: Optional[Dict[str, Any]], future: Optional[Future]) -> bool:
+        """Record and enqueue a command (see send_command).
+        
+        Args:
+            command: Command name
+            data: Optional command data
+            future: Resolved with Unity's reply (None if nobody waits for it)
+            
+        Returns:
+            True if queued, False if not connected (nor reconnecting)
+        """
+        if not (self.connected and self.socket) and not self.is_reconnecting():
             logger.warning("Cannot send command: not connected to Unity")
             return False
+        
+        data = data or {}
+        
+        with self._pending_cond:
+            self._record_state(command, data)
+            self._enqueue(command, data, future)
+            self.commands_queued += 1
+        
+        logger.debug(f"Queued command for Unity: {command}")
+        return True
+    
+    def _enqueue(self, command: str, data: Dict[str, Any], future: Optional[Future] = None):
+        """Add a command to the outbound queue (caller holds `_pending_cond`).
+        
+        Futures of superseded commands move to the command replacing them;
+        those of commands dropped because the queue is full fail.
+        
+        Args:
+            command: Command name
+            data: Command data
+            future: Resolved with Unity's reply (None if nobody waits for it)
+        """
+        key = _coalesce_key(command, data)
+        waiters = [future] if future is not None else []
             
-        try:
-            message = {
-                "command": command,
-                "data": data or {}
-            }
+        if command == "reset_expressions":
+            superseded = [k for k in self._pending if k and k[0] == "set_expression"]
+            for pending_key in superseded:
+                del self._pending[pending_key]
+                waiters.extend(self._waiters.pop(pending_key, ()))
+            self.commands_coalesced += len(superseded)
+        
+        if key is None:
+            self._sequence += 1
+            key = ("#", self._sequence)
+        elif key in self._pending:
+            # Superseded: drop the old value, send the new one in order
+            del self._pending[key]
+            self.commands_coalesced += 1
+        
+        self._pending[key] = (command, data)
+        if waiters:
+            self._waiters.setdefault(key, []).extend(waiters)
+        
+        dropped: List[Future] = []
+        while len(self._pending) > self.max_pending:
+            oldest, _ = self._pending.popitem(last=False)
+            dropped.extend(self._waiters.pop(oldest, ()))
+            self.commands_dropped += 1
+        
+        _settle(dropped, error=CommandDroppedError("Command dropped: Unity command queue full"))
+        self._pending_cond.notify()
+    
+    def _record_state(self, command: str, data: Dict[str, Any]):
+        """Update the last known avatar state (caller holds `_pending_cond`).
+        
+        Args:
+            command: Command name
+            data: Command data
+        """
+        if command not in STATE_COMMANDS:
+            return
+        
+        state = self._avatar_state
+        
+        # A new or removed model starts neutral: forget its expressions
+        if command in ("load_model", "unload_model", "reset_expressions"):
+            for key in [k for k in state if k[0] == "set_expression"]:
+                del state[key]
+        
+        if command == "load_model":
+            state[("load_model",)] = (command, data)
+        elif command == "unload_model":
+            state.pop(("load_model",), None)
+        elif command != "reset_expressions":
+            state[_coalesce_key(command, data)] = (command, data)
+    
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until every queued command has been written.
+        
+        Args:
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if the queue was drained, False on timeout or disconnect
+        """
+        deadline = time.monotonic() + timeout
+        
+        with self._pending_cond:
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.running:
+                    return False
+                self._pending_cond.wait(remaining)
+        
+        return True
+    
+    def _send_loop(self):
+        """Background thread writing queued commands in batches (one write per batch)."""
+        last_send = 0.0
+        
+        while True:
+            with self._pending_cond:
+                # While reconnecting, commands stay queued for replay
+                while self.running and not (self._pending and self.connected):
+                    self._pending_cond.wait()
+                if not self.running:
+                    return
             
-            json_data = json.dumps(message)
-            self.socket.sendall(json_data.encode('utf-8') + b'\n')
+            # Frame budget: further commands keep coalescing meanwhile
+            delay = last_send + self.min_send_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
             
-            logger.debug(f"Sent command to Unity: {command}")
-            return True
+            with self._pending_cond:
+                if not self.running:
+                    return
+                batch = [
+                    (command, data, self._waiters.pop(key, None))
+                    for key, (command, data) in self._pending.items()
+                ]
+                self._pending.clear()
+                self._in_flight = len(batch)
             
-        except socket.error as e:
-            logger.error(f"Error sending command to Unity: {e}")
-            self.connected = False
-            return False
+            if batch:
+                self._write_batch(batch)
+            last_send = time.monotonic()
             
-    def _receive_loop(self):
-        """Background thread to receive messages from Unity."""
-        buffer = ""
+            with self._pending_cond:
+                self._in_flight = 0
+                self._pending_cond.notify_all()
+    
+    def _write_batch(self, batch):
+        """Serialize a batch with the negotiated codec and write it at once.
         
-        while self.running and self.socket:
+        Commands get a message id unless they are unacknowledged struct
+        frames nobody waits for; they are registered as awaiting a reply
+        before the write (Unity may answer before sendall() returns).
+        
+        Args:
+            batch: List of (command, data, futures or None) tuples
+        """
+        sock = self.socket
+        if sock is None:
+            _settle(
+                [future for _, _, futures in batch for future in futures or ()],
+                error=ConnectionError("Unity connection lost")
+            )
+            return
+        
+        codec = self.codec
+        frames = []
+        expired = []
+        
+        with self._pending_cond:
+            now = time.monotonic()
+            for command, data, futures in batch:
+                message_id = None
+                if futures or command not in codec.unacknowledged:
+                    self._message_id += 1
+                    message_id = self._message_id
+                    self._awaiting[message_id] = (command, now, futures or [])
+                frames.append(codec.encode(command, data, message_id))
+            
+            while len(self._awaiting) > MAX_AWAITING_REPLIES:
+                expired.extend(self._awaiting.popitem(last=False)[1][2])
+        
+        _settle(expired, error=TimeoutError("No reply from Unity"))
+        payload = b"".join(frames)
+        
+        try:
+            sock.sendall(payload)
+            self.commands_sent += sum(1 for command, _, _ in batch if command != "ping")
+            self.batches_sent += 1
+            logger.debug(f"Sent {len(batch)} command(s) to Unity ({len(payload)} bytes)")
+            
+        except (socket.error, OSError) as e:
+            logger.error(f"Error sending commands to Unity: {e}")
+            self._connection_lost(sock)
+    
+    def get_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the reply latency histogram of each command.
+        
+        Returns:
+            {command: LatencyHistogram.to_dict()}, slowest average first
+        """
+        with self._pending_cond:
+            stats = {command: histogram.to_dict() for command, histogram in self._latency.items()}
+        return dict(sorted(stats.items(), key=lambda item: -item[1]['avg_ms']))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get outbound queue statistics.
+        
+        Returns:
+            Dictionary with queued/sent/coalesced/dropped counters,
+            reconnection count, heartbeat round-trip times and the number
+            of replies received / still awaited
+        """
+        with self._pending_cond:
+            rtt = list(self._rtt_samples)
+            return {
+                'connected': self.connected,
+                'reconnecting': self.is_reconnecting(),
+                'reconnects': self.reconnects,
+                'protocol': self.codec.name,
+                'pings': self.pings_sent,
+                'rtt_ms': rtt[-1] if rtt else None,
+                'rtt_avg_ms': sum(rtt) / len(rtt) if rtt else None,
+                'pending': len(self._pending),
+                'queued': self.commands_queued,
+                'sent': self.commands_sent,
+                'coalesced': self.commands_coalesced,
+                'dropped': self.commands_dropped,
+                'batches': self.batches_sent,
+                'replies': self.replies_received,
+                'awaiting': len(self._awaiting),
+                'max_rate_hz': 1.0 / self.min_send_interval if self.min_send_interval else None
+            }
+            
+    def _receive_loop(self, sock: socket.socket, buffer: ReceiveBuffer):
+        """Background thread to receive messages from Unity.
+        
+        Args:
+            sock: Socket of this connection (the loop ends once it is replaced)
+            buffer: Receive buffer of this connection
+        """
+        while self.running and self.socket is sock:
             try:
-                data = self.socket.recv(4096)
-                if not data:
+                if buffer.recv_from(sock) == 0:
                     logger.warning("Unity connection closed")
-                    self.connected = False
+                    self._connection_lost(sock)
                     break
                     
-                buffer += data.decode('utf-8')
-                
-                # Process complete messages (delimited by newline)
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    self._handle_message(line)
+                for message in buffer.consume(self.codec):
+                    self._handle_message(message)
                     
             except socket.timeout:
                 continue
-            except socket.error as e:
+            except (socket.error, ValueError) as e:
                 logger.error(f"Error receiving from Unity: {e}")
-                self.connected = False
+                self._connection_lost(sock)
                 break
+    
+    def _connection_lost(self, sock: socket.socket):
+        """Mark a connection as dead and wake the supervisor.
+        
+        Args:
+            sock: Socket of the lost connection (ignored if already replaced)
+        """
+        with self._pending_cond:
+            if self.socket is not sock:
+                return
+            self.connected = False
+            self.socket = None
+            # Replies to the commands written on this connection will never come
+            unanswered = [future for _, _, futures in self._awaiting.values() for future in futures]
+            self._awaiting.clear()
+        
+        _settle(unanswered, error=ConnectionError("Unity connection lost"))
+        
+        try:
+            sock.close()
+        except OSError:
+            pass
+        
+        if self._supervising:
+            logger.warning("Unity connection lost, reconnecting...")
+        self._wakeup.set()
                 
-    def _handle_message(self, message: str):
+    def _handle_message(self, message: Dict[str, Any]):
         """Handle a message received from Unity.
         
         Args:
-            message: JSON message string
+            message: Decoded message
         """
-        try:
-            data = json.loads(message)
-            logger.debug(f"Received from Unity: {data}")
+        logger.debug(f"Received from Unity: {message}")
+            
+        # Replies echo the id of their command (0 or missing: unsolicited message)
+        message_id = message.get("id")
+        if message_id:
+            self._dispatch_reply(message_id, message)
+            
+    def _dispatch_reply(self, message_id: int, message: Dict[str, Any]):
+        """Route a reply to the futures of its command and record its latency.
+        
+        Args:
+            message_id: Id echoed by Unity
+            message: Reply (or pong) message
+        """
+        with self._pending_cond:
+            entry = self._awaiting.pop(message_id, None)
+            if entry is None:
+                # Unknown, expired, or sent on a previous connection
+                return
+            
+            command, sent_at, futures = entry
+            latency_ms = (time.monotonic() - sent_at) * 1000
+            self._latency.setdefault(command, LatencyHistogram()).record(latency_ms)
+            self.replies_received += 1
+            
+            if command == "ping":
+                self._rtt_samples.append(latency_ms)
+                self._ping_sent_at = None
+                self._pong_supported = True
+        
+        if futures:
+            _settle(futures, UnityReply(
+                command=command,
+                status=message.get("status") or "success",
+                message=message.get("message") or "",
+                latency_ms=latency_ms
+            ))
+    
+    def _take_waiters(self) -> List[Future]:
+        """Forget every queued or awaited reply (caller holds `_pending_cond`).
+        
+        Returns:
+            Futures nobody will resolve anymore (to fail once the lock is released)
+        """
+        futures = [future for waiters in self._waiters.values() for future in waiters]
+        futures.extend(future for _, _, waiters in self._awaiting.values() for future in waiters)
+        self._waiters.clear()
+        self._awaiting.clear()
+        return futures
+    
+    # === Connection supervision ===
+    
+    def _owns_connection(self, generation: int) -> bool:
+        """Check the supervisor run `generation` is still the current one.
+        
+        Args:
+            generation: Supervisor run (see connect())
+        
+        Returns:
+            False once disconnect() or a newer connect() took over
+        """
+        return self._supervising and generation == self._supervisor_generation
+    
+    def _supervise_loop(self, generation: Optional[int] = None):
+        """Background thread: heartbeats while connected, reconnection with backoff otherwise.
+        
+        Args:
+            generation: Supervisor run started by connect() (None: the current one)
+        """
+        if generation is None:
+            generation = self._supervisor_generation
+        delay = self.reconnect_min_delay
+        
+        while self._owns_connection(generation):
+            if self.connected:
+                delay = self.reconnect_min_delay
+                self._heartbeat()
+                self._wakeup.wait(self.heartbeat_interval)
+                self._wakeup.clear()
+                continue
             
-            # TODO: Implement message handlers based on message type
+            logger.info(f"Reconnecting to Unity in {delay:.1f}s...")
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+            if not self._owns_connection(generation):
+                break
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Unity message: {e}")
+            if self._open(generation):
+                self.reconnects += 1
+                if self._replay_deferred:
+                    self._finish_replay()
+            else:
+                delay = min(delay * 2, self.reconnect_max_delay)
+    
+    def _heartbeat(self):
+        """Send a ping, or drop the connection if Unity stopped answering."""
+        now = time.monotonic()
+        sock = self.socket
+        
+        if self._ping_sent_at is not None:
+            if self._pong_supported and now - self._ping_sent_at > self.heartbeat_timeout:
+                logger.warning(f"No pong from Unity for {now - self._ping_sent_at:.1f}s")
+                if sock is not None:
+                    self._connection_lost(sock)
+                return
+            
+            # Ping still outstanding: Unity builds without heartbeat support never answer
+            if self._pong_supported:
+                return
+        
+        # The pong echoes the ping's message id (see _dispatch_reply)
+        with self._pending_cond:
+            self._ping_sent_at = now
+            self.pings_sent += 1
+            self._enqueue("ping", {})
+    
+    def _queue_replay(self) -> bool:
+        """Rebuild the queue for a fresh connection (caller holds `_pending_cond`).
+        
+        The model is loaded first; settings and expressions follow after
+        `replay_delay` so Unity has finished loading it. Buffered state
+        commands are superseded by the replay, other buffered commands are
+        kept.
+        
+        Futures of superseded state commands fail with ConnectionError; the
+        other buffered commands keep theirs.
+        
+        Returns:
+            True if settings and expressions must be queued later (see _finish_replay)
+        """
+        buffered = [(key, value) for key, value in self._pending.items() if value[0] not in STATE_COMMANDS]
+        superseded = [
+            future for key, futures in self._waiters.items()
+            if self._pending[key][0] in STATE_COMMANDS for future in futures
+        ]
+        _settle(superseded, error=ConnectionError("Unity connection lost, avatar state replayed"))
+        self._pending.clear()
+        
+        model = self._avatar_state.get(("load_model",))
+        if model:
+            self._enqueue(*model)
+        # Same keys (never coalesced): their futures stay attached
+        for key, value in buffered:
+            self._pending[key] = value
+        self._waiters = {key: self._waiters[key] for key, _ in buffered if key in self._waiters}
+        
+        if model:
+            logger.info(f"Replaying VRM model to Unity: {model[1].get('path')}")
+            return True
+        
+        self._queue_avatar_settings()
+        return False
+    
+    def _finish_replay(self):
+        """Queue settings and expressions once the replayed model had time to load."""
+        self._wakeup.wait(self.replay_delay)
+        self._wakeup.clear()
+        
+        with self._pending_cond:
+            if self.connected:
+                self._queue_avatar_settings()
+    
+    def _queue_avatar_settings(self):
+        """Queue the settings and expressions of the avatar state (caller holds `_pending_cond`)."""
+        state = [value for value in self._avatar_state.values() if value[0] != "load_model"]
+        state.sort(key=lambda value: value[0] == "set_expression")
+        
+        self._enqueue("reset_expressions", {})
+        for command, data in state:
+            self._enqueue(command, data)
+        
+        logger.info(f"Replayed avatar state to Unity ({len(state)} command(s))")
 
     # === VRM Control Methods ===
 
@@ -160,7 +1402,7 @@ class UnityBridge:
             model_path: Path to the VRM model file
             
         Returns:
-            True if command sent successfully, False otherwise
+            True if command queued successfully, False otherwise
         """
         return self.send_command("load_model", {"path": model_path})
 
@@ -172,7 +1414,7 @@ class UnityBridge:
             value: Expression intensity from 0.0 (0%) to 1.0 (100%)
             
         Returns:
-            True if command sent successfully, False otherwise
+            True if command queued successfully, False otherwise
         """
         # Clamp value between 0.0 and 1.0
         value = max(0.0, min(1.0, value))
@@ -186,7 +1428,7 @@ class UnityBridge:
         """Reset all facial expressions to neutral.
         
         Returns:
-            True if command sent successfully, False otherwise
+            True if command queued successfully, False otherwise
         """
         return self.send_command("reset_expressions", {})
 
@@ -197,7 +1439,7 @@ class UnityBridge:
             speed: Transition speed from 0.1 (slow) to 10.0 (fast)
             
         Returns:
-            True if command sent successfully, False otherwise
+            True if command queued successfully, False otherwise
         """
         # Clamp speed between 0.1 and 10.0
         speed = max(0.1, min(10.0, speed))
@@ -213,7 +1455,7 @@ class UnityBridge:
             enabled: True to enable automatic blinking, False to disable
             
         Returns:
-            True if command sent successfully, False otherwise
+            True if command queued successfully, False otherwise
         """
         return self.send_command("set_auto_blink", {
             "enabled": enabled
@@ -231,7 +1473,7 @@ class UnityBridge:
                       Pitch will be half of this value for more subtle movements
             
         Returns:
-            True if command sent successfully, False otherwise
+            True if command queued successfully, False otherwise
         """
         return self.send_command("set_auto_head_movement", {
             "enabled": enabled,
@@ -240,4 +1482,47 @@ class UnityBridge:
             "max_angle": max_angle
         })
 
+    # === Awaitable VRM Control Methods ===
+
+    async def load_vrm_model_async(
+        self, model_path: str, timeout: float = DEFAULT_REQUEST_TIMEOUT
+    ) -> UnityReply:
+        """Load a VRM model in Unity and await its reply.
+        
+        Args:
+            model_path: Path to the VRM model file
+            timeout: Maximum seconds to wait for the reply
+            
+        Returns:
+            Unity's reply
+            
+        Raises:
+            TimeoutError: If Unity did not answer within `timeout`
+            ConnectionError: If not connected, or the connection was lost
+        """
+        return await self.request_async("load_model", {"path": model_path}, timeout)
 
+    async def set_expression_async(
+        self, expression_name: str, value: float, timeout: float = DEFAULT_REQUEST_TIMEOUT
+    ) -> UnityReply:
+        """Set a facial expression and await Unity's reply.
+        
+        A value superseded before being sent resolves with the reply to the
+        value that replaced it.
+        
+        Args:
+            expression_name: Name of the expression (e.g., "joy", "angry", "sorrow")
+            value: Expression intensity from 0.0 (0%) to 1.0 (100%)
+            timeout: Maximum seconds to wait for the reply
+            
+        Returns:
+            Unity's reply
+            
+        Raises:
+            TimeoutError: If Unity did not answer within `timeout`
+            ConnectionError: If not connected, or the connection was lost
+        """
+        return await self.request_async("set_expression", {
+            "name": expression_name,
+            "value": max(0.0, min(1.0, value))
+        }, timeout)
@@ -103,7 +103,8 @@ class Config:
         return {
             "unity": {
                 "host": "127.0.0.1",
-                "port": 5555
+                "port": 5555,
+                "protocol": "json"
             },
             "audio": {
                 "sample_rate": 44100,
@@ -0,0 +1,232 @@
+"""
+Startup profiling for Desktop-Mate (--profile-startup).
+Times the imports of our modules and the main initialization steps.
+"""
+
+import importlib.abc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Our top-level package: its modules (and what they import directly) are reported
+PROJECT_PACKAGE = "src"
+
+
+@dataclass
+class ImportRecord:
+    """Timing of one module import."""
+    name: str
+    depth: int                  # Nesting level among the reported imports
+    self_ms: float = 0.0        # Time spent executing the module body itself
+    cumulative_ms: float = 0.0  # Including the modules it imported
+
+
+@dataclass
+class StepRecord:
+    """Timing of one initialization step."""
+    name: str
+    depth: int
+    duration_ms: float = 0.0
+
+
+class _TimedLoader:
+    """Loader wrapper timing exec_module (delegates everything else)."""
+    
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+    
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+    
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+    
+    def exec_module(self, module):
+        self._profiler._timed_exec(self._loader, module)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta path finder wrapping the loaders found by the other finders."""
+    
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+    
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        
+        return None
+
+
+class StartupProfiler:
+    """Import-time and init-time breakdown of the application startup.
+    
+    Scoped version of `python -X importtime`: only our modules and the
+    modules they import directly (PySide6, llama_cpp...) are reported.
+    Disabled by default; every method is a no-op until start() is called.
+    """
+    
+    def __init__(self):
+        """Initialize a disabled profiler."""
+        self.enabled = False
+        self.started_at = time.perf_counter()
+        self.imports: List[ImportRecord] = []
+        self.steps: List[StepRecord] = []
+        self.marks: List[tuple] = []  # (name, ms since start)
+        self._finder: Optional[_TimingFinder] = None
+        self._local = threading.local()
+        self._step_depth = 0
+        self._reported = False
+    
+    def start(self):
+        """Enable profiling and start timing imports."""
+        if self.enabled:
+            return
+        
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+    
+    def stop(self):
+        """Stop timing imports (recorded data is kept)."""
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+    
+    @staticmethod
+    def _is_ours(name: str) -> bool:
+        return name == PROJECT_PACKAGE or name.startswith(PROJECT_PACKAGE + ".")
+    
+    def _timed_exec(self, loader, module):
+        """Execute a module body, recording its self and cumulative time."""
+        # Per-thread stack of [record or None, time spent in child imports]
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        
+        name = module.__name__
+        parent = next((entry[0] for entry in reversed(stack) if entry[0] is not None), None)
+        
+        # Ours, or imported directly by one of ours
+        record = None
+        if self._is_ours(name) or (parent is not None and self._is_ours(parent.name)):
+            depth = parent.depth + 1 if parent is not None else 0
+            record = ImportRecord(name=name, depth=depth)
+            self.imports.append(record)
+        
+        entry = [record, 0.0]
+        stack.append(entry)
+        start = time.perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            # Leave no trace of the wrapper on the imported module
+            if getattr(module, "__loader__", None) is not loader:
+                module.__loader__ = loader
+            spec = getattr(module, "__spec__", None)
+            if spec is not None and spec.loader is not loader:
+                spec.loader = loader
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            if record is not None:
+                record.cumulative_ms = elapsed
+                record.self_ms = elapsed - entry[1]
+    
+    @contextmanager
+    def step(self, name: str):
+        """Time an initialization step (steps can be nested).
+        
+        Args:
+            name: Step name shown in the report
+        """
+        if not self.enabled:
+            yield
+            return
+        
+        record = StepRecord(name=name, depth=self._step_depth)
+        self.steps.append(record)
+        self._step_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record.duration_ms = (time.perf_counter() - start) * 1000
+            self._step_depth -= 1
+    
+    def mark(self, name: str):
+        """Record a milestone (time elapsed since start()).
+        
+        Args:
+            name: Milestone name (e.g. "window shown")
+        """
+        if self.enabled:
+            self.marks.append((name, (time.perf_counter() - self.started_at) * 1000))
+    
+    def report(self) -> str:
+        """Format the startup breakdown.
+        
+        Returns:
+            Multi-line report (imports, init steps, milestones)
+        """
+        lines = ["", "🚀 Startup profile (--profile-startup)", ""]
+        
+        lines.append(f"  {'self ms':>9} | {'cumul. ms':>9} | import")
+        for record in self.imports:
+            lines.append(
+                f"  {record.self_ms:>9.1f} | {record.cumulative_ms:>9.1f} | "
+                f"{'  ' * record.depth}{record.name}"
+            )
+        
+        lines.append("")
+        lines.append(f"  {'ms':>9} | init step")
+        for step in self.steps:
+            lines.append(f"  {step.duration_ms:>9.1f} | {'  ' * step.depth}{step.name}")
+        
+        if self.marks:
+            lines.append("")
+            for name, elapsed in self.marks:
+                lines.append(f"  {elapsed:>9.1f} ms since start: {name}")
+        
+        return "\n".join(lines)
+    
+    def finish(self):
+        """Stop profiling and print the report (once)."""
+        if not self.enabled or self._reported:
+            return
+        
+        self._reported = True
+        self.stop()
+        print(self.report(), flush=True)
+
+
+_startup_profiler_instance: Optional[StartupProfiler] = None
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Get the global startup profiler (singleton).
+    
+    Returns:
+        StartupProfiler instance (disabled unless started)
+    """
+    global _startup_profiler_instance
+    
+    if _startup_profiler_instance is None:
+        _startup_profiler_instance = StartupProfiler()
+    
+    return _startup_profiler_instance
@@ -96,6 +96,36 @@ class TestAIConfig:
         with pytest.raises(ValueError, match="system_prompt ne peut pas être vide"):
             AIConfig(system_prompt="   ")
     
+    def test_validation_prefix_cache_mb_invalid(self):
+        """Test validation avec prefix_cache_mb invalide"""
+        with pytest.raises(ValueError, match="prefix_cache_mb doit être un entier"):
+            AIConfig(prefix_cache_mb=-1)
+        
+        with pytest.raises(ValueError, match="prefix_cache_disk_mb doit être un entier"):
+            AIConfig(prefix_cache_disk_mb=-1)
+    
+    def test_validation_scheduler_invalid(self):
+        """Test validation avec paramètres scheduler invalides"""
+        with pytest.raises(ValueError, match="scheduler_max_queue doit être un entier"):
+            AIConfig(scheduler_max_queue=0)
+        
+        with pytest.raises(ValueError, match="scheduler_timeout doit être un nombre"):
+            AIConfig(scheduler_timeout=0)
+        
+        with pytest.raises(ValueError, match="batch_max_sequences doit être un entier"):
+            AIConfig(batch_max_sequences=0)
+    
+    def test_validation_model_loading_flags_invalid(self):
+        """Test validation des options de chargement (booléens)"""
+        with pytest.raises(ValueError, match="model_prefetch doit être un booléen"):
+            AIConfig(model_prefetch="yes")
+        
+        with pytest.raises(ValueError, match="suspend_on_unload doit être un booléen"):
+            AIConfig(suspend_on_unload=1)
+    
+        with pytest.raises(ValueError, match="auto_profile_calibrate doit être un booléen"):
+            AIConfig(auto_profile_calibrate="auto")
+    
     def test_get_gpu_params_balanced(self):
         """Test récupération paramètres GPU (balanced)"""
         config = AIConfig(gpu_profile="balanced")
@@ -107,6 +137,7 @@ class TestAIConfig:
         assert params["n_batch"] == 256
         assert params["n_threads"] == 6
         assert params["use_mlock"] is True
+        assert params["use_mmap"] is True
     
     def test_get_gpu_params_performance(self):
         """Test récupération paramètres GPU (performance)"""
@@ -179,6 +210,15 @@ class TestAIConfig:
         assert config_dict["top_p"] == 0.95
         assert config_dict["max_tokens"] == 256
         assert config_dict["system_prompt"] == "Test prompt"
+        assert config_dict["memory_write_behind"] is False
+        assert config_dict["prefix_cache_mb"] == 512
+        assert config_dict["prefix_cache_disk_mb"] == 0
+        assert config_dict["scheduler_max_queue"] == 32
+        assert config_dict["scheduler_timeout"] == 120.0
+        assert config_dict["batch_max_sequences"] == 1
+        assert config_dict["model_prefetch"] is True
+        assert config_dict["suspend_on_unload"] is False
+        assert config_dict["auto_profile_calibrate"] is True
     
     def test_repr(self):
         """Test représentation string"""
@@ -359,12 +399,13 @@ class TestGPUProfiles:
         assert "performance" in GPU_PROFILES
         assert "balanced" in GPU_PROFILES
         assert "cpu_fallback" in GPU_PROFILES
+        assert "auto" in GPU_PROFILES
     
     def test_profile_structure(self):
         """Test structure de chaque profil"""
         required_keys = [
             "name", "description", "n_gpu_layers", "n_ctx",
-            "n_batch", "n_threads", "use_mlock",
+            "n_batch", "n_threads", "use_mlock", "use_mmap",
             "vram_estimate", "speed_estimate", "recommended_for"
         ]
         
@@ -379,10 +420,11 @@ class TestGPUProfiles:
         profiles = list_profiles()
         
         assert isinstance(profiles, dict)
-        assert len(profiles) == 3
+        assert len(profiles) == 4
         assert "performance" in profiles
         assert "balanced" in profiles
         assert "cpu_fallback" in profiles
+        assert "auto" in profiles
 
 
 class TestGetConfigSingleton:
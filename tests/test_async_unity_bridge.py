@@ -0,0 +1,211 @@
+"""
+Unit tests for the asyncio Unity bridge.
+"""
+
+import asyncio
+import socket
+import time
+
+import pytest
+
+from src.ipc.async_unity_bridge import AsyncUnityBridge
+from src.ipc.unity_bridge import CommandDroppedError
+from tests.test_unity_bridge import FakeUnityServer
+
+
+async def wait_for_condition(condition, timeout=5.0):
+    """Poll `condition` without blocking the event loop."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    return condition()
+
+
+def wait_until_received(server, count, timeout=5.0):
+    """Wait until the fake server recorded `count` commands."""
+    deadline = time.monotonic() + timeout
+    while len(server.commands) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return len(server.commands) >= count
+
+
+def free_port():
+    """Return a loopback port nobody listens on."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.mark.parametrize("protocol", ["json", "binary"])
+def test_commands_and_replies(protocol):
+    """Test commands delivered in order and replies awaited."""
+    server = FakeUnityServer()
+    
+    async def main():
+        bridge = AsyncUnityBridge(port=server.port, protocol=protocol, auto_reconnect=False)
+        try:
+            assert await bridge.connect()
+            assert bridge.get_stats()['protocol'] == protocol
+            
+            assert await bridge.set_expression("joy", 1.5)
+            assert await bridge.set_auto_blink(True)
+            reply = await bridge.request("load_model", {"path": "a.vrm"})
+            
+            assert reply.ok and reply.command == "load_model"
+            assert "load_model" in bridge.get_latency_stats()
+        finally:
+            await bridge.disconnect()
+    
+    try:
+        asyncio.run(main())
+    finally:
+        server.close()
+    
+    assert server.commands == [
+        {"command": "set_expression", "data": {"name": "joy", "value": 1.0}},
+        {"command": "set_auto_blink", "data": {"enabled": True}},
+        {"command": "load_model", "data": {"path": "a.vrm"}},
+    ]
+
+
+def test_expression_changes_coalesced():
+    """Test superseded values coalesced within the frame budget, last one delivered."""
+    server = FakeUnityServer()
+    
+    async def main():
+        bridge = AsyncUnityBridge(port=server.port, max_rate_hz=20, auto_reconnect=False)
+        try:
+            assert await bridge.connect()
+            for tick in range(101):
+                assert await bridge.set_expression("joy", tick / 100)
+            assert await bridge.flush(timeout=5.0)
+            return bridge.get_stats()
+        finally:
+            await bridge.disconnect()
+    
+    try:
+        stats = asyncio.run(main())
+        assert wait_until_received(server, stats['sent'])
+    finally:
+        server.close()
+    
+    assert stats['coalesced'] > 50
+    assert stats['sent'] + stats['coalesced'] == 101
+    assert server.commands[-1]["data"] == {"name": "joy", "value": 1.0}
+
+
+def test_stalled_unity_applies_backpressure_without_blocking_loop():
+    """Test a Unity that stops reading: callers wait send_timeout, the loop keeps running."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    
+    async def main():
+        bridge = AsyncUnityBridge(
+            port=listener.getsockname()[1], max_rate_hz=0, max_pending=2,
+            send_timeout=0.2, auto_reconnect=False
+        )
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+        
+        ticking = asyncio.create_task(ticker())
+        try:
+            assert await bridge.connect()
+            
+            # Fill the socket buffers: Unity never reads, drain() stays suspended
+            large = "x" * (1 << 20)
+            for _ in range(50):
+                if not await bridge.send_command("custom", {"blob": large}):
+                    break
+            else:
+                pytest.fail("Queue never filled")
+            
+            assert bridge.get_stats()['rejected'] == 1
+            with pytest.raises(CommandDroppedError):
+                await bridge.request("custom", {"blob": large})
+            return ticks
+        finally:
+            ticking.cancel()
+            await bridge.disconnect(flush_timeout=0.1)
+    
+    try:
+        ticks = asyncio.run(main())
+    finally:
+        listener.close()
+    
+    # The event loop kept running while the writer was stalled
+    assert ticks >= 10
+
+
+def test_connects_once_unity_starts():
+    """Test a failed connect is retried in the background with backoff."""
+    port = free_port()
+    
+    async def main():
+        bridge = AsyncUnityBridge(port=port, reconnect_min_delay=0.05, reconnect_max_delay=0.1)
+        try:
+            assert not await bridge.connect()
+            assert bridge.is_reconnecting()
+            assert await bridge.set_expression("joy", 0.5)
+            
+            server = FakeUnityServer(port=port)
+            try:
+                assert await wait_for_condition(bridge.is_connected)
+                assert await bridge.flush(timeout=5.0)
+                assert await wait_for_condition(lambda: server.commands)
+            finally:
+                server.close()
+            return server.commands
+        finally:
+            await bridge.disconnect()
+    
+    commands = asyncio.run(main())
+    assert commands == [{"command": "set_expression", "data": {"name": "joy", "value": 0.5}}]
+
+
+def test_reconnects_after_unity_restart():
+    """Test a lost connection fails pending replies and is re-established."""
+    first = FakeUnityServer(reply_delays={"load_model": 1.0})
+    port = first.port
+    
+    async def main():
+        bridge = AsyncUnityBridge(port=port, reconnect_min_delay=0.05)
+        second = None
+        try:
+            assert await bridge.connect()
+            loading = asyncio.create_task(bridge.request("load_model", {"path": "a.vrm"}))
+            assert await wait_for_condition(lambda: first.commands)
+            
+            first.kill()
+            with pytest.raises(ConnectionError):
+                await loading
+            assert await wait_for_condition(lambda: not bridge.is_connected())
+            
+            second = FakeUnityServer(port=port)
+            assert await wait_for_condition(bridge.is_connected)
+            assert (await bridge.request("reset_expressions")).ok
+            assert bridge.get_stats()['reconnects'] == 1
+        finally:
+            await bridge.disconnect()
+            if second is not None:
+                second.close()
+    
+    asyncio.run(main())
+
+
+def test_disconnected_bridge_rejects_commands():
+    """Test commands refused when never connected (no background retries)."""
+    async def main():
+        bridge = AsyncUnityBridge(port=free_port(), auto_reconnect=False, connect_timeout=1.0)
+        assert not await bridge.connect()
+        assert not bridge.can_send()
+        assert await bridge.set_expression("joy", 1.0) is False
+        with pytest.raises(ConnectionError):
+            await bridge.request("load_model", {"path": "a.vrm"})
+    
+    asyncio.run(main())
@@ -0,0 +1,233 @@
+"""
+Tests unitaires pour src.ai.auto_profile
+Tests du profil GPU automatique (métadonnées GGUF, calcul, calibration, cache)
+"""
+
+import json
+import struct
+
+import pytest
+
+from src.ai.auto_profile import (
+    AutoProfileCache, GGUFInfo, calibrate, candidate_params, compute_auto_params,
+    machine_fingerprint, model_fingerprint, read_gguf_metadata
+)
+
+GB = 1024 ** 3
+
+
+def _gguf_string(text):
+    data = text.encode("utf-8")
+    return struct.pack("<Q", len(data)) + data
+
+
+def write_gguf(path, metadata, version=3, padding=b""):
+    """Écrit un en-tête GGUF minimal (métadonnées seules, sans tenseurs)"""
+    body = b""
+    for key, (value_type, value) in metadata.items():
+        body += _gguf_string(key) + struct.pack("<I", value_type)
+        if value_type == 8:
+            body += _gguf_string(value)
+        elif value_type == 9:
+            item_type, items = value
+            body += struct.pack("<IQ", item_type, len(items))
+            for item in items:
+                body += _gguf_string(item) if item_type == 8 else struct.pack("<i", item)
+        else:
+            body += struct.pack({4: "<I", 6: "<f", 7: "<?", 10: "<Q"}[value_type], value)
+    
+    counts = struct.pack("<II" if version == 1 else "<QQ", 0, len(metadata))
+    path.write_bytes(b"GGUF" + struct.pack("<I", version) + counts + body + padding)
+    return path
+
+
+def llama_metadata(n_layers=32):
+    return {
+        "general.architecture": (8, "llama"),
+        "general.file_type": (4, 17),
+        "tokenizer.ggml.tokens": (9, (8, ["<s>", "</s>", "Kira"])),
+        "tokenizer.ggml.token_type": (9, (5, [1, 2, 3])),
+        "llama.block_count": (4, n_layers),
+        "llama.context_length": (4, 32768),
+        "llama.embedding_length": (4, 4096),
+        "llama.attention.head_count": (4, 32),
+        "llama.attention.head_count_kv": (4, 8),
+        "llama.rope.freq_base": (6, 10000.0),
+        "general.quantized": (7, True),
+    }
+
+
+def zephyr_like(file_size=5 * GB):
+    """Modèle 7B Q5_K_M : 32 couches, GQA 8 têtes KV"""
+    return GGUFInfo(
+        architecture="llama", n_layers=32, context_length=32768,
+        embedding_length=4096, head_count=32, head_count_kv=8,
+        quantization="Q5_K_M", file_size=file_size
+    )
+
+
+class TestReadGGUFMetadata:
+    """Tests de lecture de l'en-tête GGUF"""
+    
+    def test_reads_layers_context_and_quantization(self, tmp_path):
+        """Test lecture des clés utiles (tableaux du tokenizer sautés)"""
+        path = write_gguf(tmp_path / "model.gguf", llama_metadata(), padding=b"\0" * 100)
+        
+        info = read_gguf_metadata(str(path))
+        
+        assert info.architecture == "llama"
+        assert info.n_layers == 32
+        assert info.context_length == 32768
+        assert info.head_count_kv == 8
+        assert info.quantization == "Q5_K_M"
+        assert info.file_size == path.stat().st_size
+    
+    def test_reads_version_1_header(self, tmp_path):
+        """Test en-tête GGUF v1 (compteurs sur 32 bits)"""
+        path = write_gguf(tmp_path / "model.gguf", llama_metadata(n_layers=26), version=1)
+        
+        assert read_gguf_metadata(str(path)).n_layers == 26
+    
+    def test_rejects_non_gguf_and_truncated_files(self, tmp_path):
+        """Test fichiers invalides : ValueError"""
+        other = tmp_path / "model.bin"
+        other.write_bytes(b"GGML" + b"\0" * 32)
+        with pytest.raises(ValueError, match="Pas un fichier GGUF"):
+            read_gguf_metadata(str(other))
+        
+        path = write_gguf(tmp_path / "model.gguf", llama_metadata())
+        path.write_bytes(path.read_bytes()[:60])
+        with pytest.raises(ValueError, match="tronqué"):
+            read_gguf_metadata(str(path))
+
+
+class TestComputeAutoParams:
+    """Tests du calcul des paramètres selon le matériel"""
+    
+    def test_model_fits_in_vram(self):
+        """Test toutes les couches sur GPU avec un contexte de 4096"""
+        params = compute_auto_params(zephyr_like(), vram_free=8 * GB, cores=8)
+        
+        assert params["n_gpu_layers"] == -1
+        assert params["n_ctx"] == 4096
+        assert params["n_batch"] == 512
+        assert params["n_threads"] == 8
+        assert params["use_mlock"] is True and params["use_mmap"] is True
+    
+    def test_partial_offload_when_vram_is_short(self):
+        """Test couches réparties GPU/CPU, contexte réduit"""
+        params = compute_auto_params(zephyr_like(), vram_free=4 * GB, cores=6)
+        
+        assert 0 < params["n_gpu_layers"] < 32
+        assert params["n_ctx"] == 2048
+        assert params["n_batch"] == 256
+    
+    def test_cpu_only_without_gpu(self):
+        """Test sans GPU : threads et batch quand même adaptés"""
+        params = compute_auto_params(zephyr_like(), vram_free=None, cores=4)
+        
+        assert params["n_gpu_layers"] == 0
+        assert params["n_ctx"] == 2048
+        assert params["n_batch"] == 128
+        assert params["n_threads"] == 4
+        assert params["use_mlock"] is False
+    
+    def test_context_capped_by_training_context(self):
+        """Test n_ctx jamais au-delà du contexte d'entraînement"""
+        gguf = zephyr_like(file_size=1 * GB)
+        gguf.context_length = 2048
+        
+        assert compute_auto_params(gguf, vram_free=8 * GB, cores=8)["n_ctx"] == 2048
+
+
+class TestCalibration:
+    """Tests des candidats et de la calibration"""
+    
+    def test_candidates_are_distinct_variants_of_base(self):
+        """Test variantes threads/batch (+ couches si partagé), sans doublon"""
+        base = compute_auto_params(zephyr_like(), vram_free=4 * GB, cores=2)
+        candidates = candidate_params(base, cores=2)
+        
+        assert candidates[0] == base
+        assert len(candidates) == len({json.dumps(c, sort_keys=True) for c in candidates})
+        assert any(c["n_gpu_layers"] < base["n_gpu_layers"] for c in candidates)
+        assert {c["n_threads"] for c in candidates} == {1, 2}
+    
+    def test_calibrate_keeps_fastest_and_skips_failures(self):
+        """Test meilleur débit retenu, candidat en erreur écarté"""
+        candidates = [{"n_gpu_layers": layers, "n_batch": 256, "n_threads": 4} for layers in (-1, 30, 20)]
+        speeds = {-1: RuntimeError("CUDA out of memory"), 30: 22.5, 20: 18.0}
+        
+        def measure(params):
+            speed = speeds[params["n_gpu_layers"]]
+            if isinstance(speed, Exception):
+                raise speed
+            return speed
+        
+        best = calibrate(candidates, measure)
+        
+        assert best["params"]["n_gpu_layers"] == 30
+        assert best["tokens_per_second"] == 22.5
+        assert [result["tokens_per_second"] for result in best["results"]] == [0.0, 22.5, 18.0]
+    
+    def test_calibrate_reports_candidates_and_stops_on_cancel(self):
+        """Test (index, total) avant chaque mesure ; mesure annulée non comptée comme échec"""
+        candidates = [{"n_gpu_layers": layers, "n_batch": 256, "n_threads": 4} for layers in (-1, 30, 20)]
+        seen = []
+        stopped = []
+        
+        def measure(params):
+            if params["n_gpu_layers"] == 30:
+                stopped.append(True)
+                raise RuntimeError("Failed to load model from file")
+            return 20.0
+        
+        best = calibrate(candidates, measure, should_stop=lambda: bool(stopped),
+                         on_candidate=lambda index, total: seen.append((index, total)))
+        
+        assert best is None
+        assert seen == [(0, 3), (1, 3)]
+    
+    def test_calibrate_stops_or_fails(self):
+        """Test calibration interrompue ou sans candidat valide : None"""
+        candidates = [{"n_gpu_layers": 0, "n_batch": 128, "n_threads": 4}]
+        
+        assert calibrate(candidates, lambda params: 10.0, should_stop=lambda: True) is None
+        assert calibrate(candidates, lambda params: 0.0) is None
+
+
+class TestAutoProfileCache:
+    """Tests du cache des profils calibrés"""
+    
+    def test_put_get_discard(self, tmp_path):
+        """Test profil gardé sur disque par machine et modèle"""
+        path = tmp_path / "data" / "auto_profiles.json"
+        key = AutoProfileCache.key(machine_fingerprint("RTX 4050", 6 * GB, 8), "abc")
+        entry = {"params": {"n_gpu_layers": -1}, "tokens_per_second": 30.0}
+        
+        AutoProfileCache(str(path)).put(key, entry)
+        
+        cache = AutoProfileCache(str(path))
+        assert cache.get(key) == entry
+        assert cache.get(AutoProfileCache.key(machine_fingerprint(None, None, 8), "abc")) is None
+        
+        cache.discard(key)
+        assert cache.get(key) is None
+    
+    def test_corrupted_cache_is_ignored(self, tmp_path):
+        """Test fichier cache illisible : vide, puis réécrit"""
+        path = tmp_path / "auto_profiles.json"
+        path.write_text("{pas du json")
+        cache = AutoProfileCache(str(path))
+        
+        assert cache.get("key") is None
+        cache.put("key", {"params": {}})
+        assert json.loads(path.read_text()) == {"key": {"params": {}}}
+    
+    def test_model_fingerprint_changes_with_content(self, tmp_path):
+        """Test empreinte stable pour un fichier, différente pour un autre"""
+        first = write_gguf(tmp_path / "a.gguf", llama_metadata(n_layers=32))
+        second = write_gguf(tmp_path / "b.gguf", llama_metadata(n_layers=40))
+        
+        assert model_fingerprint(str(first)) == model_fingerprint(str(first))
+        assert model_fingerprint(str(first)) != model_fingerprint(str(second))
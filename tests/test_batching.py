@@ -0,0 +1,264 @@
+"""
+Tests unitaires pour src.ai.batching
+Tests du moteur de génération par lots (backend llama.cpp simulé)
+"""
+
+import random
+import threading
+
+import pytest
+
+from src.ai.batching import BatchEngine, _sample, _stop_holdback
+
+
+EOS = 99
+
+
+class FakeBatchBackend:
+    """
+    Backend simulé : chaque séquence « compte » à partir de son dernier
+    token (prompt [10, 11] → 12, 13, ...), EOS = 99
+    
+    Vérifie que les positions de chaque séquence sont contiguës et que les
+    séquences sont bien effacées avant réutilisation.
+    """
+    
+    def __init__(self, n_ctx_per_seq=64, n_batch=32):
+        self.n_ctx_per_seq = n_ctx_per_seq
+        self.n_batch = n_batch
+        self.kv = {}
+        self.calls = []
+        self.cleared = []
+        self.gate = None
+        self.fail = False
+        self.closed = False
+        self.decoding = threading.Event()
+        self._last = []
+    
+    def decode(self, entries):
+        self.decoding.set()
+        if self.gate is not None:
+            self.gate.wait(5.0)
+            self.gate = None
+        
+        if self.fail:
+            raise RuntimeError("KV cache plein")
+        
+        assert 0 < len(entries) <= self.n_batch
+        self.calls.append(list(entries))
+        
+        for token, pos, seq_id, _ in entries:
+            cells = self.kv.setdefault(seq_id, [])
+            assert pos == len(cells), "positions non contiguës"
+            cells.append(token)
+        
+        self._last = entries
+    
+    def top_logits(self, index, k):
+        token, _, _, logits = self._last[index]
+        assert logits, "logits non demandés pour cette entrée"
+        return [(token + 1, 10.0), (0, 1.0)][:k]
+    
+    def clear_sequence(self, seq_id):
+        self.kv.pop(seq_id, None)
+        self.cleared.append(seq_id)
+    
+    def token_eos(self):
+        return EOS
+    
+    def detokenize(self, tokens):
+        return "".join(f"<{t}>" for t in tokens).encode("utf-8")
+    
+    def close(self):
+        self.closed = True
+
+
+def generate(engine, tokens, max_tokens=3, **kwargs):
+    """Soumet une requête gloutonne et attend le texte"""
+    request = engine.submit(tokens, max_tokens=max_tokens, temperature=0.0, top_p=1.0, **kwargs)
+    return request.future.result(timeout=5.0)
+
+
+@pytest.fixture
+def backend():
+    """Backend simulé"""
+    return FakeBatchBackend()
+
+
+@pytest.fixture
+def engine(backend):
+    """Moteur de batch (4 séquences) sur backend simulé"""
+    engine = BatchEngine(backend, max_sequences=4, seed=0)
+    yield engine
+    engine.close()
+
+
+class TestSampling:
+    """Tests pour l'échantillonnage"""
+    
+    def test_greedy(self):
+        """Test temperature 0 → meilleur candidat"""
+        candidates = [(5, 3.0), (7, 2.0), (9, 1.0)]
+        assert _sample(candidates, 0.0, 1.0, random.Random(0)) == 5
+    
+    def test_top_p_keeps_nucleus(self):
+        """Test top_p faible → seul le candidat dominant reste"""
+        candidates = [(5, 10.0), (7, 2.0), (9, 1.0)]
+        rng = random.Random(0)
+        assert {_sample(candidates, 1.0, 0.5, rng) for _ in range(50)} == {5}
+    
+    def test_temperature_spreads_choices(self):
+        """Test température élevée → plusieurs candidats tirés"""
+        candidates = [(5, 1.0), (7, 1.0), (9, 1.0)]
+        rng = random.Random(0)
+        assert {_sample(candidates, 1.0, 1.0, rng) for _ in range(100)} == {5, 7, 9}
+    
+    def test_stop_holdback(self):
+        """Test retenue du début possible d'une séquence d'arrêt"""
+        assert _stop_holdback("Bonjour\nUs", ["\nUser:"]) == 3
+        assert _stop_holdback("Bonjour", ["\nUser:"]) == 0
+
+
+class TestBatchEngine:
+    """Tests pour BatchEngine"""
+    
+    def test_single_request(self, engine):
+        """Test génération simple jusqu'à max_tokens"""
+        assert generate(engine, [10, 11, 12]) == "<13><14><15>"
+    
+    def test_stops_on_eos(self, engine):
+        """Test arrêt sur le token de fin de séquence"""
+        assert generate(engine, [95], max_tokens=10) == "<96><97><98>"
+    
+    def test_stop_sequence_not_streamed(self, engine):
+        """Test séquence d'arrêt : texte tronqué, jamais émis en streaming"""
+        pieces = []
+        text = generate(
+            engine, [10], max_tokens=10, stop=["<14>"], on_token=pieces.append
+        )
+        
+        assert text == "<11><12><13>"
+        assert "".join(pieces) == text
+    
+    def test_concurrent_requests_decoded_together(self, engine, backend):
+        """Test plusieurs séquences avancées dans un même appel à decode"""
+        backend.gate = threading.Event()
+        requests = [
+            engine.submit([base], max_tokens=5, temperature=0.0, top_p=1.0)
+            for base in (10, 20, 30, 40)
+        ]
+        backend.gate.set()
+        
+        results = [request.future.result(timeout=5.0) for request in requests]
+        
+        assert results[1] == "<21><22><23><24><25>"
+        assert results[3] == "<41><42><43><44><45>"
+        assert max(len({seq for _, _, seq, _ in call}) for call in backend.calls) == 4
+        
+        stats = engine.get_stats()
+        assert stats['completed'] == 4
+        assert stats['tokens_generated'] == 20
+        assert stats['avg_batch_tokens'] > 1
+    
+    def test_sequences_limited_and_reused(self, backend):
+        """Test max_sequences respecté, séquences libérées puis réutilisées"""
+        engine = BatchEngine(backend, max_sequences=2, seed=0)
+        
+        try:
+            backend.gate = threading.Event()
+            requests = [
+                engine.submit([base], max_tokens=4, temperature=0.0, top_p=1.0)
+                for base in (10, 20, 30, 40, 50)
+            ]
+            backend.gate.set()
+            
+            results = [request.future.result(timeout=5.0) for request in requests]
+        finally:
+            engine.close()
+        
+        assert results[4] == "<51><52><53><54>"
+        assert max(len({seq for _, _, seq, _ in call}) for call in backend.calls) == 2
+        assert sorted(set(backend.cleared)) == [0, 1]
+        assert len(backend.cleared) == 5
+    
+    def test_long_prompt_prefilled_in_chunks(self):
+        """Test prompt plus long que n_batch : prefill découpé"""
+        backend = FakeBatchBackend(n_batch=4)
+        engine = BatchEngine(backend, max_sequences=2, seed=0)
+        
+        try:
+            assert generate(engine, list(range(1, 11)), max_tokens=2) == "<11><12>"
+        finally:
+            engine.close()
+        
+        assert all(len(call) <= 4 for call in backend.calls)
+        assert len(backend.calls) >= 3
+    
+    def test_prompt_too_long_rejected(self, engine, backend):
+        """Test prompt dépassant le contexte par séquence"""
+        request = engine.submit(
+            list(range(backend.n_ctx_per_seq)), max_tokens=4, temperature=0.0, top_p=1.0
+        )
+        
+        with pytest.raises(RuntimeError, match="Prompt trop long"):
+            request.future.result(timeout=5.0)
+    
+    def test_context_limit_stops_generation(self):
+        """Test arrêt quand la séquence remplit son contexte"""
+        backend = FakeBatchBackend(n_ctx_per_seq=8)
+        engine = BatchEngine(backend, max_sequences=1, seed=0)
+        
+        try:
+            text = generate(engine, [10, 11, 12, 13], max_tokens=50)
+        finally:
+            engine.close()
+        
+        assert text == "<14><15><16><17>"
+    
+    def test_cancel_frees_sequence(self, engine, backend):
+        """Test annulation : texte partiel et séquence libérée"""
+        pieces = []
+        
+        def on_token(piece):
+            pieces.append(piece)
+            if len(pieces) == 2:
+                request.cancel()
+        
+        request = engine.submit(
+            [10], max_tokens=50, temperature=0.0, top_p=1.0, on_token=on_token
+        )
+        text = request.future.result(timeout=5.0)
+        
+        assert text.startswith("<11><12>")
+        assert len(text) < 50 * 4
+        assert request.seq_id in backend.cleared
+    
+    def test_decode_error_fails_requests(self, engine, backend):
+        """Test erreur llama_decode propagée aux requêtes du batch"""
+        backend.fail = True
+        
+        with pytest.raises(RuntimeError, match="Échec génération"):
+            generate(engine, [10])
+        
+        assert engine.get_stats()['failed'] == 1
+
+    def test_close_keeps_backend_while_decoding(self, backend):
+        """Test arrêt pendant un décodage bloqué : backend pas libéré sous le thread"""
+        engine = BatchEngine(backend, max_sequences=2, seed=0)
+        engine.CLOSE_TIMEOUT = 0.1
+        backend.gate = threading.Event()
+        
+        request = engine.submit([10], max_tokens=3, temperature=0.0, top_p=1.0)
+        assert backend.decoding.wait(5.0)
+        
+        engine.close()
+        
+        assert not backend.closed
+        with pytest.raises(RuntimeError, match="BatchEngine arrêté"):
+            request.future.result(timeout=1.0)
+        
+        # Décodage terminé : un nouvel arrêt libère le backend
+        backend.gate.set()
+        engine._thread.join(timeout=5.0)
+        engine.close()
+        assert backend.closed
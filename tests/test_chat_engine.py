@@ -15,10 +15,12 @@ from unittest.mock import Mock, patch, MagicMock
 from src.ai.chat_engine import (
     ChatEngine,
     ChatResponse,
+    ChatStream,
     EmotionDetector,
     get_chat_engine
 )
 from src.ai.config import AIConfig
+from src.ai.emotion_analyzer import EmotionAnalyzer, EmotionResult
 from src.ai.memory import ConversationMemory
 from src.ai.model_manager import ModelManager
 
@@ -154,6 +156,34 @@ class TestEmotionDetector:
         assert emotion == 'sorrow'
 
 
+class FakeLlama:
+    """Faux modèle llama-cpp : 1 mot = 1 token, KV cache simulé"""
+    
+    def __init__(self):
+        self.vocab = {}
+        self.eval_tokens = []
+    
+    def tokenize(self, text, add_bos=True):
+        words = text.decode("utf-8").split()
+        return [self.vocab.setdefault(word, len(self.vocab) + 1) for word in words]
+    
+    def reset(self):
+        self.eval_tokens = []
+    
+    def eval(self, tokens):
+        self.eval_tokens = self.eval_tokens + list(tokens)
+    
+    def save_state(self):
+        return Mock(tokens=list(self.eval_tokens), llama_state_size=100)
+    
+    def load_state(self, state):
+        self.eval_tokens = list(state.tokens)
+    
+    def __call__(self, prompt, **kwargs):
+        self.eval_tokens = self.tokenize(prompt.encode("utf-8"))
+        return {"choices": [{"text": "Bonne question !"}]}
+
+
 # ============================================================================
 # Tests ChatEngine (mocked)
 # ============================================================================
@@ -190,6 +220,7 @@ class TestChatEngine:
         manager = Mock(spec=ModelManager)
         manager.is_loaded = True
         manager.generate.return_value = "Bonjour ! Je suis Kira ! 😊"
+        manager.count_tokens.side_effect = lambda text: len(text.split())
         manager.get_model_info.return_value = {
             'loaded': True,
             'model_path': 'fake_model.gguf'
@@ -198,16 +229,15 @@ class TestChatEngine:
     
     @pytest.fixture
     def chat_engine(self, mock_config, mock_memory, mock_model_manager):
-        """ChatEngine avec toutes les dépendances mockées"""
-        return ChatEngine(mock_config, mock_memory, mock_model_manager)
+        """ChatEngine avec toutes les dépendances mockées (analyseur isolé)"""
+        return ChatEngine(mock_config, mock_memory, mock_model_manager, EmotionAnalyzer())
     
     def test_initialization(self, chat_engine):
         """Test initialisation du ChatEngine"""
         assert chat_engine.config is not None
         assert chat_engine.memory is not None
         assert chat_engine.model_manager is not None
-        assert chat_engine.emotion_detector is not None
-        assert isinstance(chat_engine.emotion_detector, EmotionDetector)
+        assert isinstance(chat_engine.emotion_analyzer, EmotionAnalyzer)
     
     def test_build_prompt_empty_history(self, chat_engine):
         """Test construction prompt sans historique"""
@@ -273,6 +303,54 @@ class TestChatEngine:
         # Vérifier que generate a été appelé
         mock_model_manager.generate.assert_called_once()
     
+    def test_chat_returns_full_emotion_result(self, chat_engine, mock_memory):
+        """Test une seule analyse : résultat complet, identique à l'émotion sauvegardée"""
+        response = chat_engine.chat("Bonjour Kira !", "test_user", "desktop")
+        
+        assert isinstance(response.emotion_result, EmotionResult)
+        assert response.emotion_result.emotion == response.emotion
+        assert response.emotion_result.intensity > 0
+        assert response.vrm_blendshape['blendshape'] == 'Joy'
+        
+        saved = mock_memory.save_interaction.call_args.kwargs
+        assert saved['emotion'] == response.emotion
+        
+        # Historique émotionnel tenu par utilisateur (lissage du tour suivant)
+        assert len(chat_engine.emotion_analyzer.get_emotion_history("test_user")) == 1
+    
+    def test_emotion_context_rehydrated_from_history(self, chat_engine, mock_memory):
+        """Test utilisateur inconnu de l'analyseur : contexte repris de l'historique"""
+        mock_memory.get_history.return_value = [
+            {'user_input': 'Salut', 'bot_response': 'Super !', 'emotion': 'joy'}
+        ]
+        
+        response = chat_engine.chat("Bonjour Kira !", "test_user", "desktop")
+        
+        assert response.emotion_result.context_score == 80.0
+        emotions = [r.emotion for r in chat_engine.emotion_analyzer.get_emotion_history("test_user")]
+        assert emotions == ['joy', 'joy']
+    
+    def test_pluggable_emotion_analyzer(self, mock_config, mock_memory, mock_model_manager):
+        """Test analyseur fourni : appelé une fois par tour, résultat repris tel quel"""
+        result = EmotionResult(
+            emotion='fun', intensity=60.0, confidence=70.0,
+            keywords_found=['mdr'], context_score=50.0, timestamp=None
+        )
+        analyzer = Mock()
+        analyzer.analyze.return_value = result
+        analyzer.get_vrm_blendshape.return_value = {'blendshape': 'Fun', 'value': 0.6}
+        
+        engine = ChatEngine(mock_config, mock_memory, mock_model_manager, analyzer)
+        response = engine.chat("Raconte une blague", "test_user", "discord")
+        
+        analyzer.analyze.assert_called_once_with(
+            text="Bonjour ! Je suis Kira ! 😊", user_id="test_user"
+        )
+        analyzer.get_vrm_blendshape.assert_called_once_with('fun', 60.0)
+        assert response.emotion == 'fun'
+        assert response.emotion_result is result
+        assert response.vrm_blendshape == {'blendshape': 'Fun', 'value': 0.6}
+    
     def test_chat_with_history(
         self,
         chat_engine,
@@ -294,6 +372,155 @@ class TestChatEngine:
         assert isinstance(response, ChatResponse)
         assert response.context_messages == 1  # 1 message d'historique
     
+    def test_chat_reports_token_usage(self, chat_engine, mock_memory):
+        """Test tokens prompt/réponse comptés avec le tokenizer"""
+        response = chat_engine.chat("Bonjour Kira !", "test_user", "desktop")
+        
+        assert response.completion_tokens == len("Bonjour ! Je suis Kira ! 😊".split())
+        assert response.prompt_tokens > 0
+        assert response.tokens_used == response.prompt_tokens + response.completion_tokens
+    
+    def test_fit_history_respects_token_budget(self, chat_engine, mock_config):
+        """Test historique rempli du plus récent au plus ancien dans le budget"""
+        # cpu_fallback : n_ctx=2048, max_tokens=100
+        long_turn = {'user_input': "mot " * 3000, 'bot_response': "ok"}
+        history = [
+            {'user_input': 'Très ancien', 'bot_response': 'Oui'},
+            long_turn,
+            {'user_input': 'Récent 1', 'bot_response': 'Réponse 1'},
+            {'user_input': 'Récent 2', 'bot_response': 'Réponse 2'}
+        ]
+        
+        selected, prompt_tokens = chat_engine._fit_history("Bonjour", history)
+        
+        # Le long échange ne tient pas : on s'arrête avant (historique contigu)
+        assert [h['user_input'] for h in selected] == ['Récent 1', 'Récent 2']
+        assert prompt_tokens <= 2048 - mock_config.max_tokens
+    
+    def test_fit_history_caches_token_counts(self, chat_engine, mock_model_manager):
+        """Test les échanges d'historique ne sont tokenisés qu'une fois"""
+        history = [{'user_input': 'Salut', 'bot_response': 'Bonjour !'}]
+        
+        chat_engine._fit_history("Question 1", history)
+        calls = mock_model_manager.count_tokens.call_count
+        
+        chat_engine._fit_history("Question 2", history)
+        
+        # Seule la nouvelle question est tokenisée
+        assert mock_model_manager.count_tokens.call_count == calls + 1
+    
+    def test_fit_history_keeps_window_start(self, chat_engine):
+        """Test début de fenêtre fixe, puis coupe d'un bloc (context_limit=10)"""
+        rows = [{'user_input': f"Q{i}", 'bot_response': f"R{i}"} for i in range(20)]
+        starts = []
+        
+        for turn in range(1, 20):
+            history = rows[:turn][-10:]  # get_history(limit=context_limit)
+            selected, _ = chat_engine._fit_history("Question", history, ("u1", "desktop"))
+            starts.append(selected[0]['user_input'])
+        
+        # Fenêtre Q0..Q9 inchangée au début, puis 5 échanges gardés d'un coup
+        assert starts[:10] == ["Q0"] * 10
+        assert starts[10:16] == ["Q6"] * 6
+        assert starts[16:] == ["Q12"] * 3
+    
+    def test_fit_history_cut_frees_half_budget(self, chat_engine, mock_config):
+        """Test dépassement du budget : la fenêtre repart avec de la marge"""
+        # cpu_fallback : n_ctx=2048, max_tokens=100 ; ~300 tokens par échange
+        history = [
+            {'user_input': "mot " * 300, 'bot_response': f"R{i}"} for i in range(8)
+        ]
+        
+        selected, prompt_tokens = chat_engine._fit_history("Bonjour", history, ("u1", "desktop"))
+        
+        assert len(selected) == 3
+        assert prompt_tokens <= (2048 - mock_config.max_tokens) // 2 + 20
+    
+    def test_prefix_reused_past_context_limit(self, tmp_path):
+        """Test au-delà de context_limit tours, le préfixe réutilisé dépasse le system prompt"""
+        config = AIConfig(
+            model_path="fake_model.gguf",
+            context_limit=4,
+            gpu_profile="cpu_fallback",
+            max_tokens=50,
+            system_prompt="Tu es Kira."
+        )
+        memory = ConversationMemory(str(tmp_path / "chat.db"))
+        
+        with patch("src.ai.model_manager.LLAMA_CPP_AVAILABLE", True):
+            manager = ModelManager(config)
+        manager.is_loaded = True
+        manager.model = FakeLlama()
+        
+        engine = ChatEngine(config, memory, manager, EmotionAnalyzer())
+        system_tokens = manager.count_tokens(engine._format_system())
+        exchange_tokens = manager.count_tokens(
+            engine._format_interaction("Question 0 ?", "Bonne question !")
+        )
+        
+        hits = []
+        try:
+            for turn in range(12):
+                engine.chat(f"Question {turn} ?", "u1", "desktop")
+                hits.append(manager.last_prefix_stats['prefix_hit_tokens'])
+        finally:
+            memory.close()
+        
+        # Fenêtre glissante échange par échange : plus aucun échange réutilisé
+        # après context_limit tours ; fenêtre fixe : 2 tours sur 3
+        later = hits[config.context_limit + 1:]
+        reused = [hit >= system_tokens + exchange_tokens for hit in later]
+        assert sum(reused) >= 2 * len(later) // 3
+    
+    def test_chat_stream_yields_tokens_then_response(
+        self,
+        chat_engine,
+        mock_memory,
+        mock_model_manager
+    ):
+        """Test streaming : fragments puis réponse complète"""
+        mock_model_manager.generate_stream.return_value = iter(["Super ", "content ", "😊 "])
+        
+        stream = chat_engine.chat_stream("Bonjour", "test_user", "desktop")
+        
+        assert isinstance(stream, ChatStream)
+        mock_memory.save_interaction.assert_not_called()  # Génération pas encore lancée
+        
+        tokens = list(stream)
+        
+        assert tokens == ["Super ", "content ", "😊 "]
+        assert stream.response.response == "Super content 😊"
+        assert stream.response.emotion == 'joy'
+        assert stream.response.time_to_first_token is not None
+        assert stream.response.time_to_first_token <= stream.response.processing_time
+        mock_memory.save_interaction.assert_called_once()
+    
+    def test_chat_stream_abandoned_is_not_saved(
+        self,
+        chat_engine,
+        mock_memory,
+        mock_model_manager
+    ):
+        """Test flux abandonné : aucune sauvegarde"""
+        mock_model_manager.generate_stream.return_value = iter(["Un ", "deux ", "trois"])
+        
+        stream = iter(chat_engine.chat_stream("Bonjour", "test_user", "desktop"))
+        next(stream)
+        stream.close()
+        
+        mock_memory.save_interaction.assert_not_called()
+    
+    def test_chat_stream_generation_error(self, chat_engine, mock_model_manager):
+        """Test erreur pendant le streaming"""
+        def failing_stream(**kwargs):
+            yield "Début"
+            raise RuntimeError("CUDA OOM")
+        
+        mock_model_manager.generate_stream.side_effect = failing_stream
+        
+        with pytest.raises(RuntimeError, match="Échec génération réponse"):
+            list(chat_engine.chat_stream("Bonjour", "test_user", "desktop"))
+    
     def test_chat_generation_error(
         self,
         chat_engine,
@@ -305,7 +532,7 @@ class TestChatEngine:
         with pytest.raises(RuntimeError, match="Échec génération réponse"):
             chat_engine.chat("Bonjour", "test_user", "desktop")
     
-    def test_clear_user_history(self, chat_engine, mock_memory):
+    def test_clear_user_history(self, chat_engine, mock_memory, mock_model_manager):
         """Test effacement historique utilisateur"""
         deleted = chat_engine.clear_user_history("test_user", "desktop")
         
@@ -314,6 +541,15 @@ class TestChatEngine:
             "test_user",
             "desktop"
         )
+        mock_model_manager.release_slot.assert_called_once_with(("test_user", "desktop"))
+    
+    def test_clear_user_history_resets_emotion_context(self, chat_engine):
+        """Test effacement : historique émotionnel de l'utilisateur effacé aussi"""
+        chat_engine.chat("Bonjour", "test_user", "desktop")
+        
+        chat_engine.clear_user_history("test_user")
+        
+        assert chat_engine.emotion_analyzer.get_emotion_history("test_user") == []
     
     def test_get_stats(self, chat_engine, mock_memory, mock_model_manager):
         """Test récupération statistiques"""
@@ -407,6 +643,7 @@ class TestChatEngineIntegration:
         mock_manager = Mock(spec=ModelManager)
         mock_manager.is_loaded = True
         mock_manager.generate.return_value = "Salut ! Content de te voir ! 😊"
+        mock_manager.count_tokens.side_effect = lambda text: len(text.split())
         mock_manager.get_model_info.return_value = {'loaded': True}
         
         # ChatEngine avec vraie mémoire
@@ -424,9 +661,9 @@ class TestChatEngineIntegration:
         # Vérifier sauvegarde
         history = memory.get_history("user123", limit=10, source="desktop")
         assert len(history) == 2
-        # Note: get_history retourne du plus récent au plus ancien
-        assert history[-1]['user_input'] == "Bonjour"
-        assert history[-2]['user_input'] == "Comment ça va ?"
+        # get_history retourne du plus ancien au plus récent
+        assert history[0]['user_input'] == "Bonjour"
+        assert history[1]['user_input'] == "Comment ça va ?"
     
     def test_emotion_detection_in_real_scenario(self):
         """Test détection émotions dans scénario réaliste"""
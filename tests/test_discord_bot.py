@@ -9,12 +9,28 @@ from unittest.mock import Mock, AsyncMock, patch, MagicMock
 import asyncio
 from datetime import datetime
 
-from src.discord_bot.bot import KiraDiscordBot, get_discord_bot
-from src.ai.chat_engine import ChatResponse
+from src.discord_bot.bot import (
+    KiraDiscordBot, get_discord_bot, split_message,
+    DISCORD_MESSAGE_LIMIT, STREAM_PLACEHOLDER
+)
+from src.ai.chat_engine import ChatResponse, ChatStream
+from src.ai.emotion_analyzer import EmotionResult
+from src.ai.scheduler import InferenceScheduler, SchedulerFullError
 
 
 # === Fixtures ===
 
+JOY_RESULT = EmotionResult(
+    emotion="joy",
+    intensity=75.0,
+    confidence=85.0,
+    keywords_found=["😊"],
+    context_score=50.0,
+    timestamp=None
+)
+JOY_VRM = {'blendshape': 'Joy', 'value': 0.75, 'recommended': True}
+
+
 @pytest.fixture
 def mock_chat_engine():
     """Mock du ChatEngine"""
@@ -24,7 +40,9 @@ def mock_chat_engine():
         emotion="joy",
         tokens_used=10,
         context_messages=0,
-        processing_time=0.5
+        processing_time=0.5,
+        emotion_result=JOY_RESULT,
+        vrm_blendshape=JOY_VRM
     ))
     return engine
 
@@ -53,10 +71,12 @@ def mock_emotion_analyzer():
 
 @pytest.fixture
 def mock_unity_bridge():
-    """Mock du UnityBridge"""
+    """Mock de l'AsyncUnityBridge"""
     bridge = Mock()
     bridge.is_connected = Mock(return_value=True)
-    bridge.set_expression = Mock(return_value=True)
+    bridge.connect = AsyncMock(return_value=True)
+    bridge.disconnect = AsyncMock()
+    bridge.set_expression = AsyncMock(return_value=True)
     return bridge
 
 
@@ -67,20 +87,30 @@ def mock_config():
     config.get = Mock(return_value={
         'auto_reply_enabled': True,
         'auto_reply_channels': [123456789],
-        'rate_limit_seconds': 3
+        'rate_limit_seconds': 3,
+        'stream_replies': False
     })
     return config
 
 
 @pytest.fixture
-def bot(mock_chat_engine, mock_emotion_analyzer, mock_unity_bridge, mock_config):
+def scheduler():
+    """Ordonnanceur d'inférence dédié au test"""
+    scheduler = InferenceScheduler(max_queue=4, timeout=5.0)
+    yield scheduler
+    scheduler.shutdown()
+
+
+@pytest.fixture
+def bot(mock_chat_engine, mock_emotion_analyzer, mock_unity_bridge, mock_config, scheduler):
     """Fixture du bot Discord mocké"""
     with patch('discord.Client.login', new_callable=AsyncMock):
         bot = KiraDiscordBot(
             chat_engine=mock_chat_engine,
             emotion_analyzer=mock_emotion_analyzer,
             unity_bridge=mock_unity_bridge,
-            config=mock_config
+            config=mock_config,
+            scheduler=scheduler
         )
         # Patch bot.user (read-only property)
         mock_user = Mock()
@@ -109,6 +139,46 @@ def mock_message():
     return message
 
 
+def make_chat_stream(tokens, response_text=None):
+    """Construit un ChatStream produisant `tokens` puis une ChatResponse"""
+    def generator():
+        for token in tokens:
+            yield token
+        return ChatResponse(
+            response=response_text if response_text is not None else "".join(tokens).strip(),
+            emotion="joy",
+            tokens_used=len(tokens),
+            context_messages=0,
+            processing_time=0.5,
+            time_to_first_token=0.1,
+            emotion_result=JOY_RESULT,
+            vrm_blendshape=JOY_VRM
+        )
+    return ChatStream(generator())
+
+
+@pytest.fixture
+def streaming_message(mock_message):
+    """Message Discord dont channel.send renvoie des messages éditables"""
+    posted = []
+    
+    async def send(content):
+        sent = Mock()
+        sent.content = content
+        
+        async def edit(content):
+            sent.content = content
+        
+        sent.edit = AsyncMock(side_effect=edit)
+        sent.delete = AsyncMock()
+        posted.append(sent)
+        return sent
+    
+    mock_message.channel.send = AsyncMock(side_effect=send)
+    mock_message.posted = posted
+    return mock_message
+
+
 # === Tests Initialisation ===
 
 def test_bot_initialization(mock_chat_engine, mock_emotion_analyzer, mock_unity_bridge, mock_config):
@@ -132,11 +202,13 @@ def test_bot_initialization_defaults():
     """Test initialisation avec valeurs par défaut (singletons)"""
     with patch('src.discord_bot.bot.get_chat_engine'):
         with patch('src.discord_bot.bot.get_emotion_analyzer'):
-            with patch('src.discord_bot.bot.UnityBridge'):
+            with patch('src.discord_bot.bot.AsyncUnityBridge'):
                 with patch('src.discord_bot.bot.Config'):
-                    bot = KiraDiscordBot()
-                    assert bot.chat_engine is not None
-                    assert bot.emotion_analyzer is not None
+                    with patch('src.discord_bot.bot.get_inference_scheduler'):
+                        bot = KiraDiscordBot()
+                        assert bot.chat_engine is not None
+                        assert bot.emotion_analyzer is not None
+                        assert bot.scheduler is not None
 
 
 # === Tests on_ready ===
@@ -305,31 +377,146 @@ async def test_generate_response(bot):
     
     assert response == "Salut ! Comment ça va ? 😊"
     
-    # Vérifier appels
+    # Vérifier appels : émotion reprise du ChatEngine, pas ré-analysée
     bot.chat_engine.chat.assert_called_once()
-    bot.emotion_analyzer.analyze.assert_called_once()
+    bot.emotion_analyzer.analyze.assert_not_called()
+    bot.unity_bridge.set_expression.assert_awaited_once_with(
+        expression_name="Joy", value=0.75
+    )
 
 
-def test_send_emotion_to_unity_connected(bot):
+@pytest.mark.asyncio
+async def test_send_emotion_to_unity_connected(bot):
     """Test envoi émotion à Unity (connecté)"""
-    bot._send_emotion_to_unity("joy", 75.0)
+    await bot._send_emotion_to_unity(JOY_VRM)
     
     # Vérifier appels
     bot.unity_bridge.is_connected.assert_called_once()
-    bot.emotion_analyzer.get_vrm_blendshape.assert_called_once_with("joy", 75.0)
-    bot.unity_bridge.set_expression.assert_called_once()
+    bot.unity_bridge.set_expression.assert_awaited_once()
 
 
-def test_send_emotion_to_unity_not_connected(bot):
+@pytest.mark.asyncio
+async def test_send_emotion_to_unity_not_connected(bot):
     """Test envoi émotion à Unity (non connecté)"""
     bot.unity_bridge.is_connected = Mock(return_value=False)
     
-    bot._send_emotion_to_unity("joy", 75.0)
+    await bot._send_emotion_to_unity(JOY_VRM)
     
     # Pas d'appel set_expression
     bot.unity_bridge.set_expression.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_setup_hook_connects_unity(bot):
+    """Test connexion (asyncio) à Unity au démarrage du bot (discord.unity_enabled)"""
+    bot.unity_enabled = True
+    
+    await bot.setup_hook()
+    
+    bot.unity_bridge.connect.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_setup_hook_leaves_unity_to_gui_by_default(bot):
+    """Test sans discord.unity_enabled : pas de connexion (client unique côté Unity)"""
+    assert bot.unity_enabled is False
+    
+    await bot.setup_hook()
+    
+    bot.unity_bridge.connect.assert_not_called()
+
+
+# === Tests Streaming ===
+
+def test_split_message_short_text():
+    """Test texte court → un seul morceau"""
+    assert split_message("Bonjour !") == ["Bonjour !"]
+
+
+def test_split_message_respects_limit():
+    """Test découpage sur les espaces sans dépasser la limite"""
+    text = "mot " * 1200
+    parts = split_message(text)
+    
+    assert len(parts) == 3
+    assert all(len(part) <= DISCORD_MESSAGE_LIMIT for part in parts)
+    assert " ".join(parts).split() == text.split()
+
+
+def test_split_message_prefers_newlines():
+    """Test découpage de préférence sur un saut de ligne"""
+    text = "a" * 1500 + "\n" + "b " * 400
+    parts = split_message(text)
+    
+    assert parts[0] == "a" * 1500
+    assert parts[1].startswith("b")
+
+
+def test_split_message_without_separator():
+    """Test découpage brutal d'un texte sans séparateur"""
+    parts = split_message("x" * 4500)
+    
+    assert [len(part) for part in parts] == [2000, 2000, 500]
+
+
+@pytest.mark.asyncio
+async def test_on_message_streams_reply(bot, streaming_message):
+    """Test mode streaming : placeholder puis éditions successives"""
+    bot.user.mentioned_in = Mock(return_value=True)
+    bot.stream_replies = True
+    bot.stream_edit_interval = 60.0
+    bot.stream_edit_chars = 10
+    tokens = ["Salut", " toi", ", comment", " ça", " va", " ?"]
+    bot.chat_engine.chat_stream = Mock(return_value=make_chat_stream(tokens))
+    
+    await bot.on_message(streaming_message)
+    
+    # Un seul message posté (le placeholder), puis édité
+    assert len(streaming_message.posted) == 1
+    reply = streaming_message.posted[0]
+    assert streaming_message.channel.send.call_args_list[0][0][0] == STREAM_PLACEHOLDER
+    assert reply.content == "Salut toi, comment ça va ?"
+    
+    # Éditions intermédiaires regroupées (seuil de 10 caractères)
+    assert 1 < reply.edit.await_count < len(tokens) + 1
+    
+    bot.chat_engine.chat.assert_not_called()
+    bot.emotion_analyzer.analyze.assert_not_called()
+    bot.unity_bridge.set_expression.assert_awaited_once()
+    assert bot.responses_sent == 1
+
+
+@pytest.mark.asyncio
+async def test_on_message_stream_splits_long_reply(bot, streaming_message):
+    """Test mode streaming : réponse > 2000 caractères sur plusieurs messages"""
+    bot.user.mentioned_in = Mock(return_value=True)
+    bot.stream_replies = True
+    bot.stream_edit_chars = 200
+    tokens = ["phrase "] * 700
+    bot.chat_engine.chat_stream = Mock(return_value=make_chat_stream(tokens))
+    
+    await bot.on_message(streaming_message)
+    
+    contents = [sent.content for sent in streaming_message.posted]
+    assert len(contents) == 3
+    assert all(len(content) <= DISCORD_MESSAGE_LIMIT for content in contents)
+    assert " ".join(contents).split() == ("phrase " * 700).split()
+
+
+@pytest.mark.asyncio
+async def test_on_message_stream_error_removes_placeholder(bot, streaming_message):
+    """Test mode streaming : erreur → placeholder supprimé, message d'erreur"""
+    bot.user.mentioned_in = Mock(return_value=True)
+    bot.stream_replies = True
+    bot.chat_engine.chat_stream = Mock(side_effect=RuntimeError("Erreur test"))
+    
+    await bot.on_message(streaming_message)
+    
+    placeholder, error = streaming_message.posted
+    placeholder.delete.assert_awaited_once()
+    assert "erreur" in error.content.lower()
+
+
 # === Tests Statistiques ===
 
 def test_get_stats(bot):
@@ -347,9 +534,21 @@ def test_get_stats(bot):
             assert stats['responses_sent'] == 8
             assert stats['guilds'] == 2
             assert stats['auto_reply_enabled'] is True
+            assert stats['inference']['queue_depth'] == 0
             assert 'uptime_seconds' in stats
 
 
+@pytest.mark.asyncio
+async def test_close_flushes_memory(bot):
+    """Test fermeture du bot écrit l'historique en attente"""
+    with patch('discord.ext.commands.Bot.close', new_callable=AsyncMock) as mock_close:
+        await bot.close()
+    
+    bot.chat_engine.memory.flush.assert_called_once()
+    bot.unity_bridge.disconnect.assert_awaited_once()
+    mock_close.assert_awaited_once()
+
+
 # === Tests Singleton ===
 
 def test_get_discord_bot_singleton():
@@ -378,5 +577,32 @@ async def test_on_message_handles_chat_engine_error(bot, mock_message):
     assert "erreur" in sent_message.lower()
 
 
+@pytest.mark.asyncio
+async def test_on_message_scheduler_full(bot, mock_message):
+    """Test file d'inférence pleine → message d'attente, pas d'erreur"""
+    bot.user.mentioned_in = Mock(return_value=True)
+    bot.scheduler.submit = Mock(side_effect=SchedulerFullError("pleine"))
+    
+    await bot.on_message(mock_message)
+    
+    bot.chat_engine.chat.assert_not_called()
+    sent_message = mock_message.channel.send.call_args[0][0]
+    assert "débordée" in sent_message
+
+
+@pytest.mark.asyncio
+async def test_on_message_uses_guild_lane(bot, mock_message):
+    """Test requête Discord placée dans la file de son serveur"""
+    bot.user.mentioned_in = Mock(return_value=True)
+    mock_message.guild = Mock(id=42)
+    submit = bot.scheduler.submit
+    bot.scheduler.submit = Mock(side_effect=submit)
+    
+    await bot.on_message(mock_message)
+    
+    assert bot.scheduler.submit.call_args.kwargs['lane'] == "discord:42"
+    mock_message.channel.send.assert_called_once()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -12,10 +12,14 @@ Test de toutes les fonctionnalités :
 
 import pytest
 from datetime import datetime
+from unittest.mock import patch
 
 from src.ai.emotion_analyzer import (
     EmotionAnalyzer,
+    EmotionHistory,
+    EmotionRecord,
     EmotionResult,
+    NUMPY_AVAILABLE,
     get_emotion_analyzer
 )
 
@@ -241,6 +245,90 @@ def test_emotion_history_empty_for_new_user():
     assert history == []
 
 
+def test_emotion_history_compact_records():
+    """Test entrées compactes (__slots__) et reconstruction EmotionResult"""
+    analyzer = EmotionAnalyzer()
+    result = analyzer.analyze("Je suis content.", "user1")
+    
+    record = analyzer.emotion_history.get("user1")[0]
+    assert isinstance(record, EmotionRecord)
+    assert not hasattr(record, '__dict__')
+    
+    restored = analyzer.get_emotion_history("user1")[0]
+    assert restored.emotion == result.emotion
+    assert restored.intensity == result.intensity
+    assert restored.keywords_found == []
+
+
+def test_emotion_history_max_users_lru():
+    """Test nombre d'utilisateurs borné : le moins récemment vu est évincé"""
+    analyzer = EmotionAnalyzer(max_users=2)
+    
+    analyzer.analyze("Je suis content.", "user1")
+    analyzer.analyze("Je suis triste.", "user2")
+    analyzer.analyze("Je suis content.", "user1")  # user1 redevient récent
+    analyzer.analyze("Wow incroyable !", "user3")
+    
+    assert "user2" not in analyzer.emotion_history
+    assert "user1" in analyzer.emotion_history
+    assert analyzer.get_stats()['evicted_users'] == 1
+    assert analyzer.get_stats()['total_users'] == 2
+
+
+def test_emotion_history_idle_ttl():
+    """Test utilisateurs inactifs oubliés après idle_ttl"""
+    history = EmotionHistory(depth=5, idle_ttl=60.0)
+    
+    with patch('src.ai.emotion_analyzer.time.monotonic', return_value=1000.0):
+        history.append("idle", EmotionRecord('joy', 50.0))
+    with patch('src.ai.emotion_analyzer.time.monotonic', return_value=1030.0):
+        history.append("active", EmotionRecord('fun', 50.0))
+    with patch('src.ai.emotion_analyzer.time.monotonic', return_value=1070.0):
+        history.append("active", EmotionRecord('fun', 50.0))
+    
+    assert "idle" not in history
+    assert "active" in history
+    assert history.get_stats()['evictions'] == 1
+
+
+def test_emotion_history_counters_follow_window():
+    """Test compteurs maintenus (fenêtre glissante, éviction, effacement)"""
+    history = EmotionHistory(depth=2, max_users=1)
+    
+    history.append("user1", EmotionRecord('joy', 50.0))
+    history.append("user1", EmotionRecord('joy', 50.0))
+    history.append("user1", EmotionRecord('sorrow', 50.0))
+    assert history.get_stats()['emotion_distribution'] == {'joy': 1, 'sorrow': 1}
+    
+    history.append("user2", EmotionRecord('fun', 50.0))
+    stats = history.get_stats()
+    assert stats['entries'] == 1
+    assert stats['emotion_distribution'] == {'fun': 1}
+    
+    history.remove("user2")
+    assert history.get_stats()['entries'] == 0
+    assert history.get_stats()['emotion_distribution'] == {}
+
+
+def test_rehydrate_history():
+    """Test rechargement depuis les émotions sauvegardées (utilisateur inconnu)"""
+    analyzer = EmotionAnalyzer(history_size=2)
+    
+    assert analyzer.rehydrate_history("user1", ['sorrow', None, 'joy', 'joy'])
+    assert [r.emotion for r in analyzer.get_emotion_history("user1")] == ['joy', 'joy']
+    
+    # Déjà connu : pas de rechargement
+    assert not analyzer.rehydrate_history("user1", ['angry'])
+    assert not analyzer.rehydrate_history("user2", [None])
+    
+    # Contexte repris (émotion répétée), sans lissage d'intensité inconnue
+    result = analyzer.analyze("Je suis content.", "user1")
+    fresh = EmotionAnalyzer().analyze("Je suis content.", "user2")
+    assert result.context_score == 80.0
+    assert result.intensity == fresh.intensity
+    assert analyzer.get_stats()['rehydrated_users'] == 1
+
+
 # === Tests Analyse Contextuelle ===
 
 def test_context_score_increases_for_repeated_emotion():
@@ -496,6 +584,55 @@ def test_emotion_result_keywords_found():
     assert any('heureux' in kw or 'content' in kw for kw in result.keywords_found)
 
 
+# === Tests Analyse par lots ===
+
+requires_numpy = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy non installé")
+
+
+@requires_numpy
+def test_analyze_batch_matches_analyze():
+    """Test résultats identiques à analyze() pour un premier message"""
+    texts = [
+        "Je suis heureux et content, c'est génial ! 😊",
+        "Je suis en colère, c'est énervant 😡",
+        "C'est vraiment triste, désolée...",
+        "Mdr 😂 c'était trop drôle, haha",
+        "Wow, c'est ahurissant !",
+        "Le rapport est prêt.",
+        ""
+    ]
+    
+    batch = EmotionAnalyzer().analyze_batch(texts)
+    
+    assert len(batch) == len(texts)
+    for text, result in zip(texts, batch):
+        expected = EmotionAnalyzer().analyze(text, "user1")
+        assert result.emotion == expected.emotion
+        assert result.intensity == pytest.approx(expected.intensity)
+        assert result.confidence == pytest.approx(expected.confidence)
+        assert result.keywords_found == expected.keywords_found
+        assert result.context_score == expected.context_score
+
+
+@requires_numpy
+def test_analyze_batch_is_stateless():
+    """Test analyse par lots : historique non modifié, pas de lissage"""
+    analyzer = EmotionAnalyzer()
+    analyzer.analyze("Je suis triste.", "user1")
+    
+    results = analyzer.analyze_batch(["Je suis heureux !", "Je suis heureux !"])
+    
+    assert results[0].intensity == results[1].intensity
+    assert len(analyzer.get_emotion_history("user1")) == 1
+    assert "desktop_user" not in analyzer.emotion_history
+
+
+@requires_numpy
+def test_analyze_batch_empty():
+    """Test lot vide"""
+    assert EmotionAnalyzer().analyze_batch([]) == []
+
+
 if __name__ == "__main__":
     # Lancer les tests
     pytest.main([__file__, "-v"])
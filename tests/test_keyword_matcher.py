@@ -0,0 +1,147 @@
+"""
+Tests unitaires pour KeywordMatcher
+
+Détection multi-motifs en un seul parcours :
+- Poids et mots-clés par émotion
+- Limites de mots (mots entiers, emojis partout)
+- Mots-clés partagés entre émotions
+"""
+
+from src.ai.keyword_matcher import KeywordMatcher
+from src.ai.emotion_analyzer import EmotionAnalyzer
+from src.ai.chat_engine import EmotionDetector
+
+
+# === Tests Détection ===
+
+def test_match_weights_and_keywords():
+    """Test poids cumulés et mots-clés dans l'ordre de déclaration"""
+    matcher = KeywordMatcher({'joy': {'super': 3, 'génial': 4}, 'fun': {'mdr': 2}})
+    
+    hits = matcher.match("Génial, vraiment SUPER mdr")
+    
+    assert hits['joy'].weight == 7
+    assert hits['joy'].keywords == ['super', 'génial']
+    assert hits['fun'].keywords == ['mdr']
+
+
+def test_match_list_keywords_weight_one():
+    """Test liste de mots-clés : poids 1 chacun"""
+    matcher = KeywordMatcher({'joy': ['super', 'cool']})
+    
+    assert matcher.match("super cool")['joy'].weight == 2
+
+
+def test_keyword_counted_once():
+    """Test mot-clé répété : compté une seule fois"""
+    matcher = KeywordMatcher({'joy': {'super': 3}})
+    
+    hits = matcher.match("super super super")
+    
+    assert hits['joy'].weight == 3
+    assert hits['joy'].keywords == ['super']
+
+
+def test_no_match_returns_empty():
+    """Test aucun mot-clé → dictionnaire vide"""
+    matcher = KeywordMatcher({'joy': {'super': 3}})
+    
+    assert matcher.match("Rien à signaler") == {}
+    assert matcher.match("") == {}
+
+
+def test_shared_keyword_counts_for_each_emotion():
+    """Test mot-clé présent dans plusieurs émotions"""
+    matcher = KeywordMatcher({'joy': {'bien': 2}, 'neutral': {'bien': 1}})
+    
+    hits = matcher.match("C'est bien")
+    
+    assert hits['joy'].weight == 2
+    assert hits['neutral'].weight == 1
+
+
+# === Tests Limites de mots ===
+
+def test_short_keyword_not_matched_inside_word():
+    """Test 'ah' absent de 'ahurissant', 'oh' absent de 'colère'"""
+    matcher = KeywordMatcher({'surprised': {'ah': 1, 'oh': 1, 'ahurissant': 3}})
+    
+    hits = matcher.match("C'est ahurissant, quelle colère")
+    
+    assert hits['surprised'].keywords == ['ahurissant']
+
+
+def test_keyword_matched_next_to_punctuation():
+    """Test mot-clé entouré de ponctuation"""
+    matcher = KeywordMatcher({'surprised': {'oh': 1}})
+    
+    assert 'surprised' in matcher.match("Oh! Vraiment ?")
+    assert 'surprised' in matcher.match("(oh)")
+
+
+def test_prefix_keywords_both_found():
+    """Test mots-clés préfixes l'un de l'autre (trie)"""
+    matcher = KeywordMatcher({'joy': {'content': 2, 'contente': 2}})
+    
+    assert matcher.match("content")['joy'].keywords == ['content']
+    assert matcher.match("contente")['joy'].keywords == ['contente']
+    assert matcher.match("contentement") == {}
+
+
+def test_multi_word_keyword():
+    """Test mots-clés de plusieurs mots et apostrophes"""
+    matcher = KeywordMatcher({'fun': {'mort de rire': 3}, 'neutral': {"d'accord": 1}})
+    
+    hits = matcher.match("J'étais mort de rire, d'accord ?")
+    
+    assert hits['fun'].keywords == ['mort de rire']
+    assert hits['neutral'].keywords == ["d'accord"]
+
+
+def test_emoji_matched_without_spaces():
+    """Test emojis détectés même collés au texte"""
+    matcher = KeywordMatcher({'fun': {'😂': 3}, 'joy': {'super': 3}})
+    
+    hits = matcher.match("super😂😂")
+    
+    assert hits['fun'].weight == 3
+    assert hits['joy'].weight == 3
+
+
+def test_find_and_keywords_for():
+    """Test ensemble des mots-clés trouvés puis filtrage par émotion"""
+    matcher = KeywordMatcher({'joy': {'super': 3, 'génial': 4}, 'fun': {'mdr': 2}})
+    
+    found = matcher.find("Génial, super, mdr")
+    
+    assert found == {'super', 'génial', 'mdr'}
+    assert matcher.keywords_for(found, 'joy') == ['super', 'génial']
+    assert matcher.keywords_for(found, 'sorrow') == []
+
+
+def test_weight_matrix():
+    """Test matrice mot-clé × émotion"""
+    matcher = KeywordMatcher({'joy': {'bien': 2, 'super': 3}, 'neutral': {'bien': 1}})
+    
+    assert matcher.keywords == ['bien', 'super']
+    assert matcher.emotions == ['joy', 'neutral']
+    assert matcher.weight_matrix() == [[2, 1], [3, 0]]
+
+
+# === Tests Intégration ===
+
+def test_emotion_analyzer_word_boundaries():
+    """Test EmotionAnalyzer : 'ahurissant' ne déclenche pas 'ah'"""
+    analyzer = EmotionAnalyzer()
+    
+    result = analyzer.analyze("C'est ahurissant !")
+    
+    assert result.emotion == 'surprised'
+    assert result.keywords_found == ['ahurissant']
+
+
+def test_emotion_detector_word_boundaries():
+    """Test EmotionDetector : 'oh' ne se trouve plus dans 'colère'"""
+    detector = EmotionDetector()
+    
+    assert detector.analyze("Je suis en colère") == 'angry'
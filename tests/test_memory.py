@@ -7,7 +7,10 @@ Tests pour src/ai/memory.py
 import pytest
 import os
 import tempfile
-from src.ai.memory import ConversationMemory
+import sqlite3
+import threading
+import time
+from src.ai.memory import ConversationMemory, HistoryCache
 
 
 @pytest.fixture
@@ -22,9 +25,35 @@ def temp_db():
     
     yield memory
     
-    # Nettoyer après les tests
-    if os.path.exists(path):
-        os.unlink(path)
+    # Fermer les connexions du pool avant suppression (requis sous Windows)
+    memory.close()
+    
+    # Nettoyer après les tests (base + fichiers WAL)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+@pytest.fixture
+def write_behind_db():
+    """Fixture mémoire en mode write-behind (flush manuel : intervalle long)"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    
+    memory = ConversationMemory(
+        path,
+        write_behind=True,
+        flush_interval_ms=60_000,
+        flush_batch_size=1000
+    )
+    
+    yield memory
+    
+    memory.close()
+    
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
 
 
 def test_save_and_retrieve_interaction(temp_db):
@@ -263,5 +292,576 @@ def test_multiple_users_isolation(temp_db):
     assert "Bob" in bob_history[0]['user_input']
 
 
+def test_connection_reused_in_same_thread(temp_db):
+    """Test réutilisation de la connexion du pool dans un même thread"""
+    memory = temp_db
+    
+    memory.save_interaction("pool_user", "desktop", "Msg 1", "Rép 1")
+    memory.get_history("pool_user")
+    memory.get_stats()
+    
+    assert memory.pool.get() is memory.pool.get()
+    assert memory.pool.connections_opened == 1
+    assert memory.pool.connections_reused >= 3
+
+
+def test_connection_per_thread(temp_db):
+    """Test une connexion distincte par thread, visible par les autres"""
+    memory = temp_db
+    connections = []
+    
+    def worker(i):
+        connections.append(memory.pool.get())
+        memory.save_interaction("thread_user", "discord", f"Msg {i}", f"Rép {i}")
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(set(id(conn) for conn in connections)) == 4
+    assert len(memory.get_history("thread_user", limit=10)) == 4
+
+
+def test_dead_thread_connections_reaped(temp_db):
+    """Test fermeture des connexions de threads terminés"""
+    memory = temp_db
+    
+    for i in range(5):
+        thread = threading.Thread(
+            target=memory.save_interaction,
+            args=("reap_user", "desktop", f"Msg {i}", f"Rép {i}")
+        )
+        thread.start()
+        thread.join()
+    
+    # Chaque nouveau thread ferme les connexions des threads terminés :
+    # il ne reste que celle du thread principal et celle du dernier thread
+    assert memory.pool.size == 2
+    assert len(memory.get_history("reap_user", limit=10)) == 5
+
+
+def test_wal_mode_enabled(temp_db):
+    """Test activation du mode WAL et synchronous=NORMAL"""
+    memory = temp_db
+    
+    conn = memory.pool.get()
+    
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_close_pool(temp_db):
+    """Test fermeture du pool de connexions"""
+    memory = temp_db
+    memory.save_interaction("close_user", "desktop", "Msg", "Rép")
+    
+    memory.close()
+    
+    assert memory.pool.size == 0
+    with pytest.raises(RuntimeError):
+        memory.get_history("close_user")
+
+
+def test_write_behind_history_sees_pending(write_behind_db):
+    """Test get_history voit les interactions pas encore écrites"""
+    memory = write_behind_db
+    
+    for i in range(3):
+        assert memory.save_interaction("wb_user", "discord", f"Msg {i}", f"Rép {i}") == 0
+    
+    assert memory.pending_count == 3
+    
+    history = memory.get_history("wb_user", limit=10, source="discord")
+    assert [h['user_input'] for h in history] == ["Msg 0", "Msg 1", "Msg 2"]
+    
+    # Filtre par source appliqué aussi à la file
+    assert memory.get_history("wb_user", limit=10, source="desktop") == []
+
+
+def test_write_behind_history_merges_db_and_pending(write_behind_db):
+    """Test fusion base + file avec respect de la limite"""
+    memory = write_behind_db
+    
+    memory.save_interaction("wb_merge", "desktop", "Ancien 1", "Rép")
+    memory.save_interaction("wb_merge", "desktop", "Ancien 2", "Rép")
+    memory.flush()
+    memory.save_interaction("wb_merge", "desktop", "Nouveau", "Rép")
+    
+    history = memory.get_history("wb_merge", limit=2)
+    
+    assert len(history) == 2
+    assert history[-1]['user_input'] == "Nouveau"
+
+
+def test_write_behind_flush_single_batch(write_behind_db):
+    """Test écriture de toute la file en un seul lot"""
+    memory = write_behind_db
+    
+    for i in range(20):
+        memory.save_interaction(f"user_{i % 4}", "discord", f"Msg {i}", f"Rép {i}")
+    
+    assert memory.flush() == 20
+    assert memory.pending_count == 0
+    assert memory.flush_count == 1
+    assert memory.get_stats()['total_interactions'] == 20
+
+
+def test_write_behind_save_during_flush_is_kept(write_behind_db):
+    """Test une interaction mise en file pendant l'écriture d'un lot n'est pas perdue"""
+    memory = write_behind_db
+    get_connection = memory._get_connection
+    
+    def save_during_write():
+        # Ajoutée après la prise du lot, avant son retrait de la file
+        memory._get_connection = get_connection
+        memory.save_interaction("wb_race", "desktop", "Msg 2", "Rép 2")
+        return get_connection()
+    
+    memory.save_interaction("wb_race", "desktop", "Msg 1", "Rép 1")
+    memory._get_connection = save_during_write
+    
+    assert memory.flush() == 1
+    assert memory.pending_count == 1
+    assert memory.flush() == 1
+    assert memory.get_stats()['total_interactions'] == 2
+
+
+def test_write_behind_batch_size_triggers_writer():
+    """Test écriture automatique quand la taille de lot est atteinte"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    memory = ConversationMemory(path, write_behind=True, flush_interval_ms=60_000, flush_batch_size=5)
+    
+    try:
+        for i in range(5):
+            memory.save_interaction("wb_auto", "desktop", f"Msg {i}", f"Rép {i}")
+        
+        # Attendre le thread d'écriture
+        deadline = time.time() + 5
+        while memory.flushed_rows < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        
+        assert memory.flushed_rows == 5
+        assert memory.pending_count == 0
+    finally:
+        memory.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+def test_write_behind_failing_database_backs_off():
+    """Test base en erreur : nouvelles tentatives espacées, lignes gardées en file"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    memory = ConversationMemory(path, write_behind=True, flush_interval_ms=10, flush_batch_size=1)
+    get_connection = memory._get_connection
+    attempts = []
+    
+    def failing_connection():
+        attempts.append(time.monotonic())
+        raise sqlite3.OperationalError("database is locked")
+    
+    try:
+        memory._get_connection = failing_connection
+        for i in range(5):
+            memory.save_interaction("wb_fail", "desktop", f"Msg {i}", f"Rép {i}")
+        
+        time.sleep(0.5)
+        
+        # Délais 0.1, 0.2, 0.4 s... au lieu d'une boucle active (file >= lot)
+        assert 1 <= len(attempts) <= 5
+        assert memory.flush_errors == len(attempts)
+        assert memory.pending_count == 5
+        
+        memory._get_connection = get_connection
+        memory.close()
+        
+        reopened = ConversationMemory(path)
+        try:
+            assert len(reopened.get_history("wb_fail")) == 5
+        finally:
+            reopened.close()
+    finally:
+        memory.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+def test_write_behind_full_queue_writes_synchronously(write_behind_db):
+    """Test file pleine : l'appelant écrit la file, qui reste bornée"""
+    memory = write_behind_db
+    memory.max_pending = 3
+    
+    for i in range(5):
+        memory.save_interaction("wb_full", "desktop", f"Msg {i}", f"Rép {i}")
+    
+    assert memory.sync_flushes == 1
+    assert memory.pending_count == 2
+    assert memory.flushed_rows == 3
+    
+    # Base en erreur : l'erreur remonte à l'appelant, la file ne grossit plus
+    def failing_connection():
+        raise sqlite3.OperationalError("disk I/O error")
+    
+    get_connection = memory._get_connection
+    memory._get_connection = failing_connection
+    memory.save_interaction("wb_full", "desktop", "Msg 5", "Rép 5")
+    with pytest.raises(sqlite3.OperationalError):
+        memory.save_interaction("wb_full", "desktop", "Msg 6", "Rép 6")
+    assert memory.pending_count == 3
+    
+    memory._get_connection = get_connection
+    assert [row['user_input'] for row in memory.get_history("wb_full", limit=10)] == [
+        f"Msg {i}" for i in range(6)
+    ]
+
+
+def test_write_behind_close_flushes(write_behind_db):
+    """Test la fermeture écrit les interactions en attente"""
+    memory = write_behind_db
+    
+    memory.save_interaction("wb_close", "desktop", "Msg", "Rép", emotion="joy")
+    memory.close()
+    
+    reopened = ConversationMemory(memory.db_path)
+    try:
+        assert len(reopened.get_history("wb_close")) == 1
+    finally:
+        reopened.close()
+
+
+def test_write_behind_clear_includes_pending(write_behind_db):
+    """Test l'effacement supprime aussi les interactions en file"""
+    memory = write_behind_db
+    
+    memory.save_interaction("wb_clear", "desktop", "Msg 1", "Rép 1")
+    memory.save_interaction("wb_clear", "desktop", "Msg 2", "Rép 2")
+    
+    assert memory.clear_user_history("wb_clear") == 2
+    assert memory.get_history("wb_clear") == []
+
+
+def test_history_cache_hit_after_miss(temp_db):
+    """Test get_history servi par le cache au second appel"""
+    memory = temp_db
+    memory.save_interaction("cache_user", "desktop", "Msg 1", "Rép 1")
+    
+    first = memory.get_history("cache_user", limit=5, source="desktop")
+    second = memory.get_history("cache_user", limit=5, source="desktop")
+    
+    assert first == second
+    stats = memory.history_cache.get_stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+
+
+def test_history_cache_updated_on_save(temp_db):
+    """Test save_interaction met à jour les clés en cache (source et toutes sources)"""
+    memory = temp_db
+    memory.get_history("cache_save", limit=5, source="discord")
+    memory.get_history("cache_save", limit=5)
+    
+    memory.save_interaction("cache_save", "discord", "Nouveau", "Rép")
+    
+    assert memory.get_history("cache_save", limit=5, source="discord")[-1]['user_input'] == "Nouveau"
+    assert memory.get_history("cache_save", limit=5)[-1]['user_input'] == "Nouveau"
+    assert memory.history_cache.get_stats()['hits'] == 2
+
+
+def test_history_cache_limit_above_depth_misses(temp_db):
+    """Test une limite supérieure à la profondeur du cache lit la base"""
+    memory = temp_db
+    for i in range(15):
+        memory.save_interaction("cache_deep", "desktop", f"Msg {i}", f"Rép {i}")
+    
+    memory.get_history("cache_deep", limit=10)
+    history = memory.get_history("cache_deep", limit=15)
+    
+    assert len(history) == 15
+    assert memory.history_cache.get_stats()['misses'] == 2
+
+
+def test_history_cache_invalidated_on_clear(temp_db):
+    """Test effacement invalide le cache"""
+    memory = temp_db
+    memory.save_interaction("cache_clear", "desktop", "Msg", "Rép")
+    memory.get_history("cache_clear", source="desktop")
+    
+    memory.clear_user_history("cache_clear")
+    assert memory.get_history("cache_clear", source="desktop") == []
+    
+    memory.save_interaction("cache_all", "desktop", "Msg", "Rép")
+    memory.get_history("cache_all")
+    memory.clear_all_history()
+    assert memory.get_history("cache_all") == []
+
+
+def test_history_cache_lru_eviction():
+    """Test éviction LRU par nombre de clés et par taille mémoire"""
+    cache = HistoryCache(depth=5, max_users=2)
+    row = {'user_input': 'a', 'bot_response': 'b', 'emotion': None, 'timestamp': None}
+    
+    cache.populate("u1", None, [row], 5, cache.generation)
+    cache.populate("u2", None, [row], 5, cache.generation)
+    cache.get("u1", None, 5)  # u1 devient le plus récent
+    cache.populate("u3", None, [row], 5, cache.generation)
+    
+    assert cache.get("u2", None, 5) is None
+    assert cache.get("u1", None, 5) is not None
+    assert cache.evictions == 1
+    
+    small = HistoryCache(depth=5, max_bytes=HistoryCache.ROW_OVERHEAD_BYTES * 2)
+    for i in range(5):
+        small.populate(f"u{i}", None, [row], 5, small.generation)
+    
+    assert small.get_stats()['entries'] == 1
+    assert small.get_stats()['estimated_bytes'] <= small.max_bytes
+
+
+def test_history_cache_stale_populate_ignored():
+    """Test une lecture base concurrente à une écriture ne peuple pas le cache"""
+    cache = HistoryCache(depth=5)
+    generation = cache.generation
+    
+    cache.append("u1", "desktop", {'user_input': 'x', 'bot_response': 'y'})
+    cache.populate("u1", "desktop", [], 5, generation)
+    
+    assert cache.get("u1", "desktop", 5) is None
+
+
+def test_stats_counters_follow_deletes(temp_db):
+    """Test compteurs matérialisés mis à jour lors des suppressions"""
+    memory = temp_db
+    memory.save_interaction("user_1", "desktop", "Msg 1", "Rép 1", emotion="joy")
+    memory.save_interaction("user_1", "discord", "Msg 2", "Rép 2", emotion="sorrow")
+    memory.save_interaction("user_2", "desktop", "Msg 3", "Rép 3", emotion="joy")
+    
+    memory.clear_user_history("user_1", source="discord")
+    stats = memory.get_stats()
+    
+    assert stats['total_interactions'] == 2
+    assert stats['unique_users'] == 2
+    assert stats['by_source'] == {'desktop': 2}
+    assert stats['by_emotion'] == {'joy': 2}
+    
+    memory.clear_user_history("user_1")
+    stats = memory.get_stats()
+    
+    assert stats['unique_users'] == 1
+    assert memory.get_user_stats("user_1")['total_interactions'] == 0
+    
+    memory.clear_all_history()
+    stats = memory.get_stats()
+    
+    assert stats['total_interactions'] == 0
+    assert stats['unique_users'] == 0
+    assert stats['by_source'] == {}
+
+
+def test_stats_counters_follow_emotion_update(temp_db):
+    """Test compteurs mis à jour par trigger lors d'un UPDATE de l'émotion"""
+    memory = temp_db
+    memory.save_interaction("user_up", "desktop", "Msg", "Rép", emotion="joy")
+    
+    with memory._get_connection() as conn:
+        conn.execute("UPDATE chat_history SET emotion = 'fun' WHERE user_id = 'user_up'")
+    
+    assert memory.get_stats()['by_emotion'] == {'fun': 1}
+    assert memory.get_stats()['unique_users'] == 1
+    assert memory.get_user_stats("user_up")['top_emotions'] == [('fun', 1)]
+
+
+def test_iter_responses_in_chunks(temp_db):
+    """Test parcours de toutes les réponses par tranches (ordre des id)"""
+    memory = temp_db
+    for i in range(5):
+        memory.save_interaction(f"user_{i % 2}", "discord", "Msg", f"Rép {i}", emotion="joy")
+    
+    chunks = list(memory.iter_responses(chunk_size=2))
+    
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [row[1] for chunk in chunks for row in chunk] == [f"Rép {i}" for i in range(5)]
+    assert all(row[2] == "joy" for chunk in chunks for row in chunk)
+
+
+def test_update_emotions(temp_db):
+    """Test mise à jour groupée des émotions (stats et cache suivent)"""
+    memory = temp_db
+    memory.save_interaction("user_up", "desktop", "Msg 1", "Rép 1", emotion="neutral")
+    memory.save_interaction("user_up", "desktop", "Msg 2", "Rép 2", emotion="joy")
+    memory.get_history("user_up")  # Remplit le cache
+    
+    ids = [row[0] for chunk in memory.iter_responses() for row in chunk]
+    updated = memory.update_emotions([(ids[0], "fun"), (ids[1], "joy")])
+    
+    assert updated == 1  # Émotion inchangée : ligne non réécrite
+    assert memory.get_stats()['by_emotion'] == {'fun': 1, 'joy': 1}
+    assert [row['emotion'] for row in memory.get_history("user_up")] == ["fun", "joy"]
+    assert memory.update_emotions([]) == 0
+
+
+def test_rebuild_stats_repairs_drift(temp_db):
+    """Test rebuild_stats répare des compteurs incohérents"""
+    memory = temp_db
+    memory.save_interaction("user_1", "desktop", "Msg 1", "Rép 1", emotion="joy")
+    memory.save_interaction("user_2", "discord", "Msg 2", "Rép 2", emotion="angry")
+    
+    with memory._get_connection() as conn:
+        conn.execute("UPDATE chat_stats_global SET count = 999 WHERE scope = 'total'")
+        conn.execute("DELETE FROM chat_stats_user")
+    
+    stats = memory.rebuild_stats()
+    
+    assert stats['total_interactions'] == 2
+    assert stats['unique_users'] == 2
+    assert memory.get_user_stats("user_2")['by_source'] == {'discord': 1}
+
+
+def test_stats_backfill_existing_database():
+    """Test remplissage des compteurs pour une base créée sans eux"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    
+    # Base au format historique (sans tables de compteurs)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE chat_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            user_input TEXT NOT NULL,
+            bot_response TEXT NOT NULL,
+            emotion TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO chat_history (user_id, source, user_input, bot_response, emotion) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [("old_1", "desktop", "a", "b", "joy"), ("old_2", "discord", "c", "d", None)]
+    )
+    conn.commit()
+    conn.close()
+    
+    memory = ConversationMemory(path)
+    try:
+        stats = memory.get_stats()
+        
+        assert stats['total_interactions'] == 2
+        assert stats['unique_users'] == 2
+        assert stats['by_emotion'] == {'joy': 1}
+    finally:
+        memory.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+def test_search_ranked_with_snippet(temp_db):
+    """Test recherche plein texte avec classement et extrait"""
+    memory = temp_db
+    memory.save_interaction("user_s", "desktop", "Parle-moi de Paris", "Paris est magnifique, Paris !")
+    memory.save_interaction("user_s", "desktop", "Et Lyon ?", "Lyon est proche de Paris")
+    memory.save_interaction("user_s", "desktop", "Bonjour", "Salut !")
+    
+    results = memory.search("paris")
+    
+    assert len(results) == 2
+    assert results[0]['user_input'] == "Parle-moi de Paris"  # Plus d'occurrences
+    assert results[0]['score'] <= results[1]['score']
+    assert "[Paris]" in results[0]['snippet']
+
+
+def test_search_accents_prefix_and_filters(temp_db):
+    """Test recherche insensible aux accents, préfixe et filtres"""
+    memory = temp_db
+    memory.save_interaction("alice", "desktop", "La météo est belle", "Oui !")
+    memory.save_interaction("bob", "discord", "J'aime les films", "Moi aussi")
+    memory.save_interaction("bob", "desktop", "Un film ce soir ?", "Bonne idée")
+    
+    assert len(memory.search("meteo")) == 1
+    assert len(memory.search("film*")) == 2
+    assert len(memory.search("film*", user_id="bob", source="discord")) == 1
+    assert memory.search("film*", user_id="alice") == []
+    assert memory.search("film*", user_id="bo") == []
+    assert memory.search("bob") == []  # user_id indexé mais non recherché
+    assert len(memory.search("film*", limit=1, offset=1)) == 1
+
+
+def test_search_sanitizes_query(temp_db):
+    """Test la syntaxe FTS5 de l'utilisateur ne provoque pas d'erreur"""
+    memory = temp_db
+    memory.save_interaction("user_q", "desktop", "Question (importante) ?", "Réponse")
+    
+    assert len(memory.search('importante) "AND (')) == 0  # ET implicite sur "AND"
+    assert len(memory.search('(importante')) == 1
+    assert memory.search('   ') == []
+
+
+def test_search_index_synced_on_delete(temp_db):
+    """Test index plein texte synchronisé à la suppression"""
+    memory = temp_db
+    memory.save_interaction("user_d", "desktop", "Message unique zorglub", "Réponse")
+    assert len(memory.search("zorglub")) == 1
+    
+    memory.clear_user_history("user_d")
+    
+    assert memory.search("zorglub") == []
+
+
+def test_search_sees_write_behind_rows(write_behind_db):
+    """Test recherche inclut les interactions encore en file"""
+    memory = write_behind_db
+    memory.save_interaction("user_wb", "discord", "Parlons de dragons", "Les dragons !")
+    
+    assert len(memory.search("dragons")) == 1
+
+
+def test_search_window_limits_ranking_to_recent_matches(temp_db):
+    """Test classement borné aux correspondances les plus récentes"""
+    memory = temp_db
+    memory.SEARCH_WINDOW = 3
+    
+    for i in range(5):
+        memory.save_interaction("user_w", "desktop", f"Message {i} sur les chats", "Réponse")
+    memory.save_interaction("other", "discord", "Encore des chats", "Réponse")
+    
+    results = memory.search("chats", limit=10)
+    assert len(results) == 3
+    assert "Message 0 sur les chats" not in [r['user_input'] for r in results]
+    
+    # Le filtre utilisateur s'applique avant la fenêtre
+    results = memory.search("chats", user_id="user_w", limit=10)
+    assert len(results) == 3
+    assert all(r['user_id'] == "user_w" for r in results)
+
+
+def test_search_backfill_existing_database():
+    """Test indexation d'une base existante créée sans index FTS"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    
+    memory = ConversationMemory(path)
+    memory.save_interaction("old", "desktop", "Ancienne licorne", "Réponse")
+    with memory._get_connection() as conn:
+        conn.execute("DROP TABLE chat_history_fts")
+    memory.close()
+    
+    memory = ConversationMemory(path)
+    try:
+        assert len(memory.search("licorne")) == 1
+        memory.rebuild_search_index()
+        assert len(memory.search("licorne")) == 1
+    finally:
+        memory.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
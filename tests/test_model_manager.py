@@ -4,10 +4,19 @@ Tests du gestionnaire de modèle LLM avec GPU
 """
 
 import pytest
+import contextlib
+import mmap
 import os
+import sys
+import threading
+import types
 from unittest.mock import Mock, patch, MagicMock
-from src.ai.model_manager import ModelManager, GPUInfo, get_model_manager
+from src.ai.model_manager import (
+    ModelManager, ModelLoadCancelled, GPUInfo, PrefixCache, get_model_manager,
+    _prefetch_file, AUTO_CALIBRATION_PROGRESS
+)
 from src.ai.config import AIConfig
+from src.ai.auto_profile import AutoProfileCache, GGUFInfo, candidate_params, compute_auto_params
 
 
 class TestGPUInfo:
@@ -130,6 +139,333 @@ class TestModelManager:
         result = manager.load_model()
         assert result is True
     
+    def _fake_llama_lib(self):
+        """Faux module llama_cpp.llama_cpp (paramètres modèle + type callback)"""
+        lib = types.ModuleType("llama_cpp.llama_cpp")
+        lib.llama_model_default_params = lambda: types.SimpleNamespace(progress_callback=None)
+        lib.llama_progress_callback = lambda func: func
+        return lib
+    
+    def _fake_llama(self, lib, steps=(0.25, 0.5, 1.0)):
+        """Faux Llama qui appelle le callback de progression comme llama.cpp"""
+        def construct(**kwargs):
+            params = lib.llama_model_default_params()
+            for value in steps:
+                if not params.progress_callback(value, None):
+                    raise ValueError("Failed to load model from file")
+            return Mock()
+        return construct
+    
+    def test_load_model_reports_progress(self, tmp_path):
+        """Test progression du chargement remontée depuis llama.cpp"""
+        model_file = tmp_path / "model.gguf"
+        model_file.write_bytes(b"gguf")
+        manager = ModelManager(AIConfig(model_path=str(model_file)))
+        lib = self._fake_llama_lib()
+        original_params = lib.llama_model_default_params
+        progress = []
+        
+        with patch.dict(sys.modules, {"llama_cpp.llama_cpp": lib}), \
+                patch('src.ai.model_manager.Llama', side_effect=self._fake_llama(lib)), \
+                patch.object(manager, 'detect_gpu', return_value=GPUInfo(available=False)):
+            assert manager.load_model(progress_callback=progress.append) is True
+        
+        assert progress == [0.0, 0.25, 0.5, 1.0, 1.0]
+        assert manager.is_loaded is True
+        # Paramètres par défaut restaurés après le chargement
+        assert lib.llama_model_default_params is original_params
+    
+    def test_load_model_cancelled_during_load(self, tmp_path):
+        """Test annulation : llama.cpp interrompu, rien ne reste chargé"""
+        model_file = tmp_path / "model.gguf"
+        model_file.write_bytes(b"gguf")
+        manager = ModelManager(AIConfig(model_path=str(model_file)))
+        lib = self._fake_llama_lib()
+        cancel = threading.Event()
+        
+        def on_progress(value):
+            if value >= 0.5:
+                cancel.set()
+        
+        with patch.dict(sys.modules, {"llama_cpp.llama_cpp": lib}), \
+                patch('src.ai.model_manager.Llama', side_effect=self._fake_llama(lib)), \
+                patch.object(manager, 'detect_gpu', return_value=GPUInfo(available=False)):
+            with pytest.raises(ModelLoadCancelled):
+                manager.load_model(progress_callback=on_progress, cancel_event=cancel)
+        
+        assert manager.model is None
+        assert manager.is_loaded is False
+        assert manager.batch_engine is None
+    
+    def test_load_model_cancelled_before_start(self, tmp_path):
+        """Test annulation avant le chargement : Llama jamais construit"""
+        model_file = tmp_path / "model.gguf"
+        model_file.write_bytes(b"gguf")
+        manager = ModelManager(AIConfig(model_path=str(model_file)))
+        cancel = threading.Event()
+        cancel.set()
+        
+        with patch('src.ai.model_manager.Llama') as mock_llama, \
+                patch.object(manager, 'detect_gpu', return_value=GPUInfo(available=False)):
+            with pytest.raises(ModelLoadCancelled):
+                manager.load_model(cancel_event=cancel)
+        
+        mock_llama.assert_not_called()
+        assert manager.is_loaded is False
+    
+    def test_load_model_progress_without_native_hook(self, tmp_path):
+        """Test progression début/fin si llama.cpp n'expose pas de callback"""
+        model_file = tmp_path / "model.gguf"
+        model_file.write_bytes(b"gguf")
+        manager = ModelManager(AIConfig(model_path=str(model_file)))
+        progress = []
+        
+        with patch.dict(sys.modules, {"llama_cpp.llama_cpp": None}), \
+                patch('src.ai.model_manager.Llama', return_value=Mock()), \
+                patch.object(manager, 'detect_gpu', return_value=GPUInfo(available=False)):
+            assert manager.load_model(progress_callback=progress.append) is True
+        
+        assert progress == [0.0, 1.0]
+    
+    def test_load_model_maps_weights_and_times_stages(self, tmp_path):
+        """Test chargement mmap + pré-chargement, durées mapping/tenseurs/contexte"""
+        model_file = tmp_path / "model.gguf"
+        model_file.write_bytes(b"gguf")
+        manager = ModelManager(AIConfig(model_path=str(model_file)))
+        lib = self._fake_llama_lib()
+        
+        with patch.dict(sys.modules, {"llama_cpp.llama_cpp": lib}), \
+                patch('src.ai.model_manager.Llama', side_effect=self._fake_llama(lib)) as mock_llama, \
+                patch('src.ai.model_manager._prefetch_file') as mock_prefetch, \
+                patch.object(manager, 'detect_gpu', return_value=GPUInfo(available=False)):
+            assert manager.load_model() is True
+        
+        assert mock_llama.call_args.kwargs["use_mmap"] is True
+        mock_prefetch.assert_called_once_with(str(model_file))
+        
+        stats = manager.get_model_info()["load_stats"]
+        assert stats["mode"] == "cold"
+        for stage in ("prefetch_ms", "mapping_ms", "tensors_ms", "context_ms", "total_ms"):
+            assert stats[stage] >= 0
+    
+    def test_prefetch_file(self, tmp_path):
+        """Test pré-chargement du GGUF dans le cache de pages"""
+        model_file = tmp_path / "model.gguf"
+        model_file.write_bytes(b"\0" * 4096)
+        
+        supported = hasattr(os, "posix_fadvise") or hasattr(mmap, "MADV_WILLNEED")
+        assert _prefetch_file(str(model_file)) is supported
+        assert _prefetch_file(str(tmp_path / "absent.gguf")) is False
+    
+    def _auto_manager(self, tmp_path, **config_kwargs):
+        """ModelManager en profil "auto" (GGUF lu : 32 couches, 5 GB)"""
+        model_file = tmp_path / "model.gguf"
+        model_file.write_bytes(b"gguf")
+        manager = ModelManager(AIConfig(
+            model_path=str(model_file), gpu_profile="auto", **config_kwargs
+        ))
+        manager.auto_profile_cache = AutoProfileCache(str(tmp_path / "auto_profiles.json"))
+        gguf = GGUFInfo(
+            architecture="llama", n_layers=32, context_length=32768,
+            embedding_length=4096, head_count=32, head_count_kv=8,
+            quantization="Q5_K_M", file_size=5 * 1024 ** 3
+        )
+        gpu = GPUInfo(available=True, name="RTX 4050", vram_total=6 * 1024 ** 3, vram_free=4 * 1024 ** 3)
+        return manager, gguf, gpu
+    
+    def test_auto_profile_calibrates_then_uses_cache(self, tmp_path):
+        """Test profil auto : calcul + calibration au 1er chargement, cache ensuite"""
+        manager, gguf, gpu = self._auto_manager(tmp_path)
+        
+        def measure(model_path, params, on_progress=None):
+            # Moins de threads plus rapide sur cette machine
+            return 30.0 if params["n_threads"] == 4 else 20.0
+        
+        with patch('src.ai.auto_profile.read_gguf_metadata', return_value=gguf), \
+                patch('src.ai.auto_profile.physical_cores', return_value=8), \
+                patch.dict(sys.modules, {"llama_cpp.llama_cpp": None}), \
+                patch('src.ai.model_manager.Llama', return_value=Mock()) as mock_llama, \
+                patch.object(manager, 'detect_gpu', return_value=gpu), \
+                patch.object(manager, '_measure_throughput', side_effect=measure) as mock_measure:
+            assert manager.load_model() is True
+            
+            params = mock_llama.call_args.kwargs
+            assert 0 < params["n_gpu_layers"] < 32
+            assert params["n_threads"] == 4
+            assert manager.get_model_info()["gpu_params"]["n_threads"] == 4
+            calibrations = mock_measure.call_count
+            assert calibrations > 1
+            
+            # Rechargement : profil calibré relu depuis le cache, sans mesure
+            manager.unload_model()
+            assert manager.load_model() is True
+            assert mock_measure.call_count == calibrations
+            assert mock_llama.call_args.kwargs["n_threads"] == 4
+    
+    def _calibration_llama(self, lib):
+        """Faux Llama de calibration : progression native + courte génération"""
+        construct = self._fake_llama(lib)
+        
+        def llama(**kwargs):
+            model = construct(**kwargs)
+            model.create_completion.return_value = {"usage": {"completion_tokens": 48}}
+            return model
+        return llama
+    
+    def test_auto_profile_calibration_reports_progress(self, tmp_path):
+        """Test calibration : progression par candidat, puis chargement final"""
+        manager, gguf, gpu = self._auto_manager(tmp_path)
+        lib = self._fake_llama_lib()
+        total = len(candidate_params(compute_auto_params(gguf, gpu.vram_free, 8), 8))
+        progress = []
+        
+        with patch('src.ai.auto_profile.read_gguf_metadata', return_value=gguf), \
+                patch('src.ai.auto_profile.physical_cores', return_value=8), \
+                patch.dict(sys.modules, {"llama_cpp.llama_cpp": lib}), \
+                patch('src.ai.model_manager.Llama', side_effect=self._calibration_llama(lib)) as mock_llama, \
+                patch.object(manager, 'detect_gpu', return_value=gpu):
+            assert manager.load_model(progress_callback=progress.append) is True
+        
+        assert mock_llama.call_count == total + 1
+        calibration = [
+            (index + step) / total * AUTO_CALIBRATION_PROGRESS
+            for index in range(total) for step in (0.25, 0.5, 1.0)
+        ]
+        final = [0.8, 0.85, 0.9, 1.0, 1.0]
+        assert progress == pytest.approx(calibration + final)
+    
+    def test_auto_profile_calibration_cancelled(self, tmp_path):
+        """Test annulation pendant le chargement d'un candidat : rien en cache"""
+        manager, gguf, gpu = self._auto_manager(tmp_path)
+        lib = self._fake_llama_lib()
+        cancel = threading.Event()
+        progress = []
+        
+        def on_progress(value):
+            progress.append(value)
+            # Au milieu du chargement du 2e candidat
+            if len(progress) == 5:
+                cancel.set()
+        
+        with patch('src.ai.auto_profile.read_gguf_metadata', return_value=gguf), \
+                patch('src.ai.auto_profile.physical_cores', return_value=8), \
+                patch.dict(sys.modules, {"llama_cpp.llama_cpp": lib}), \
+                patch('src.ai.model_manager.Llama', side_effect=self._calibration_llama(lib)) as mock_llama, \
+                patch.object(manager, 'detect_gpu', return_value=gpu):
+            with pytest.raises(ModelLoadCancelled):
+                manager.load_model(progress_callback=on_progress, cancel_event=cancel)
+        
+        assert mock_llama.call_count == 2
+        assert len(progress) == 5
+        assert manager.is_loaded is False
+        assert manager.auto_profile_cache.get(manager._auto_profile_key) is None
+    
+    def test_auto_profile_without_calibration_on_cpu(self, tmp_path):
+        """Test profil auto sans GPU ni calibration : paramètres calculés"""
+        manager, gguf, _ = self._auto_manager(tmp_path, auto_profile_calibrate=False)
+        
+        with patch('src.ai.auto_profile.read_gguf_metadata', return_value=gguf), \
+                patch('src.ai.auto_profile.physical_cores', return_value=4), \
+                patch.dict(sys.modules, {"llama_cpp.llama_cpp": None}), \
+                patch('src.ai.model_manager.Llama', return_value=Mock()) as mock_llama, \
+                patch.object(manager, 'detect_gpu', return_value=GPUInfo(available=False)), \
+                patch.object(manager, '_measure_throughput') as mock_measure:
+            assert manager.load_model() is True
+        
+        mock_measure.assert_not_called()
+        params = mock_llama.call_args.kwargs
+        assert params["n_gpu_layers"] == 0
+        assert params["n_threads"] == 4
+        assert params["n_batch"] == 128
+    
+    def test_auto_profile_oom_discards_cached_profile(self, tmp_path):
+        """Test OOM avec un profil auto en cache : profil oublié, fallback CPU"""
+        manager, gguf, gpu = self._auto_manager(tmp_path, auto_profile_calibrate=False)
+        
+        with patch('src.ai.auto_profile.read_gguf_metadata', return_value=gguf), \
+                patch('src.ai.auto_profile.model_fingerprint', return_value="model"), \
+                patch.object(manager, 'detect_gpu', return_value=gpu):
+            with patch.dict(sys.modules, {"llama_cpp.llama_cpp": None}), \
+                    patch('src.ai.model_manager.Llama', side_effect=[
+                        RuntimeError("CUDA error: out of memory"), Mock()
+                    ]):
+                manager._resolve_auto_params(manager.config.model_path, gpu, lambda: False)
+                key = manager._auto_profile_key
+                manager.auto_profile_cache.put(key, {
+                    "params": manager.config.get_gpu_params(), "tokens_per_second": 25.0
+                })
+                assert manager.load_model() is True
+        
+        assert manager.auto_profile_cache.get(key) is None
+        assert manager.config.gpu_profile == "cpu_fallback"
+    
+    def _suspendable_manager(self, config=None):
+        """ModelManager avec un faux Llama exposant contexte et batch"""
+        manager = ModelManager(config)
+        manager.model = types.SimpleNamespace(
+            _model=Mock(), _ctx=Mock(), _batch=Mock(), _stack=contextlib.ExitStack(),
+            context_params=types.SimpleNamespace(n_ctx=2048),
+            n_batch=256, n_tokens=42, verbose=False
+        )
+        manager.is_loaded = True
+        
+        internals = types.ModuleType("llama_cpp._internals")
+        internals.LlamaContext = Mock(name="LlamaContext")
+        internals.LlamaBatch = Mock(name="LlamaBatch")
+        return manager, internals
+    
+    def test_suspend_and_resume_keeps_weights(self):
+        """Test veille : contexte libéré, reprise sans recharger les poids"""
+        manager, internals = self._suspendable_manager()
+        model = manager.model
+        old_ctx, old_batch = model._ctx, model._batch
+        progress = []
+        
+        with patch.dict(sys.modules, {"llama_cpp._internals": internals}), \
+                patch('src.ai.model_manager.Llama') as mock_llama:
+            assert manager.suspend_model() is True
+            
+            old_ctx.close.assert_called_once()
+            old_batch.close.assert_called_once()
+            assert manager.is_suspended and not manager.is_loaded
+            assert manager.model is model
+            assert "en veille" in repr(manager)
+            
+            assert manager.load_model(progress_callback=progress.append) is True
+        
+        mock_llama.assert_not_called()
+        internals.LlamaContext.assert_called_once_with(
+            model=model._model, params=model.context_params, verbose=False
+        )
+        assert model._ctx is internals.LlamaContext.return_value
+        assert model._batch is internals.LlamaBatch.return_value
+        assert model.n_tokens == 0
+        assert manager.is_loaded and not manager.is_suspended
+        assert manager.load_stats["mode"] == "resume"
+        assert progress == [0.0, 1.0]
+    
+    def test_unload_suspends_when_configured(self):
+        """Test suspend_on_unload : unload_model met en veille, keep_weights=False libère tout"""
+        manager, internals = self._suspendable_manager(AIConfig(suspend_on_unload=True))
+        
+        with patch.dict(sys.modules, {"llama_cpp._internals": internals}):
+            manager.unload_model()
+            assert manager.is_suspended and manager.model is not None
+            
+            manager.unload_model(keep_weights=False)
+        
+        assert manager.model is None
+        assert not manager.is_suspended and not manager.is_loaded
+    
+    def test_suspend_unsupported_keeps_model_loaded(self):
+        """Test veille impossible (llama-cpp-python sans objets bas niveau)"""
+        manager = ModelManager()
+        manager.model = types.SimpleNamespace()
+        manager.is_loaded = True
+        
+        assert manager.suspend_model() is False
+        assert manager.is_loaded and not manager.is_suspended
+    
     def test_unload_model(self):
         """Test déchargement modèle"""
         manager = ModelManager()
@@ -224,6 +560,118 @@ class TestModelManager:
         assert call_args[1]["top_p"] == 0.85
         assert call_args[1]["max_tokens"] == 1024
     
+    def test_generate_stream_yields_chunks(self):
+        """Test génération en streaming"""
+        manager = ModelManager()
+        manager.is_loaded = True
+        
+        mock_model = Mock()
+        mock_model.return_value = iter([
+            {"choices": [{"text": "  "}]},
+            {"choices": [{"text": " Bon"}]},
+            {"choices": [{"text": "jour !"}]}
+        ])
+        manager.model = mock_model
+        
+        chunks = list(manager.generate_stream("Test prompt"))
+        
+        assert chunks == ["Bon", "jour !"]
+        assert mock_model.call_args[1]["stream"] is True
+    
+    def test_generate_routes_to_batch_engine(self):
+        """Test génération via le moteur de batch quand il est actif"""
+        manager = ModelManager(AIConfig(max_tokens=64))
+        manager.is_loaded = True
+        manager.model = Mock()
+        manager.model.tokenize.return_value = [1, 2, 3]
+        
+        request = Mock()
+        request.future.result.return_value = "  Salut !  "
+        manager.batch_engine = Mock()
+        manager.batch_engine.submit.return_value = request
+        
+        assert manager.generate("Test prompt", prefix="sys", cache_key="k") == "Salut !"
+        
+        manager.model.assert_not_called()
+        args, kwargs = manager.batch_engine.submit.call_args
+        assert args[0] == [1, 2, 3]
+        assert kwargs["max_tokens"] == 64
+    
+    def test_generate_stream_routes_to_batch_engine(self):
+        """Test streaming via le moteur de batch (callback → générateur)"""
+        from concurrent.futures import Future
+        
+        manager = ModelManager()
+        manager.is_loaded = True
+        manager.model = Mock()
+        manager.model.tokenize.return_value = [1, 2, 3]
+        
+        def submit(tokens, on_token=None, **kwargs):
+            request = Mock()
+            request.future = Future()
+            for piece in ("  ", " Bon", "jour !"):
+                on_token(piece)
+            request.future.set_result("  Bonjour !")
+            return request
+        
+        manager.batch_engine = Mock()
+        manager.batch_engine.submit.side_effect = submit
+        
+        assert list(manager.generate_stream("Test prompt")) == ["Bon", "jour !"]
+        manager.model.assert_not_called()
+    
+    def test_batch_engine_start_releases_prefix_cache(self, caplog):
+        """Test moteur de batch actif : cache de préfixes vidé, avertissement"""
+        manager = ModelManager(AIConfig(batch_max_sequences=4))
+        manager.model = Mock()
+        manager.prefix_cache.set_system((1, 2, 3), FakeState(100, "system"))
+        
+        with patch('src.ai.model_manager.LlamaBatchBackend'), \
+                patch('src.ai.model_manager.BatchEngine') as engine_class:
+            manager._start_batch_engine({"n_ctx": 2048, "n_batch": 512, "n_threads": 4})
+        
+        assert manager.batch_engine is engine_class.return_value
+        assert manager.prefix_cache.system_tokens is None
+        assert "cache de préfixes KV inutilisé" in caplog.text
+    
+    def test_unload_closes_batch_engine(self):
+        """Test déchargement arrête le moteur de batch"""
+        manager = ModelManager()
+        manager.is_loaded = True
+        engine = Mock()
+        manager.batch_engine = engine
+        
+        manager.unload_model()
+        
+        engine.close.assert_called_once()
+        assert manager.batch_engine is None
+    
+    def test_generate_stream_not_loaded(self):
+        """Test streaming sans modèle chargé"""
+        manager = ModelManager()
+        
+        with pytest.raises(RuntimeError, match="Modèle non chargé"):
+            list(manager.generate_stream("Test prompt"))
+    
+    def test_count_tokens_not_loaded(self):
+        """Test comptage de tokens sans modèle chargé"""
+        manager = ModelManager()
+        
+        with pytest.raises(RuntimeError, match="Modèle non chargé"):
+            manager.count_tokens("Bonjour")
+    
+    def test_count_tokens_uses_model_tokenizer(self):
+        """Test comptage de tokens via le tokenizer llama-cpp"""
+        manager = ModelManager()
+        manager.is_loaded = True
+        
+        mock_model = Mock()
+        mock_model.tokenize.return_value = [1, 2, 3, 4]
+        manager.model = mock_model
+        
+        assert manager.count_tokens("Bonjour Kira") == 4
+        mock_model.tokenize.assert_called_once_with("Bonjour Kira".encode("utf-8"), add_bos=False)
+    
     @patch('src.ai.model_manager.PYNVML_AVAILABLE', False)
     def test_get_gpu_status_unavailable(self):
         """Test statut GPU sans pynvml"""
@@ -311,6 +759,195 @@ class TestModelManager:
         assert "balanced" in repr_str
 
 
+class FakeLlama:
+    """Faux modèle llama-cpp : 1 mot = 1 token, KV cache simulé"""
+    
+    def __init__(self):
+        self.vocab = {}
+        self.eval_tokens = []
+        self.evaluated = 0
+    
+    def tokenize(self, text, add_bos=True):
+        words = text.decode("utf-8").split()
+        return [self.vocab.setdefault(word, len(self.vocab) + 1) for word in words]
+    
+    def reset(self):
+        self.eval_tokens = []
+    
+    def eval(self, tokens):
+        self.evaluated += len(tokens)
+        self.eval_tokens = self.eval_tokens + list(tokens)
+    
+    def save_state(self):
+        return Mock(tokens=list(self.eval_tokens), llama_state_size=100)
+    
+    def load_state(self, state):
+        self.eval_tokens = list(state.tokens)
+    
+    def __call__(self, prompt, **kwargs):
+        tokens = self.tokenize(prompt.encode("utf-8"))
+        reused = 0
+        for a, b in zip(self.eval_tokens, tokens[:-1]):
+            if a != b:
+                break
+            reused += 1
+        self.eval_tokens = self.eval_tokens[:reused]
+        self.eval(tokens[reused:])
+        return {"choices": [{"text": "réponse"}]}
+
+
+class FakeState:
+    """État llama.cpp sérialisable (pickle) pour les tests"""
+    
+    def __init__(self, size, name):
+        self.llama_state_size = size
+        self.name = name
+
+
+class TestPrefixCache:
+    """Tests du cache d'états KV par préfixe"""
+    
+    def test_best_match_prefers_longest_prefix(self):
+        """Test sélection de l'état au plus long préfixe commun"""
+        cache = PrefixCache(max_bytes=1000)
+        cache.set_system((1, 2), "system")
+        cache.put("user", (1, 2, 3, 4), Mock(llama_state_size=10))
+        
+        length, state = cache.best_match([1, 2, 3, 9], "user")
+        assert length == 3
+        
+        length, state = cache.best_match([1, 2, 7], "other")
+        assert (length, state) == (2, "system")
+        
+        assert cache.best_match([5], "user") == (0, None)
+    
+    def test_lru_eviction_by_bytes(self):
+        """Test éviction LRU quand la taille max est dépassée"""
+        cache = PrefixCache(max_bytes=250)
+        
+        for key in ("a", "b", "c"):
+            cache.put(key, (1,), Mock(llama_state_size=100))
+        
+        stats = cache.get_stats()
+        assert stats['conversations'] == 2
+        assert stats['bytes'] == 200
+        assert stats['evictions'] == 1
+        assert cache.best_match([1], "a") == (0, None)
+    
+    def test_eviction_counts_logits_and_tokens(self):
+        """Test budget appliqué à l'état complet (KV cache + scores + input_ids)"""
+        np = pytest.importorskip("numpy")
+        cache = PrefixCache(max_bytes=50_000)
+        
+        def state(name):
+            state = FakeState(1000, name)
+            state.scores = np.zeros((4, 4096), dtype=np.float32)   # 65 536 bytes
+            state.input_ids = np.zeros(512, dtype=np.intc)
+            return state
+        
+        assert PrefixCache._state_size(state("a")) == 1000 + 4 * 4096 * 4 + 512 * 4
+        
+        # Plus gros que le budget une fois les logits comptés : non gardé
+        cache.put("a", (1,), state("a"))
+        assert cache.get_stats()['conversations'] == 0
+        
+        cache = PrefixCache(max_bytes=150_000)
+        for key in ("a", "b", "c"):
+            cache.put(key, (1,), state(key))
+        
+        stats = cache.get_stats()
+        assert stats['conversations'] == 2
+        assert stats['evictions'] == 1
+        assert stats['bytes'] <= 150_000
+    
+    def test_disabled_keeps_system_only(self):
+        """Test max_bytes=0 : aucun état par conversation"""
+        cache = PrefixCache(max_bytes=0)
+        cache.put("a", (1,), Mock(llama_state_size=1))
+        
+        assert cache.get_stats()['conversations'] == 0
+
+
+    def test_spill_to_disk_and_reload(self, tmp_path):
+        """Test slots évincés déplacés sur disque puis rechargés"""
+        cache = PrefixCache(max_bytes=150, spill_dir=str(tmp_path), spill_max_bytes=1000)
+        
+        cache.put(("alice", "discord"), (1, 2, 3), FakeState(100, "alice"))
+        cache.put(("bob", "discord"), (1, 2, 4), FakeState(100, "bob"))
+        
+        stats = cache.get_stats()
+        assert stats['conversations'] == 1
+        assert stats['spilled'] == 1
+        assert len(list(tmp_path.glob("*.slot"))) == 1
+        
+        length, state = cache.best_match([1, 2, 3, 5], ("alice", "discord"))
+        
+        assert length == 3
+        assert state.name == "alice"
+        assert cache.get_stats()['spill_loads'] == 1
+        # bob a pris la place d'alice sur disque
+        assert cache.get_stats()['spilled'] == 1
+    
+    def test_discard_and_clear_remove_spilled_files(self, tmp_path):
+        """Test suppression des fichiers de slots"""
+        cache = PrefixCache(max_bytes=100, spill_dir=str(tmp_path), spill_max_bytes=1000)
+        
+        for user in ("a", "b", "c"):
+            cache.put((user, "desktop"), (1,), FakeState(100, user))
+        assert len(list(tmp_path.glob("*.slot"))) == 2
+        
+        cache.discard(("a", "desktop"))
+        assert len(list(tmp_path.glob("*.slot"))) == 1
+        
+        cache.clear()
+        assert list(tmp_path.glob("*.slot")) == []
+
+
+class TestPrefixReuse:
+    """Tests de la réutilisation du KV cache dans generate()"""
+    
+    def test_generate_reuses_system_and_conversation_prefix(self):
+        """Test seuls les tokens nouveaux sont évalués"""
+        manager = ModelManager(AIConfig())
+        manager.is_loaded = True
+        manager.model = FakeLlama()
+        
+        system = "Tu es Kira , un assistant"
+        
+        manager.generate(f"{system} user: Bonjour", prefix=system, cache_key="desktop:u1")
+        first = manager.last_prefix_stats
+        assert first['prefix_hit_tokens'] == 6  # System prompt évalué une fois
+        
+        # Une autre conversation passe entre deux tours de u1
+        manager.generate(f"{system} user: Salut", prefix=system, cache_key="discord:u2")
+        assert manager.last_prefix_stats['prefix_hit_tokens'] == 7  # System + "user:"
+        
+        manager.generate(
+            f"{system} user: Bonjour réponse user: Ça va ?",
+            prefix=system,
+            cache_key="desktop:u1"
+        )
+        stats = manager.last_prefix_stats
+        assert stats['prefix_hit_tokens'] == 8  # System + tour précédent de u1
+        assert stats['evaluated_tokens'] == stats['prompt_tokens'] - 8
+        
+        totals = manager.get_prefix_cache_stats()
+        assert totals['requests'] == 3
+        assert 0 < totals['hit_ratio'] < 1
+    
+    def test_unload_clears_prefix_cache(self):
+        """Test déchargement vide le cache d'états"""
+        manager = ModelManager(AIConfig())
+        manager.is_loaded = True
+        manager.model = FakeLlama()
+        manager.generate("a b c", prefix="a b", cache_key="k")
+        
+        manager.unload_model()
+        
+        assert manager.prefix_cache.get_stats()['conversations'] == 0
+        assert manager.prefix_cache.system_tokens is None
+
+
 class TestGetModelManagerSingleton:
     """Tests pour la fonction get_model_manager (singleton)"""
     
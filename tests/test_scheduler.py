@@ -0,0 +1,215 @@
+"""
+Tests unitaires pour InferenceScheduler
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.ai.scheduler import (
+    InferenceScheduler, SchedulerFullError, SchedulerTimeoutError,
+    PRIORITY_HIGH, PRIORITY_NORMAL
+)
+
+
+@pytest.fixture
+def scheduler():
+    """Ordonnanceur avec petite file et timeout long"""
+    scheduler = InferenceScheduler(max_queue=4, timeout=5.0)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def block_worker(scheduler):
+    """Occupe le worker jusqu'à ce que l'événement retourné soit levé"""
+    started = threading.Event()
+    release = threading.Event()
+    
+    def blocking():
+        started.set()
+        release.wait(5.0)
+    
+    future = scheduler.submit(blocking, lane="blocker")
+    assert started.wait(5.0)
+    return release, future
+
+
+class TestInferenceScheduler:
+    """Tests pour InferenceScheduler"""
+    
+    def test_run_returns_result(self, scheduler):
+        """Test exécution simple et résultat"""
+        assert scheduler.run(lambda: 21 * 2) == 42
+        
+        stats = scheduler.get_stats()
+        assert stats['submitted'] == 1
+        assert stats['completed'] == 1
+        assert stats['queue_depth'] == 0
+    
+    def test_run_propagates_exception(self, scheduler):
+        """Test exception du travail remontée à l'appelant"""
+        def failing():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError, match="boom"):
+            scheduler.run(failing)
+        
+        assert scheduler.get_stats()['failed'] == 1
+    
+    def test_jobs_never_run_concurrently(self, scheduler):
+        """Test un seul travail à la fois sur le worker"""
+        active = []
+        overlaps = []
+        
+        def job():
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+        
+        futures = [scheduler.submit(job, lane=f"lane{i}") for i in range(4)]
+        for future in futures:
+            future.result(timeout=5.0)
+        
+        assert max(overlaps) == 1
+    
+    def test_workers_run_jobs_concurrently(self):
+        """Test plusieurs workers (génération par lots) : travaux simultanés"""
+        scheduler = InferenceScheduler(max_queue=8, timeout=5.0, workers=2)
+        barrier = threading.Barrier(2, timeout=5.0)
+        
+        try:
+            # Chaque travail attend l'autre : impossible avec un seul worker
+            futures = [scheduler.submit(barrier.wait, lane=f"lane{i}") for i in range(2)]
+            for future in futures:
+                future.result(timeout=5.0)
+            
+            assert scheduler.get_stats()['workers'] == 2
+        finally:
+            scheduler.shutdown()
+    
+    def test_full_queue_rejected(self, scheduler):
+        """Test file pleine → SchedulerFullError"""
+        release, _ = block_worker(scheduler)
+        
+        try:
+            for _ in range(4):
+                scheduler.submit(lambda: None)
+            
+            with pytest.raises(SchedulerFullError):
+                scheduler.submit(lambda: None)
+            
+            assert scheduler.get_stats()['rejected_full'] == 1
+        finally:
+            release.set()
+    
+    def test_waiting_too_long_rejected(self):
+        """Test requête expirée pendant qu'une génération occupe le worker"""
+        scheduler = InferenceScheduler(max_queue=4, timeout=0.1)
+        release, _ = block_worker(scheduler)
+        
+        try:
+            future = scheduler.submit(lambda: "trop tard")
+            
+            # Rejetée sans attendre la fin du travail en cours
+            with pytest.raises(SchedulerTimeoutError):
+                future.result(timeout=2.0)
+            
+            stats = scheduler.get_stats()
+            assert stats['rejected_timeout'] == 1
+            assert stats['queue_depth'] == 0
+        finally:
+            release.set()
+            scheduler.shutdown()
+    
+    def test_high_priority_served_first(self, scheduler):
+        """Test priorité haute (desktop) servie avant priorité normale"""
+        order = []
+        release, _ = block_worker(scheduler)
+        
+        normal = scheduler.submit(lambda: order.append("discord"), lane="discord:1")
+        high = scheduler.submit(
+            lambda: order.append("desktop"), lane="desktop", priority=PRIORITY_HIGH
+        )
+        release.set()
+        
+        normal.result(timeout=5.0)
+        high.result(timeout=5.0)
+        assert order == ["desktop", "discord"]
+    
+    def test_lanes_served_round_robin(self):
+        """Test équité : un serveur bavard ne monopolise pas le worker"""
+        scheduler = InferenceScheduler(max_queue=16, timeout=5.0)
+        order = []
+        release, _ = block_worker(scheduler)
+        
+        try:
+            futures = [
+                scheduler.submit(lambda i=i: order.append(f"a{i}"), lane="discord:a")
+                for i in range(3)
+            ]
+            futures.append(scheduler.submit(lambda: order.append("b0"), lane="discord:b"))
+            futures.append(scheduler.submit(lambda: order.append("c0"), lane="discord:c"))
+            
+            assert scheduler.get_stats()['lanes'] == {
+                "discord:a": 3, "discord:b": 1, "discord:c": 1
+            }
+            release.set()
+            
+            for future in futures:
+                future.result(timeout=5.0)
+            
+            assert order == ["a0", "b0", "c0", "a1", "a2"]
+        finally:
+            release.set()
+            scheduler.shutdown()
+    
+    def test_cancelled_job_skipped(self, scheduler):
+        """Test requête annulée avant exécution jamais lancée"""
+        ran = []
+        release, _ = block_worker(scheduler)
+        
+        future = scheduler.submit(lambda: ran.append(1))
+        assert future.cancel()
+        release.set()
+        
+        scheduler.run(lambda: None)
+        assert ran == []
+    
+    def test_run_async(self, scheduler):
+        """Test utilisation depuis une boucle asyncio"""
+        async def main():
+            return await scheduler.run_async(lambda: "ok", lane="discord:1")
+        
+        assert asyncio.run(main()) == "ok"
+    
+    def test_wait_stats(self, scheduler):
+        """Test statistiques de temps d'attente"""
+        release, blocker = block_worker(scheduler)
+        
+        future = scheduler.submit(lambda: None, priority=PRIORITY_NORMAL)
+        assert scheduler.get_stats()['queue_depth'] == 1
+        assert scheduler.get_stats()['busy'] is True
+        
+        time.sleep(0.05)
+        release.set()
+        future.result(timeout=5.0)
+        blocker.result(timeout=5.0)
+        
+        stats = scheduler.get_stats()
+        assert stats['wait_max_ms'] >= 40
+        assert stats['wait_p95_ms'] >= 40
+        assert 0 < stats['wait_avg_ms'] <= stats['wait_max_ms']
+    
+    def test_shutdown_cancels_pending(self):
+        """Test arrêt : requêtes en attente annulées"""
+        scheduler = InferenceScheduler(max_queue=4, timeout=5.0)
+        release, _ = block_worker(scheduler)
+        
+        future = scheduler.submit(lambda: None)
+        release.set()
+        scheduler.shutdown()
+        
+        assert future.cancelled() or future.done()
@@ -0,0 +1,102 @@
+"""
+Unit tests for the startup profiler (--profile-startup) and the lazy imports.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.utils.startup_profiler import StartupProfiler
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def fake_package(tmp_path, monkeypatch):
+    """Create an importable `src.fakeprof` package (removed after the test)."""
+    package = tmp_path / "src" / "fakeprof"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("from . import child\nimport colorsys\n")
+    (package / "child.py").write_text("import time\ntime.sleep(0.02)\n")
+    
+    import src
+    monkeypatch.setattr(src, "__path__", list(src.__path__) + [str(tmp_path / "src")])
+    yield "src.fakeprof"
+    
+    for name in ["src.fakeprof", "src.fakeprof.child", "colorsys"]:
+        sys.modules.pop(name, None)
+
+
+def test_imports_timed_with_self_and_cumulative(fake_package):
+    """Test our modules and their direct imports timed, nested like -X importtime."""
+    sys.modules.pop("colorsys", None)
+    profiler = StartupProfiler()
+    profiler.start()
+    try:
+        __import__(fake_package)
+    finally:
+        profiler.stop()
+    
+    records = {record.name: record for record in profiler.imports}
+    package, child = records["src.fakeprof"], records["src.fakeprof.child"]
+    
+    assert child.depth == package.depth + 1
+    assert child.cumulative_ms >= 15
+    assert package.cumulative_ms >= child.cumulative_ms
+    assert package.self_ms < child.cumulative_ms
+    # Third-party module imported directly by one of ours
+    assert records["colorsys"].depth == package.depth + 1
+    
+    # The wrapper loader does not stay on the imported modules
+    module = sys.modules["src.fakeprof.child"]
+    assert type(module.__loader__).__name__ == "SourceFileLoader"
+
+
+def test_steps_and_report():
+    """Test nested init steps and milestones in the report."""
+    profiler = StartupProfiler()
+    profiler.start()
+    try:
+        with profiler.step("MainWindow"):
+            with profiler.step("init_ui"):
+                pass
+        profiler.mark("window shown")
+    finally:
+        profiler.stop()
+    
+    assert [(step.name, step.depth) for step in profiler.steps] == [
+        ("MainWindow", 0), ("init_ui", 1)
+    ]
+    report = profiler.report()
+    assert "MainWindow" in report
+    assert "|   init_ui" in report
+    assert "ms since start: window shown" in report
+
+
+def test_disabled_profiler_records_nothing():
+    """Test a profiler never started is a no-op (default startup path)."""
+    profiler = StartupProfiler()
+    
+    with profiler.step("MainWindow"):
+        pass
+    profiler.mark("window shown")
+    profiler.finish()
+    
+    assert profiler.steps == [] and profiler.marks == [] and profiler.imports == []
+
+
+def test_ai_modules_do_not_import_heavy_dependencies():
+    """Test llama_cpp, numpy and pynvml are only imported on first use."""
+    code = (
+        "import sys\n"
+        "import src.ai.chat_engine, src.ai.scheduler\n"
+        "print(sorted(name for name in ('llama_cpp', 'numpy', 'pynvml') if name in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
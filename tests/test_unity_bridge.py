@@ -2,9 +2,18 @@
 Unit tests for Unity bridge IPC.
 """
 
+import asyncio
+import json
+import socket
+import threading
+import time
+
 import pytest
 from unittest.mock import Mock, patch
-from src.ipc.unity_bridge import UnityBridge
+from src.ipc.unity_bridge import (
+    UnityBridge, ReceiveBuffer, CODECS, FRAME_HEADER, FRAME_JSON, FRAME_SET_EXPRESSION,
+    MAX_FRAME_SIZE, CommandDroppedError, LatencyHistogram
+)
 
 
 def test_unity_bridge_initialization():
@@ -60,3 +69,687 @@ def test_send_command_not_connected():
     result = bridge.send_command("test_command")
     
     assert result is False
+
+
+# === Outbound queue (coalescing, frame budget) ===
+
+class FakeUnityServer:
+    """Loopback TCP server recording every command it receives.
+    
+    Args:
+        accept_binary: Answer the binary protocol negotiation (False mimics
+            a Unity build that ignores it)
+        answer_pings: Answer heartbeat pings with pongs
+        port: Port to listen on (0 for any free port)
+        reply_delays: {command: seconds} to wait before answering it
+    
+    Like Unity, commands sent with an id get a reply echoing it; ids are
+    stripped from the recorded commands (see `ids`).
+    """
+    
+    def __init__(self, accept_binary=True, answer_pings=True, port=0, reply_delays=None):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", port))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.accept_binary = accept_binary
+        self.answer_pings = answer_pings
+        self.reply_delays = reply_delays or {}
+        self.commands = []
+        self.ids = []
+        self.pings = 0
+        self.reads = 0
+        self.conn = None
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+    
+    def _serve(self):
+        try:
+            conn, _ = self.server.accept()
+        except OSError:
+            return
+        self.conn = conn
+        buffer = ReceiveBuffer(1024)
+        with conn:
+            conn.sendall(b'{"type": "response", "status": "connected"}\n')
+            try:
+                self._receive(conn, buffer)
+            except OSError:
+                pass
+    
+    def _receive(self, conn, buffer):
+        codec = CODECS["json"]
+        while buffer.recv_from(conn):
+            self.reads += 1
+            # One message at a time: the codec may change after negotiation
+            while True:
+                messages = buffer.consume(codec, max_messages=1)
+                if not messages:
+                    break
+                message = messages[0]
+                message_id = message.pop("id", None)
+                if message["command"] == "ping":
+                    self.pings += 1
+                    if self.answer_pings:
+                        self._reply(conn, codec.encode_message({"type": "pong", "id": message_id}))
+                elif message["command"] != "negotiate_protocol":
+                    self.commands.append(message)
+                    self.ids.append(message_id)
+                    if message_id is not None:
+                        time.sleep(self.reply_delays.get(message["command"], 0))
+                        status = "error" if message["command"] == "unknown" else "success"
+                        self._reply(conn, codec.encode_message({
+                            "type": "response", "command": message["command"],
+                            "status": status, "id": message_id
+                        }))
+                elif self.accept_binary:
+                    conn.sendall(codec.encode_message({
+                        "type": "response", "command": "negotiate_protocol",
+                        "status": "success", "protocol": "binary"
+                    }))
+                    codec = CODECS["binary"]
+    
+    def _reply(self, conn, payload):
+        """Answer the bridge; keep reading what it sent even if it already closed."""
+        try:
+            conn.sendall(payload)
+        except OSError:
+            pass
+    
+    def close(self):
+        self.server.close()
+    
+    def kill(self):
+        """Simulate Unity quitting: close the listener and the client connection."""
+        self.close()
+        if self.conn is not None:
+            self.conn.shutdown(socket.SHUT_RDWR)
+
+
+@pytest.fixture
+def unity_server():
+    """Fake Unity listening on a free loopback port."""
+    server = FakeUnityServer()
+    yield server
+    server.close()
+
+
+def queued_bridge():
+    """Connected-looking bridge without sender thread (inspect the queue)."""
+    bridge = UnityBridge()
+    bridge.connected = True
+    bridge.socket = Mock()
+    return bridge
+
+
+def test_slider_ticks_coalesced_into_few_writes(unity_server):
+    """Test superseded expression values coalesced, last value delivered."""
+    bridge = UnityBridge(port=unity_server.port, max_rate_hz=20)
+    assert bridge.connect()
+    
+    try:
+        for tick in range(101):
+            assert bridge.set_expression("joy", tick / 100)
+            bridge.set_transition_speed(1.0 + tick / 100)
+        bridge.set_expression("sorrow", 0.5)
+        
+        assert bridge.flush(timeout=5.0)
+        
+        stats = bridge.get_stats()
+        assert stats['queued'] == 203
+        assert stats['coalesced'] > 150
+        assert stats['sent'] + stats['coalesced'] == 203
+        assert stats['batches'] < 10
+    finally:
+        bridge.disconnect()
+    
+    deadline = time.monotonic() + 5.0
+    while len(unity_server.commands) < stats['sent'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    
+    joy = [c["data"]["value"] for c in unity_server.commands if c["data"].get("name") == "joy"]
+    assert joy[-1] == 1.0
+    assert unity_server.commands[-1]["data"] == {"name": "sorrow", "value": 0.5}
+
+
+def test_coalesced_command_moves_to_end_of_queue():
+    """Test superseding keeps order relative to other commands."""
+    bridge = queued_bridge()
+    
+    bridge.set_expression("joy", 0.2)
+    bridge.send_command("load_model", {"path": "a.vrm"})
+    bridge.set_expression("joy", 0.8)
+    
+    assert list(bridge._pending.values()) == [
+        ("load_model", {"path": "a.vrm"}),
+        ("set_expression", {"name": "joy", "value": 0.8}),
+    ]
+
+
+def test_reset_drops_pending_expressions():
+    """Test reset_expressions supersedes queued expression changes."""
+    bridge = queued_bridge()
+    
+    bridge.set_expression("joy", 0.5)
+    bridge.set_expression("angry", 0.5)
+    bridge.set_auto_blink(True)
+    bridge.reset_expressions()
+    
+    assert [command for command, _ in bridge._pending.values()] == [
+        "set_auto_blink", "reset_expressions"
+    ]
+    assert bridge.get_stats()['coalesced'] == 2
+
+
+def test_non_state_commands_never_coalesced():
+    """Test commands without a target are all kept."""
+    bridge = queued_bridge()
+    
+    bridge.send_command("unload_model")
+    bridge.send_command("load_model", {"path": "a.vrm"})
+    bridge.send_command("unload_model")
+    
+    assert len(bridge._pending) == 3
+
+
+def test_pending_queue_capped():
+    """Test oldest commands dropped above max_pending."""
+    bridge = UnityBridge(max_pending=2)
+    bridge.connected = True
+    bridge.socket = Mock()
+    
+    for index in range(4):
+        bridge.send_command("load_model", {"path": f"{index}.vrm"})
+    
+    assert [data["path"] for _, data in bridge._pending.values()] == ["2.vrm", "3.vrm"]
+    assert bridge.get_stats()['dropped'] == 2
+
+
+def test_send_command_does_not_block_on_slow_unity():
+    """Test callers return immediately while the sender thread is stuck."""
+    bridge = queued_bridge()
+    release = threading.Event()
+    bridge.socket.sendall.side_effect = lambda payload: release.wait(5.0)
+    bridge.running = True
+    bridge.sender_thread = threading.Thread(target=bridge._send_loop, daemon=True)
+    bridge.sender_thread.start()
+    
+    try:
+        start = time.monotonic()
+        for tick in range(200):
+            bridge.set_expression("joy", tick / 200)
+        
+        assert time.monotonic() - start < 0.5
+    finally:
+        release.set()
+        assert bridge.flush(timeout=5.0)
+        bridge.disconnect()
+    
+    # One write per batch, never one per tick
+    assert bridge.socket is None
+    assert bridge.get_stats()['batches'] <= 3
+
+
+# === Wire protocols (JSON, binary frames) ===
+
+@pytest.mark.parametrize("protocol", ["json", "binary"])
+def test_codec_round_trip(protocol):
+    """Test every command kind survives encode/decode, split at any byte."""
+    codec = CODECS[protocol]
+    commands = [
+        ("set_expression", {"name": "joy", "value": 0.5}),
+        ("set_expression", {"name": "surprisé", "value": 1.0}),
+        ("set_auto_head_movement", {
+            "enabled": True, "min_interval": 3.0, "max_interval": 7.5, "max_angle": 5.0
+        }),
+        ("load_model", {"path": "C:/models/kira.vrm"}),
+        ("reset_expressions", {}),
+    ]
+    stream = b"".join(codec.encode(command, data) for command, data in commands)
+    expected = [{"command": command, "data": data} for command, data in commands]
+    
+    for split in range(len(stream) + 1):
+        buffer = bytearray(stream)
+        first, offset = codec.decode(buffer, 0, split)
+        rest, offset = codec.decode(buffer, offset, len(stream))
+        
+        assert first + rest == expected
+        assert offset == len(stream)
+
+
+def test_binary_hot_commands_are_compact():
+    """Test set_expression uses the struct layout, not JSON."""
+    codec = CODECS["binary"]
+    frame = codec.encode("set_expression", {"name": "joy", "value": 0.5})
+    
+    assert FRAME_HEADER.unpack_from(frame) == (len(frame) - 4, FRAME_SET_EXPRESSION)
+    assert len(frame) == 13
+    assert len(frame) < len(CODECS["json"].encode("set_expression", {"name": "joy", "value": 0.5}))
+
+
+def test_binary_invalid_frame_rejected():
+    """Test an out-of-sync stream raises instead of allocating garbage sizes."""
+    codec = CODECS["binary"]
+    
+    with pytest.raises(ValueError):
+        codec.decode(bytearray(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1, 1)), 0, 5)
+    with pytest.raises(ValueError):
+        codec.decode(bytearray(FRAME_HEADER.pack(1, 0x7f)), 0, 5)
+
+
+def test_receive_buffer_compacts_and_grows():
+    """Test recv_into buffer reuses space and grows for large messages."""
+    left, right = socket.socketpair()
+    buffer = ReceiveBuffer(16)
+    codec = CODECS["json"]
+    big = {"command": "load_model", "data": {"path": "x" * 100}}
+    
+    try:
+        left.sendall(b'{"a": 1}\n{"b":')
+        while buffer.end < 14:
+            buffer.recv_from(right)
+        assert buffer.consume(codec) == [{"a": 1}]
+        
+        left.sendall(b' 2}\n' + json.dumps(big).encode() + b"\n")
+        messages = []
+        while len(messages) < 2:
+            buffer.recv_from(right)
+            messages += buffer.consume(codec)
+    finally:
+        left.close()
+        right.close()
+    
+    assert messages == [{"b": 2}, big]
+    assert len(buffer.data) >= 128
+    assert buffer.start == buffer.end == 0
+
+
+def test_binary_protocol_negotiated():
+    """Test binary frames used after Unity accepts the negotiation."""
+    server = FakeUnityServer()
+    bridge = UnityBridge(port=server.port, protocol="binary")
+    
+    try:
+        assert bridge.connect()
+        assert bridge.get_stats()['protocol'] == "binary"
+        
+        bridge.set_expression("joy", 0.75)
+        bridge.set_auto_head_movement(False, 2.0, 4.0, 10.0)
+        bridge.load_vrm_model("a.vrm")
+        assert bridge.flush(timeout=5.0)
+        
+        deadline = time.monotonic() + 5.0
+        while len(server.commands) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        bridge.disconnect()
+        server.close()
+    
+    assert server.commands == [
+        {"command": "set_expression", "data": {"name": "joy", "value": 0.75}},
+        {"command": "set_auto_head_movement", "data": {
+            "enabled": False, "min_interval": 2.0, "max_interval": 4.0, "max_angle": 10.0
+        }},
+        {"command": "load_model", "data": {"path": "a.vrm"}},
+    ]
+
+
+def test_binary_protocol_falls_back_to_json():
+    """Test a Unity build ignoring the negotiation keeps working in JSON."""
+    server = FakeUnityServer(accept_binary=False)
+    bridge = UnityBridge(port=server.port, protocol="binary", handshake_timeout=0.2)
+    
+    try:
+        assert bridge.connect()
+        assert bridge.get_stats()['protocol'] == "json"
+        
+        bridge.set_expression("joy", 0.5)
+        assert bridge.flush(timeout=5.0)
+        
+        deadline = time.monotonic() + 5.0
+        while not server.commands and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        bridge.disconnect()
+        server.close()
+    
+    assert server.commands == [{"command": "set_expression", "data": {"name": "joy", "value": 0.5}}]
+
+
+def test_unknown_protocol_rejected():
+    """Test invalid protocol name."""
+    with pytest.raises(ValueError):
+        UnityBridge(protocol="xml")
+
+
+# === Connection supervision (heartbeats, reconnection, state replay) ===
+
+def wait_until(condition, timeout=5.0):
+    """Poll `condition` until it holds or `timeout` expires."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def supervised_bridge(port, **kwargs):
+    """Bridge with short heartbeat and reconnection delays."""
+    options = dict(
+        heartbeat_interval=0.05, heartbeat_timeout=0.3,
+        reconnect_min_delay=0.05, replay_delay=0.1
+    )
+    options.update(kwargs)
+    return UnityBridge(port=port, **options)
+
+
+def test_avatar_state_tracked():
+    """Test the replayable state follows model and expression changes."""
+    bridge = queued_bridge()
+    
+    bridge.load_vrm_model("a.vrm")
+    bridge.set_expression("joy", 0.8)
+    bridge.set_auto_blink(True)
+    bridge.reset_expressions()
+    bridge.set_expression("angry", 0.3)
+    
+    assert list(bridge._avatar_state.values()) == [
+        ("load_model", {"path": "a.vrm"}),
+        ("set_auto_blink", {"enabled": True}),
+        ("set_expression", {"name": "angry", "value": 0.3}),
+    ]
+    
+    bridge.send_command("unload_model")
+    assert list(bridge._avatar_state.values()) == [("set_auto_blink", {"enabled": True})]
+
+
+def test_reconnect_backoff_doubles_up_to_max():
+    """Test failed attempts wait 0.5, 1, 2, 4 then stay at the maximum."""
+    bridge = UnityBridge(reconnect_min_delay=0.5, reconnect_max_delay=4.0)
+    waits = []
+    attempts = []
+    
+    class RecordingEvent:
+        def wait(self, timeout):
+            waits.append(timeout)
+        
+        def clear(self):
+            pass
+    
+    def failing_open(generation=None):
+        attempts.append(generation)
+        if len(attempts) == 6:
+            bridge._supervising = False
+        return False
+    
+    bridge._wakeup = RecordingEvent()
+    bridge._open = failing_open
+    bridge._supervising = True
+    bridge._supervise_loop()
+    
+    assert waits == [0.5, 1.0, 2.0, 4.0, 4.0, 4.0]
+    assert attempts == [0] * 6
+
+
+def test_heartbeat_measures_rtt():
+    """Test pings answered by Unity give round-trip times."""
+    server = FakeUnityServer()
+    bridge = supervised_bridge(server.port)
+    
+    try:
+        assert bridge.connect()
+        assert wait_until(lambda: bridge.get_stats()['rtt_ms'] is not None)
+        
+        stats = bridge.get_stats()
+        assert stats['pings'] >= 1
+        assert 0 <= stats['rtt_ms'] < 1000
+        assert stats['queued'] == 0
+    finally:
+        bridge.disconnect()
+        server.close()
+
+
+def test_silent_unity_dropped_after_heartbeat_timeout():
+    """Test a Unity that stops answering pings is considered disconnected."""
+    server = FakeUnityServer()
+    bridge = supervised_bridge(server.port)
+    
+    try:
+        assert bridge.connect()
+        assert wait_until(lambda: bridge.get_stats()['rtt_ms'] is not None)
+        
+        server.answer_pings = False
+        assert wait_until(bridge.is_reconnecting)
+        assert bridge.can_send()
+    finally:
+        bridge.disconnect()
+        server.close()
+
+
+def test_unity_without_heartbeat_support_kept():
+    """Test a Unity build that never answers pings is not disconnected."""
+    server = FakeUnityServer(answer_pings=False)
+    bridge = supervised_bridge(server.port, heartbeat_timeout=0.1)
+    
+    try:
+        assert bridge.connect()
+        assert wait_until(lambda: server.pings >= 3)
+        assert bridge.is_connected()
+    finally:
+        bridge.disconnect()
+        server.close()
+
+
+def test_reconnect_replays_avatar_state():
+    """Test Unity restart: commands buffered, state replayed after reconnecting."""
+    first = FakeUnityServer()
+    bridge = supervised_bridge(first.port)
+    second = None
+    
+    try:
+        assert bridge.connect()
+        bridge.load_vrm_model("a.vrm")
+        bridge.set_expression("joy", 0.8)
+        bridge.set_auto_blink(True)
+        bridge.set_transition_speed(2.0)
+        assert bridge.flush(timeout=5.0)
+        assert wait_until(lambda: len(first.commands) == 4)
+        
+        first.kill()
+        assert wait_until(bridge.is_reconnecting)
+        
+        # Issued while Unity is down: kept for replay instead of dropped
+        assert bridge.set_expression("angry", 0.25)
+        assert bridge.set_expression("joy", 0.5)
+        
+        second = FakeUnityServer(port=first.port)
+        assert wait_until(lambda: len(second.commands) >= 6)
+        time.sleep(0.1)
+        
+        assert second.commands == [
+            {"command": "load_model", "data": {"path": "a.vrm"}},
+            {"command": "reset_expressions", "data": {}},
+            {"command": "set_auto_blink", "data": {"enabled": True}},
+            {"command": "set_transition_speed", "data": {"speed": 2.0}},
+            {"command": "set_expression", "data": {"name": "joy", "value": 0.5}},
+            {"command": "set_expression", "data": {"name": "angry", "value": 0.25}},
+        ]
+        assert bridge.is_connected()
+        assert bridge.get_stats()['reconnects'] == 1
+    finally:
+        bridge.disconnect()
+        first.close()
+        if second is not None:
+            second.close()
+
+
+def test_disconnect_stops_reconnecting():
+    """Test explicit disconnect: no reconnection, commands rejected."""
+    server = FakeUnityServer()
+    bridge = supervised_bridge(server.port)
+    
+    try:
+        assert bridge.connect()
+    finally:
+        bridge.disconnect()
+        server.close()
+    
+    assert not bridge.is_reconnecting()
+    assert not bridge.can_send()
+    assert bridge.set_expression("joy", 1.0) is False
+    
+    bridge.supervisor_thread.join(timeout=5.0)
+    assert not bridge.supervisor_thread.is_alive()
+
+
+def test_reconnect_after_disconnect_replaces_supervisor():
+    """Test Disconnect then Connect: the previous supervisor stands down."""
+    server = FakeUnityServer()
+    bridge = supervised_bridge(server.port)
+    
+    try:
+        assert bridge.connect()
+        previous = bridge.supervisor_thread
+        bridge.disconnect()
+        assert bridge.connect()
+        
+        # Stale reconnection attempt finishing late: not published, socket closed
+        sock = bridge.socket
+        assert bridge._open(generation=bridge._supervisor_generation - 1) is False
+        assert bridge.socket is sock
+        
+        assert wait_until(lambda: not previous.is_alive())
+        assert bridge.supervisor_thread.is_alive()
+        assert bridge.is_connected()
+    finally:
+        bridge.disconnect()
+        server.close()
+
+
+# === Replies (message ids, futures, latency histograms) ===
+
+def test_binary_frames_carry_id_only_when_awaited():
+    """Test an awaited hot command is sent as a JSON frame with its id."""
+    codec = CODECS["binary"]
+    data = {"name": "joy", "value": 0.5}
+    
+    frame = codec.encode("set_expression", data, 7)
+    messages, _ = codec.decode(bytearray(frame), 0, len(frame))
+    
+    assert FRAME_HEADER.unpack_from(frame)[1] == FRAME_JSON
+    assert messages == [{"id": 7, "command": "set_expression", "data": data}]
+    assert FRAME_HEADER.unpack_from(codec.encode("set_expression", data))[1] == FRAME_SET_EXPRESSION
+
+
+def test_request_returns_reply_and_records_latency():
+    """Test sync request: Unity's reply, per-command latency histogram."""
+    server = FakeUnityServer(reply_delays={"load_model": 0.05})
+    bridge = UnityBridge(port=server.port, auto_reconnect=False)
+    
+    try:
+        assert bridge.connect()
+        
+        reply = bridge.request("load_model", {"path": "a.vrm"})
+        assert reply.ok
+        assert reply.command == "load_model"
+        assert reply.latency_ms >= 40
+        
+        assert not bridge.request("unknown").ok
+        
+        latency = bridge.get_latency_stats()
+        assert list(latency)[0] == "load_model"
+        assert latency["load_model"]['count'] == 1
+        assert latency["load_model"]['p95_ms'] >= 40
+        assert bridge.get_stats()['replies'] == 2
+        assert bridge.get_stats()['awaiting'] == 0
+    finally:
+        bridge.disconnect()
+        server.close()
+    
+    assert server.ids == [1, 2]
+
+
+def test_set_expression_async_and_callback():
+    """Test asyncio API and reply callbacks."""
+    server = FakeUnityServer()
+    bridge = UnityBridge(port=server.port, auto_reconnect=False)
+    replies = []
+    done = threading.Event()
+    
+    def on_reply(reply):
+        replies.append(reply)
+        done.set()
+    
+    try:
+        assert bridge.connect()
+        
+        reply = asyncio.run(bridge.set_expression_async("joy", 2.0))
+        assert reply.ok and reply.command == "set_expression"
+        
+        assert bridge.send_command("set_auto_blink", {"enabled": True}, callback=on_reply)
+        assert done.wait(5.0)
+        assert replies[0].command == "set_auto_blink"
+    finally:
+        bridge.disconnect()
+        server.close()
+    
+    assert server.commands[0] == {"command": "set_expression", "data": {"name": "joy", "value": 1.0}}
+
+
+def test_superseded_commands_resolved_by_replacement():
+    """Test futures of coalesced commands resolve with the reply to the survivor."""
+    bridge = queued_bridge()
+    
+    first = bridge.submit("set_expression", {"name": "joy", "value": 0.2})
+    second = bridge.submit("set_expression", {"name": "joy", "value": 0.4})
+    reset = bridge.submit("reset_expressions")
+    
+    bridge._write_batch([
+        (command, data, bridge._waiters.pop(key, None))
+        for key, (command, data) in bridge._pending.items()
+    ])
+    message_id, = bridge._awaiting
+    bridge._handle_message({"type": "response", "status": "success", "id": message_id})
+    
+    for future in (first, second, reset):
+        assert future.result(timeout=1.0).command == "reset_expressions"
+
+
+def test_unanswered_commands_fail():
+    """Test dropped commands, lost connections and missing replies surface as errors."""
+    bridge = UnityBridge(max_pending=1)
+    bridge.connected = True
+    bridge.socket = Mock()
+    
+    dropped = bridge.submit("load_model", {"path": "a.vrm"})
+    sent = bridge.submit("unload_model")
+    with pytest.raises(CommandDroppedError):
+        dropped.result(timeout=1.0)
+    
+    bridge._write_batch([("unload_model", {}, bridge._waiters.pop(key)) for key in list(bridge._pending)])
+    bridge._connection_lost(bridge.socket)
+    with pytest.raises(ConnectionError):
+        sent.result(timeout=1.0)
+    
+    with pytest.raises(ConnectionError):
+        bridge.submit("reset_expressions").result(timeout=1.0)
+    
+    # No sender thread: the reply never comes
+    with pytest.raises(TimeoutError):
+        queued_bridge().request("ping", timeout=0.05)
+
+
+def test_latency_histogram_percentiles():
+    """Test bucket counts and percentile estimates."""
+    histogram = LatencyHistogram()
+    for latency_ms in [0.5] * 90 + [30.0] * 9 + [7000.0]:
+        histogram.record(latency_ms)
+    
+    stats = histogram.to_dict()
+    assert stats['count'] == 100
+    assert stats['buckets']["<=1"] == 90
+    assert stats['buckets'][">5000"] == 1
+    assert stats['p50_ms'] == 1
+    assert stats['p95_ms'] == 50
+    assert stats['max_ms'] == 7000.0
+    assert LatencyHistogram().percentile(0.5) is None
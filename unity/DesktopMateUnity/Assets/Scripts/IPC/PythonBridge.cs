@@ -44,10 +44,22 @@ public class PythonBridge : MonoBehaviour
     private TcpClient client;
     private NetworkStream stream;
     private Thread listenThread;
+    // Sérialise les écritures : SendMessage est appelé par le thread réseau et le thread principal
+    private readonly object sendLock = new object();
     private bool isRunning = false;
 
-    // Buffer pour les messages
-    private string messageBuffer = "";
+    // Buffer de réception réutilisé (rempli directement par stream.Read)
+    private byte[] receiveBuffer = new byte[65536];
+    private int receiveStart = 0;
+    private int receiveEnd = 0;
+
+    // Protocole binaire (trames préfixées par leur longueur), négocié par Python
+    private bool useBinaryProtocol = false;
+    private const int BINARY_PROTOCOL_VERSION = 1;
+    private const byte FRAME_JSON = 0x01;            // JSON UTF-8 (toute commande, réponses)
+    private const byte FRAME_SET_EXPRESSION = 0x02;  // <f32 valeur><u8 longueur nom><nom UTF-8>
+    private const byte FRAME_HEAD_MOVEMENT = 0x03;   // <u8 enabled><f32 min><f32 max><f32 angle>
+    private const int MAX_FRAME_SIZE = 16 * 1024 * 1024;
     
     // Queue pour exécuter les actions sur le thread principal Unity
     private Queue<Action> mainThreadActions = new Queue<Action>();
@@ -123,10 +135,15 @@ public class PythonBridge : MonoBehaviour
                 stream = client.GetStream();
                 isConnected = true;
 
+                // Nouveau client : JSON jusqu'à la négociation, buffer vide
+                useBinaryProtocol = false;
+                receiveStart = 0;
+                receiveEnd = 0;
+
                 Debug.Log("[PythonBridge] 🔗 Client Python connecté !");
 
                 // Envoyer un message de confirmation
-                SendMessage(new
+                SendMessage(new UnityResponse
                 {
                     type = "response",
                     status = "connected",
@@ -153,14 +170,17 @@ public class PythonBridge : MonoBehaviour
     /// </summary>
     void ReceiveMessages()
     {
-        byte[] buffer = new byte[4096];
-
         while (isRunning && client != null && client.Connected)
         {
             try
             {
-                // Lire les données
-                int bytesRead = stream.Read(buffer, 0, buffer.Length);
+                // Lire les données directement dans l'espace libre du buffer
+                if (receiveEnd == receiveBuffer.Length)
+                {
+                    MakeRoom();
+                }
+
+                int bytesRead = stream.Read(receiveBuffer, receiveEnd, receiveBuffer.Length - receiveEnd);
 
                 if (bytesRead == 0)
                 {
@@ -170,11 +190,9 @@ public class PythonBridge : MonoBehaviour
                     break;
                 }
 
-                // Convertir en string
-                string data = Encoding.UTF8.GetString(buffer, 0, bytesRead);
-                messageBuffer += data;
+                receiveEnd += bytesRead;
 
-                // Traiter les messages complets (séparés par \n)
+                // Traiter les messages complets (lignes JSON ou trames binaires)
                 ProcessMessages();
             }
             catch (Exception e)
@@ -187,21 +205,167 @@ public class PythonBridge : MonoBehaviour
     }
 
     /// <summary>
-    /// Traite les messages reçus du buffer
+    /// Libère de la place dans le buffer de réception : décale les octets non lus
+    /// au début, ou agrandit le buffer si un seul message le remplit
+    /// </summary>
+    void MakeRoom()
+    {
+        int pending = receiveEnd - receiveStart;
+
+        if (receiveStart == 0)
+        {
+            if (receiveBuffer.Length >= MAX_FRAME_SIZE)
+            {
+                throw new InvalidOperationException($"Message supérieur à {MAX_FRAME_SIZE} octets");
+            }
+
+            byte[] larger = new byte[receiveBuffer.Length * 2];
+            Buffer.BlockCopy(receiveBuffer, 0, larger, 0, pending);
+            receiveBuffer = larger;
+        }
+        else
+        {
+            Buffer.BlockCopy(receiveBuffer, receiveStart, receiveBuffer, 0, pending);
+        }
+
+        receiveStart = 0;
+        receiveEnd = pending;
+    }
+
+    /// <summary>
+    /// Traite les messages complets du buffer de réception
+    /// Le protocole est relu à chaque message : la négociation bascule en binaire
+    /// pour les octets qui suivent
     /// </summary>
     void ProcessMessages()
     {
-        while (messageBuffer.Contains("\n"))
+        while (receiveStart < receiveEnd)
+        {
+            bool handled = useBinaryProtocol ? ProcessFrame() : ProcessLine();
+            if (!handled)
+            {
+                break;
+            }
+        }
+
+        if (receiveStart == receiveEnd)
         {
-            int newlineIndex = messageBuffer.IndexOf("\n");
-            string message = messageBuffer.Substring(0, newlineIndex);
-            messageBuffer = messageBuffer.Substring(newlineIndex + 1);
+            receiveStart = 0;
+            receiveEnd = 0;
+        }
+    }
 
-            if (!string.IsNullOrWhiteSpace(message))
+    /// <summary>
+    /// Traite une ligne JSON complète (protocole JSON)
+    /// </summary>
+    /// <returns>false si aucune ligne complète n'est disponible</returns>
+    bool ProcessLine()
+    {
+        int newlineIndex = Array.IndexOf(receiveBuffer, (byte)'\n', receiveStart, receiveEnd - receiveStart);
+        if (newlineIndex == -1)
+        {
+            return false;
+        }
+
+        string message = Encoding.UTF8.GetString(receiveBuffer, receiveStart, newlineIndex - receiveStart);
+        receiveStart = newlineIndex + 1;
+
+        if (!string.IsNullOrWhiteSpace(message))
+        {
+            HandleMessage(message);
+        }
+
+        return true;
+    }
+
+    /// <summary>
+    /// Traite une trame binaire complète : <u32 longueur (type + données)><u8 type><données>
+    /// Les commandes fréquentes sont lues en place, sans passer par une chaîne JSON
+    /// </summary>
+    /// <returns>false si aucune trame complète n'est disponible</returns>
+    bool ProcessFrame()
+    {
+        if (receiveEnd - receiveStart < 5)
+        {
+            return false;
+        }
+
+        int length = receiveBuffer[receiveStart]
+            | (receiveBuffer[receiveStart + 1] << 8)
+            | (receiveBuffer[receiveStart + 2] << 16)
+            | (receiveBuffer[receiveStart + 3] << 24);
+
+        if (length < 1 || length > MAX_FRAME_SIZE)
+        {
+            throw new InvalidOperationException($"Longueur de trame invalide : {length}");
+        }
+
+        if (receiveEnd - receiveStart < 4 + length)
+        {
+            return false;
+        }
+
+        byte frameType = receiveBuffer[receiveStart + 4];
+        int offset = receiveStart + 5;
+        int payloadLength = length - 1;
+        receiveStart += 4 + length;
+
+        try
+        {
+            switch (frameType)
             {
-                HandleMessage(message);
+                case FRAME_JSON:
+                    HandleMessage(Encoding.UTF8.GetString(receiveBuffer, offset, payloadLength));
+                    break;
+
+                case FRAME_SET_EXPRESSION:
+                {
+                    float value = ReadFloat(offset);
+                    int nameLength = receiveBuffer[offset + 4];
+                    if (5 + nameLength > payloadLength)
+                    {
+                        throw new InvalidOperationException("Trame set_expression tronquée");
+                    }
+                    string expressionName = Encoding.UTF8.GetString(receiveBuffer, offset + 5, nameLength);
+                    ApplyExpression(expressionName, value, false, 0);
+                    break;
+                }
+
+                case FRAME_HEAD_MOVEMENT:
+                {
+                    bool enabled = receiveBuffer[offset] != 0;
+                    float minInterval = ReadFloat(offset + 1);
+                    float maxInterval = ReadFloat(offset + 5);
+                    float maxAngle = ReadFloat(offset + 9);
+                    ApplyAutoHeadMovement(enabled, minInterval, maxInterval, maxAngle, false, 0);
+                    break;
+                }
+
+                default:
+                    Debug.LogWarning($"[PythonBridge] ⚠️ Type de trame inconnu : {frameType}");
+                    break;
             }
         }
+        catch (Exception e)
+        {
+            Debug.LogError($"[PythonBridge] ❌ Erreur de traitement de la trame : {e.Message}");
+        }
+
+        return true;
+    }
+
+    /// <summary>
+    /// Lit un float 32 bits little-endian dans le buffer de réception
+    /// </summary>
+    float ReadFloat(int offset)
+    {
+        if (BitConverter.IsLittleEndian)
+        {
+            return BitConverter.ToSingle(receiveBuffer, offset);
+        }
+
+        byte[] bytes = { receiveBuffer[offset + 3], receiveBuffer[offset + 2], receiveBuffer[offset + 1], receiveBuffer[offset] };
+        return BitConverter.ToSingle(bytes, 0);
     }
 
     /// <summary>
@@ -211,7 +375,11 @@ public class PythonBridge : MonoBehaviour
     {
         try
         {
-            Debug.Log($"[PythonBridge] 📨 Reçu : {jsonMessage}");
+            // Les pings (heartbeat toutes les 2 s) ne sont pas journalisés
+            if (!jsonMessage.Contains("\"ping\""))
+            {
+                Debug.Log($"[PythonBridge] 📨 Reçu : {jsonMessage}");
+            }
 
             // Parser le JSON (simple pour l'instant)
             // TODO: Utiliser JsonUtility ou Newtonsoft.Json pour un parsing complet
@@ -219,7 +387,44 @@ public class PythonBridge : MonoBehaviour
             // Pour l'instant, on détecte juste la commande
             if (jsonMessage.Contains("\"command\""))
             {
-                if (jsonMessage.Contains("\"load_model\""))
+                // Identifiant de la commande (placé en tête par Python), renvoyé dans la réponse
+                long requestId = ExtractLongValue(jsonMessage, "id");
+
+                if (jsonMessage.Contains("\"negotiate_protocol\""))
+                {
+                    string protocol = ExtractStringValue(jsonMessage, "protocol");
+                    bool accepted = protocol == "binary";
+
+                    Debug.Log($"[PythonBridge] 🔀 Négociation du protocole : {protocol} ({(accepted ? "accepté" : "refusé")})");
+
+                    // Réponse envoyée en JSON, avant de basculer pour la suite du flux
+                    // (sous le verrou d'envoi : aucun message du thread principal entre les deux)
+                    lock (sendLock)
+                    {
+                        SendMessage(new UnityResponse
+                        {
+                            type = "response",
+                            command = "negotiate_protocol",
+                            status = accepted ? "success" : "error",
+                            protocol = accepted ? "binary" : "json",
+                            message = accepted ? $"Protocole binaire v{BINARY_PROTOCOL_VERSION}" : $"Protocole inconnu : {protocol}"
+                        });
+
+                        useBinaryProtocol = accepted;
+                    }
+                }
+                else if (jsonMessage.Contains("\"ping\""))
+                {
+                    // Heartbeat : réponse immédiate depuis le thread réseau (mesure du RTT côté Python)
+                    SendMessage(new UnityResponse
+                    {
+                        type = "pong",
+                        command = "ping",
+                        status = "success",
+                        id = requestId
+                    });
+                }
+                else if (jsonMessage.Contains("\"load_model\""))
                 {
                     Debug.Log("[PythonBridge] 🎭 Commande : Charger un modèle VRM");
 
@@ -232,24 +437,12 @@ public class PythonBridge : MonoBehaviour
                         Debug.Log($"[PythonBridge] 📂 Chargement depuis : {path}");
                         vrmLoader.LoadVRMFromPath(path);
 
-                        SendMessage(new
-                        {
-                            type = "response",
-                            command = "load_model",
-                            status = "success",
-                            message = $"Modèle en cours de chargement : {path}"
-                        });
+                        SendResponse("load_model", "success", $"Modèle en cours de chargement : {path}", requestId);
                     }
                     else
                     {
                         Debug.LogError("[PythonBridge] ❌ VRMLoader non assigné !");
-                        SendMessage(new
-                        {
-                            type = "response",
-                            command = "load_model",
-                            status = "error",
-                            message = "VRMLoader non configuré"
-                        });
+                        SendResponse("load_model", "error", "VRMLoader non configuré", requestId);
                     }
                 }
                 else if (jsonMessage.Contains("\"unload_model\""))
@@ -267,24 +460,12 @@ public class PythonBridge : MonoBehaviour
                                 // Les expressions sont automatiquement perdues avec Destroy(currentModel)
                                 vrmLoader.UnloadModel();
 
-                                SendMessage(new
-                                {
-                                    type = "response",
-                                    command = "unload_model",
-                                    status = "success",
-                                    message = "Modèle déchargé avec succès"
-                                });
+                                SendResponse("unload_model", "success", "Modèle déchargé avec succès", requestId);
                             }
                             else
                             {
                                 Debug.LogError("[PythonBridge] ❌ VRMLoader non assigné !");
-                                SendMessage(new
-                                {
-                                    type = "response",
-                                    command = "unload_model",
-                                    status = "error",
-                                    message = "VRMLoader non configuré"
-                                });
+                                SendResponse("unload_model", "error", "VRMLoader non configuré", requestId);
                             }
                         });
                     }
@@ -297,31 +478,7 @@ public class PythonBridge : MonoBehaviour
                     string expressionName = ExtractStringValue(jsonMessage, "name");
                     float expressionValue = ExtractFloatValue(jsonMessage, "value");
 
-                    // Appeler le BlendshapeController
-                    if (blendshapeController != null)
-                    {
-                        Debug.Log($"[PythonBridge] 🎭 Expression : {expressionName} = {expressionValue:F2}");
-                        blendshapeController.SetExpression(expressionName, expressionValue);
-
-                        SendMessage(new
-                        {
-                            type = "response",
-                            command = "set_expression",
-                            status = "success",
-                            message = $"Expression '{expressionName}' appliquée à {expressionValue:F2}"
-                        });
-                    }
-                    else
-                    {
-                        Debug.LogError("[PythonBridge] ❌ VRMBlendshapeController non assigné !");
-                        SendMessage(new
-                        {
-                            type = "response",
-                            command = "set_expression",
-                            status = "error",
-                            message = "VRMBlendshapeController non configuré"
-                        });
-                    }
+                    ApplyExpression(expressionName, expressionValue, true, requestId);
                 }
                 else if (jsonMessage.Contains("\"reset_expressions\""))
                 {
@@ -332,24 +489,12 @@ public class PythonBridge : MonoBehaviour
                     {
                         blendshapeController.ResetExpressions();
 
-                        SendMessage(new
-                        {
-                            type = "response",
-                            command = "reset_expressions",
-                            status = "success",
-                            message = "Toutes les expressions réinitialisées"
-                        });
+                        SendResponse("reset_expressions", "success", "Toutes les expressions réinitialisées", requestId);
                     }
                     else
                     {
                         Debug.LogError("[PythonBridge] ❌ VRMBlendshapeController non assigné !");
-                        SendMessage(new
-                        {
-                            type = "response",
-                            command = "reset_expressions",
-                            status = "error",
-                            message = "VRMBlendshapeController non configuré"
-                        });
+                        SendResponse("reset_expressions", "error", "VRMBlendshapeController non configuré", requestId);
                     }
                 }
                 else if (jsonMessage.Contains("\"set_transition_speed\""))
@@ -365,24 +510,12 @@ public class PythonBridge : MonoBehaviour
                         Debug.Log($"[PythonBridge] 🎚️ Vitesse de transition : {speed:F2}");
                         blendshapeController.SetTransitionSpeed(speed);
 
-                        SendMessage(new
-                        {
-                            type = "response",
-                            command = "set_transition_speed",
-                            status = "success",
-                            message = $"Vitesse de transition définie à {speed:F2}"
-                        });
+                        SendResponse("set_transition_speed", "success", $"Vitesse de transition définie à {speed:F2}", requestId);
                     }
                     else
                     {
                         Debug.LogError("[PythonBridge] ❌ VRMBlendshapeController non assigné !");
-                        SendMessage(new
-                        {
-                            type = "response",
-                            command = "set_transition_speed",
-                            status = "error",
-                            message = "VRMBlendshapeController non configuré"
-                        });
+                        SendResponse("set_transition_speed", "error", "VRMBlendshapeController non configuré", requestId);
                     }
                 }
                 else if (jsonMessage.Contains("\"set_auto_blink\""))
@@ -401,24 +534,12 @@ public class PythonBridge : MonoBehaviour
                                 autoBlinkController.SetAutoBlinkEnabled(enabled);
                                 Debug.Log($"[PythonBridge] 👁️ Clignement automatique : {(enabled ? "ACTIVÉ" : "DÉSACTIVÉ")}");
                                 
-                                SendMessage(new
-                                {
-                                    type = "response",
-                                    command = "set_auto_blink",
-                                    status = "success",
-                                    message = $"Clignement automatique {(enabled ? "activé" : "désactivé")}"
-                                });
+                                SendResponse("set_auto_blink", "success", $"Clignement automatique {(enabled ? "activé" : "désactivé")}", requestId);
                             }
                             else
                             {
                                 Debug.LogError("[PythonBridge] ❌ VRMAutoBlinkController non assigné !");
-                                SendMessage(new
-                                {
-                                    type = "response",
-                                    command = "set_auto_blink",
-                                    status = "error",
-                                    message = "VRMAutoBlinkController non configuré"
-                                });
+                                SendResponse("set_auto_blink", "error", "VRMAutoBlinkController non configuré", requestId);
                             }
                         });
                     }
@@ -433,46 +554,7 @@ public class PythonBridge : MonoBehaviour
                     float maxInterval = ExtractFloatValue(jsonMessage, "max_interval");
                     float maxAngle = ExtractFloatValue(jsonMessage, "max_angle");
 
-                    // Enqueue l'action sur le thread principal
-                    lock (mainThreadActions)
-                    {
-                        mainThreadActions.Enqueue(() => {
-                            if (headMovementController != null)
-                            {
-                                headMovementController.SetAutoHeadMovement(enabled);
-                                
-                                // Mettre à jour les paramètres de timing (min, max, duration)
-                                // Note: duration est fixé à 2.0s (1s aller + 1s retour)
-                                headMovementController.UpdateTimingParameters(minInterval, maxInterval, 2.0f);
-                                
-                                // Mettre à jour les paramètres d'amplitude (yaw, pitch)
-                                // Note: pitch = maxAngle / 2 pour des mouvements plus subtils
-                                headMovementController.UpdateAmplitudeParameters(maxAngle, maxAngle / 2f);
-                                
-                                Debug.Log($"[PythonBridge] 🎭 Mouvements de tête : {(enabled ? "ACTIVÉS" : "DÉSACTIVÉS")}");
-                                Debug.Log($"[PythonBridge] 🎭 Paramètres : Interval [{minInterval:F1}s-{maxInterval:F1}s], Angle max {maxAngle:F1}°");
-                                
-                                SendMessage(new
-                                {
-                                    type = "response",
-                                    command = "set_auto_head_movement",
-                                    status = "success",
-                                    message = $"Mouvements de tête {(enabled ? "activés" : "désactivés")}"
-                                });
-                            }
-                            else
-                            {
-                                Debug.LogError("[PythonBridge] ❌ VRMHeadMovementController non assigné !");
-                                SendMessage(new
-                                {
-                                    type = "response",
-                                    command = "set_auto_head_movement",
-                                    status = "error",
-                                    message = "VRMHeadMovementController non configuré"
-                                });
-                            }
-                        });
-                    }
+                    ApplyAutoHeadMovement(enabled, minInterval, maxInterval, maxAngle, true, requestId);
                 }
                 else if (jsonMessage.Contains("\"set_blendshape\""))
                 {
@@ -487,8 +569,89 @@ public class PythonBridge : MonoBehaviour
         }
     }
 
+    /// <summary>
+    /// Applique une expression (commande JSON ou trame binaire)
+    /// Les trames binaires, envoyées à haute fréquence, ne sont ni journalisées ni acquittées
+    /// (requestId = 0 : commande sans identifiant)
+    /// </summary>
+    void ApplyExpression(string expressionName, float expressionValue, bool acknowledge, long requestId)
+    {
+        // Appeler le BlendshapeController
+        if (blendshapeController != null)
+        {
+            blendshapeController.SetExpression(expressionName, expressionValue);
+
+            if (acknowledge)
+            {
+                Debug.Log($"[PythonBridge] 🎭 Expression : {expressionName} = {expressionValue:F2}");
+                SendResponse("set_expression", "success", $"Expression '{expressionName}' appliquée à {expressionValue:F2}", requestId);
+            }
+        }
+        else
+        {
+            Debug.LogError("[PythonBridge] ❌ VRMBlendshapeController non assigné !");
+            SendResponse("set_expression", "error", "VRMBlendshapeController non configuré", requestId);
+        }
+    }
+
+    /// <summary>
+    /// Applique les paramètres des mouvements de tête automatiques (commande JSON ou trame binaire)
+    /// </summary>
+    void ApplyAutoHeadMovement(bool enabled, float minInterval, float maxInterval, float maxAngle, bool acknowledge, long requestId)
+    {
+        // Enqueue l'action sur le thread principal
+        lock (mainThreadActions)
+        {
+            mainThreadActions.Enqueue(() => {
+                if (headMovementController != null)
+                {
+                    headMovementController.SetAutoHeadMovement(enabled);
+                    
+                    // Mettre à jour les paramètres de timing (min, max, duration)
+                    // Note: duration est fixé à 2.0s (1s aller + 1s retour)
+                    headMovementController.UpdateTimingParameters(minInterval, maxInterval, 2.0f);
+                    
+                    // Mettre à jour les paramètres d'amplitude (yaw, pitch)
+                    // Note: pitch = maxAngle / 2 pour des mouvements plus subtils
+                    headMovementController.UpdateAmplitudeParameters(maxAngle, maxAngle / 2f);
+                    
+                    if (acknowledge)
+                    {
+                        Debug.Log($"[PythonBridge] 🎭 Mouvements de tête : {(enabled ? "ACTIVÉS" : "DÉSACTIVÉS")}");
+                        Debug.Log($"[PythonBridge] 🎭 Paramètres : Interval [{minInterval:F1}s-{maxInterval:F1}s], Angle max {maxAngle:F1}°");
+                        
+                        SendResponse("set_auto_head_movement", "success", $"Mouvements de tête {(enabled ? "activés" : "désactivés")}", requestId);
+                    }
+                }
+                else
+                {
+                    Debug.LogError("[PythonBridge] ❌ VRMHeadMovementController non assigné !");
+                    SendResponse("set_auto_head_movement", "error", "VRMHeadMovementController non configuré", requestId);
+                }
+            });
+        }
+    }
+
+    /// <summary>
+    /// Envoie la réponse à une commande (requestId : identifiant de la commande, 0 si aucun)
+    /// UnityResponse plutôt qu'un objet anonyme : JsonUtility ne sérialise que les types [Serializable]
+    /// </summary>
+    void SendResponse(string command, string status, string message, long requestId)
+    {
+        SendMessage(new UnityResponse
+        {
+            type = "response",
+            command = command,
+            status = status,
+            message = message,
+            id = requestId
+        });
+    }
+
     /// <summary>
     /// Envoie un message au client Python
+    /// (ligne JSON, ou trame FRAME_JSON si le protocole binaire est négocié)
+    /// Thread-safe : un message n'est jamais entrelacé avec un autre
     /// </summary>
     public void SendMessage(object data)
     {
@@ -502,12 +665,11 @@ public class PythonBridge : MonoBehaviour
         {
             // Convertir en JSON (simple)
             string json = JsonUtility.ToJson(data);
-            string message = json + "\n";
 
-            // Convertir en bytes et envoyer
-            byte[] bytes = Encoding.UTF8.GetBytes(message);
-            stream.Write(bytes, 0, bytes.Length);
-            stream.Flush();
+            lock (sendLock)
+            {
+                WriteMessage(json);
+            }
 
             Debug.Log($"[PythonBridge] 📤 Envoyé : {json}");
         }
@@ -518,6 +680,36 @@ public class PythonBridge : MonoBehaviour
         }
     }
 
+    /// <summary>
+    /// Écrit un message JSON sur le flux dans le protocole courant (appelant : verrou sendLock pris)
+    /// </summary>
+    private void WriteMessage(string json)
+    {
+        byte[] bytes;
+
+        if (useBinaryProtocol)
+        {
+            // Trame : <u32 longueur little-endian><u8 FRAME_JSON><JSON UTF-8>
+            int payloadLength = Encoding.UTF8.GetByteCount(json);
+            int length = payloadLength + 1;
+            bytes = new byte[4 + length];
+            bytes[0] = (byte)length;
+            bytes[1] = (byte)(length >> 8);
+            bytes[2] = (byte)(length >> 16);
+            bytes[3] = (byte)(length >> 24);
+            bytes[4] = FRAME_JSON;
+            Encoding.UTF8.GetBytes(json, 0, json.Length, bytes, 5);
+        }
+        else
+        {
+            // Convertir en bytes (ligne terminée par \n)
+            bytes = Encoding.UTF8.GetBytes(json + "\n");
+        }
+
+        stream.Write(bytes, 0, bytes.Length);
+        stream.Flush();
+    }
+
     /// <summary>
     /// Nettoyage à la fermeture de l'application
     /// </summary>
@@ -656,6 +848,53 @@ public class PythonBridge : MonoBehaviour
         }
     }
 
+    /// <summary>
+    /// Extrait une valeur entière d'un JSON simple (id de requête Python, entier non borné)
+    /// Lu comme jeton brut : pas d'arrondi float32 au-delà de 2^24
+    /// </summary>
+    private long ExtractLongValue(string json, string key)
+    {
+        try
+        {
+            string searchKey = $"\"{key}\"";
+            int keyStart = json.IndexOf(searchKey);
+            if (keyStart == -1) return 0;
+
+            // Chercher le ':' après la clé
+            int colonIndex = json.IndexOf(":", keyStart);
+            if (colonIndex == -1) return 0;
+
+            // Trouver le début de la valeur (après ':' et espaces)
+            int valueStart = colonIndex + 1;
+            while (valueStart < json.Length && (json[valueStart] == ' ' || json[valueStart] == '\t'))
+                valueStart++;
+
+            // Trouver la fin de la valeur (avant ',' ou '}')
+            int valueEnd = valueStart;
+            while (valueEnd < json.Length && json[valueEnd] != ',' && json[valueEnd] != '}' && json[valueEnd] != '\n')
+                valueEnd++;
+
+            string valueStr = json.Substring(valueStart, valueEnd - valueStart).Trim();
+
+            // null (pas d'id) : 0, comme côté Python
+            if (valueStr == "null") return 0;
+
+            // Parser l'entier
+            if (long.TryParse(valueStr, System.Globalization.NumberStyles.Integer, System.Globalization.CultureInfo.InvariantCulture, out long result))
+            {
+                return result;
+            }
+
+            Debug.LogWarning($"[PythonBridge] ⚠️ Impossible de parser entier '{key}' : '{valueStr}'");
+            return 0;
+        }
+        catch (Exception e)
+        {
+            Debug.LogError($"[PythonBridge] ❌ Erreur extraction entier '{key}' : {e.Message}");
+            return 0;
+        }
+    }
+
     /// <summary>
     /// Extrait une valeur booléenne depuis un JSON simple
     /// </summary>
@@ -726,4 +965,6 @@ public class UnityResponse
     public string status;
     public string message;
     public string command;
+    public string protocol;
+    public long id;
 }